@@ -161,7 +161,7 @@ async def trigger_integration(args: dict) -> dict:
                     "url": url,
                     "params": params,
                     "status_code": resp.status,
-                    "success": resp.status == 200,
+                    "success": resp.status in (200, 202),
                     "body": body,
                 }
         return {"content": [{"type": "text", "text": json.dumps(result, indent=2, default=str)}]}
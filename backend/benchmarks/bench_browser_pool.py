@@ -0,0 +1,120 @@
+"""
+NGCP-style scrape latency and memory: Chromium per scrape vs. the warm browser pool.
+
+Serves a local page shaped like the ngcp.ph homepage (the Power Situation
+Outlook table plus a few large images and a web font) and scrapes it N times:
+
+  before   launch Chromium, new context, goto, extract, close — per scrape
+  after    services.browser_pool pages (one warm browser, recycled contexts,
+           images/fonts/media blocked)
+
+Reports per-scrape latency (first = cold miss, then p50) and the process-tree
+RSS after every scrape, so growth across scrapes is visible.
+
+Requires Playwright's Chromium (`playwright install chromium`).
+
+Usage (from backend/):
+    python -m benchmarks.bench_browser_pool [--scrapes 20] [--context-uses 5]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from aiohttp import web
+from playwright.async_api import async_playwright
+
+from services.browser_pool import CHROMIUM_ARGS, CONTEXT_OPTIONS, BrowserPool, process_tree_rss_mb
+
+IMAGE = b"\x89PNG\r\n\x1a\n" + b"\0" * 2_000_000
+PAGE = """<html><head><style>@font-face {{ font-family: x; src: url(/font.woff2); }}</style></head>
+<body style="font-family: x">{images}
+<h3>Power Situation Outlook</h3>
+<table>
+  <tr><td>as of 6:00 PM, 06 January 2025</td></tr>
+  <tr><th>(MW)</th><th>Luz</th><th>Vis</th><th>Min</th></tr>
+  <tr><td>Available Generating Capacity</td><td>14,054</td><td>2,620</td><td>2,977</td></tr>
+  <tr><td>System Peak Demand</td><td>11,582</td><td>2,333</td><td>2,417</td></tr>
+  <tr><td>Operating Margin</td><td>2,472</td><td>287</td><td>560</td></tr>
+</table></body></html>"""
+EXTRACT = "() => Array.from(document.querySelectorAll('tr')).map(r => r.textContent.trim())"
+
+
+async def serve():
+    async def index(request):
+        images = "".join(f'<img src="/img/{i}.png">' for i in range(8))
+        return web.Response(text=PAGE.format(images=images), content_type="text/html")
+
+    async def image(request):
+        return web.Response(body=IMAGE, content_type="image/png")
+
+    async def font(request):
+        return web.Response(body=b"\0" * 200_000, content_type="font/woff2")
+
+    app = web.Application()
+    app.router.add_get("/", index)
+    app.router.add_get("/img/{name}", image)
+    app.router.add_get("/font.woff2", font)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/"
+
+
+async def scrape_before(url: str):
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+        context = await browser.new_context(**CONTEXT_OPTIONS)
+        page = await context.new_page()
+        await page.goto(url, wait_until="load")
+        rows = await page.evaluate(EXTRACT)
+        await browser.close()
+        return rows
+
+
+def make_after(pool: BrowserPool):
+    async def scrape_after(url: str):
+        async with pool.page() as page:
+            await page.goto(url, wait_until="load")
+            return await page.evaluate(EXTRACT)
+    return scrape_after
+
+
+async def run(label: str, scrape, url: str, scrapes: int):
+    latencies, rss = [], []
+    for _ in range(scrapes):
+        start = time.perf_counter()
+        rows = await scrape(url)
+        latencies.append((time.perf_counter() - start) * 1000)
+        rss.append(process_tree_rss_mb() or 0)
+        assert any("Generating" in row for row in rows)
+
+    print(
+        f"{label:<7} first {latencies[0]:7.0f} ms   p50 {statistics.median(latencies[1:] or latencies):7.0f} ms   "
+        f"RSS first/last/max {rss[0]:5.0f} / {rss[-1]:5.0f} / {max(rss):5.0f} MB"
+    )
+
+
+async def main(scrapes: int, context_uses: int):
+    runner, url = await serve()
+    pool = BrowserPool(size=1, max_context_uses=context_uses)
+    try:
+        await run("before", scrape_before, url, scrapes)
+        await run("after", make_after(pool), url, scrapes)
+        stats = pool.stats()
+        print(f"\npool: {stats['launches']} launch(es), {stats['contexts_created']} contexts, "
+              f"{stats['contexts_recycled']} recycled")
+    finally:
+        await pool.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scrapes", type=int, default=20)
+    parser.add_argument("--context-uses", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.scrapes, args.context_uses))
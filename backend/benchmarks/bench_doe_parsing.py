@@ -0,0 +1,152 @@
+"""
+DOE listing-page parsing: the old inline html.parser code vs. services.html_parsing.
+
+Parses saved DOE listing pages (tests/fixtures/doe/ by default — save live
+ones with `curl -o page.html "<listing url>&page=N"` and pass --pages DIR) and
+reports, for the __NUXT__ path and for the rendered-HTML fallback (the same
+pages with the __NUXT__ script removed):
+
+  * time per page (articles + max-page detection)
+  * event-loop stall while a crawl parses --count pages, 4 in flight,
+    measured by a probe coroutine's late wake-ups from a 5 ms sleep
+
+  before: regex over the whole page + full html.parser trees, inline
+  after:  slice-and-JSON __NUXT__, sliced/strained trees (lxml when
+          installed), fallback parsing of large pages in the worker pool
+
+Usage (from backend/):
+    python -m benchmarks.bench_doe_parsing [--pages DIR] [--count 40] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from services import html_parsing, worker_pool
+from services.doe_integration import _parse_listing_page
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "doe"
+PROBE_INTERVAL = 0.005
+
+
+# The parsers as they were: regex over the whole page, full html.parser trees
+
+
+def _before_nuxt(html: str) -> list:
+    match = re.search(r"window\.__NUXT__\s*=\s*(.+?);\s*</script>", html, re.DOTALL)
+    if not match:
+        return []
+    articles_match = re.search(r'"articles"\s*:\s*(\[.*?\])\s*,\s*"', match.group(1), re.DOTALL)
+    if not articles_match:
+        return []
+    try:
+        return json.loads(articles_match.group(1).replace("undefined", "null"))
+    except json.JSONDecodeError:
+        return []
+
+
+def _before_cards(html: str) -> list:
+    soup = BeautifulSoup(html, "html.parser")
+    ids = []
+    for heading in soup.find_all("h1"):
+        link = heading.find("a")
+        if link and heading.find_parent("div"):
+            match = re.search(r"/articles/(\d+)--", link.get("href", ""))
+            ids.append({"id": int(match.group(1)) if match else None})
+    return ids
+
+
+def _before_max_page(html: str) -> int:
+    soup = BeautifulSoup(html, "html.parser")
+    for select in soup.find_all("select"):
+        values = [int(o["value"]) for o in select.find_all("option") if o.get("value", "").isdigit()]
+        if values and max(values) > 1:
+            return max(values)
+    return 1
+
+
+async def before(html: str, detect_max: bool = True):
+    articles = _before_nuxt(html) or _before_cards(html)
+    return articles, _before_max_page(html) if detect_max else 1
+
+
+async def after(html: str, detect_max: bool = True):
+    return await _parse_listing_page(html, detect_max)
+
+
+async def _probe(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        t = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - t - PROBE_INTERVAL) * 1000)
+
+
+async def per_page(parse, pages: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            await parse(html)
+        best = min(best, time.perf_counter() - start)
+    return best / len(pages) * 1000
+
+
+async def crawl(parse, pages: list, count: int) -> tuple:
+    semaphore = asyncio.Semaphore(4)
+
+    async def one(i: int):
+        async with semaphore:
+            await asyncio.sleep(0.005)  # stand-in for the page fetch
+            # Like the crawler, only the first page detects the page count
+            await parse(pages[i % len(pages)], i == 0)
+
+    stop, lags = asyncio.Event(), []
+    probe = asyncio.create_task(_probe(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    lags.sort()
+    return elapsed, lags[min(len(lags) - 1, int(len(lags) * 0.99))], lags[-1]
+
+
+async def main(pages_dir: Path, count: int, repeat: int):
+    nuxt_pages = [p.read_text(encoding="utf-8") for p in sorted(pages_dir.glob("*.html"))]
+    if not nuxt_pages:
+        raise SystemExit(f"No *.html pages in {pages_dir}")
+    html_pages = [p.replace("window.__NUXT__", "window.__SAVED__") for p in nuxt_pages]
+    size_kb = sum(map(len, nuxt_pages)) / len(nuxt_pages) / 1024
+    print(
+        f"{len(nuxt_pages)} saved pages (~{size_kb:.0f} KB each), parser {html_parsing.PARSER}, "
+        f"offload >= {html_parsing.OFFLOAD_BYTES // 1024} KB\n"
+    )
+
+    for html in nuxt_pages + html_pages:
+        old, new = await before(html), await after(html)
+        assert [a["id"] for a in old[0]] == [a["id"] for a in new[0]] and old[1] == new[1]
+
+    for label, pages in (("__NUXT__", nuxt_pages), ("HTML fallback", html_pages)):
+        print(label)
+        for name, parse in (("before", before), ("after", after)):
+            ms = await per_page(parse, pages, repeat)
+            elapsed, p99, worst = await crawl(parse, pages, count)
+            print(
+                f"  {name:<7} {ms:7.2f} ms/page   crawl of {count}: {elapsed:5.2f}s"
+                f"   loop stall p99 {p99:6.1f} ms   max {worst:6.1f} ms"
+            )
+    worker_pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=Path, default=FIXTURES)
+    parser.add_argument("--count", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.count, args.repeat))
@@ -0,0 +1,107 @@
+"""
+IEMOP MP CSV ingestion: whole-file csv.DictReader vs. the streaming aggregator.
+
+Generates a synthetic full-day MP_YYYYMMDD.csv (288 RTD intervals x N resources
+spread over Luzon/Visayas/Mindanao) and parses it both ways:
+
+  before: decode the whole body, csv.DictReader, per-region float lists
+  after:  services.iemop_csv.MarketPriceAggregator fed 64 KB chunks, as the
+          scraper does while the response streams in
+
+Reports throughput and peak traced memory (tracemalloc) for each.
+
+Usage (from backend/):
+    python -m benchmarks.bench_iemop_csv [--resources 400] [--repeat 3]
+"""
+
+import argparse
+import csv
+import io
+import random
+import time
+import tracemalloc
+
+from services.energy_grid_scraper import WESMPriceScraper
+from services.iemop_csv import CHUNK_SIZE, MarketPriceAggregator
+
+REGION_MAP = WESMPriceScraper.REGION_MAP
+HEADER = "RUN_TIME,MKT_TYPE,TIME_INTERVAL,REGION_NAME,RESOURCE_NAME,RESOURCE_TYPE,COMMODITY_TYPE,MARGINAL_PRICE"
+
+
+def make_csv(resources: int) -> bytes:
+    rng = random.Random(0)
+    regions = ["CLUZ"] * 6 + ["CVIS"] * 2 + ["CMIN"] * 2
+    plants = [(regions[i % len(regions)], f"RES_{i:04d}") for i in range(resources)]
+    lines = [HEADER]
+    for i in range(288):
+        stamp = f"01/06/2025 {i * 5 // 60:02d}:{i * 5 % 60:02d}:00"
+        for region, name in plants:
+            lines.append(f"{stamp},RTD,{stamp},{region},{name},G,En,{rng.uniform(-500, 12000):.4f}")
+    return ("\r\n".join(lines) + "\r\n").encode()
+
+
+def before(body: bytes):
+    content = body.decode("utf-8", errors="replace")
+    prices = {k: [] for k in REGION_MAP.values()}
+    for row in csv.DictReader(io.StringIO(content)):
+        region_key = REGION_MAP.get((row.get("REGION_NAME") or "").strip())
+        price_raw = (row.get("MARGINAL_PRICE") or "").strip()
+        if region_key and price_raw:
+            try:
+                prices[region_key].append(float(price_raw))
+            except ValueError:
+                pass
+    return {
+        k: {"current": v[-1], "average": sum(v) / len(v), "min": min(v), "max": max(v)}
+        for k, v in prices.items()
+        if v
+    }
+
+
+def after(body: bytes):
+    agg = MarketPriceAggregator(REGION_MAP)
+    for i in range(0, len(body), CHUNK_SIZE):
+        agg.feed(body[i:i + CHUNK_SIZE])
+    agg.close()
+    agg.interval_prices()
+    return agg.region_stats()
+
+
+def measure(label: str, fn, body: bytes, rows: int, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(body)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{label:<7} {best * 1000:8.1f} ms   {rows / best:>11,.0f} rows/s   "
+        f"{len(body) / best / 1e6:6.1f} MB/s   peak {peak / 1e6:6.1f} MB"
+    )
+
+
+def main(resources: int, repeat: int):
+    body = make_csv(resources)
+    rows = body.count(b"\n") - 1
+    print(f"MP CSV: {rows:,} rows, {len(body) / 1e6:.1f} MB\n")
+
+    expected, got = before(body), after(body)
+    for region, stats in expected.items():
+        for key, value in stats.items():
+            assert abs(got[region][key] - value) <= 1e-6 * max(1.0, abs(value)), (region, key)
+
+    measure("before", before, body, rows, repeat)
+    measure("after", after, body, rows, repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--resources", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.resources, args.repeat)
@@ -0,0 +1,138 @@
+"""
+Commodity name search: unanchored `$regex` vs. the name_search subsystem.
+
+Builds a synthetic price_history of N rows (the recorded DA commodity names
+x consecutive dates) and runs the search terms the app sends — full names,
+partial words, lowercase fragments.
+
+  in-memory   always runs: a Python regex scan over every row (a lower bound
+              on what a COLLSCAN costs MongoDB) vs. the trigram index lookup
+              that produces the `name_key $in` filter.
+  mongodb     runs when MONGO_URL is set: loads the rows into a scratch
+              database, then times /api/price-history's query both ways and
+              reports docsExamined from explain().
+
+Usage (from backend/):
+    python -m benchmarks.bench_name_search [--rows 10000 100000] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from services.db_migrations import ensure_indexes
+from services.name_search import name_fields, name_filter, name_index, normalize
+
+CORPUS = (
+    Path(__file__).resolve().parent.parent
+    / "tests" / "fixtures" / "categorizer" / "recorded_corpus.json"
+)
+TERMS = ["rice", "Chicken", "galunggong", "red onion", "pork kasim", "egg", "tomato", "xyz"]
+SCRATCH_DB = "bench_name_search"
+
+
+def make_rows(n_rows: int):
+    names = sorted({entry["name"] for entry in json.loads(CORPUS.read_text(encoding="utf-8"))})
+    start = date(2020, 1, 1)
+    rows = []
+    day = 0
+    while len(rows) < n_rows:
+        date_str = (start + timedelta(days=day)).isoformat()
+        for name in names[: n_rows - len(rows)]:
+            rows.append({"name": name, **name_fields(name), "date": date_str, "price": 100.0})
+        day += 1
+    return rows
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench_in_memory(rows, repeat: int):
+    by_key = {}
+    for row in rows:
+        by_key.setdefault(row["name_key"], []).append(row)
+    name_index.rebuild(by_key)
+
+    def regex_scan():
+        for term in TERMS:
+            pattern = re.compile(re.escape(term), re.IGNORECASE)
+            [row for row in rows if pattern.search(row["name"])]
+
+    def indexed():
+        for term in TERMS:
+            [row for key in name_index.search(term) for row in by_key[key]]
+
+    for term in TERMS:
+        expected = sum(1 for row in rows if normalize(term) in row["name_key"])
+        assert expected == sum(len(by_key[k]) for k in name_index.search(term)), term
+
+    before, after = _best_ms(regex_scan, repeat), _best_ms(indexed, repeat)
+    print(
+        f"  in-memory  regex scan {before:8.2f} ms   trigram index {after:7.2f} ms"
+        f"   ({before / after:,.0f}x, {len(TERMS)} terms)"
+    )
+
+
+async def bench_mongodb(rows, repeat: int):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    db = client[SCRATCH_DB]
+    try:
+        await db.price_history.drop()
+        await db.price_history.insert_many([dict(row) for row in rows])
+        await ensure_indexes(db, ["price_history"])
+        await name_index.refresh(db)
+
+        async def run(make_query):
+            best, examined = float("inf"), 0
+            for _ in range(repeat):
+                start = time.perf_counter()
+                for term in TERMS:
+                    await db.price_history.find(make_query(term), {"_id": 0}).sort("date", 1).limit(500).to_list(500)
+                best = min(best, time.perf_counter() - start)
+            for term in TERMS:
+                plan = await db.price_history.find(make_query(term)).sort("date", 1).limit(500).explain()
+                examined += plan["executionStats"]["totalDocsExamined"]
+            return best * 1000, examined
+
+        before, before_docs = await run(lambda t: {"name": {"$regex": t, "$options": "i"}})
+        after, after_docs = await run(name_filter)
+        print(
+            f"  mongodb    $regex     {before:8.2f} ms ({before_docs:>7} docs examined)"
+            f"   name_key $in {after:7.2f} ms ({after_docs:>6} docs examined)"
+        )
+    finally:
+        await client.drop_database(SCRATCH_DB)
+        client.close()
+
+
+def main(row_counts, repeat: int):
+    for n_rows in row_counts:
+        rows = make_rows(n_rows)
+        print(f"price_history: {n_rows:,} rows, {len({r['name_key'] for r in rows})} distinct names")
+        bench_in_memory(rows, repeat)
+        if os.environ.get("MONGO_URL"):
+            asyncio.run(bench_mongodb(rows, repeat))
+        else:
+            print("  mongodb    skipped (set MONGO_URL to run against a scratch database)")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,128 @@
+"""
+Event-loop latency during a backfill: inline PyPDF2 vs. the extraction service.
+
+Simulates a historical backfill (N DA-sized PDFs, 4 in flight) while a probe
+coroutine measures how late the event loop wakes up from a 5 ms sleep. That
+stall is added to every request the server handles meanwhile — e.g.
+/api/market-items, which itself needs only a few ms of loop time.
+
+  before: PyPDF2 extraction called inline on the event loop (old behaviour)
+  after:  services.pdf_extraction.extract_text (process pool)
+
+Usage (from backend/):
+    python -m benchmarks.bench_pdf_extraction [--pdfs 20] [--pages 8]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from services import worker_pool
+from services.pdf_extraction import extract_text, extract_text_sync
+
+PROBE_INTERVAL = 0.005
+
+
+def make_pdf(pages: int, lines_per_page: int = 60) -> bytes:
+    """Minimal multi-page text PDF shaped like a DA Daily Price Index."""
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = len(objects) + 1 + 2 * pages  # reserved: after all page/content objects
+    page_ids = []
+    for p in range(pages):
+        lines = [b"BT /F1 9 Tf 40 800 Td 11 TL"]
+        for i in range(lines_per_page):
+            price = 20 + (p * lines_per_page + i) % 400 + 0.25
+            lines.append(f"(Commodity {p}-{i} Local, Fresh   {price:.2f}) '".encode())
+        lines.append(b"ET")
+        stream = b"\n".join(lines)
+        content = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        page_ids.append(
+            add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+                b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+                % (pages_id, font, content)
+            )
+        )
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    add(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages))
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (num, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        catalog,
+        xref,
+    )
+    return bytes(out)
+
+
+async def _probe(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        t = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - t - PROBE_INTERVAL) * 1000)
+
+
+async def _inline(pdf: bytes) -> str:
+    return extract_text_sync(pdf)
+
+
+async def _pooled(pdf: bytes) -> str:
+    return await extract_text(pdf, memoize=False)
+
+
+async def run(label: str, extract, pdfs: list, concurrency: int = 4):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(pdf):
+        async with semaphore:
+            await extract(pdf)
+            await asyncio.sleep(0.01)  # stand-in for the network/DB part of a day
+
+    stop, lags = asyncio.Event(), []
+    probe = asyncio.create_task(_probe(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(one(p) for p in pdfs))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(
+        f"{label:<8} total {elapsed:6.2f}s   loop stall p50 {statistics.median(lags):7.1f} ms"
+        f"   p99 {p99:7.1f} ms   max {lags[-1]:7.1f} ms   ({len(lags)} probes)"
+    )
+
+
+async def main(n_pdfs: int, pages: int):
+    pdf = make_pdf(pages)
+    pdfs = [pdf] * n_pdfs
+    print(f"{n_pdfs} PDFs x {pages} pages ({len(pdf) // 1024} KB each), 4 in flight\n")
+
+    assert extract_text_sync(pdf) == await extract_text(pdf, memoize=False)
+    await run("before", _inline, pdfs)
+    await run("after", _pooled, pdfs)
+    worker_pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pdfs", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.pdfs, args.pages))
@@ -0,0 +1,82 @@
+"""
+Price forecasts: one np.polyfit per item vs. the batched least-squares fit.
+
+Generates items with variable-length trends (0-30 points, some too short to
+forecast) and forecasts all of them both ways:
+
+  per-item  AnalyticsEngine.predict_price_movements in a loop — what the
+            frontend got by calling /api/analytics/predict/{id} per card
+  batch     AnalyticsEngine.predict_price_movements_batch (one masked fit)
+
+Slopes and next values are compared before timing; they agree to within one
+rounding step (the two fits differ in the last bits, which can flip an exact
+.xx5 the other way).
+
+Usage (from backend/):
+    python -m benchmarks.bench_predict_batch [--sizes 1000,10000,100000] [--repeat 3]
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from services.analytics_engine import AnalyticsEngine
+
+
+def make_items(n: int, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        price = round(rng.uniform(10, 600), 2)
+        item = {"name": f"Item {i:06d}", "currentPrice": price}
+        length = rng.choice([0, 1, 2] + [7] * 6 + list(range(3, 31)))
+        if length or rng.random() < 0.5:
+            item["trend"] = [round(price * rng.uniform(0.7, 1.3), 2) for _ in range(length)]
+        items.append(item)
+    return items
+
+
+def per_item(engine: AnalyticsEngine, items: List[Dict]) -> List[Dict]:
+    return [engine.predict_price_movements(item) for item in items]
+
+
+def check(expected: List[Dict], got: List[Dict]):
+    assert len(expected) == len(got)
+    for e, g in zip(expected, got):
+        assert e.keys() == g.keys(), (e, g)
+        if "prediction" in e:
+            assert e == g
+            continue
+        assert abs(e["predicted_next"] - g["predicted_next"]) <= 0.0100001, (e, g)
+        assert abs(e["trend_slope"] - g["trend_slope"]) <= 0.0100001, (e, g)
+        assert abs(e["confidence"] - g["confidence"]) < 1e-9, (e, g)
+
+
+def best_time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(sizes: List[int], repeat: int):
+    engine = AnalyticsEngine()
+    print(f"{'items':>8}  {'per-item':>10}  {'batch':>10}  speedup")
+    for n in sizes:
+        items = make_items(n)
+        check(per_item(engine, items), engine.predict_price_movements_batch(items))
+
+        before = best_time(lambda: per_item(engine, items), repeat)
+        after = best_time(lambda: engine.predict_price_movements_batch(items), repeat)
+        print(f"{n:>8,}  {before * 1000:8.1f}ms  {after * 1000:8.1f}ms  {before / after:6.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main([int(s) for s in args.sizes.split(",")], args.repeat)
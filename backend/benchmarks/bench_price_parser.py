@@ -0,0 +1,47 @@
+"""
+Micro-benchmark for DailyPriceIndexParser.parse_prices in lines/sec.
+
+Feeds the golden DA Daily Price Index fixture (tests/fixtures/price_parser/)
+through the parser repeatedly — by default the equivalent of a one-year
+backfill (~260 weekday PDFs).
+
+Usage (from backend/):
+    python -m benchmarks.bench_price_parser [--pdfs 260] [--repeat 5]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from services.daily_price_parser import daily_parser
+
+FIXTURE = (
+    Path(__file__).resolve().parent.parent
+    / "tests" / "fixtures" / "price_parser" / "da_daily_price_index.txt"
+)
+
+
+def main(n_pdfs: int, repeat: int):
+    text = FIXTURE.read_text(encoding="utf-8")
+    lines_per_pdf = text.count("\n") + 1
+    total_lines = lines_per_pdf * n_pdfs
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(n_pdfs):
+            daily_parser.parse_prices(text)
+        best = min(best, time.perf_counter() - start)
+
+    print(
+        f"{n_pdfs} PDFs x {lines_per_pdf} lines: best of {repeat} = {best * 1000:.1f} ms"
+        f"  ({total_lines / best:,.0f} lines/sec, {best / n_pdfs * 1e6:.0f} µs per PDF)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pdfs", type=int, default=260)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.pdfs, args.repeat)
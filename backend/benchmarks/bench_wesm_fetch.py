@@ -0,0 +1,79 @@
+"""
+WESM price trends latency: sequential day fetches vs. concurrent + per-day cache.
+
+Serves synthetic full-day MP CSVs from a local aiohttp server that adds a
+fixed latency per request (IEMOP is slow from Render), then times
+fetch_price_trends(days=7) as /api/energy/analytics calls it:
+
+  sequential   one day at a time (FETCH_CONCURRENCY=1, the old behaviour)
+  concurrent   cold cache, days fetched FETCH_CONCURRENCY at a time
+  restart      new process with past days already in `wesm_daily_stats`
+               — only today's file is downloaded
+
+Usage (from backend/):
+    python -m benchmarks.bench_wesm_fetch [--latency 0.5] [--resources 400]
+"""
+
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+
+from benchmarks.bench_iemop_csv import make_csv
+from services.energy_grid_scraper import WESMPriceScraper
+
+
+async def serve(body: bytes, latency: float):
+    async def handler(request):
+        await asyncio.sleep(latency)
+        return web.Response(body=body, content_type="text/csv")
+
+    app = web.Application()
+    app.router.add_get("/MP/{name}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/MP/MP_{{date_str}}.csv"
+
+
+def new_scraper(url: str, concurrency: int) -> WESMPriceScraper:
+    scraper = WESMPriceScraper()
+    scraper.CSV_URL = url
+    scraper.FETCH_CONCURRENCY = concurrency
+    scraper._days, scraper._inflight = {}, {}
+    return scraper
+
+
+async def timed(label: str, scraper: WESMPriceScraper) -> WESMPriceScraper:
+    start = time.perf_counter()
+    trends = await scraper.fetch_price_trends(days=7)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<11} {elapsed:6.2f}s   ({len(trends['wesm_luzon']['trend'])} days)")
+    return scraper
+
+
+async def main(latency: float, resources: int):
+    runner, url = await serve(make_csv(resources), latency)
+    print(f"Per-request latency {latency:.2f}s\n")
+    try:
+        await timed("sequential", new_scraper(url, 1))
+        warm = await timed("concurrent", new_scraper(url, WESMPriceScraper.FETCH_CONCURRENCY))
+
+        # Past days as a fresh process would load them from wesm_daily_stats
+        today = max(warm._days)
+        restarted = new_scraper(url, WESMPriceScraper.FETCH_CONCURRENCY)
+        restarted._days = {d: entry for d, entry in warm._days.items() if d != today}
+        await timed("restart", restarted)
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--resources", type=int, default=400)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.resources))
@@ -75,3 +75,6 @@ class AnalyticsInsight(BaseModel):
     confidence: float  # 0-1
     data: dict
     generated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class PredictionBatchRequest(BaseModel):
+    item_ids: Optional[List[str]] = Field(None, description="market_items ids; omit to forecast the whole catalog")
@@ -7,6 +7,7 @@ import schedule
 import time
 import logging
 from datetime import datetime
+from services.http_utils import http_clients
 from services.real_data_integration import integrate_real_data
 
 logging.basicConfig(level=logging.INFO)
@@ -23,6 +24,9 @@ async def scheduled_integration():
             logger.error("Scheduled integration failed")
     except Exception as e:
         logger.error(f"Error in scheduled integration: {str(e)}")
+    finally:
+        # Each run gets its own event loop; close its pooled session with it
+        await http_clients.close()
 
 def run_scheduler():
     """Run the scheduler"""
@@ -12,6 +12,11 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent))
 
+from services.market_catalog import status_rank
+from services.name_search import name_fields
+from services.db_migrations import migrate
+from services.collection_versions import collection_versions
+
 # Load environment
 from dotenv import load_dotenv
 load_dotenv()
@@ -179,6 +184,10 @@ async def seed_database():
         }
     ]
     
+    for item in market_items:
+        item["statusRank"] = status_rank(item["status"])
+        item.update(name_fields(item["name"]))
+
     result = await db.market_items.insert_many(market_items)
     print(f"✓ Inserted {len(result.inserted_ids)} market items")
     
@@ -309,12 +318,12 @@ async def seed_database():
     result = await db.climate_metrics.insert_many(climate_metrics)
     print(f"✓ Inserted {len(result.inserted_ids)} climate metrics")
     
-    # Create indexes for better performance
-    await db.market_items.create_index("category")
-    await db.market_items.create_index("status")
-    await db.market_items.create_index("name")
-    await db.climate_metrics.create_index("category")
+    # Indexes and data migrations (same as on server startup)
+    await migrate(db)
     print("✓ Created database indexes")
+
+    # Invalidate cached API responses on running servers
+    await collection_versions.bump(db, "market_items", "climate_metrics")
     
     print("\\n✅ Database seeded successfully!")
     print(f"📊 Market items: {len(market_items)}")
@@ -1,5 +1,5 @@
 from fastapi import FastAPI, APIRouter, File, UploadFile, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -18,16 +18,28 @@ from services.web_crawler import crawler
 from services.ocr_service import ocr_service
 from services.analytics_engine import analytics_engine
 from services.real_data_integration import DABantayPresyoIntegration
-from services.comprehensive_real_data import integrate_comprehensive_real_data
-from services.newsdata_integration import news_integration
+from services.news_store import news_store
 from services.doe_document_scraper import doe_scraper
 from services.energy_grid_scraper import wesm_scraper
 from services.ngcp_scraper import ngcp_scraper
+from services.browser_pool import browser_pool
+from services.http_utils import http_clients
+from services.pdf_cache import pdf_cache
+from services.swr_cache import SWRCache, cache_stats
+from services import response_cache
+from services.collection_versions import collection_versions
+from services.analytics_snapshots import analytics_snapshots
+from services.forecasting import MAX_HORIZON, forecaster
+from services.climate_correlation import climate_correlations
 from services.weather_integration import run_weather_update
 from services.doe_integration import run_doe_update
 from services.doe_fuel_integration import integrate_doe_fuel_prices
 from services.ppa_contract_scraper import scrape_all_contracts
-from models import MarketItem, ClimateMetric, ScrapedDocument, AnalyticsInsight
+from services import db_migrations, market_catalog, worker_pool
+from services.name_search import name_fields, name_filter, name_index, normalize
+from services.job_runner import job_runner, serialize_job
+from services import integration_jobs  # noqa: F401 — registers job handlers
+from models import MarketItem, ClimateMetric, ScrapedDocument, AnalyticsInsight, PredictionBatchRequest
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / ".env")
@@ -50,6 +62,24 @@ db = client[os.environ["DB_NAME"]]
 # Create the main app without a prefix
 app = FastAPI(title="Climate-Smart Market Intelligence API")
 
+# Cache read endpoints until an integration writes to the collections they read.
+# Added before CORS so CORS stays outermost and decorates cached replies too.
+app.add_middleware(
+    response_cache.ResponseCacheMiddleware,
+    routes=[
+        ("/api/market-items", ["market_items"]),
+        ("/api/best-deals", ["market_items"]),
+        ("/api/climate-metrics", ["climate_metrics"]),
+        # Recomputed daily; RESPONSE_CACHE_TTL bounds how long yesterday's report is served
+        (
+            "/api/analytics/climate-correlations",
+            ["price_history", "climate_history", "market_items", "climate_metrics"],
+        ),
+        ("/api/analytics/", ["market_items", "climate_metrics"]),
+        ("/api/energy/doe-circulars", ["doe_circulars"]),
+    ],
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -83,6 +113,15 @@ async def health_check():
         "certifi_ca": certifi.where(),
         "weatherapi_key_set": bool(os.environ.get("WEATHERAPI_KEY")),
         "newsdata_key_set": bool(os.environ.get("NEWSDATA_API_KEY")),
+        "browser_pool": browser_pool.stats(),
+        "http_clients": http_clients.stats(),
+        "news_store": news_store.stats(),
+        "swr_caches": cache_stats(),
+        "response_cache": response_cache.cache_stats(),
+        "collection_versions": collection_versions.versions(),
+        "analytics_snapshots": analytics_snapshots.stats(),
+        "forecasting": forecaster.stats(),
+        "climate_correlations": climate_correlations.stats(),
     }
     try:
         # Test MongoDB connection
@@ -102,54 +141,26 @@ async def get_market_items(
     category: Optional[str] = None,
     search: Optional[str] = None,
     sort: Optional[str] = "best",
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="`next` token from the previous page"),
+    view: str = Query("full", description="full | summary (omits trend, climateImpact, metadata)"),
 ):
-    """Get all market items with filtering and sorting"""
+    """Get market items with filtering, sorting and keyset pagination (all in MongoDB)"""
     try:
-        query = {}
-
-        # Filter by category
-        if category and category != "all":
-            query["category"] = category
-
-        # Search by name
-        if search:
-            query["name"] = {"$regex": search, "$options": "i"}
-
-        # Get items from database
-        cursor = db.market_items.find(query).sort("lastUpdated", -1).limit(limit)
-        items = await cursor.to_list(length=limit)
-
-        # Convert ObjectId and datetime to string
-        for item in items:
-            item["id"] = str(item.pop("_id"))
-            if "lastUpdated" in item:
-                item["lastUpdated"] = item["lastUpdated"].isoformat()
-            if "createdAt" in item:
-                item["createdAt"] = item["createdAt"].isoformat()
-            if "updatedAt" in item:
-                item["updatedAt"] = item["updatedAt"].isoformat()
-
-        # Sort items
-        if sort == "best":
-            items.sort(
-                key=lambda x: (
-                    0
-                    if x.get("status") == "MURA"
-                    else 1
-                    if x.get("status") == "STABLE"
-                    else 2,
-                    -x.get("savings", 0),
-                )
-            )
-        elif sort == "price-low":
-            items.sort(key=lambda x: x.get("currentPrice", 0))
-        elif sort == "price-high":
-            items.sort(key=lambda x: x.get("currentPrice", 0), reverse=True)
-        elif sort == "name":
-            items.sort(key=lambda x: x.get("name", ""))
-
-        return JSONResponse({"success": True, "count": len(items), "data": items})
+        items, next_token = await market_catalog.list_items(
+            db,
+            category=category,
+            search=search,
+            sort=sort,
+            limit=limit,
+            after=after,
+            view=view,
+        )
+        return JSONResponse(
+            {"success": True, "count": len(items), "data": items, "next": next_token}
+        )
+    except market_catalog.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching market items: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -166,14 +177,7 @@ async def get_market_item(item_id: str):
         if not item:
             raise HTTPException(status_code=404, detail="Item not found")
 
-        item["id"] = str(item.pop("_id"))
-        if "lastUpdated" in item:
-            item["lastUpdated"] = item["lastUpdated"].isoformat()
-        if "createdAt" in item:
-            item["createdAt"] = item["createdAt"].isoformat()
-        if "updatedAt" in item:
-            item["updatedAt"] = item["updatedAt"].isoformat()
-        return JSONResponse({"success": True, "data": item})
+        return JSONResponse({"success": True, "data": market_catalog.serialize_item(item)})
     except HTTPException:
         raise
     except Exception as e:
@@ -412,18 +416,12 @@ async def process_pdf(file: UploadFile = File(...)):
 async def get_market_analytics():
     """Get comprehensive market analytics including price, supply/demand insights"""
     try:
-        # Fetch all market items
-        cursor = db.market_items.find({})
-        items = await cursor.to_list(length=1000)
-
-        # Generate comprehensive analytics
-        analytics = analytics_engine.generate_market_analytics(items)
-
+        snapshot = await analytics_snapshots.get(db, "market_analytics")
         return JSONResponse(
             {
                 "success": True,
-                "generated_at": datetime.utcnow().isoformat(),
-                "data": analytics,
+                "generated_at": snapshot["computed_at"].isoformat(),
+                "data": snapshot["data"],
             }
         )
     except Exception as e:
@@ -435,37 +433,51 @@ async def get_market_analytics():
 async def get_price_trends():
     """Get price trend analysis by category"""
     try:
-        # Fetch all market items
-        cursor = db.market_items.find({})
-        items = await cursor.to_list(length=1000)
-
-        # Calculate trends
-        trends = analytics_engine.calculate_price_trends(items)
-
-        return JSONResponse({"success": True, "data": trends})
+        snapshot = await analytics_snapshots.get(db, "price_trends")
+        return JSONResponse({"success": True, "data": snapshot["data"]})
     except Exception as e:
         logger.error(f"Error calculating price trends: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @api_router.get("/analytics/climate-correlations")
-async def get_climate_correlations():
-    """Get correlations between climate and prices"""
+async def get_climate_correlations(
+    include_insignificant: bool = Query(False, description="Also return pairs whose CI includes 0"),
+):
+    """
+    Lagged Pearson/Spearman correlations between climate_history metrics and
+    price_history category indices, with confidence intervals (computed once a
+    day). Falls back to the heuristic insights until enough climate history
+    has been recorded.
+    """
     try:
-        # Fetch market items and climate metrics
-        market_cursor = db.market_items.find({})
-        market_items = await market_cursor.to_list(length=1000)
-
-        climate_cursor = db.climate_metrics.find({})
-        climate_metrics = await climate_cursor.to_list(length=100)
-
-        # Calculate correlations
-        correlations = analytics_engine.correlate_climate_to_prices(
-            market_items, climate_metrics
-        )
+        report = await climate_correlations.get(db)
+        if report["correlations"]:
+            correlations = [
+                c for c in report["correlations"] if include_insignificant or c["significant"]
+            ]
+            return JSONResponse(
+                {
+                    "success": True,
+                    "method": "time_series",
+                    "computed_for": report["computed_for"],
+                    "window_days": report["window_days"],
+                    "lags": report["lags"],
+                    "pairs_tested": report["pairs_tested"],
+                    "count": len(correlations),
+                    "data": correlations,
+                }
+            )
 
+        correlations = (await analytics_snapshots.get(db, "climate_correlations"))["data"]
         return JSONResponse(
-            {"success": True, "count": len(correlations), "data": correlations}
+            {
+                "success": True,
+                "method": "heuristic",
+                "climate_history_days": report["climate_days"],
+                "count": len(correlations),
+                "data": correlations,
+            }
         )
     except Exception as e:
         logger.error(f"Error calculating correlations: {str(e)}")
@@ -476,13 +488,7 @@ async def get_climate_correlations():
 async def get_buying_opportunities():
     """Get best buying opportunities based on trends and climate"""
     try:
-        # Fetch all market items
-        cursor = db.market_items.find({})
-        items = await cursor.to_list(length=1000)
-
-        # Identify opportunities
-        opportunities = analytics_engine.identify_best_buying_opportunities(items)
-
+        opportunities = (await analytics_snapshots.get(db, "buying_opportunities"))["data"]
         return JSONResponse(
             {"success": True, "count": len(opportunities), "data": opportunities}
         )
@@ -495,17 +501,8 @@ async def get_buying_opportunities():
 async def get_weekly_report():
     """Generate comprehensive weekly analytics report"""
     try:
-        # Fetch data
-        market_cursor = db.market_items.find({})
-        market_items = await market_cursor.to_list(length=1000)
-
-        climate_cursor = db.climate_metrics.find({})
-        climate_metrics = await climate_cursor.to_list(length=100)
-
-        # Generate report
-        report = analytics_engine.generate_weekly_report(market_items, climate_metrics)
-
-        return JSONResponse({"success": True, "data": report})
+        snapshot = await analytics_snapshots.get(db, "weekly_report")
+        return JSONResponse({"success": True, "data": snapshot["data"]})
     except Exception as e:
         logger.error(f"Error generating weekly report: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -533,6 +530,40 @@ async def predict_price(item_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@api_router.post("/analytics/predict/batch")
+async def predict_prices_batch(request: Optional[PredictionBatchRequest] = None):
+    """Forecast many items in one vectorized fit (the whole catalog when no item_ids are given)"""
+    from bson import ObjectId
+    from bson.errors import InvalidId
+
+    query, ids = {}, None
+    if request is not None and request.item_ids is not None:
+        try:
+            ids = [ObjectId(i) for i in request.item_ids]
+            query = {"_id": {"$in": ids}}
+        except InvalidId as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        items = await db.market_items.find(
+            query, {"name": 1, "trend": 1, "currentPrice": 1}
+        ).to_list(length=None)
+        predictions = analytics_engine.predict_price_movements_batch(items)
+
+        data = [
+            {"id": str(item["_id"]), "item": item.get("name"), "prediction": prediction}
+            for item, prediction in zip(items, predictions)
+        ]
+        response = {"success": True, "count": len(data), "data": data}
+        if ids is not None:
+            found = {item["_id"] for item in items}
+            response["not_found"] = [str(i) for i in ids if i not in found]
+        return JSONResponse(response)
+    except Exception as e:
+        logger.error(f"Error predicting prices: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ========== REAL DATA INTEGRATION ENDPOINTS ==========
 
 
@@ -541,46 +572,19 @@ async def run_comprehensive_integration(days: int = 7):
     """
     Integrate real historical price data from DA Daily Price Index
     Downloads and parses actual daily PDFs to build price trends
+
+    Runs as a background job — poll GET /api/jobs/{job_id} for progress and
+    the final result.
     """
     try:
         logger.info(
-            f"Starting comprehensive real data integration (last {days} days)..."
+            f"Queueing comprehensive real data integration (last {days} days)..."
+        )
+        job_id = await job_runner.submit("comprehensive_real_data", {"days": days})
+        return JSONResponse(
+            {"success": True, "job_id": job_id, "status_url": f"/api/jobs/{job_id}"},
+            status_code=202,
         )
-        success = await integrate_comprehensive_real_data(db, days)
-
-        if success:
-            count = await db.market_items.count_documents({})
-
-            # Get sample item to show metadata
-            sample = await db.market_items.find_one(
-                {}, {"metadata": 1, "name": 1, "trend": 1}
-            )
-
-            return JSONResponse(
-                {
-                    "success": True,
-                    "message": "Real historical data integrated successfully",
-                    "total_items": count,
-                    "data_source": "DA Bantay Presyo Daily Price Index",
-                    "days_analyzed": days,
-                    "note": "Real price trends from actual daily PDFs",
-                    "sample": {
-                        "item": sample.get("name") if sample else None,
-                        "trend_points": len(sample.get("trend", [])) if sample else 0,
-                        "date_range": sample.get("metadata", {}).get("date_range")
-                        if sample
-                        else None,
-                    },
-                }
-            )
-        else:
-            return JSONResponse(
-                {
-                    "success": False,
-                    "message": "Integration failed - check logs for details",
-                },
-                status_code=500,
-            )
     except Exception as e:
         logger.error(f"Error in comprehensive integration: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -598,6 +602,19 @@ async def run_weather_update_endpoint():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@api_router.post("/integration/run-news-update")
+async def run_news_update_endpoint(
+    force: bool = Query(False, description="Re-fetch every query even if fetched recently"),
+):
+    """Refresh stored NewsData.io articles for all configured queries (within the daily credit budget)."""
+    try:
+        result = await news_store.refresh_all(db, force=force)
+        return JSONResponse({"success": True, **result})
+    except Exception as e:
+        logger.error(f"Error in news update: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @api_router.post("/integration/run-doe-update")
 async def run_doe_update_endpoint(
     full: bool = Query(
@@ -605,9 +622,18 @@ async def run_doe_update_endpoint(
         description="If true, backfill ALL pages (500+ issuances). Default: incremental (first 5 pages per subcategory).",
     ),
 ):
-    """Fetch real DOE issuances and upsert to MongoDB doe_circulars collection."""
+    """
+    Fetch real DOE issuances and upsert to MongoDB doe_circulars collection.
+    A full backfill runs as a resumable background job (202 + job_id).
+    """
     try:
-        result = await run_doe_update(db, full=full)
+        if full:
+            job_id = await job_runner.submit("doe_full_update")
+            return JSONResponse(
+                {"success": True, "job_id": job_id, "status_url": f"/api/jobs/{job_id}"},
+                status_code=202,
+            )
+        result = await run_doe_update(db, full=False)
         status_code = 200 if result.get("success") else 500
         return JSONResponse(result, status_code=status_code)
     except Exception as e:
@@ -702,9 +728,9 @@ async def get_integration_status():
 
 @api_router.get("/energy/news")
 async def get_energy_news(query: str = "renewable energy"):
-    """Get latest energy news from NewsData.io"""
+    """Latest energy news for a query — stored NewsData.io articles, refreshed hourly"""
     try:
-        articles = await news_integration.fetch_energy_news(query=query)
+        articles = await news_store.articles(db, query)
         return JSONResponse({"success": True, "count": len(articles), "data": articles})
     except Exception as e:
         logger.error(f"Error fetching energy news: {str(e)}")
@@ -713,9 +739,9 @@ async def get_energy_news(query: str = "renewable energy"):
 
 @api_router.get("/energy/news/multiple")
 async def get_multiple_energy_news():
-    """Get energy news for multiple queries"""
+    """Get energy news for every configured query (stored, refreshed hourly)"""
     try:
-        results = await news_integration.fetch_multiple_queries()
+        results = await news_store.multiple(db)
         total_articles = sum(len(articles) for articles in results.values())
         return JSONResponse(
             {"success": True, "total_articles": total_articles, "data": results}
@@ -806,6 +832,26 @@ async def get_ppa_statuses(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Stale-while-revalidate caches for the slow upstream calls. Soft TTL = serve
+# as fresh; past it the last good value is served while one background
+# refresh runs. Override with SWR_<NAME>_SOFT_TTL / SWR_<NAME>_HARD_TTL.
+ngcp_cache = SWRCache("ngcp", soft_ttl=1800, hard_ttl=6 * 3600)
+wesm_trends_cache = SWRCache("wesm_trends", soft_ttl=900, hard_ttl=6 * 3600)
+# Built from ppa_contracts + cached trends; memory only (tech names as keys)
+energy_analytics_cache = SWRCache("energy_analytics", soft_ttl=300, hard_ttl=3600, collection=None)
+
+
+async def _ngcp_status() -> Optional[dict]:
+    return await ngcp_cache.get("latest", ngcp_scraper.scrape, db=db)
+
+
+async def _wesm_price_trends(days: int) -> dict:
+    trends = await wesm_trends_cache.get(
+        f"days={days}", lambda: wesm_scraper.fetch_price_trends(days=days, db=db), db=db
+    )
+    return trends or {}
+
+
 @api_router.get("/energy/grid-status")
 async def get_grid_status():
     """
@@ -816,8 +862,8 @@ async def get_grid_status():
     try:
         # Fetch NGCP and WESM data concurrently
         ngcp_data, price_trends = await asyncio.gather(
-            ngcp_scraper.scrape(),
-            wesm_scraper.fetch_price_trends(days=1),
+            _ngcp_status(),
+            _wesm_price_trends(days=1),
             return_exceptions=True,
         )
         if isinstance(ngcp_data, Exception):
@@ -840,22 +886,14 @@ async def get_grid_status():
                 "status": overall_status,
                 "timestamp": datetime.utcnow().isoformat(),
             }
-            # Persist successful NGCP scrape to MongoDB for fallback
-            try:
-                await db.grid_status_cache.update_one(
-                    {"_id": "latest"},
-                    {"$set": {**ngcp_data, "cached_at": datetime.utcnow().isoformat()}},
-                    upsert=True,
-                )
-            except Exception:
-                pass  # Persistence failure is non-critical
         else:
-            # Try MongoDB cached value before showing full unavailable
-            cached = await db.grid_status_cache.find_one({"_id": "latest"}, {"_id": 0})
+            # Last good scrape, however old, before showing full unavailable
+            cached = await ngcp_cache.peek("latest", db=db)
             if cached:
-                cached_at = cached.pop("cached_at", "unknown")
+                value, stored_at = cached
+                cached_at = datetime.utcfromtimestamp(stored_at).isoformat()
                 grid_data = {
-                    **cached,
+                    **value,
                     "status": overall_status,
                     "timestamp": datetime.utcnow().isoformat(),
                     "data_source": f"NGCP data from cache (scraped {cached_at}); MW values may be stale",
@@ -967,74 +1005,74 @@ def _derive_market_outlook(price_trends: dict) -> dict:
 async def get_energy_analytics():
     """Get energy market analytics including price trends and contract insights"""
     try:
-        # Get real PPA data from MongoDB (populated by run-ppa-update)
-        ppa_total = await db.ppa_contracts.count_documents({})
-        ppa_pipeline = [
-            {"$group": {
-                "_id": "$stage",
-                "count": {"$sum": 1},
-                "capacity": {"$sum": "$potential_capacity_mw"},
-                "installed": {"$sum": "$installed_capacity_mw"},
-            }},
-        ]
-        stage_stats = {s["_id"]: s for s in await db.ppa_contracts.aggregate(ppa_pipeline).to_list(20)}
+        result = await energy_analytics_cache.get("latest", _build_energy_analytics)
+        return JSONResponse({"success": True, **result})
+    except Exception as e:
+        logger.error(f"Error generating energy analytics: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        tech_pipeline = [
-            {"$group": {
-                "_id": "$technology",
-                "count": {"$sum": 1},
-                "capacity_mw": {"$sum": "$potential_capacity_mw"},
-            }},
-        ]
-        tech_breakdown = {
-            t["_id"]: {"count": t["count"], "capacity_mw": round(t["capacity_mw"], 2)}
-            for t in await db.ppa_contracts.aggregate(tech_pipeline).to_list(20)
-        }
 
-        operational = stage_stats.get("Commercial Operation", {"count": 0, "capacity": 0, "installed": 0})
-        development = stage_stats.get("Development", {"count": 0, "capacity": 0})
-        pre_dev = stage_stats.get("Pre-Development", {"count": 0, "capacity": 0})
+async def _build_energy_analytics() -> dict:
+    """PPA pipeline stats, WESM trends, outlook and alerts (cached by the endpoint)."""
+    # Get real PPA data from MongoDB (populated by run-ppa-update)
+    ppa_total = await db.ppa_contracts.count_documents({})
+    ppa_pipeline = [
+        {"$group": {
+            "_id": "$stage",
+            "count": {"$sum": 1},
+            "capacity": {"$sum": "$potential_capacity_mw"},
+            "installed": {"$sum": "$installed_capacity_mw"},
+        }},
+    ]
+    stage_stats = {s["_id"]: s for s in await db.ppa_contracts.aggregate(ppa_pipeline).to_list(20)}
+
+    tech_pipeline = [
+        {"$group": {
+            "_id": "$technology",
+            "count": {"$sum": 1},
+            "capacity_mw": {"$sum": "$potential_capacity_mw"},
+        }},
+    ]
+    tech_breakdown = {
+        t["_id"]: {"count": t["count"], "capacity_mw": round(t["capacity_mw"], 2)}
+        for t in await db.ppa_contracts.aggregate(tech_pipeline).to_list(20)
+    }
 
-        total_capacity = sum(s["capacity"] for s in stage_stats.values())
+    operational = stage_stats.get("Commercial Operation", {"count": 0, "capacity": 0, "installed": 0})
+    development = stage_stats.get("Development", {"count": 0, "capacity": 0})
+    pre_dev = stage_stats.get("Pre-Development", {"count": 0, "capacity": 0})
 
-        # Price trends — real data from IEMOP only, no fabricated fallback
-        price_trends = await wesm_scraper.fetch_price_trends(days=7)
-        if not price_trends:
-            logger.warning("IEMOP unavailable; WESM price trends empty")
-            price_trends = {
-                "wesm_luzon": {"current": None, "week_ago": None, "month_ago": None, "trend": [], "change_pct": None, "source": "unavailable"},
-                "wesm_visayas": {"current": None, "week_ago": None, "month_ago": None, "trend": [], "change_pct": None, "source": "unavailable"},
-                "wesm_mindanao": {"current": None, "week_ago": None, "month_ago": None, "trend": [], "change_pct": None, "source": "unavailable"},
-            }
+    total_capacity = sum(s["capacity"] for s in stage_stats.values())
 
-        analytics = {
-            "ppa_summary": {
-                "total_projects": ppa_total,
-                "total_capacity_mw": round(total_capacity, 2),
-                "operational_count": operational["count"],
-                "operational_capacity": round(operational.get("installed", 0), 2),
-                "development_count": development["count"],
-                "development_capacity": round(development["capacity"], 2),
-                "pre_development_count": pre_dev["count"],
-                "pre_development_capacity": round(pre_dev["capacity"], 2),
-                "source": "DOE Awarded RE Service Contracts (April 2025)",
-            },
-            "technology_breakdown": tech_breakdown,
-            "price_trends": price_trends,
-            "market_outlook": _derive_market_outlook(price_trends),
-            "alerts": _build_price_alerts(price_trends),
+    # Price trends — real data from IEMOP only, no fabricated fallback
+    price_trends = await _wesm_price_trends(days=7)
+    if not price_trends:
+        logger.warning("IEMOP unavailable; WESM price trends empty")
+        price_trends = {
+            "wesm_luzon": {"current": None, "week_ago": None, "month_ago": None, "trend": [], "change_pct": None, "source": "unavailable"},
+            "wesm_visayas": {"current": None, "week_ago": None, "month_ago": None, "trend": [], "change_pct": None, "source": "unavailable"},
+            "wesm_mindanao": {"current": None, "week_ago": None, "month_ago": None, "trend": [], "change_pct": None, "source": "unavailable"},
         }
 
-        return JSONResponse(
-            {
-                "success": True,
-                "generated_at": datetime.utcnow().isoformat(),
-                "data": analytics,
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error generating energy analytics: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    analytics = {
+        "ppa_summary": {
+            "total_projects": ppa_total,
+            "total_capacity_mw": round(total_capacity, 2),
+            "operational_count": operational["count"],
+            "operational_capacity": round(operational.get("installed", 0), 2),
+            "development_count": development["count"],
+            "development_capacity": round(development["capacity"], 2),
+            "pre_development_count": pre_dev["count"],
+            "pre_development_capacity": round(pre_dev["capacity"], 2),
+            "source": "DOE Awarded RE Service Contracts (April 2025)",
+        },
+        "technology_breakdown": tech_breakdown,
+        "price_trends": price_trends,
+        "market_outlook": _derive_market_outlook(price_trends),
+        "alerts": _build_price_alerts(price_trends),
+    }
+
+    return {"generated_at": datetime.utcnow().isoformat(), "data": analytics}
 
 
 # ========== GROCERY BASKET ENDPOINTS ==========
@@ -1059,10 +1097,8 @@ BASKET_TEMPLATES = {
 
 
 async def _find_cheapest_match(db, item_name: str):
-    """Return cheapest market_item whose name matches item_name (case-insensitive)."""
-    cursor = db.market_items.find(
-        {"name": {"$regex": item_name, "$options": "i"}}
-    ).sort("currentPrice", 1).limit(1)
+    """Return cheapest market_item whose name contains item_name (case-insensitive)."""
+    cursor = db.market_items.find(name_filter(item_name)).sort("currentPrice", 1).limit(1)
     matches = await cursor.to_list(length=1)
     if not matches:
         return None
@@ -1159,7 +1195,7 @@ async def get_basket_templates():
 
 # ========== TELEGRAM BOT ENDPOINTS ==========
 
-from services.telegram_bot import send_message, build_daily_alert, broadcast
+from services.telegram_bot import send_message, build_daily_alert
 
 
 @api_router.post("/telegram/subscribe")
@@ -1191,10 +1227,15 @@ async def telegram_subscribers():
 
 @api_router.post("/telegram/send-daily-alert")
 async def telegram_send_daily_alert():
-    """Trigger daily price alert broadcast to all active subscribers."""
+    """
+    Build the daily price alert and broadcast it to all active subscribers.
+
+    Runs as a resumable background job — poll GET /api/jobs/{job_id}; the
+    job's progress and result carry the delivery stats.
+    """
     try:
         # Fetch data for the alert
-        items_cursor = db.market_items.find({}).sort("priceStatus", 1).limit(10)
+        items_cursor = db.market_items.find({}).sort(market_catalog.SORTS["best"]).limit(10)
         items = []
         async for doc in items_cursor:
             doc["_id"] = str(doc["_id"])
@@ -1205,31 +1246,58 @@ async def telegram_send_daily_alert():
             doc["_id"] = str(doc["_id"])
             metrics.append(doc)
 
-        grid = await ngcp_scraper.scrape()
+        grid = await _ngcp_status()
 
         message = build_daily_alert(items, metrics, grid)
-        stats = await broadcast(db, message)
+        job_id = await job_runner.submit("telegram_broadcast", {"message": message})
 
-        return JSONResponse({"success": True, "data": stats, "message_preview": message[:200]})
+        return JSONResponse(
+            {
+                "success": True,
+                "job_id": job_id,
+                "status_url": f"/api/jobs/{job_id}",
+                "message_preview": message[:200],
+            },
+            status_code=202,
+        )
     except Exception as e:
         logger.error(f"Telegram broadcast error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@api_router.get("/telegram/broadcasts")
+async def telegram_broadcasts(limit: int = Query(10, ge=1, le=100)):
+    """Delivery stats of the most recent broadcasts."""
+    cursor = db.telegram_broadcasts.find({}).sort("started_at", -1).limit(limit)
+    data = []
+    async for doc in cursor:
+        doc["id"] = doc.pop("_id")
+        for key in ("started_at", "finished_at"):
+            if isinstance(doc.get(key), datetime):
+                doc[key] = doc[key].isoformat()
+        data.append(doc)
+    return JSONResponse({"success": True, "data": data})
+
+
 # ========== HISTORICAL PRICE ARCHIVE ENDPOINTS ==========
 
-from services.historical_backfill import backfill_date_range
+from services.historical_backfill import DEFAULT_CONCURRENCY
 
 
 @api_router.post("/integration/run-historical-backfill")
 async def run_historical_backfill(
     start_date: str = Query(..., description="Start date YYYY-MM-DD"),
     end_date: str = Query(..., description="End date YYYY-MM-DD"),
+    concurrency: int = Query(
+        DEFAULT_CONCURRENCY, ge=1, le=8, description="Days downloaded/parsed in parallel"
+    ),
 ):
     """
     Backfill price_history collection from DA Bantay Presyo PDFs for a date range.
-    Weekends are skipped automatically. Rate-limited at 1.5s per page.
-    WARNING: Large ranges (e.g. 1 year) will take ~90 minutes — run as a one-time job.
+    Weekends are skipped automatically. Days run concurrently under a per-host
+    token bucket (2 req/s against da.gov.ph); a 1-year range takes a few minutes.
+
+    Runs as a resumable background job — poll GET /api/jobs/{job_id}.
     """
     try:
         start = datetime.strptime(start_date, "%Y-%m-%d")
@@ -1244,8 +1312,14 @@ async def run_historical_backfill(
     if delta_days > 365:
         raise HTTPException(status_code=400, detail="Date range cannot exceed 365 days per request")
 
-    stats = await backfill_date_range(db, start, end)
-    return JSONResponse({"success": True, "data": stats})
+    job_id = await job_runner.submit(
+        "historical_backfill",
+        {"start_date": start_date, "end_date": end_date, "concurrency": concurrency},
+    )
+    return JSONResponse(
+        {"success": True, "job_id": job_id, "status_url": f"/api/jobs/{job_id}"},
+        status_code=202,
+    )
 
 
 @api_router.get("/price-history")
@@ -1255,7 +1329,7 @@ async def get_price_history(
     end_date: Optional[str] = Query(None, description="End date YYYY-MM-DD"),
 ):
     """Return daily price history for a commodity from the price_history collection."""
-    query: dict = {"name": {"$regex": name, "$options": "i"}}
+    query: dict = name_filter(name)
     date_filter: dict = {}
     if start_date:
         date_filter["$gte"] = start_date
@@ -1272,6 +1346,51 @@ async def get_price_history(
     return JSONResponse({"success": True, "count": len(records), "data": records})
 
 
+# ========== FORECASTING ENDPOINTS ==========
+
+
+@api_router.get("/forecast/{name:path}")
+async def get_forecast(
+    name: str,
+    horizon: int = Query(7, ge=1, le=MAX_HORIZON, description="Business days ahead"),
+):
+    """
+    Forecast a commodity's price from its price_history: seasonal naive,
+    exponential smoothing and ridge regression, with rolling-origin backtest
+    errors (MAE / RMSE / MAPE) per model and the best model by MAPE.
+    Models are cached and refit incrementally when new days arrive.
+    """
+    commodity = await forecaster.resolve_name(db, name)
+    if commodity is None:
+        raise HTTPException(status_code=404, detail=f"No price history for {name}")
+
+    try:
+        forecast = await forecaster.forecast(db, commodity, horizon)
+    except Exception as e:
+        logger.error(f"Error forecasting {commodity}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if forecast["status"] != "ok":
+        raise HTTPException(
+            status_code=422,
+            detail=f"Not enough price history to forecast {commodity} ({forecast['n_obs']} days)",
+        )
+    return JSONResponse({"success": True, "data": forecast})
+
+
+@api_router.post("/forecast/train")
+async def train_forecasts():
+    """
+    Bring every commodity's forecast models up to date (runs across the worker
+    process pool as a background job — poll GET /api/jobs/{job_id}).
+    """
+    job_id = await job_runner.submit("forecast_training")
+    return JSONResponse(
+        {"success": True, "job_id": job_id, "status_url": f"/api/jobs/{job_id}"},
+        status_code=202,
+    )
+
+
 # ========== CROWDSOURCED PRICING ENDPOINTS ==========
 
 
@@ -1290,8 +1409,10 @@ async def crowdsource_report(
     if price <= 0 or price > 10000:
         raise HTTPException(status_code=400, detail="Price must be between 0 and 10,000 PHP")
 
+    item_name = item_name.strip()
     doc = {
-        "item_name": item_name.strip(),
+        "item_name": item_name,
+        **name_fields(item_name, "item_name"),
         "price": round(price, 2),
         "market": market.strip(),
         "unit": unit,
@@ -1300,6 +1421,7 @@ async def crowdsource_report(
         "reported_at": datetime.utcnow().isoformat(),
     }
     result = await db.crowd_price_reports.insert_one(doc)
+    name_index.add(normalize(item_name))
     return JSONResponse({"success": True, "report_id": str(result.inserted_id)})
 
 
@@ -1312,7 +1434,7 @@ async def get_crowdsource_reports(
     """List crowdsourced price reports (for moderation or display)."""
     query: dict = {}
     if item_name:
-        query["item_name"] = {"$regex": item_name, "$options": "i"}
+        query.update(name_filter(item_name, "item_name"))
     if status:
         query["status"] = status
 
@@ -1332,7 +1454,7 @@ async def crowdsource_summary(item_name: str = Query(...)):
     """
     cutoff = (datetime.utcnow() - timedelta(days=7)).isoformat()
     pipeline = [
-        {"$match": {"item_name": {"$regex": item_name, "$options": "i"}, "status": "approved", "reported_at": {"$gte": cutoff}}},
+        {"$match": {**name_filter(item_name, "item_name"), "status": "approved", "reported_at": {"$gte": cutoff}}},
         {"$group": {"_id": "$item_name", "avg_crowd_price": {"$avg": "$price"}, "min_price": {"$min": "$price"}, "max_price": {"$max": "$price"}, "report_count": {"$sum": 1}}},
     ]
     results = []
@@ -1340,7 +1462,7 @@ async def crowdsource_summary(item_name: str = Query(...)):
         results.append(doc)
 
     # Get official DA price
-    official = await db.market_items.find_one({"name": {"$regex": item_name, "$options": "i"}}, {"currentPrice": 1, "name": 1})
+    official = await db.market_items.find_one(name_filter(item_name), {"currentPrice": 1, "name": 1})
     official_price = official.get("currentPrice") if official else None
     official_name = official.get("name") if official else item_name
 
@@ -1360,6 +1482,41 @@ async def crowdsource_summary(item_name: str = Query(...)):
         return JSONResponse({"success": True, "data": {"item_name": official_name, "official_price": official_price, "avg_crowd_price": None, "report_count": 0}})
 
 
+# ========== JOB ENDPOINTS ==========
+
+
+@api_router.get("/jobs")
+async def list_jobs(
+    status: Optional[str] = Query(None, description="queued | running | succeeded | failed"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Most recent background jobs, newest first."""
+    query = {"status": status} if status else {}
+    cursor = db.jobs.find(query, {"checkpoint": 0}).sort("created_at", -1).limit(limit)
+    jobs = [serialize_job(job) async for job in cursor]
+    return JSONResponse({"success": True, "count": len(jobs), "data": jobs})
+
+
+@api_router.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    stream: bool = Query(False, description="Stream updates as server-sent events until the job finishes"),
+):
+    """Status, progress and result of a background job."""
+    job = await job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if not stream:
+        return JSONResponse({"success": True, "data": serialize_job(job)})
+
+    async def events():
+        async for update in job_runner.watch(job_id):
+            yield f"data: {json.dumps(serialize_job(update), default=str)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 # ========== UTILITY ENDPOINTS ==========
 
 
@@ -1388,6 +1545,36 @@ async def root():
 app.include_router(api_router)
 
 
+@app.on_event("startup")
+async def run_db_migrations():
+    try:
+        await db_migrations.migrate(db)
+    except Exception as e:
+        logger.error(f"Database migrations failed: {e}")
+    try:
+        await name_index.refresh(db)
+    except Exception as e:
+        # name_filter falls back to word-prefix matching until the index loads
+        logger.error(f"Name index refresh failed: {e}")
+    collection_versions.attach(db)
+    await collection_versions.sync(force=True)
+    collection_versions.add_listener(analytics_snapshots.on_collections_changed)
+    analytics_snapshots.schedule(db)  # warm the snapshots shortly after boot
+
+
+@app.on_event("startup")
+async def start_job_runner():
+    try:
+        await job_runner.start(db)
+    except Exception as e:
+        logger.error(f"Job runner failed to start: {e}")
+
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await job_runner.stop()
+    await browser_pool.close()
+    await pdf_cache.flush()
+    await http_clients.close()
     client.close()
+    worker_pool.shutdown()
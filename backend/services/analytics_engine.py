@@ -1,88 +1,193 @@
 import numpy as np
-from typing import List, Dict, Optional
+import pandas as pd
+from typing import List, Dict, Optional, Union
 from datetime import datetime, timedelta
 import logging
-from collections import defaultdict
+from itertools import chain
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+
+class ItemFrame:
+    """
+    Columnar view of market items, built once per AnalyticsEngine call.
+
+    Every report used to loop over the item dicts again, re-grouping by
+    category and recomputing trend percent changes. ItemFrame extracts the
+    fields once into NumPy arrays; the reports work on masks, per-category
+    index arrays and argpartition. Raw values (names, prices as stored) are
+    still read from `items` so the JSON output is unchanged.
+    """
+
+    def __init__(self, market_items: List[Dict]):
+        self.items = market_items
+        n = self.n = len(market_items)
+
+        # One comprehension per column: much cheaper than a single loop appending to ten lists
+        self.name = np.array([item.get('name') for item in market_items], dtype=object)
+        self.status = np.array([item.get('status') for item in market_items], dtype=object)
+        self.climate_level = np.array(
+            [(item.get('climateImpact') or {}).get('level', 'unknown') for item in market_items], dtype=object
+        )
+
+        category = np.empty(n, dtype=object)
+        category[:] = [item.get('category', _MISSING) for item in market_items]
+        missing = category == _MISSING
+        self.category = np.where(missing, None, category)
+        # calculate_price_trends defaults a missing category to 'unknown', the rest to 'other'
+        self.cat_codes, self.cat_labels = pd.factorize(np.where(missing, 'other', category), use_na_sentinel=False)
+        self.cat_unknown_codes, self.cat_unknown_labels = pd.factorize(
+            np.where(missing, 'unknown', category), use_na_sentinel=False
+        )
+
+        savings = [item.get('savings', 0) for item in market_items]
+        self.savings = np.array(savings, dtype=float)
+        self.savings_is_int = np.array([type(s) is int for s in savings], dtype=bool)
+
+        prices = [item.get('currentPrice', _MISSING) for item in market_items]
+        present = np.array([p is not _MISSING for p in prices], dtype=bool)
+        self.price = np.array([None if p is _MISSING else p for p in prices], dtype=float)
+        self.price_is_int = np.array([type(p) is int for p in prices], dtype=bool)
+        self.price_truthy = present & np.array([bool(p) for p in prices], dtype=bool)
+        # min(..., key=lambda x: x.get('currentPrice', float('inf')))
+        self.price_min_key = np.where(present, self.price, np.inf)
+
+        trends = self.trends = [item.get('trend') or () for item in market_items]
+        self.trend_len = np.fromiter(map(len, trends), dtype=np.int64, count=n)
+        self.first = np.array([t[0] if t else None for t in trends], dtype=float)
+        self.last = np.array([t[-1] if t else None for t in trends], dtype=float)
+        self.third_last = np.array([t[-3] if len(t) >= 3 else None for t in trends], dtype=float)
+
+        # (last - first) / first * 100, or 0 when the trend starts at <= 0; NaN without a trend
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = (self.last - self.first) / self.first * 100
+        self.pct_change = np.where(self.first > 0, change, np.where(self.trend_len > 0, 0.0, np.nan))
+
+    @classmethod
+    def of(cls, items: Union[List[Dict], 'ItemFrame']) -> 'ItemFrame':
+        return items if isinstance(items, ItemFrame) else cls(items)
+
+    def groups(self, codes: np.ndarray, mask: Optional[np.ndarray] = None) -> List[np.ndarray]:
+        """Row indices per category code, groups in order of first (masked) appearance, rows in order."""
+        idx = np.flatnonzero(mask) if mask is not None else np.arange(self.n)
+        if not len(idx):
+            return []
+        order = np.argsort(codes[idx], kind='stable')
+        sorted_idx = idx[order]
+        bounds = np.flatnonzero(np.diff(codes[sorted_idx])) + 1
+        groups = np.split(sorted_idx, bounds)
+        groups.sort(key=lambda g: g[0])
+        return groups
+
+    def is_status(self, status: str) -> np.ndarray:
+        return self.status == status
+
+
+def _mean(values: np.ndarray, is_int: np.ndarray):
+    """np.mean as taken over the equivalent Python list (an all-int list sums as int64)."""
+    if len(values) and is_int.all():
+        return np.mean(values.astype(np.int64))
+    return np.mean(values)
+
+
+def _trend_matrix(trends: List) -> tuple:
+    """Trends left-aligned in an (n, longest) float matrix padded with 0, their lengths and the validity mask."""
+    lengths = np.fromiter(map(len, trends), dtype=np.int64, count=len(trends))
+    width = int(lengths.max()) if len(lengths) else 0
+    mask = np.arange(width) < lengths[:, None]
+    values = np.zeros((len(trends), width))
+    # Row-major boolean assignment fills each row's leading cells in order; None becomes NaN
+    values[mask] = np.array(list(chain.from_iterable(trends)), dtype=float)
+    return values, lengths, mask
+
+
+def _top_candidates(idx: np.ndarray, key: np.ndarray, k: int, margin: float, largest: bool) -> np.ndarray:
+    """
+    Rows of `idx` that can still rank in the top k by `key` once it is rounded.
+
+    argpartition finds the k-th key; rows more than `margin` (one rounding
+    step) beyond it cannot round into the top k, so only the remainder needs
+    the exact rounded, stable Python sort.
+    """
+    if len(idx) <= k:
+        return idx
+    if largest:
+        kth = key[np.argpartition(key, -k)[-k]]
+        return idx[key >= kth - margin]
+    kth = key[np.argpartition(key, k - 1)[k - 1]]
+    return idx[key <= kth + margin]
+
+
 class AnalyticsEngine:
     """Analytics engine for generating actionable insights from market and climate data"""
-    
+
     def __init__(self):
         self.insights = []
-    
-    def calculate_price_trends(self, market_items: List[Dict]) -> Dict:
+
+    def calculate_price_trends(self, market_items: Union[List[Dict], ItemFrame]) -> Dict:
         """Analyze price trends across categories"""
-        category_trends = defaultdict(list)
-        
-        for item in market_items:
-            category = item.get('category', 'unknown')
-            if 'trend' in item and len(item['trend']) > 0:
-                trend_change = item['trend'][-1] - item['trend'][0]
-                category_trends[category].append({
-                    'item': item['name'],
-                    'change': trend_change,
-                    'percent_change': (trend_change / item['trend'][0] * 100) if item['trend'][0] > 0 else 0
-                })
-        
-        # Calculate category averages
+        frame = ItemFrame.of(market_items)
+
         insights = {}
-        for category, items in category_trends.items():
-            avg_change = np.mean([i['percent_change'] for i in items])
-            insights[category] = {
+        for group in frame.groups(frame.cat_unknown_codes, frame.trend_len > 0):
+            avg_change = np.mean(frame.pct_change[group])
+            insights[frame.cat_unknown_labels[frame.cat_unknown_codes[group[0]]]] = {
                 'average_change': round(avg_change, 2),
                 'trend': 'increasing' if avg_change > 0 else 'decreasing',
-                'item_count': len(items)
+                'item_count': len(group)
             }
-        
+
         return insights
-    
-    def generate_market_analytics(self, market_items: List[Dict]) -> Dict:
+
+    def generate_market_analytics(self, market_items: Union[List[Dict], ItemFrame]) -> Dict:
         """Generate comprehensive market analytics with price, supply/demand insights"""
+        frame = ItemFrame.of(market_items)
         analytics = {
-            'price_summary': self._generate_price_summary(market_items),
-            'supply_demand': self._generate_supply_demand_insights(market_items),
-            'category_insights': self._generate_category_insights(market_items),
-            'price_alerts': self._generate_price_alerts(market_items),
-            'top_movers': self._get_top_movers(market_items)
+            'price_summary': self._generate_price_summary(frame),
+            'supply_demand': self._generate_supply_demand_insights(frame),
+            'category_insights': self._generate_category_insights(frame),
+            'price_alerts': self._generate_price_alerts(frame),
+            'top_movers': self._get_top_movers(frame)
         }
         return analytics
-    
-    def _generate_price_summary(self, market_items: List[Dict]) -> Dict:
+
+    def _generate_price_summary(self, frame: ItemFrame) -> Dict:
         """Generate price summary statistics"""
-        mura_items = [i for i in market_items if i.get('status') == 'MURA']
-        mahal_items = [i for i in market_items if i.get('status') == 'MAHAL']
-        stable_items = [i for i in market_items if i.get('status') == 'STABLE']
-        
-        total_savings = sum(i.get('savings', 0) for i in mura_items if i.get('savings', 0) > 0)
-        
+        mura = frame.is_status('MURA')
+        mura_count = int(np.count_nonzero(mura))
+        mahal_count = int(np.count_nonzero(frame.is_status('MAHAL')))
+        stable_count = int(np.count_nonzero(frame.is_status('STABLE')))
+
+        # Python sum, in item order, over the stored values (ints stay ints)
+        total_savings = sum(frame.items[i].get('savings', 0) for i in np.flatnonzero(mura & (frame.savings > 0)))
+
         return {
-            'total_items': len(market_items),
-            'mura_count': len(mura_items),
-            'mahal_count': len(mahal_items),
-            'stable_count': len(stable_items),
+            'total_items': frame.n,
+            'mura_count': mura_count,
+            'mahal_count': mahal_count,
+            'stable_count': stable_count,
             'total_potential_savings': round(total_savings, 2),
-            'market_sentiment': 'favorable' if len(mura_items) > len(mahal_items) else 'cautious',
-            'price_stability_index': round(len(stable_items) / len(market_items) * 100, 1) if market_items else 0
+            'market_sentiment': 'favorable' if mura_count > mahal_count else 'cautious',
+            'price_stability_index': round(stable_count / frame.n * 100, 1) if frame.n else 0
         }
-    
-    def _generate_supply_demand_insights(self, market_items: List[Dict]) -> List[Dict]:
+
+    def _generate_supply_demand_insights(self, frame: ItemFrame) -> List[Dict]:
         """Generate supply/demand insights based on price movements"""
         insights = []
-        
-        # Group by category
-        categories = defaultdict(list)
-        for item in market_items:
-            categories[item.get('category', 'other')].append(item)
-        
-        for category, items in categories.items():
-            if len(items) < 2:
+        mura = frame.is_status('MURA')
+        mahal = frame.is_status('MAHAL')
+
+        for group in frame.groups(frame.cat_codes):
+            count = len(group)
+            if count < 2:
                 continue
-                
-            mura_pct = len([i for i in items if i.get('status') == 'MURA']) / len(items) * 100
-            mahal_pct = len([i for i in items if i.get('status') == 'MAHAL']) / len(items) * 100
-            
+            category = frame.cat_labels[frame.cat_codes[group[0]]]
+
+            mura_pct = int(np.count_nonzero(mura[group])) / count * 100
+            mahal_pct = int(np.count_nonzero(mahal[group])) / count * 100
+
             # Determine supply/demand status
             if mura_pct > 50:
                 supply_status = 'surplus'
@@ -96,111 +201,104 @@ class AnalyticsEngine:
                 supply_status = 'balanced'
                 demand_status = 'moderate'
                 recommendation = f'{category.title()} market is stable. Standard purchasing advised.'
-            
+
             insights.append({
                 'category': category,
                 'supply_status': supply_status,
                 'demand_status': demand_status,
                 'mura_percentage': round(mura_pct, 1),
                 'mahal_percentage': round(mahal_pct, 1),
-                'item_count': len(items),
+                'item_count': count,
                 'recommendation': recommendation
             })
-        
+
         return sorted(insights, key=lambda x: x['mura_percentage'], reverse=True)
-    
-    def _generate_category_insights(self, market_items: List[Dict]) -> List[Dict]:
+
+    def _generate_category_insights(self, frame: ItemFrame) -> List[Dict]:
         """Generate detailed category-level insights"""
-        categories = defaultdict(list)
-        for item in market_items:
-            categories[item.get('category', 'other')].append(item)
-        
         category_insights = []
-        for category, items in categories.items():
-            prices = [i.get('currentPrice', 0) for i in items if i.get('currentPrice')]
-            avg_price = np.mean(prices) if prices else 0
-            
-            # Calculate weekly change from trend data
-            weekly_changes = []
-            for item in items:
-                trend = item.get('trend', [])
-                if len(trend) >= 2:
-                    change = ((trend[-1] - trend[0]) / trend[0] * 100) if trend[0] > 0 else 0
-                    weekly_changes.append(change)
-            
-            avg_weekly_change = np.mean(weekly_changes) if weekly_changes else 0
-            
+        for group in frame.groups(frame.cat_codes):
+            priced = group[frame.price_truthy[group]]
+            avg_price = _mean(frame.price[priced], frame.price_is_int[priced]) if len(priced) else 0
+
+            # Weekly change from trend data
+            trended = group[frame.trend_len[group] >= 2]
+            avg_weekly_change = np.mean(frame.pct_change[trended]) if len(trended) else 0
+
             category_insights.append({
-                'category': category,
-                'item_count': len(items),
+                'category': frame.cat_labels[frame.cat_codes[group[0]]],
+                'item_count': len(group),
                 'average_price': round(avg_price, 2),
                 'weekly_change_pct': round(avg_weekly_change, 2),
                 'trend_direction': 'up' if avg_weekly_change > 1 else 'down' if avg_weekly_change < -1 else 'stable',
-                'best_deal': min(items, key=lambda x: x.get('currentPrice', float('inf'))).get('name') if items else None
+                'best_deal': frame.name[group[np.argmin(frame.price_min_key[group])]]
             })
-        
+
         return category_insights
-    
-    def _generate_price_alerts(self, market_items: List[Dict]) -> List[Dict]:
+
+    def _generate_price_alerts(self, frame: ItemFrame) -> List[Dict]:
         """Generate price alerts for significant movements"""
+        pct = frame.pct_change
+        with np.errstate(invalid='ignore'):
+            moved = np.flatnonzero((frame.trend_len >= 2) & (np.abs(pct) > 10))
+        moved = _top_candidates(moved, np.abs(pct[moved]), 10, 0.1, largest=True)
+
         alerts = []
-        
-        for item in market_items:
-            trend = item.get('trend', [])
-            if len(trend) < 2:
-                continue
-            
-            # Calculate percentage change
-            pct_change = ((trend[-1] - trend[0]) / trend[0] * 100) if trend[0] > 0 else 0
-            
-            if abs(pct_change) > 10:
-                alert_type = 'price_spike' if pct_change > 0 else 'price_drop'
-                severity = 'high' if abs(pct_change) > 20 else 'medium'
-                
-                alerts.append({
-                    'item': item.get('name'),
-                    'category': item.get('category'),
-                    'alert_type': alert_type,
-                    'severity': severity,
-                    'change_pct': round(pct_change, 1),
-                    'current_price': item.get('currentPrice'),
-                    'message': f"{item.get('name')} {'increased' if pct_change > 0 else 'decreased'} by {abs(round(pct_change, 1))}%"
-                })
-        
+        for i, pct_change in zip(moved.tolist(), pct[moved].tolist()):
+            item = frame.items[i]
+            alert_type = 'price_spike' if pct_change > 0 else 'price_drop'
+            severity = 'high' if abs(pct_change) > 20 else 'medium'
+
+            alerts.append({
+                'item': item.get('name'),
+                'category': item.get('category'),
+                'alert_type': alert_type,
+                'severity': severity,
+                'change_pct': round(pct_change, 1),
+                'current_price': item.get('currentPrice'),
+                'message': f"{item.get('name')} {'increased' if pct_change > 0 else 'decreased'} by {abs(round(pct_change, 1))}%"
+            })
+
         return sorted(alerts, key=lambda x: abs(x['change_pct']), reverse=True)[:10]
-    
-    def _get_top_movers(self, market_items: List[Dict]) -> Dict:
+
+    def _get_top_movers(self, frame: ItemFrame) -> Dict:
         """Get top gainers and losers"""
+        movers = np.flatnonzero((frame.trend_len >= 2) & (frame.first > 0))
+        pct = frame.pct_change[movers]
+        candidates = np.union1d(
+            _top_candidates(movers, pct, 5, 0.01, largest=True),
+            _top_candidates(movers, pct, 5, 0.01, largest=False),
+        )
+
         items_with_changes = []
-        
-        for item in market_items:
-            trend = item.get('trend', [])
-            if len(trend) >= 2 and trend[0] > 0:
-                pct_change = ((trend[-1] - trend[0]) / trend[0] * 100)
-                items_with_changes.append({
-                    'name': item.get('name'),
-                    'category': item.get('category'),
-                    'change_pct': round(pct_change, 2),
-                    'current_price': item.get('currentPrice'),
-                    'status': item.get('status')
-                })
-        
+        for i, pct_change in zip(candidates.tolist(), frame.pct_change[candidates].tolist()):
+            item = frame.items[i]
+            items_with_changes.append({
+                'name': item.get('name'),
+                'category': item.get('category'),
+                'change_pct': round(pct_change, 2),
+                'current_price': item.get('currentPrice'),
+                'status': item.get('status')
+            })
+
         sorted_items = sorted(items_with_changes, key=lambda x: x['change_pct'])
-        
+
         return {
             'top_gainers': sorted_items[-5:][::-1],  # Top 5 highest increases
             'top_losers': sorted_items[:5]  # Top 5 biggest decreases
         }
-    
-    def correlate_climate_to_prices(self, market_items: List[Dict], climate_metrics: List[Dict]) -> List[Dict]:
+
+    def correlate_climate_to_prices(self, market_items: Union[List[Dict], ItemFrame], climate_metrics: List[Dict]) -> List[Dict]:
         """Find correlations between climate conditions and price changes"""
+        frame = ItemFrame.of(market_items)
         correlations = []
-        
+
+        def count(*categories) -> int:
+            return int(np.count_nonzero(np.isin(frame.category, categories)))
+
         # Temperature impact on vegetables
         temp_metric = next((m for m in climate_metrics if m['name'] == 'Temperature'), None)
         if temp_metric:
-            vegetables = [item for item in market_items if item['category'] == 'vegetables']
-            
             if temp_metric['currentValue'] < temp_metric.get('averageValue', temp_metric['currentValue']):
                 correlations.append({
                     'insight_type': 'climate_correlation',
@@ -208,14 +306,12 @@ class AnalyticsEngine:
                     'description': f"Current temperature ({temp_metric['currentValue']}°C) is below average, creating favorable conditions for leafy vegetables. This is contributing to lower prices in lettuce, cabbage, and similar items.",
                     'confidence': 0.85,
                     'impact': 'positive',
-                    'affected_items': len(vegetables)
+                    'affected_items': count('vegetables')
                 })
-        
+
         # Rainfall impact on rice and agriculture
         rain_metric = next((m for m in climate_metrics if m['name'] == 'Rainfall'), None)
         if rain_metric:
-            rice_items = [item for item in market_items if item['category'] == 'rice']
-            
             if rain_metric['currentValue'] > rain_metric.get('averageValue', rain_metric['currentValue']):
                 correlations.append({
                     'insight_type': 'climate_correlation',
@@ -223,40 +319,39 @@ class AnalyticsEngine:
                     'description': f"Above-average rainfall ({rain_metric['currentValue']}mm) is improving irrigation conditions, supporting stable rice production and prices.",
                     'confidence': 0.78,
                     'impact': 'positive',
-                    'affected_items': len(rice_items)
+                    'affected_items': count('rice')
                 })
-        
+
         # UV Index impact on livestock
         uv_metric = next((m for m in climate_metrics if m['name'] == 'UV Index'), None)
         if uv_metric and uv_metric['status'] in ['WARNING', 'ALERT']:
-            meat_items = [item for item in market_items if item['category'] in ['meat', 'poultry']]
             correlations.append({
                 'insight_type': 'climate_correlation',
                 'title': 'High UV Levels May Affect Livestock Prices',
                 'description': f"Elevated UV index ({uv_metric['currentValue']}) can cause heat stress in livestock, potentially impacting meat and poultry prices in the coming weeks.",
                 'confidence': 0.72,
                 'impact': 'warning',
-                'affected_items': len(meat_items)
+                'affected_items': count('meat', 'poultry')
             })
-        
+
         return correlations
-    
+
     def predict_price_movements(self, item: Dict) -> Dict:
         """Predict future price movement based on trends"""
         if 'trend' not in item or len(item['trend']) < 3:
             return {'prediction': 'insufficient_data'}
-        
+
         trend = item['trend']
-        
+
         # Simple linear regression
         x = np.arange(len(trend))
         y = np.array(trend)
         z = np.polyfit(x, y, 1)  # Linear fit
         slope = z[0]
-        
+
         # Predict next value
         next_price = z[0] * len(trend) + z[1]
-        
+
         prediction = {
             'current_price': item['currentPrice'],
             'predicted_next': round(next_price, 2),
@@ -264,66 +359,120 @@ class AnalyticsEngine:
             'direction': 'increasing' if slope > 0 else 'decreasing',
             'confidence': min(0.9, max(0.5, 1 - abs(slope) / 10))  # Simple confidence
         }
-        
+
         return prediction
-    
-    def identify_best_buying_opportunities(self, market_items: List[Dict]) -> List[Dict]:
+
+    def predict_price_movements_batch(self, market_items: Union[List[Dict], ItemFrame]) -> List[Dict]:
+        """
+        predict_price_movements for many items at once.
+
+        Every trend is fitted in one closed-form least-squares pass over a
+        padded trend matrix (x = 0..len-1 per row, padding masked out)
+        instead of one np.polyfit per item. Results line up with the input.
+        """
+        frame = market_items if isinstance(market_items, ItemFrame) else None
+        items = frame.items if frame else market_items
+        trends = frame.trends if frame else [item.get('trend') or () for item in items]
+        values, lengths, mask = _trend_matrix(trends)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_mean = (lengths - 1) / 2
+            y_mean = values.sum(axis=1) / lengths
+            dx = np.where(mask, np.arange(values.shape[1]) - x_mean[:, None], 0.0)
+            # sum(dx) == 0 per row, so sum(dx * (y - y_mean)) == sum(dx * y)
+            slope = (dx * values).sum(axis=1) / (dx * dx).sum(axis=1)
+            next_price = slope * (lengths - x_mean) + y_mean
+        confidence = np.minimum(0.9, np.maximum(0.5, 1 - np.abs(slope) / 10))
+        fitted = (lengths >= 3) & np.isfinite(next_price)
+
+        # round() on a NumPy float is np.round, so rounding the columns matches predict_price_movements
+        rows = zip(
+            items,
+            fitted.tolist(),
+            np.round(next_price, 2).tolist(),
+            np.round(slope, 2).tolist(),
+            np.where(slope > 0, 'increasing', 'decreasing').tolist(),
+            confidence.tolist(),
+        )
+        predictions = []
+        for item, ok, predicted_next, trend_slope, direction, c in rows:
+            if not ok:
+                predictions.append({'prediction': 'insufficient_data'})
+                continue
+            predictions.append({
+                'current_price': item.get('currentPrice'),
+                'predicted_next': predicted_next,
+                'trend_slope': trend_slope,
+                'direction': direction,
+                'confidence': c
+            })
+
+        return predictions
+
+    def identify_best_buying_opportunities(self, market_items: Union[List[Dict], ItemFrame]) -> List[Dict]:
         """Identify items with best value based on price trends and climate factors"""
+        frame = ItemFrame.of(market_items)
+
+        # MURA with savings, price still declining over the last 3 points, low climate impact
+        with np.errstate(invalid='ignore'):
+            mask = (
+                frame.is_status('MURA')
+                & (frame.savings > 0)
+                & (frame.trend_len >= 3)
+                & (frame.third_last > frame.last)
+                & (frame.climate_level == 'low')
+            )
+        rows = np.flatnonzero(mask)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = frame.savings[rows] / frame.price[rows] * 100
+        rows = _top_candidates(rows, scores, 10, 0.1, largest=True)
+
         opportunities = []
-        
-        for item in market_items:
-            if item['status'] == 'MURA' and item['savings'] > 0:
-                # Check if price is still declining
-                if len(item['trend']) >= 3:
-                    recent_trend = item['trend'][-3:]
-                    if recent_trend[0] > recent_trend[-1]:  # Declining
-                        
-                        # Check climate impact
-                        climate_level = item.get('climateImpact', {}).get('level', 'unknown')
-                        if climate_level == 'low':
-                            opportunities.append({
-                                'item': item['name'],
-                                'category': item['category'],
-                                'current_price': item['currentPrice'],
-                                'savings': item['savings'],
-                                'recommendation': 'Strong Buy',
-                                'reason': f"Price declining with favorable climate conditions. Save ₱{item['savings']}/kg.",
-                                'score': round(item['savings'] / item['currentPrice'] * 100, 1)
-                            })
-        
+        for i in rows.tolist():
+            item = frame.items[i]
+            opportunities.append({
+                'item': item['name'],
+                'category': item['category'],
+                'current_price': item['currentPrice'],
+                'savings': item['savings'],
+                'recommendation': 'Strong Buy',
+                'reason': f"Price declining with favorable climate conditions. Save ₱{item['savings']}/kg.",
+                'score': round(item['savings'] / item['currentPrice'] * 100, 1)
+            })
+
         # Sort by score
         opportunities.sort(key=lambda x: x['score'], reverse=True)
         return opportunities[:10]  # Top 10
-    
-    def generate_weekly_report(self, market_items: List[Dict], climate_metrics: List[Dict]) -> Dict:
+
+    def generate_weekly_report(self, market_items: Union[List[Dict], ItemFrame], climate_metrics: List[Dict]) -> Dict:
         """Generate comprehensive weekly analytics report"""
+        frame = ItemFrame.of(market_items)
         report = {
             'generated_at': datetime.utcnow().isoformat(),
             'period': '7_days',
             'summary': {}
         }
-        
+
         # Price trends by category
-        report['price_trends'] = self.calculate_price_trends(market_items)
-        
+        report['price_trends'] = self.calculate_price_trends(frame)
+
         # Climate correlations
-        report['climate_impacts'] = self.correlate_climate_to_prices(market_items, climate_metrics)
-        
+        report['climate_impacts'] = self.correlate_climate_to_prices(frame, climate_metrics)
+
         # Best opportunities
-        report['buying_opportunities'] = self.identify_best_buying_opportunities(market_items)
-        
+        report['buying_opportunities'] = self.identify_best_buying_opportunities(frame)
+
         # Summary statistics
-        mura_count = len([i for i in market_items if i['status'] == 'MURA'])
-        mahal_count = len([i for i in market_items if i['status'] == 'MAHAL'])
-        
+        positive = frame.savings > 0
+
         report['summary'] = {
-            'total_items': len(market_items),
-            'mura_items': mura_count,
-            'mahal_items': mahal_count,
-            'avg_savings': round(np.mean([i['savings'] for i in market_items if i['savings'] > 0]), 2),
+            'total_items': frame.n,
+            'mura_items': int(np.count_nonzero(frame.is_status('MURA'))),
+            'mahal_items': int(np.count_nonzero(frame.is_status('MAHAL'))),
+            'avg_savings': round(_mean(frame.savings[positive], frame.savings_is_int[positive]), 2),
             'top_category': max(report['price_trends'].items(), key=lambda x: abs(x[1]['average_change']))[0] if report['price_trends'] else 'N/A'
         }
-        
+
         return report
 
 # Initialize analytics engine
@@ -0,0 +1,201 @@
+"""
+Materialized AnalyticsEngine results.
+
+The /api/analytics/* endpoints used to load up to 1000 market items plus the
+climate metrics and rerun AnalyticsEngine on every hit. Instead, every report
+is computed once per change of `market_items` / `climate_metrics` and stored in
+the `analytics_snapshots` collection, one document per report:
+
+    {_id: "<report>", version: [market_items, climate_metrics],
+     computed_at: datetime, data: ...}          (or error: "..." on failure)
+
+`version` is the pair of collection version counters
+(services/collection_versions.py) the snapshot was computed from.
+
+  * Writes to either collection bump its counter; a listener schedules a
+    debounced re-materialization (integrations bump once per flush, so a
+    run coalesces into one or two recomputes).
+  * Staleness guard: `get()` compares the snapshot's version with the current
+    counters and recomputes inline if the source moved — e.g. after a write
+    by another process, or before the debounced run has fired.
+
+Materializations are single-flight; the last good snapshot is also kept in
+memory so a read is a dict lookup when nothing changed.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from services.analytics_engine import ItemFrame, analytics_engine
+from services.collection_versions import collection_versions
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOTS_COLLECTION = "analytics_snapshots"
+SOURCES = ("market_items", "climate_metrics")
+DEBOUNCE_SECONDS = 5.0
+
+MAX_ITEMS = 1000
+MAX_METRICS = 100
+
+# report name -> fn(market_items ItemFrame, climate_metrics)
+REPORTS: Dict[str, Callable[[ItemFrame, List[Dict]], object]] = {
+    "market_analytics": lambda items, metrics: analytics_engine.generate_market_analytics(items),
+    "price_trends": lambda items, metrics: analytics_engine.calculate_price_trends(items),
+    "climate_correlations": lambda items, metrics: analytics_engine.correlate_climate_to_prices(items, metrics),
+    "buying_opportunities": lambda items, metrics: analytics_engine.identify_best_buying_opportunities(items),
+    "weekly_report": lambda items, metrics: analytics_engine.generate_weekly_report(items, metrics),
+}
+
+
+def _plain(value):
+    """
+    numpy scalars/arrays → Python values and tuples → lists, so a report can be
+    stored in MongoDB. Datetimes, ObjectIds and other BSON types are kept as is.
+    """
+    if isinstance(value, dict):
+        return {key if isinstance(key, str) else str(key): _plain(v) for key, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return _plain(value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class AnalyticsSnapshots:
+    def __init__(self):
+        self._snapshots: Dict[str, Dict] = {}
+        self._inflight: Optional[asyncio.Task] = None
+        self._scheduled: Optional[asyncio.Task] = None
+        self._dirty = False
+
+        self.materializations = 0
+        self.stale_reads = 0
+        self.last_duration_ms: Optional[float] = None
+
+    # ------------------------------------------------------------------ #
+    #  Public API                                                          #
+    # ------------------------------------------------------------------ #
+
+    async def get(self, db, report: str) -> Dict:
+        """
+        Current snapshot for `report` ({version, computed_at, data}).
+
+        Raises RuntimeError if the report failed to compute for the current data.
+        """
+        await collection_versions.sync()
+        snapshot = self._snapshots.get(report)
+        if not self._is_current(snapshot):
+            snapshot = await self._load(db, report) or snapshot
+
+        # Staleness guard: the source moved since this snapshot was computed.
+        # Two rounds at most — a write landing mid-compute serves the slightly
+        # older result rather than looping.
+        for _ in range(2):
+            if self._is_current(snapshot):
+                break
+            self.stale_reads += 1
+            await self.materialize(db)
+            snapshot = self._snapshots.get(report)
+
+        if snapshot is None:
+            raise RuntimeError(f"No analytics snapshot for {report}")
+        if "error" in snapshot:
+            raise RuntimeError(snapshot["error"])
+        return snapshot
+
+    async def materialize(self, db):
+        """Recompute every report from the current data (single-flight)."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._materialize(db))
+        await asyncio.shield(self._inflight)
+
+    def schedule(self, db):
+        """Re-materialize after DEBOUNCE_SECONDS of quiet (coalesces bursts of writes)."""
+        self._dirty = True
+        if self._scheduled is None or self._scheduled.done():
+            self._scheduled = asyncio.ensure_future(self._debounced(db))
+
+    def on_collections_changed(self, db, collections):
+        """collection_versions listener."""
+        if set(collections) & set(SOURCES):
+            self.schedule(db)
+
+    def stats(self) -> Dict:
+        return {
+            "materializations": self.materializations,
+            "stale_reads": self.stale_reads,
+            "last_duration_ms": self.last_duration_ms,
+            "version": next(iter(self._snapshots.values()), {}).get("version"),
+        }
+
+    # ------------------------------------------------------------------ #
+    #  Internal                                                            #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _current_version() -> List[int]:
+        return list(collection_versions.snapshot(SOURCES))
+
+    def _is_current(self, snapshot: Optional[Dict]) -> bool:
+        return snapshot is not None and list(snapshot.get("version", [])) == self._current_version()
+
+    async def _debounced(self, db):
+        while self._dirty:
+            self._dirty = False
+            await asyncio.sleep(DEBOUNCE_SECONDS)
+            if self._dirty:
+                continue  # still receiving writes
+            try:
+                await self.materialize(db)
+            except Exception as e:
+                logger.error(f"Analytics materialization failed: {e}")
+
+    async def _materialize(self, db):
+        started = datetime.utcnow()
+        version = self._current_version()  # before reading: a concurrent write makes this stale, never wrong
+        items = await db.market_items.find({}).to_list(length=MAX_ITEMS)
+        metrics = await db.climate_metrics.find({}).to_list(length=MAX_METRICS)
+
+        computed_at = datetime.utcnow()
+        frame = None
+        for report, compute in REPORTS.items():
+            snapshot = {"_id": report, "version": version, "computed_at": computed_at}
+            try:
+                frame = frame or ItemFrame(items)  # columnar extraction once, shared by every report
+                snapshot["data"] = _plain(compute(frame, metrics))
+            except Exception as e:
+                logger.error(f"Analytics report {report} failed: {e}")
+                snapshot["error"] = str(e)
+            self._snapshots[report] = snapshot
+            try:
+                await db[SNAPSHOTS_COLLECTION].replace_one({"_id": report}, snapshot, upsert=True)
+            except Exception as e:
+                logger.warning(f"Could not store analytics snapshot {report}: {e}")
+
+        self.materializations += 1
+        self.last_duration_ms = round((datetime.utcnow() - started).total_seconds() * 1000, 1)
+        logger.info(
+            f"Analytics materialized from {len(items)} items / {len(metrics)} metrics "
+            f"(version {version}) in {self.last_duration_ms} ms"
+        )
+
+    async def _load(self, db, report: str) -> Optional[Dict]:
+        try:
+            snapshot = await db[SNAPSHOTS_COLLECTION].find_one({"_id": report})
+        except Exception as e:
+            logger.debug(f"Could not read analytics snapshot {report}: {e}")
+            return None
+        if snapshot is not None:
+            self._snapshots[report] = snapshot
+        return snapshot
+
+
+# Singleton
+analytics_snapshots = AnalyticsSnapshots()
@@ -0,0 +1,298 @@
+"""
+Long-lived headless Chromium for scrapers that need a real browser.
+
+Launching Chromium costs several seconds and a large RSS spike — too much to
+pay on every cache miss on a 512 MB instance. BrowserPool keeps one browser
+running and hands out pages from a small bounded pool of browser contexts:
+
+  * at most `size` contexts exist; callers beyond that wait for a free one
+  * a context is recycled (closed, recreated on next use) after
+    `max_context_uses` pages, after a failed use, or when the process tree's
+    RSS exceeds `memory_limit_mb`; if RSS is still over the limit once the
+    context is gone, the browser itself is restarted
+  * images, fonts and media are aborted at the network layer — scrapers only
+    read the DOM
+  * a crashed/disconnected browser is relaunched on next use
+
+`stats()` reports launches, recycles, page latency and process-tree memory
+(exposed via /api/health).
+
+Usage:
+    async with browser_pool.page() as page:
+        await page.goto(url)
+        ...
+
+Env vars:
+  BROWSER_POOL_SIZE         — max concurrent contexts (default 1)
+  BROWSER_MAX_CONTEXT_USES  — pages per context before recycling (default 20)
+  BROWSER_MEMORY_LIMIT_MB   — process-tree RSS that triggers recycling (default 400)
+"""
+
+import asyncio
+import logging
+import os
+import statistics
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from playwright.async_api import Browser, BrowserContext, Page, Playwright, Route, async_playwright
+
+logger = logging.getLogger(__name__)
+
+# Chromium flags for low-memory environments (Render free tier ~512 MB)
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--mute-audio",
+    "--no-first-run",
+]
+
+CONTEXT_OPTIONS = {
+    "user_agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/121.0.0.0 Safari/537.36"
+    ),
+    "viewport": {"width": 1280, "height": 900},
+}
+
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+LATENCY_WINDOW = 50  # recent page uses kept for latency percentiles
+
+
+def process_tree_rss_mb() -> Optional[float]:
+    """RSS of this process plus all descendants (Playwright driver, Chromium). Linux only."""
+    try:
+        children: Dict[int, List[int]] = {}
+        for entry in os.scandir("/proc"):
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry.name}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(entry.name))
+
+        total_kb = 0
+        stack = [os.getpid()]
+        while stack:
+            pid = stack.pop()
+            stack.extend(children.get(pid, []))
+            try:
+                with open(f"/proc/{pid}/status") as f:
+                    for line in f:
+                        if line.startswith("VmRSS:"):
+                            total_kb += int(line.split()[1])
+                            break
+            except OSError:
+                continue
+        return total_kb / 1024
+    except OSError:
+        return None
+
+
+async def _block_heavy_resources(route: Route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class _PooledContext:
+    def __init__(self, context: BrowserContext, generation: int):
+        self.context = context
+        self.generation = generation
+        self.uses = 0
+
+
+class BrowserPool:
+    """One shared Chromium, a bounded pool of recycled contexts."""
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_context_uses: Optional[int] = None,
+        memory_limit_mb: Optional[float] = None,
+    ):
+        self.size = size or int(os.environ.get("BROWSER_POOL_SIZE", 1))
+        self.max_context_uses = max_context_uses or int(os.environ.get("BROWSER_MAX_CONTEXT_USES", 20))
+        self.memory_limit_mb = memory_limit_mb or float(os.environ.get("BROWSER_MEMORY_LIMIT_MB", 400))
+
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._generation = 0  # bumped on every (re)launch; stale contexts are dropped
+        self._idle: List[_PooledContext] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+
+        self.launches = 0
+        self.contexts_created = 0
+        self.contexts_recycled = 0
+        self.pages = 0
+        self.failures = 0
+        self.last_launch_ms: Optional[float] = None
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self._rss_mb: Optional[float] = None
+        self._peak_rss_mb: Optional[float] = None
+
+    # ------------------------------------------------------------------ #
+    #  Public API                                                          #
+    # ------------------------------------------------------------------ #
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """A fresh page in a pooled context. The page is closed on exit."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        async with self._slots:
+            pooled = await self._checkout()
+            start = time.perf_counter()
+            ok = False
+            page: Optional[Page] = None
+            try:
+                page = await pooled.context.new_page()
+                yield page
+                ok = True
+            finally:
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                pooled.uses += 1
+                self.pages += 1
+                self._latencies.append((time.perf_counter() - start) * 1000)
+                if not ok:
+                    self.failures += 1
+                await self._checkin(pooled, healthy=ok)
+
+    async def close(self):
+        """Close every context, the browser and Playwright (call on shutdown)."""
+        for pooled in self._idle:
+            await self._close_context(pooled, recycled=False)
+        self._idle = []
+        await self._close_browser()
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    def stats(self) -> Dict:
+        latencies = sorted(self._latencies)
+        return {
+            "browser_running": self._browser is not None and self._browser.is_connected(),
+            "launches": self.launches,
+            "last_launch_ms": self.last_launch_ms,
+            "contexts_created": self.contexts_created,
+            "contexts_recycled": self.contexts_recycled,
+            "idle_contexts": len(self._idle),
+            "pages": self.pages,
+            "failures": self.failures,
+            "page_ms_last": round(self._latencies[-1], 1) if latencies else None,
+            "page_ms_p50": round(statistics.median(latencies), 1) if latencies else None,
+            "page_ms_max": round(latencies[-1], 1) if latencies else None,
+            "rss_mb": round(self._rss_mb, 1) if self._rss_mb is not None else None,
+            "peak_rss_mb": round(self._peak_rss_mb, 1) if self._peak_rss_mb is not None else None,
+        }
+
+    # ------------------------------------------------------------------ #
+    #  Internal                                                            #
+    # ------------------------------------------------------------------ #
+
+    def _get_launch_lock(self) -> asyncio.Lock:
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        return self._launch_lock
+
+    async def _ensure_browser(self) -> Browser:
+        async with self._get_launch_lock():
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+            await self._close_browser()
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+
+            start = time.perf_counter()
+            self._browser = await self._playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            self.last_launch_ms = round((time.perf_counter() - start) * 1000, 1)
+            self._generation += 1
+            self.launches += 1
+            logger.info(f"Browser pool: launched Chromium in {self.last_launch_ms} ms")
+            return self._browser
+
+    async def _checkout(self) -> _PooledContext:
+        browser = await self._ensure_browser()
+        while self._idle:
+            pooled = self._idle.pop()
+            if pooled.generation == self._generation:
+                return pooled
+            await self._close_context(pooled, recycled=False)
+
+        context = await browser.new_context(**CONTEXT_OPTIONS)
+        await context.route("**/*", _block_heavy_resources)
+        self.contexts_created += 1
+        return _PooledContext(context, self._generation)
+
+    async def _checkin(self, pooled: _PooledContext, healthy: bool):
+        rss = await self._sample_memory()
+        over_memory = rss is not None and rss > self.memory_limit_mb
+        browser_alive = self._browser is not None and self._browser.is_connected()
+
+        if (
+            healthy
+            and browser_alive
+            and not over_memory
+            and pooled.generation == self._generation
+            and pooled.uses < self.max_context_uses
+        ):
+            self._idle.append(pooled)
+            return
+
+        await self._close_context(pooled, recycled=True)
+        if over_memory:
+            rss = await self._sample_memory()
+            if rss is not None and rss > self.memory_limit_mb and not self._idle:
+                logger.warning(f"Browser pool: {rss:.0f} MB after recycling — restarting Chromium")
+                await self._close_browser()
+
+    async def _close_context(self, pooled: _PooledContext, recycled: bool):
+        try:
+            await pooled.context.close()
+        except Exception:
+            pass
+        if recycled:
+            self.contexts_recycled += 1
+
+    async def _close_browser(self):
+        if self._browser is None:
+            return
+        for pooled in self._idle:
+            await self._close_context(pooled, recycled=False)
+        self._idle = []
+        try:
+            await self._browser.close()
+        except Exception:
+            pass
+        self._browser = None
+
+    async def _sample_memory(self) -> Optional[float]:
+        rss = await asyncio.to_thread(process_tree_rss_mb)
+        if rss is not None:
+            self._rss_mb = rss
+            self._peak_rss_mb = max(self._peak_rss_mb or 0, rss)
+        return rss
+
+
+# Singleton
+browser_pool = BrowserPool()
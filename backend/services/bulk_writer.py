@@ -0,0 +1,134 @@
+"""
+Batched MongoDB writer.
+
+Integrations used to issue one `update_one(..., upsert=True)` per document —
+~200 round trips per DA PDF. BulkWriter buffers write operations (`UpdateOne`,
+`ReplaceOne`, ...) and flushes them through unordered `bulk_write` calls of
+`chunk_size` operations each.
+
+Flushes run in the background while the caller keeps producing operations. At
+most `max_inflight` flushes run at once; when that limit is reached `add()`
+waits for one to finish (back-pressure), so memory stays bounded at roughly
+`chunk_size * (max_inflight + 1)` operations.
+
+Usage:
+    async with BulkWriter(db.price_history) as writer:
+        for doc in docs:
+            await writer.add(UpdateOne({"name": ...}, {"$set": doc}, upsert=True))
+    logger.info(writer.stats())
+
+Each flush that changed documents bumps the collection's version counter
+(services/collection_versions.py), invalidating cached read responses.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Set
+
+from pymongo.errors import BulkWriteError
+
+from services.collection_versions import collection_versions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_MAX_INFLIGHT = 2
+
+
+class BulkWriter:
+    """Buffers write operations and flushes them via unordered bulk_write."""
+
+    def __init__(
+        self,
+        collection,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_inflight: int = DEFAULT_MAX_INFLIGHT,
+    ):
+        self.collection = collection
+        self.chunk_size = max(1, chunk_size)
+        self.max_inflight = max(1, max_inflight)
+        self._buffer: List = []
+        self._inflight: Set[asyncio.Task] = set()
+
+        self.ops_queued = 0
+        self.upserted_count = 0
+        self.modified_count = 0
+        self.matched_count = 0
+        self.error_count = 0
+        self._unversioned_changes = 0
+
+    async def add(self, op):
+        """Queue one write operation, flushing a chunk when the buffer is full."""
+        self._buffer.append(op)
+        self.ops_queued += 1
+        if len(self._buffer) >= self.chunk_size:
+            await self._dispatch()
+
+    async def flush(self):
+        """Write everything buffered and wait for all in-flight chunks."""
+        if self._buffer:
+            await self._dispatch()
+        if self._inflight:
+            await asyncio.gather(*self._inflight)
+        if self._unversioned_changes:
+            self._unversioned_changes = 0
+            await collection_versions.bump(self.collection.database, self.collection.name)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "ops": self.ops_queued,
+            "upserted": self.upserted_count,
+            "modified": self.modified_count,
+            "matched": self.matched_count,
+            "errors": self.error_count,
+        }
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is asyncio.CancelledError:
+            for task in self._inflight:
+                task.cancel()
+            return False
+        await self.flush()
+        return False
+
+    # ------------------------------------------------------------------ #
+    #  Internal                                                            #
+    # ------------------------------------------------------------------ #
+
+    async def _dispatch(self):
+        ops, self._buffer = self._buffer, []
+        # Back-pressure: wait for a free flush slot before starting another
+        while len(self._inflight) >= self.max_inflight:
+            await asyncio.wait(self._inflight, return_when=asyncio.FIRST_COMPLETED)
+        task = asyncio.create_task(self._write(ops))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _write(self, ops: List):
+        try:
+            result = await self.collection.bulk_write(ops, ordered=False)
+            self._record(result.bulk_api_result)
+        except BulkWriteError as e:
+            # Unordered: every op without a write error was still applied
+            details = e.details or {}
+            self._record(details)
+            errors = details.get("writeErrors", [])
+            self.error_count += len(errors)
+            logger.error(
+                f"bulk_write to {self.collection.name}: {len(errors)} of {len(ops)} ops failed"
+                + (f" (first: {errors[0].get('errmsg')})" if errors else "")
+            )
+        except Exception as e:
+            self.error_count += len(ops)
+            logger.error(f"bulk_write to {self.collection.name} failed ({len(ops)} ops): {e}")
+
+    def _record(self, result: Dict):
+        self.upserted_count += result.get("nUpserted", 0)
+        self.modified_count += result.get("nModified", 0)
+        self.matched_count += result.get("nMatched", 0)
+        self._unversioned_changes += sum(
+            result.get(key, 0) for key in ("nUpserted", "nModified", "nInserted", "nRemoved")
+        )
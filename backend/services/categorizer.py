@@ -0,0 +1,147 @@
+"""
+Commodity categorization by keyword.
+
+Every integration maps commodity names to a category (and a unit) with an
+ordered list of keyword rules: the first rule with any keyword occurring in
+the lowercased name wins. Each rule set is compiled once, at import, into an
+Aho–Corasick automaton, so a name is classified in a single O(len(name)) pass
+regardless of how many keywords there are. Results are LRU-cached per
+lowercased name — the same ~200 DA commodities recur every day.
+
+Rule sets (kept exactly as the integrations defined them — they differ):
+  backfill_categorizer   — historical price_history backfill
+  commodity_categorizer  — comprehensive DA daily integration (market_items)
+  weekly_categorizer     — DA Bantay Presyo weekly-average integration
+  unit_classifier        — unit of sale (piece / L / kg)
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+CACHE_SIZE = 4096
+
+Rules = Sequence[Tuple[str, Sequence[str]]]
+
+
+class KeywordMatcher:
+    """
+    Aho–Corasick automaton over keywords, each tagged with a rank.
+    `best_rank(text)` returns the lowest rank of any keyword occurring in
+    `text` (or None), in one left-to-right pass.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, int]]):
+        # Node 0 is the root; goto[n] maps a character to the next node
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._rank: List[float] = [float("inf")]
+
+        for word, rank in keywords:
+            node = 0
+            for ch in word:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._rank.append(float("inf"))
+                node = nxt
+            self._rank[node] = min(self._rank[node], rank)
+
+        # Breadth-first: failure links, and fold each node's suffix matches
+        # into its rank so a scan only has to look at the current node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._rank[nxt] = min(self._rank[nxt], self._rank[self._fail[nxt]])
+                queue.append(nxt)
+
+    def best_rank(self, text: str):
+        goto, fail, rank = self._goto, self._fail, self._rank
+        node = 0
+        best = float("inf")
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if rank[node] < best:
+                best = rank[node]
+                if best == 0:
+                    break  # can't beat the first rule
+        return None if best == float("inf") else best
+
+
+class Categorizer:
+    """Ordered keyword rules → label; first matching rule wins, else `default`."""
+
+    def __init__(self, rules: Rules, default: str):
+        self.labels = [label for label, _ in rules]
+        self.default = default
+        self._matcher = KeywordMatcher(
+            (keyword, rank) for rank, (_, keywords) in enumerate(rules) for keyword in keywords
+        )
+        self._classify_lower = lru_cache(maxsize=CACHE_SIZE)(self._classify)
+
+    def categorize(self, name: str) -> str:
+        return self._classify_lower(name.lower())
+
+    def categorize_many(self, names: Iterable[str]) -> List[str]:
+        classify = self._classify_lower
+        return [classify(name.lower()) for name in names]
+
+    def _classify(self, name_lower: str) -> str:
+        rank = self._matcher.best_rank(name_lower)
+        return self.default if rank is None else self.labels[rank]
+
+
+BACKFILL_RULES: Rules = [
+    ("rice", ["rice", "bigas", "milled", "glutinous", "basmati", "premium", "jasponica", "japonica"]),
+    ("poultry", ["chicken", "egg", "poultry"]),
+    ("meat", ["pork", "beef", "carabao", "meat"]),
+    ("fish", ["fish", "tilapia", "bangus", "galunggong", "alumahan", "tuna", "mackerel"]),
+    ("vegetables", ["lettuce", "cabbage", "tomato", "onion", "potato", "carrot", "broccoli",
+                    "pechay", "ampalaya", "eggplant", "squash", "sayote", "chayote", "mustasa", "corn",
+                    "kangkong", "sitaw", "mongo"]),
+    ("spices", ["garlic", "ginger", "chili", "pepper"]),
+    ("fuel", ["diesel", "gasoline", "fuel", "lpg", "kerosene"]),
+]
+
+COMMODITY_RULES: Rules = [
+    ("rice", ["rice", "bigas", "milled", "glutinous", "basmati", "premium"]),
+    ("poultry", ["chicken", "egg", "poultry"]),
+    ("meat", ["pork", "beef", "carabao", "meat"]),
+    ("fish", ["fish", "tilapia", "bangus", "galunggong", "alumahan", "tuna", "mackerel"]),
+    ("vegetables", ["lettuce", "cabbage", "tomato", "onion", "potato", "carrot",
+                    "broccoli", "pechay", "ampalaya", "eggplant", "squash",
+                    "sayote", "chayote", "mustasa", "corn"]),
+    ("spices", ["garlic", "ginger", "chili", "pepper"]),
+    ("fuel", ["diesel", "gasoline", "fuel", "lpg", "kerosene"]),
+]
+
+WEEKLY_RULES: Rules = [
+    ("vegetables", ["lettuce", "cabbage", "tomato", "onion", "potato", "carrot", "broccoli",
+                    "pechay", "ampalaya", "eggplant", "squash", "celery"]),
+    ("poultry", ["chicken", "egg"]),
+    ("meat", ["pork", "beef", "carabao"]),
+    ("fish", ["fish", "tilapia", "bangus", "galunggong", "alumahan"]),
+    ("rice", ["rice", "bigas"]),
+    ("spices", ["garlic", "ginger", "chili", "pepper", "salt"]),
+    ("fuel", ["diesel", "gasoline", "fuel", "lpg", "kerosene"]),
+]
+
+UNIT_RULES: Rules = [
+    ("piece", ["egg"]),
+    ("L", ["diesel", "gasoline", "fuel", "kerosene"]),
+]
+
+backfill_categorizer = Categorizer(BACKFILL_RULES, default="others")
+commodity_categorizer = Categorizer(COMMODITY_RULES, default="others")
+weekly_categorizer = Categorizer(WEEKLY_RULES, default="others")
+unit_classifier = Categorizer(UNIT_RULES, default="kg")
@@ -0,0 +1,328 @@
+"""
+Climate–price correlations computed from the stored time series.
+
+AnalyticsEngine.correlate_climate_to_prices compares each metric's current
+value with its average and emits fixed insights. This module measures the
+relationship instead, from `price_history` (DA daily prices) and
+`climate_history` (daily mean per metric, written by the weather integration):
+
+  1. Category price index: each commodity's price relative to its own median
+     over the window, then the median across the category's commodities per
+     day — so categories of cheap and expensive items are comparable.
+  2. Both series are put on one calendar-day grid; climate is shifted by each
+     lag in LAGS (climate on day t - lag against prices on day t).
+  3. Pearson and Spearman for every (lag, category, metric) at once on a
+     masked tensor (pairwise-complete days), over the whole window and over
+     rolling ROLLING_WINDOW-day windows every ROLLING_STEP days.
+  4. Per (category, metric) the lag with the lowest p-value is reported, its
+     p-value Bonferroni-adjusted for the lags tried. Confidence intervals come
+     from the Fisher z-transform (Spearman with the Fieller 1.06 variance).
+
+Results are cached per Philippine calendar day in memory and in the
+`climate_correlations` collection ({_id: date, ...}). Until the climate history
+is long enough (MIN_PAIRS overlapping days) the report is empty and the
+endpoint falls back to the heuristic insights.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from services import worker_pool
+
+logger = logging.getLogger(__name__)
+
+CORRELATIONS_COLLECTION = "climate_correlations"
+
+WINDOW_DAYS = 365
+LAGS = (0, 7, 14, 30)  # days climate leads prices
+ROLLING_WINDOW = 90
+ROLLING_STEP = 30
+MIN_PAIRS = 20  # overlapping days for a correlation to be reported
+CONFIDENCE_LEVEL = 0.95
+SIGNIFICANCE = 0.05
+
+
+# ------------------------------------------------------------------ #
+#  Computation (pure, picklable)                                       #
+# ------------------------------------------------------------------ #
+
+def category_index(names: Sequence[str], categories: Sequence[Optional[str]], dates: Sequence[str],
+                   prices: Sequence[float]) -> pd.DataFrame:
+    """date × category relative price index (median of price / commodity median)."""
+    df = pd.DataFrame({
+        "name": list(names),
+        "category": [c or "other" for c in categories],
+        "date": pd.to_datetime(list(dates)),
+        "price": np.asarray(prices, dtype=float),
+    })
+    df = df[np.isfinite(df["price"]) & (df["price"] > 0)]
+    df["relative"] = df["price"] / df.groupby("name")["price"].transform("median")
+    return df.groupby(["date", "category"])["relative"].median().unstack()
+
+
+def climate_frame(names: Sequence[str], dates: Sequence[str], values: Sequence[float]) -> pd.DataFrame:
+    """date × metric daily values."""
+    df = pd.DataFrame({"name": list(names), "date": pd.to_datetime(list(dates)),
+                       "value": np.asarray(values, dtype=float)})
+    return df.groupby(["date", "name"])["value"].mean().unstack()
+
+
+def _lagged(values: np.ndarray, lags: Sequence[int]) -> np.ndarray:
+    """(len(lags), T, K): row t of slice i holds values[t - lags[i]] (NaN before the start)."""
+    out = np.full((len(lags),) + values.shape, np.nan)
+    for i, lag in enumerate(lags):
+        # A lag as long as the grid leaves its slice all NaN
+        if lag < len(values):
+            out[i, lag:] = values[:len(values) - lag]
+    return out
+
+
+def _pairwise(x: np.ndarray, y: np.ndarray, mask: np.ndarray):
+    """Pearson r and n over axis -3 of (..., T, C, K) tensors, pairwise-complete."""
+    x = np.where(mask, x, 0.0)
+    y = np.where(mask, y, 0.0)
+    n = mask.sum(axis=-3)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sx, sy = x.sum(axis=-3), y.sum(axis=-3)
+        cov = (x * y).sum(axis=-3) - sx * sy / n
+        vx = (x * x).sum(axis=-3) - sx * sx / n
+        vy = (y * y).sum(axis=-3) - sy * sy / n
+        r = cov / np.sqrt(vx * vy)
+    return np.clip(r, -1.0, 1.0), n
+
+
+def correlate(prices: np.ndarray, climate: np.ndarray, lags: Sequence[int] = LAGS):
+    """
+    Pearson r, Spearman rho and n for every (lag, category, metric) at once.
+
+    prices (T, C) and climate (T, K) share a daily grid, NaN where missing.
+    Returns arrays shaped (len(lags), C, K).
+    """
+    lagged = _lagged(climate, lags)                       # (L, T, K)
+    x = np.broadcast_to(prices[None, :, :, None], lagged.shape[:2] + prices.shape[1:] + climate.shape[1:])
+    y = np.broadcast_to(lagged[:, :, None, :], x.shape)  # (L, T, C, K)
+    mask = ~np.isnan(x) & ~np.isnan(y)
+
+    pearson, n = _pairwise(x, y, mask)
+    # Spearman = Pearson on ranks, ranked within each pair's complete days (average ties)
+    rank_x = stats.rankdata(np.where(mask, x, np.nan), axis=1, nan_policy="omit")
+    rank_y = stats.rankdata(np.where(mask, y, np.nan), axis=1, nan_policy="omit")
+    spearman, _ = _pairwise(rank_x, rank_y, mask)
+    return pearson, spearman, n
+
+
+def rolling_correlate(prices: np.ndarray, climate: np.ndarray, lags: Sequence[int] = LAGS,
+                      window: int = ROLLING_WINDOW, step: int = ROLLING_STEP):
+    """Pearson r and n per rolling window: arrays shaped (W, len(lags), C, K)."""
+    lagged = _lagged(climate, lags)
+    starts = range(max(len(prices) - window, 0) % step, max(len(prices) - window + 1, 1), step)
+    results = []
+    for start in starts:
+        p = prices[start:start + window]
+        c = lagged[:, start:start + window]
+        x = np.broadcast_to(p[None, :, :, None], c.shape[:2] + p.shape[1:] + c.shape[2:])
+        y = np.broadcast_to(c[:, :, None, :], x.shape)
+        results.append(_pairwise(x, y, ~np.isnan(x) & ~np.isnan(y)))
+    if not results:
+        empty = np.zeros((0, len(lags), prices.shape[1], climate.shape[1]))
+        return empty, empty
+    return np.stack([r for r, _ in results]), np.stack([n for _, n in results])
+
+
+def fisher_interval(r: np.ndarray, n: np.ndarray, variance: float = 1.0):
+    """Confidence interval for a correlation via Fisher's z (variance factor 1.06 for Spearman)."""
+    z_crit = stats.norm.ppf(0.5 + CONFIDENCE_LEVEL / 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.arctanh(np.clip(r, -0.999999, 0.999999))
+        se = np.sqrt(variance / (n - 3))
+    return np.tanh(z - z_crit * se), np.tanh(z + z_crit * se)
+
+
+def p_value(r: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """Two-sided p-value of r under the null of no correlation (t-test, n - 2 dof)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = r * np.sqrt((n - 2) / np.maximum(1 - r * r, 1e-12))
+        return 2 * stats.t.sf(np.abs(t), np.maximum(n - 2, 1))
+
+
+def compute_report(price_rows: Dict[str, list], climate_rows: Dict[str, list], day: str) -> Dict:
+    """
+    Full correlation report for `day` from column-oriented rows:
+      price_rows   {name, category, date, price}
+      climate_rows {name, date, value}
+    """
+    report = {
+        "computed_for": day,
+        "computed_at": datetime.utcnow().isoformat(),
+        "window_days": WINDOW_DAYS,
+        "lags": list(LAGS),
+        "confidence_level": CONFIDENCE_LEVEL,
+        "correlations": [],
+    }
+    if not price_rows["date"] or not climate_rows["date"]:
+        report.update(price_days=0, climate_days=0, pairs_tested=0)
+        return report
+
+    index = category_index(price_rows["name"], price_rows["category"], price_rows["date"], price_rows["price"])
+    climate = climate_frame(climate_rows["name"], climate_rows["date"], climate_rows["value"])
+    grid = pd.date_range(min(index.index[0], climate.index[0]), max(index.index[-1], climate.index[-1]), freq="D")
+    prices = index.reindex(grid).to_numpy(dtype=float)
+    metrics = climate.reindex(grid).to_numpy(dtype=float)
+
+    pearson, spearman, n = correlate(prices, metrics)
+    rolling_r, rolling_n = rolling_correlate(prices, metrics)
+    p = p_value(pearson, n)
+    p = np.where(n >= MIN_PAIRS, p, np.nan)
+
+    commodities = pd.Series(price_rows["category"], dtype=object).fillna("other")
+    commodity_counts = pd.DataFrame({"name": price_rows["name"], "category": commodities}) \
+        .groupby("category")["name"].nunique()
+
+    categories, metric_names = list(index.columns), list(climate.columns)
+    report.update(
+        price_days=int(index.shape[0]),
+        climate_days=int(climate.shape[0]),
+        pairs_tested=int(pearson.size),
+    )
+
+    for c, category in enumerate(categories):
+        for k, metric in enumerate(metric_names):
+            candidates = p[:, c, k]
+            if np.all(np.isnan(candidates)):
+                continue
+            lag = int(np.nanargmin(candidates))
+            r, rho, count = float(pearson[lag, c, k]), float(spearman[lag, c, k]), int(n[lag, c, k])
+            if not np.isfinite(r):
+                continue
+            adjusted = min(1.0, float(candidates[lag]) * len(LAGS))
+            r_low, r_high = fisher_interval(np.array(r), np.array(count))
+            rho_low, rho_high = fisher_interval(np.array(rho), np.array(count), variance=1.06)
+
+            windows = rolling_r[:, lag, c, k][rolling_n[:, lag, c, k] >= MIN_PAIRS]
+            windows = windows[np.isfinite(windows)]
+            report["correlations"].append(_insight(
+                category, metric, LAGS[lag], count, int(commodity_counts.get(category, 0)),
+                r, (float(r_low), float(r_high)), rho, (float(rho_low), float(rho_high)), adjusted, windows,
+            ))
+
+    report["correlations"].sort(key=lambda i: abs(i["pearson"]["r"]), reverse=True)
+    return report
+
+
+def _insight(category: str, metric: str, lag: int, n: int, items: int, r: float, r_ci, rho: float, rho_ci,
+             adjusted_p: float, windows: np.ndarray) -> Dict:
+    lag_text = "the same day" if lag == 0 else f"{lag} days earlier"
+    direction = "higher" if r > 0 else "lower"
+    return {
+        "insight_type": "climate_correlation",
+        "category": category,
+        "metric": metric,
+        "lag_days": lag,
+        "title": f"{metric} {'moves with' if r > 0 else 'moves against'} {category} prices",
+        "description": (
+            f"Higher {metric.lower()} {lag_text} goes with {direction} {category} prices "
+            f"(Pearson r = {r:.2f}, {CONFIDENCE_LEVEL:.0%} CI {r_ci[0]:.2f} to {r_ci[1]:.2f}; "
+            f"Spearman ρ = {rho:.2f}; {n} days)."
+        ),
+        "direction": "positive" if r > 0 else "negative",
+        "pearson": {"r": round(r, 3), "ci_low": round(r_ci[0], 3), "ci_high": round(r_ci[1], 3)},
+        "spearman": {"rho": round(rho, 3), "ci_low": round(rho_ci[0], 3), "ci_high": round(rho_ci[1], 3)},
+        "n_days": n,
+        "p_value": round(adjusted_p, 4),
+        "significant": adjusted_p < SIGNIFICANCE,
+        "confidence": round(1 - adjusted_p, 3),
+        "rolling": {
+            "windows": int(len(windows)),
+            "median_r": round(float(np.median(windows)), 3) if len(windows) else None,
+            "sign_agreement": round(float(np.mean(np.sign(windows) == np.sign(r))), 2) if len(windows) else None,
+        },
+        "affected_items": items,
+    }
+
+
+# ------------------------------------------------------------------ #
+#  Service                                                             #
+# ------------------------------------------------------------------ #
+
+class ClimateCorrelations:
+    """Daily correlation report, computed once per Philippine calendar day."""
+
+    def __init__(self):
+        self._reports: Dict[str, Dict] = {}
+        self._inflight: Optional[asyncio.Future] = None
+        self.computations = 0
+
+    # ------------------------------------------------------------------ #
+    #  Public API                                                          #
+    # ------------------------------------------------------------------ #
+
+    async def get(self, db) -> Dict:
+        """Today's report (from memory, then MongoDB, else computed single-flight)."""
+        day = self._today()
+        report = self._reports.get(day)
+        if report is not None:
+            return report
+        report = await db[CORRELATIONS_COLLECTION].find_one({"_id": day})
+        if report is not None:
+            self._reports = {day: report}
+            return report
+
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._compute(db, day))
+        return await asyncio.shield(self._inflight)
+
+    def stats(self) -> Dict:
+        report = next(iter(self._reports.values()), None)
+        return {
+            "computations": self.computations,
+            "computed_for": report.get("computed_for") if report else None,
+            "correlations": len(report.get("correlations", [])) if report else None,
+        }
+
+    # ------------------------------------------------------------------ #
+    #  Internal                                                            #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _today() -> str:
+        return (datetime.utcnow() + timedelta(hours=8)).strftime("%Y-%m-%d")
+
+    async def _compute(self, db, day: str) -> Dict:
+        since = (datetime.strptime(day, "%Y-%m-%d") - timedelta(days=WINDOW_DAYS)).strftime("%Y-%m-%d")
+        price_rows: Dict[str, List] = {"name": [], "category": [], "date": [], "price": []}
+        async for doc in db.price_history.find(
+            {"date": {"$gte": since}}, {"_id": 0, "name": 1, "category": 1, "date": 1, "price": 1}
+        ):
+            for key in price_rows:
+                price_rows[key].append(doc.get(key))
+
+        climate_rows: Dict[str, List] = {"name": [], "date": [], "value": []}
+        async for doc in db.climate_history.find({"date": {"$gte": since}}, {"_id": 0}):
+            climate_rows["name"].append(doc["name"])
+            climate_rows["date"].append(doc["date"])
+            climate_rows["value"].append(doc["sum"] / doc["count"] if doc.get("count") else doc.get("value"))
+
+        report = await worker_pool.run_in_process(compute_report, price_rows, climate_rows, day)
+        self.computations += 1
+        logger.info(
+            f"Climate correlations for {day}: {len(report['correlations'])} pairs from "
+            f"{report['price_days']} price days / {report['climate_days']} climate days"
+        )
+
+        report["_id"] = day
+        self._reports = {day: report}
+        try:
+            await db[CORRELATIONS_COLLECTION].replace_one({"_id": day}, report, upsert=True)
+        except Exception as e:
+            logger.warning(f"Could not store climate correlations for {day}: {e}")
+        return report
+
+
+# Singleton
+climate_correlations = ClimateCorrelations()
@@ -0,0 +1,94 @@
+"""
+Per-collection version counters for cache invalidation.
+
+Every write path that changes what read endpoints return (BulkWriter flushes,
+integration upserts, seeding) calls `bump(db, "<collection>")`. Caches key
+their entries on `snapshot([...collections])` and treat any change as stale —
+see services/response_cache.py.
+
+Counters live in the `collection_versions` collection ({_id: name, version})
+so writes made by other processes (seed_database.py, the migrations CLI,
+another instance) are picked up too: `sync()` re-reads them at most every
+SYNC_INTERVAL seconds, which is the only MongoDB traffic a fully cached
+endpoint generates.
+
+Listeners registered with `add_listener` are called as `listener(db, names)`
+after every in-process bump (e.g. to re-materialize derived data).
+"""
+
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_COLLECTION = "collection_versions"
+SYNC_INTERVAL = 5.0  # seconds
+
+
+class CollectionVersions:
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._db = None
+        self._synced_at = 0.0
+        self._listeners: List[Callable] = []
+
+    # ------------------------------------------------------------------ #
+    #  Public API                                                          #
+    # ------------------------------------------------------------------ #
+
+    def attach(self, db):
+        """Use `db` for periodic syncs (call once on startup)."""
+        self._db = db
+        self._synced_at = 0.0
+
+    def add_listener(self, listener: Callable):
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    async def bump(self, db, *collections: str):
+        """Record that `collections` changed. Never raises."""
+        for name in collections:
+            # Local bump first so this process invalidates even if MongoDB fails
+            self._versions[name] = self._versions.get(name, 0) + 1
+            try:
+                doc = await db[VERSIONS_COLLECTION].find_one_and_update(
+                    {"_id": name},
+                    {"$inc": {"version": 1}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                )
+                self._versions[name] = doc["version"]
+            except Exception as e:
+                logger.warning(f"Could not persist version bump for {name}: {e}")
+        for listener in self._listeners:
+            try:
+                listener(db, collections)
+            except Exception as e:
+                logger.error(f"Collection version listener failed: {e}")
+
+    def snapshot(self, collections: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self._versions.get(name, 0) for name in collections)
+
+    async def sync(self, force: bool = False):
+        """Pick up bumps from other processes (throttled to SYNC_INTERVAL)."""
+        if self._db is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._synced_at < SYNC_INTERVAL:
+            return
+        self._synced_at = now
+        try:
+            async for doc in self._db[VERSIONS_COLLECTION].find({}):
+                self._versions[doc["_id"]] = doc.get("version", 0)
+        except Exception as e:
+            logger.debug(f"Collection version sync failed: {e}")
+
+    def versions(self) -> Dict[str, int]:
+        return dict(self._versions)
+
+
+# Singleton
+collection_versions = CollectionVersions()
@@ -6,8 +6,13 @@ import asyncio
 from datetime import datetime
 from typing import Dict, List
 import logging
+from pymongo import UpdateOne
+from services.bulk_writer import BulkWriter
+from services.categorizer import commodity_categorizer, unit_classifier
 from services.daily_price_parser import daily_parser
 from services.doe_fuel_integration import integrate_doe_fuel_prices
+from services.market_catalog import status_rank
+from services.name_search import name_fields, name_index
 
 logger = logging.getLogger(__name__)
 
@@ -19,36 +24,11 @@ class ComprehensiveRealDataIntegrator:
     
     def categorize_item(self, name: str) -> str:
         """Categorize item based on name"""
-        name_lower = name.lower()
-        
-        if any(word in name_lower for word in ['rice', 'bigas', 'milled', 'glutinous', 'basmati', 'premium']):
-            return 'rice'
-        elif any(word in name_lower for word in ['chicken', 'egg', 'poultry']):
-            return 'poultry'
-        elif any(word in name_lower for word in ['pork', 'beef', 'carabao', 'meat']):
-            return 'meat'
-        elif any(word in name_lower for word in ['fish', 'tilapia', 'bangus', 'galunggong', 'alumahan', 'tuna', 'mackerel']):
-            return 'fish'
-        elif any(word in name_lower for word in ['lettuce', 'cabbage', 'tomato', 'onion', 'potato', 'carrot', 
-                                                   'broccoli', 'pechay', 'ampalaya', 'eggplant', 'squash', 
-                                                   'sayote', 'chayote', 'mustasa', 'corn']):
-            return 'vegetables'
-        elif any(word in name_lower for word in ['garlic', 'ginger', 'chili', 'pepper']):
-            return 'spices'
-        elif any(word in name_lower for word in ['diesel', 'gasoline', 'fuel', 'lpg', 'kerosene']):
-            return 'fuel'
-        else:
-            return 'others'
+        return commodity_categorizer.categorize(name)
     
     def get_unit(self, name: str) -> str:
         """Determine unit based on commodity name"""
-        name_lower = name.lower()
-        if 'egg' in name_lower:
-            return 'piece'
-        elif any(word in name_lower for word in ['diesel', 'gasoline', 'fuel', 'kerosene']):
-            return 'L'
-        else:
-            return 'kg'
+        return unit_classifier.categorize(name)
     
     def get_icon(self, category: str) -> str:
         """Get emoji icon for category"""
@@ -214,70 +194,70 @@ class ComprehensiveRealDataIntegrator:
             trends = daily_parser.calculate_trends(price_history)
             logger.info(f"Calculated trends for {len(trends)} agricultural commodities")
             
-            # Save agricultural commodities to database
+            # Save agricultural commodities to database (batched bulk upserts)
             saved_count = 0
-            for commodity, trend_data in trends.items():
-                try:
-                    category = self.categorize_item(commodity)
-                    
-                    # Skip if categorized as fuel (will be handled by DOE integration)
-                    if category == 'fuel':
+            async with BulkWriter(self.db.market_items) as writer:
+                for commodity, trend_data in trends.items():
+                    try:
+                        category = self.categorize_item(commodity)
+
+                        # Skip if categorized as fuel (will be handled by DOE integration)
+                        if category == 'fuel':
+                            continue
+
+                        unit = self.get_unit(commodity)
+
+                        current_price = trend_data['current_price']
+                        average_price = trend_data['average_price']
+                        status = self.determine_status(current_price, average_price)
+                        now = datetime.utcnow()
+
+                        # Prepare document
+                        doc = {
+                            'name': commodity,
+                            **name_fields(commodity),
+                            'category': category,
+                            'currentPrice': current_price,
+                            'averagePrice': average_price,
+                            'unit': unit,
+                            'location': 'NCR',
+                            'icon': self.get_icon(category),
+                            'status': status,
+                            'statusRank': status_rank(status),
+                            'savings': round(average_price - current_price, 2),
+                            'trend': trend_data['trend'],
+                            'lastUpdated': now,
+                            'climateImpact': self.generate_climate_impact(
+                                category,
+                                commodity,
+                                trend_data['trend_direction'],
+                                climate_metrics,
+                            ),
+                            'metadata': {
+                                'data_source': 'DA Bantay Presyo Daily Price Index',
+                                'trend_direction': trend_data['trend_direction'],
+                                'price_change': trend_data['price_change'],
+                                'price_change_pct': trend_data['price_change_pct'],
+                                'data_points': trend_data['data_points'],
+                                'date_range': trend_data['date_range']
+                            },
+                            'updatedAt': now
+                        }
+
+                        # Upsert — createdAt only set when the item is new
+                        await writer.add(UpdateOne(
+                            {'name': commodity},
+                            {'$set': doc, '$setOnInsert': {'createdAt': now}},
+                            upsert=True
+                        ))
+                        saved_count += 1
+                        logger.info(f"Queued: {commodity} - ₱{current_price} ({status})")
+
+                    except Exception as e:
+                        logger.error(f"Error saving commodity {commodity}: {str(e)}")
                         continue
-                    
-                    unit = self.get_unit(commodity)
-                    
-                    current_price = trend_data['current_price']
-                    average_price = trend_data['average_price']
-                    status = self.determine_status(current_price, average_price)
-                    
-                    # Prepare document
-                    doc = {
-                        'name': commodity,
-                        'category': category,
-                        'currentPrice': current_price,
-                        'averagePrice': average_price,
-                        'unit': unit,
-                        'location': 'NCR',
-                        'icon': self.get_icon(category),
-                        'status': status,
-                        'savings': round(average_price - current_price, 2),
-                        'trend': trend_data['trend'],
-                        'lastUpdated': datetime.utcnow(),
-                        'climateImpact': self.generate_climate_impact(
-                            category,
-                            commodity,
-                            trend_data['trend_direction'],
-                            climate_metrics,
-                        ),
-                        'metadata': {
-                            'data_source': 'DA Bantay Presyo Daily Price Index',
-                            'trend_direction': trend_data['trend_direction'],
-                            'price_change': trend_data['price_change'],
-                            'price_change_pct': trend_data['price_change_pct'],
-                            'data_points': trend_data['data_points'],
-                            'date_range': trend_data['date_range']
-                        },
-                        'updatedAt': datetime.utcnow()
-                    }
-                    
-                    # Check if exists
-                    existing = await self.db.market_items.find_one({'name': commodity})
-                    if not existing:
-                        doc['createdAt'] = datetime.utcnow()
-                    
-                    # Upsert
-                    await self.db.market_items.update_one(
-                        {'name': commodity},
-                        {'$set': doc},
-                        upsert=True
-                    )
-                    saved_count += 1
-                    logger.info(f"Saved: {commodity} - ₱{current_price} ({status})")
-                    
-                except Exception as e:
-                    logger.error(f"Error saving commodity {commodity}: {str(e)}")
-                    continue
-            
+
+            saved_count -= writer.error_count
             logger.info(f"✅ Agricultural commodities integrated: {saved_count} items")
         
         # Step 2: Integrate DOE fuel prices
@@ -287,6 +267,8 @@ class ComprehensiveRealDataIntegrator:
             logger.info("✅ DOE fuel prices integrated successfully")
         else:
             logger.warning("⚠️ DOE fuel price integration failed")
+
+        await name_index.refresh(self.db)
         
         # Return success if at least one source worked
         return (price_history and len(price_history) > 0) or fuel_success
@@ -4,19 +4,87 @@ Parses daily price index PDFs to extract real historical price data
 """
 
 import aiohttp
-import asyncio
 from datetime import datetime, timedelta
-import PyPDF2
-import io
 import re
 import logging
 from typing import List, Dict, Optional, Tuple
 from collections import defaultdict
 
-from services.http_utils import fetch_with_retry, DEFAULT_TIMEOUT, DEFAULT_HEADERS
+from services.http_utils import (
+    DEFAULT_HEADERS,
+    HostRateLimiter,
+)
+from services.pdf_cache import pdf_cache
+from services.pdf_extraction import extract_text
+from services.worker_pool import run_in_process
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever text extraction or price parsing changes — memoized parse
+# results in the PDF cache are keyed by content hash + this version.
+PARSER_VERSION = "1"
+
+# Politeness budget for sequential multi-day downloads (was a fixed 1s sleep)
+DOWNLOAD_RATE = 1.0  # requests/sec
+
+
+_DIGITS = "0123456789"
+
+# Trailing number of a price line: optional "<digits>." then the final digit run
+_PRICE_TAIL = re.compile(r"(?:(\d+)\.)?(\d+)$")
+
+# Header/footer lines (case-sensitive)
+_SKIP_LINE = re.compile(
+    "|".join(
+        re.escape(p)
+        for p in (
+            "DAILY PRICE INDEX",
+            "DEPARTMENT OF AGRICULTURE",
+            "BANTAY PRESYO",
+            "PREVAILING RETAIL PRICE",
+            "NATIONAL CAPITAL REGION",
+            "Page ",
+            "Prepared by",
+            "Source:",
+        )
+    )
+)
+
+
+def _price_starts(line: str) -> Tuple[int, ...]:
+    """
+    Start offsets of the candidate prices at the end of `line`, in priority
+    order: "123.45" / "123.4" (when the fraction has 1-2 digits), then the
+    bare trailing digit run. `line` is stripped and ends with a digit.
+    """
+    if line.isascii():
+        # Fast path: str.rstrip instead of a regex scan from the line start
+        body = line.rstrip(_DIGITS)
+        frac_start = len(body)
+        if len(line) - frac_start <= 2 and body.endswith("."):
+            int_start = len(body[:-1].rstrip(_DIGITS))
+            if int_start < frac_start - 1:
+                return int_start, frac_start
+        return (frac_start,)
+
+    # Non-ASCII text may hold other Unicode decimal digits, which float() accepts
+    tail = _PRICE_TAIL.search(line)
+    if tail.group(1) is not None and len(tail.group(2)) <= 2:
+        return tail.start(), tail.start(2)
+    return (tail.start(2),)
+
+
+_NAME_SKIP_KEYWORDS = frozenset(
+    ["page", "prevailing", "retail price", "department", "table", "source", "prepared"]
+)
+_NAME_SKIP_PREFIXES = tuple(k + " " for k in _NAME_SKIP_KEYWORDS)
+_NAME_EDGE_JUNK = re.compile(r"^[,\s\-\.]+|[,\s\-\.]+$")
+
+
+def _parse_prices(text: str) -> Dict[str, float]:
+    """Parse prices from extracted text. Runs inside a worker process."""
+    return daily_parser.parse_prices(text)
+
 
 class DailyPriceIndexParser:
     """Parser for DA Bantay Presyo Daily Price Index PDFs"""
@@ -38,30 +106,42 @@ class DailyPriceIndexParser:
         return urls
 
     async def download_pdf(
-        self, date: datetime, session: aiohttp.ClientSession = None
+        self,
+        date: datetime,
+        session: aiohttp.ClientSession = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
     ) -> Optional[bytes]:
-        """Download Daily Price Index PDF for a specific date, with retry."""
-        urls = self._construct_daily_url(date)
-        owns_session = session is None
+        """Download Daily Price Index PDF for a specific date, with retry.
 
-        if owns_session:
-            session = aiohttp.ClientSession(timeout=DEFAULT_TIMEOUT)
+        Every candidate URL is checked in the local PDF cache first — dated DA
+        PDFs never change, so a cached day costs no requests at all.
 
-        try:
-            for url in urls:
-                logger.info(f"Trying: {url}")
-                response = await fetch_with_retry(
-                    session, url, max_retries=3, headers=self.headers
+        Downloads go over the app-wide pooled session unless a `session` is
+        passed. A `rate_limiter` keeps concurrent callers within a politeness
+        budget.
+        """
+        urls = self._construct_daily_url(date)
+
+        for url in urls:
+            data = await pdf_cache.get(url)
+            if data is not None:
+                logger.info(f"✓ PDF for {date.strftime('%Y-%m-%d')} served from cache")
+                return data
+
+        for url in urls:
+            logger.info(f"Trying: {url}")
+            data = await pdf_cache.fetch(
+                session,
+                url,
+                max_retries=3,
+                headers=self.headers,
+                rate_limiter=rate_limiter,
+            )
+            if data:
+                logger.info(
+                    f"✓ Downloaded PDF for {date.strftime('%Y-%m-%d')} ({len(data)} bytes)"
                 )
-                if response is not None and response.status == 200:
-                    data = await response.read()
-                    logger.info(
-                        f"✓ Downloaded PDF for {date.strftime('%Y-%m-%d')} ({len(data)} bytes)"
-                    )
-                    return data
-        finally:
-            if owns_session:
-                await session.close()
+                return data
 
         logger.warning(f"No PDF found for {date.strftime('%Y-%m-%d')}")
         return None
@@ -71,125 +151,88 @@ class DailyPriceIndexParser:
     ) -> List[Tuple[datetime, bytes]]:
         """Download PDFs for the last N days.
 
-        Uses a shared session, respects DA.gov.ph with 1s delay between requests,
-        and breaks early if 3 consecutive weekdays return no PDF (circuit breaker).
+        Uses the pooled session, respects DA.gov.ph with a 1 req/s budget (cache
+        hits don't count against it), and breaks early if 3 consecutive weekdays
+        return no PDF (circuit breaker).
         """
         today = datetime.now()
         downloads = []
         consecutive_failures = 0
         max_consecutive_failures = 3
+        rate_limiter = HostRateLimiter(rate=DOWNLOAD_RATE, burst=1)
 
-        async with aiohttp.ClientSession(timeout=DEFAULT_TIMEOUT) as session:
-            for days_ago in range(days):
-                date = today - timedelta(days=days_ago)
-                # Skip weekends — DA only publishes on weekdays
-                if date.weekday() >= 5:
-                    continue
-
-                pdf_bytes = await self.download_pdf(date, session=session)
-                if pdf_bytes:
-                    downloads.append((date, pdf_bytes))
-                    consecutive_failures = 0
-                else:
-                    consecutive_failures += 1
-                    if consecutive_failures >= max_consecutive_failures:
-                        logger.warning(
-                            f"Circuit breaker: {max_consecutive_failures} consecutive "
-                            f"days with no PDF — stopping early"
-                        )
-                        break
+        for days_ago in range(days):
+            date = today - timedelta(days=days_ago)
+            # Skip weekends — DA only publishes on weekdays
+            if date.weekday() >= 5:
+                continue
 
-                # Respectful delay for government site
-                await asyncio.sleep(1.0)
+            pdf_bytes = await self.download_pdf(date, rate_limiter=rate_limiter)
+            if pdf_bytes:
+                downloads.append((date, pdf_bytes))
+                consecutive_failures = 0
+            else:
+                consecutive_failures += 1
+                if consecutive_failures >= max_consecutive_failures:
+                    logger.warning(
+                        f"Circuit breaker: {max_consecutive_failures} consecutive "
+                        f"days with no PDF — stopping early"
+                    )
+                    break
 
         logger.info(f"Downloaded {len(downloads)} PDFs out of {days} days attempted")
         return downloads
 
-    def extract_text_from_pdf(self, pdf_bytes: bytes) -> str:
-        """Extract text from PDF"""
-        try:
-            pdf_file = io.BytesIO(pdf_bytes)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
+    async def parse_pdf(self, pdf_bytes: bytes) -> Dict[str, float]:
+        """Extract and parse prices from a PDF, memoized by content hash.
+
+        Only PDFs not seen before are parsed (in the worker pool).
+        """
+
+        async def parse():
+            text = await self.extract_text_from_pdf(pdf_bytes)
+            return await run_in_process(_parse_prices, text) if text else {}
 
-            text_content = []
-            # Extract all pages to get all 200+ commodities
-            for page_num in range(len(pdf_reader.pages)):
-                text = pdf_reader.pages[page_num].extract_text()
-                if text:
-                    text_content.append(text)
+        return await pdf_cache.memoize("da_prices", PARSER_VERSION, pdf_bytes, parse)
 
-            return "\n".join(text_content)
+    async def extract_text_from_pdf(self, pdf_bytes: bytes) -> str:
+        """Extract text from PDF (all pages, in the worker pool)"""
+        try:
+            return await extract_text(pdf_bytes)
         except Exception as e:
             logger.error(f"Error extracting PDF text: {str(e)}")
             return ""
 
     def parse_prices(self, text: str) -> Dict[str, float]:
-        """Parse commodity prices from Daily Price Index text - ULTRA COMPREHENSIVE"""
+        """Parse commodity prices from Daily Price Index text - ULTRA COMPREHENSIVE
+
+        Single pass per line. A price is the number at the end of the line, tried
+        in order as "123.45", "123.4", then the bare trailing digit run "45"; the
+        first candidate in range (0.50 to 50,000) with a usable name before it
+        wins. Headers, all-caps section titles and "n/a" rows are skipped.
+        """
         prices = {}
-        lines = text.split("\n")
 
-        for line in lines:
+        for line in text.split("\n"):
             line = line.strip()
-            if not line or len(line) < 3:
-                continue
-
-            # Skip ONLY obvious headers (be less aggressive)
-            skip_patterns = [
-                "DAILY PRICE INDEX",
-                "DEPARTMENT OF AGRICULTURE",
-                "BANTAY PRESYO",
-                "PREVAILING RETAIL PRICE",
-                "NATIONAL CAPITAL REGION",
-                "Page ",
-                "Prepared by",
-                "Source:",
-            ]
-
-            if any(pattern in line for pattern in skip_patterns):
+            # Every price format ends the line with a digit — most non-price
+            # lines (section titles, notes) are rejected here. That also rules
+            # out all-caps headers, which by definition contain no digits.
+            if len(line) < 3 or not line[-1].isdecimal():
                 continue
 
-            # Skip if entire line is uppercase AND doesn't contain numbers
-            if line.isupper() and not re.search(r"\d", line):
+            if _SKIP_LINE.search(line) or "n/a" in line.lower():
                 continue
 
-            # Skip lines with "n/a" prices
-            if "n/a" in line.lower():
-                continue
-
-            # MULTIPLE patterns to catch all price formats:
-            # Pattern 1: Standard "Name    123.45" (2 decimal places)
-            # Pattern 2: "Name    123.4" or "Name    123" (1 or 0 decimals)
-            # Pattern 3: "Name 123.45" (less whitespace)
-
-            price_patterns = [
-                r"(\d+\.\d{2})\s*$",  # 123.45 at end
-                r"(\d+\.\d{1})\s*$",  # 123.4 at end
-                r"(\d+)\s*$",  # 123 at end (no decimal)
-            ]
-
-            matched = False
-            for pattern in price_patterns:
-                price_match = re.search(pattern, line)
-                if price_match:
-                    price_str = price_match.group(1)
-                    try:
-                        price = float(price_str)
-                        # Very permissive price range (0.50 to 50,000)
-                        if 0.5 <= price <= 50000:
-                            # Extract commodity name (everything before the price)
-                            commodity_part = line[: price_match.start()].strip()
-
-                            # Minimal cleaning - keep almost everything
-                            commodity_name = self._clean_commodity_name(commodity_part)
-                            if commodity_name and len(commodity_name) >= 2:
-                                prices[commodity_name] = price
-                                matched = True
-                                break
-                    except ValueError:
-                        pass
-
-                if matched:
-                    break
+            for start in _price_starts(line):
+                price = float(line[start:])
+                # Very permissive price range (0.50 to 50,000)
+                if 0.5 <= price <= 50000:
+                    # Commodity name is everything before the price
+                    commodity_name = self._clean_commodity_name(line[:start])
+                    if commodity_name:
+                        prices[commodity_name] = price
+                        break
 
         return prices
 
@@ -201,26 +244,16 @@ class DailyPriceIndexParser:
         if len(name) < 2:
             return None
 
-        # Only skip the most obvious non-commodity text
-        skip_keywords = [
-            "page",
-            "prevailing",
-            "retail price",
-            "department",
-            "table",
-            "source",
-            "prepared",
-        ]
+        # Only skip the most obvious non-commodity text — when the ENTIRE name
+        # is a keyword, or it starts with one as a separate word
         name_lower = name.lower()
-
-        # Only skip if the ENTIRE name is just the keyword
-        for keyword in skip_keywords:
-            if name_lower == keyword or name_lower.startswith(keyword + " "):
-                return None
+        if name_lower in _NAME_SKIP_KEYWORDS or name_lower.startswith(_NAME_SKIP_PREFIXES):
+            return None
 
         # Remove trailing/leading special chars but keep commas inside
-        name = re.sub(r"^[,\s\-\.]+", "", name)
-        name = re.sub(r"[,\s\-\.]+$", "", name)
+        # (the name is already stripped, so only ",-." can start the junk)
+        if name[0] in ",-." or name[-1] in ",-.":
+            name = _NAME_EDGE_JUNK.sub("", name)
 
         # Accept almost anything that's left
         return name if len(name) >= 2 else None
@@ -240,8 +273,7 @@ class DailyPriceIndexParser:
         price_history = defaultdict(list)
 
         for date, pdf_bytes in pdfs:
-            text = self.extract_text_from_pdf(pdf_bytes)
-            prices = self.parse_prices(text)
+            prices = await self.parse_pdf(pdf_bytes)
 
             logger.info(f"Parsed {len(prices)} prices for {date.strftime('%Y-%m-%d')}")
 
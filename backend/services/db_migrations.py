@@ -0,0 +1,264 @@
+"""
+Database index registry and migration runner.
+
+Every index the app relies on is declared once, in INDEXES, next to the query
+shapes it serves. `migrate(db)` runs on FastAPI startup (and from the CLI):
+
+  1. applies pending data migrations (MIGRATIONS) in order, recording each in
+     the `migrations` collection so it runs once per database;
+  2. creates every registered index. create_index is a no-op for an index that
+     already exists, so this is safe on every start.
+
+Migrations must be idempotent — two instances starting together may both run
+one before either records it. An index that can't be built (e.g. duplicates
+under a unique key) is logged and skipped; the app still starts.
+
+Queries that scan a whole collection on purpose (analytics over all
+market_items / climate_metrics, unfiltered counts) are not indexed.
+tests/test_query_plans.py checks every other query shape against explain().
+
+CLI (from backend/, uses MONGO_URL and DB_NAME):
+    python -m services.db_migrations            # apply migrations + indexes
+    python -m services.db_migrations --dry-run  # show what would change
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from services import market_catalog, name_search, news_store
+from services.collection_versions import collection_versions
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = "migrations"
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "market_items": [
+        # /market-items sorts, with and without a category prefix; the
+        # (name, _id) index also serves the integrations' upserts by name
+        *(IndexModel(keys) for keys in market_catalog.INDEXES),
+        # name search (services/name_search.py)
+        IndexModel([("name_key", ASCENDING)]),
+        IndexModel([("name_prefixes", ASCENDING)]),
+        # /best-deals
+        IndexModel([("savings", DESCENDING)]),
+    ],
+    "price_history": [
+        # backfill upsert key
+        IndexModel([("name", ASCENDING), ("date", ASCENDING)], unique=True),
+        # /price-history (name search, ordered by date)
+        IndexModel([("name_key", ASCENDING), ("date", ASCENDING)]),
+        IndexModel([("name_prefixes", ASCENDING)]),
+        # climate correlations (date window across all commodities)
+        IndexModel([("date", ASCENDING)]),
+    ],
+    "climate_history": [
+        # weather integration upsert key; correlation date window
+        IndexModel([("name", ASCENDING), ("date", ASCENDING)], unique=True),
+        IndexModel([("date", ASCENDING)]),
+    ],
+    "crowd_price_reports": [
+        # /crowdsource/reports and /crowdsource/summary
+        IndexModel([("item_name_key", ASCENDING), ("status", ASCENDING), ("reported_at", DESCENDING)]),
+        IndexModel([("status", ASCENDING), ("reported_at", DESCENDING)]),
+        IndexModel([("item_name_prefixes", ASCENDING)]),
+    ],
+    "climate_metrics": [
+        # weather integration upserts by name
+        IndexModel([("name", ASCENDING)]),
+    ],
+    "doe_circulars": [
+        # /energy/doe-circulars
+        IndexModel([("date_published", DESCENDING)]),
+        # DOE integration upserts by doe_id, falling back to title; its
+        # incremental crawl reads the newest doe_id / date_published (high-water mark)
+        IndexModel([("doe_id", ASCENDING)]),
+        IndexModel([("title", ASCENDING)]),
+    ],
+    "ppa_contracts": [
+        IndexModel([("doc_id", ASCENDING)], unique=True),
+        IndexModel([("technology", ASCENDING)]),
+        IndexModel([("stage", ASCENDING)]),
+        # /energy/ppa-status without filters
+        IndexModel([("potential_capacity_mw", DESCENDING)]),
+    ],
+    "telegram_subscribers": [
+        IndexModel([("chat_id", ASCENDING)], unique=True),
+        # broadcast and subscriber counts
+        IndexModel([("active", ASCENDING)]),
+    ],
+    "news_articles": [
+        # /energy/news and /energy/news/multiple, newest first per query
+        IndexModel([("queries", ASCENDING), ("published", DESCENDING)]),
+        # drop articles no query has returned for a while
+        IndexModel([("fetched_at", ASCENDING)], expireAfterSeconds=news_store.TTL_DAYS * 86400),
+    ],
+    "telegram_broadcasts": [
+        # /telegram/broadcasts, newest first
+        IndexModel([("started_at", DESCENDING)]),
+    ],
+    "wesm_prices": [
+        # interval upsert key; also serves per-day / per-region reads
+        IndexModel([("date", ASCENDING), ("region", ASCENDING), ("interval", ASCENDING)], unique=True),
+    ],
+    "jobs": [
+        # job runner queue scans and /jobs?status=
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)]),
+        # orphan detection
+        IndexModel([("status", ASCENDING), ("heartbeat_at", ASCENDING)]),
+        # /jobs listing, newest first
+        IndexModel([("created_at", DESCENDING)]),
+    ],
+}
+
+
+# ------------------------------------------------------------------ #
+#  Data migrations                                                     #
+# ------------------------------------------------------------------ #
+
+
+async def _dedupe(db, collection: str, key: List[str]) -> int:
+    """Keep the newest document (highest _id) per `key`, delete the rest."""
+    pipeline = [
+        {"$sort": {"_id": -1}},
+        {"$group": {"_id": {k: f"${k}" for k in key}, "ids": {"$push": "$_id"}, "n": {"$sum": 1}}},
+        {"$match": {"n": {"$gt": 1}}},
+    ]
+    stale = []
+    async for group in db[collection].aggregate(pipeline, allowDiskUse=True):
+        stale.extend(group["ids"][1:])
+    if not stale:
+        return 0
+    result = await db[collection].delete_many({"_id": {"$in": stale}})
+    await collection_versions.bump(db, collection)
+    logger.info(f"Removed {result.deleted_count} duplicate {collection} documents")
+    return result.deleted_count
+
+
+async def _dedupe_price_history(db):
+    # Before the unique (name, date) index existed, reruns could double-insert
+    await _dedupe(db, "price_history", ["name", "date"])
+
+
+async def _dedupe_telegram_subscribers(db):
+    await _dedupe(db, "telegram_subscribers", ["chat_id"])
+
+
+# (id, migration) — append only; never reorder or rename applied entries
+MIGRATIONS: List[Tuple[str, Callable[..., Awaitable]]] = [
+    ("0001_dedupe_price_history", _dedupe_price_history),
+    ("0002_dedupe_telegram_subscribers", _dedupe_telegram_subscribers),
+    ("0003_market_items_status_rank", market_catalog.backfill_status_rank),
+    ("0004_name_search_fields", name_search.backfill_name_fields),
+]
+
+
+# ------------------------------------------------------------------ #
+#  Runner                                                              #
+# ------------------------------------------------------------------ #
+
+
+async def pending_migrations(db) -> List[str]:
+    applied = set(await db[MIGRATIONS_COLLECTION].distinct("_id", {"status": "applied"}))
+    return [migration_id for migration_id, _ in MIGRATIONS if migration_id not in applied]
+
+
+async def apply_migrations(db) -> List[str]:
+    """Run pending migrations in order. Stops at the first failure."""
+    applied = []
+    for migration_id in await pending_migrations(db):
+        migration = dict(MIGRATIONS)[migration_id]
+        started_at = datetime.utcnow()
+        try:
+            await migration(db)
+        except Exception as e:
+            logger.error(f"Migration {migration_id} failed: {e}")
+            await db[MIGRATIONS_COLLECTION].update_one(
+                {"_id": migration_id},
+                {"$set": {"status": "failed", "error": str(e), "started_at": started_at}},
+                upsert=True,
+            )
+            break
+        await db[MIGRATIONS_COLLECTION].update_one(
+            {"_id": migration_id},
+            {
+                "$set": {"status": "applied", "started_at": started_at, "applied_at": datetime.utcnow()},
+                "$unset": {"error": ""},
+            },
+            upsert=True,
+        )
+        logger.info(f"Applied migration {migration_id}")
+        applied.append(migration_id)
+    return applied
+
+
+async def missing_indexes(db, collections: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """Registered index names not yet present, per collection."""
+    missing = {}
+    for collection in collections or INDEXES:
+        existing = set(await db[collection].index_information())
+        names = [m.document["name"] for m in INDEXES[collection] if m.document["name"] not in existing]
+        if names:
+            missing[collection] = names
+    return missing
+
+
+async def ensure_indexes(db, collections: Optional[List[str]] = None) -> List[str]:
+    """Create registered indexes. Returns the names of indexes that failed."""
+    failed = []
+    for collection in collections or INDEXES:
+        for model in INDEXES[collection]:
+            name = model.document["name"]
+            try:
+                await db[collection].create_indexes([model])
+            except OperationFailure as e:
+                logger.error(f"Could not create index {collection}.{name}: {e}")
+                failed.append(f"{collection}.{name}")
+    return failed
+
+
+async def migrate(db) -> Dict:
+    """Apply pending migrations, then ensure every registered index exists."""
+    applied = await apply_migrations(db)
+    failed = await ensure_indexes(db)
+    logger.info(
+        f"Database migrations: {len(applied)} applied, "
+        f"{sum(map(len, INDEXES.values())) - len(failed)} indexes ensured, {len(failed)} failed"
+    )
+    return {"migrations_applied": applied, "indexes_failed": failed}
+
+
+async def _main(dry_run: bool):
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv()
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    db = client[os.environ["DB_NAME"]]
+    try:
+        if dry_run:
+            print(f"Pending migrations: {await pending_migrations(db) or 'none'}")
+            missing = await missing_indexes(db)
+            for collection, names in missing.items():
+                print(f"Missing indexes on {collection}: {', '.join(names)}")
+            if not missing:
+                print("All registered indexes exist")
+        else:
+            print(await migrate(db))
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Apply database migrations and indexes")
+    parser.add_argument("--dry-run", action="store_true", help="Report pending work without applying it")
+    args = parser.parse_args()
+    asyncio.run(_main(args.dry_run))
@@ -9,6 +9,12 @@ Returns ncr_summary with common prices for RON 91/95/97/100, Diesel, Diesel Plus
 import aiohttp
 from datetime import datetime
 import logging
+from typing import Optional
+
+from services.collection_versions import collection_versions
+from services.http_utils import fetch_with_retry, read_json
+from services.market_catalog import status_rank
+from services.name_search import name_fields, name_index
 
 logger = logging.getLogger(__name__)
 
@@ -28,18 +34,17 @@ PRODUCT_MAP = {
 class DOEFuelPriceIntegration:
     """Integration service for DOE fuel prices via anomura API"""
 
-    async def scrape_fuel_prices(self):
+    async def scrape_fuel_prices(self, session: Optional[aiohttp.ClientSession] = None):
         """Fetch current NCR fuel prices from anomura API (DOE OIMB data source)."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    ANOMURA_FUEL_API,
-                    timeout=aiohttp.ClientTimeout(total=15),
-                ) as resp:
-                    if resp.status != 200:
-                        logger.error(f"Anomura fuel API returned {resp.status}")
-                        return {}
-                    data = await resp.json()
+            resp = await fetch_with_retry(
+                session, ANOMURA_FUEL_API, timeout=aiohttp.ClientTimeout(total=15)
+            )
+            if resp is None:
+                logger.error("Anomura fuel API request failed")
+                return {}
+            async with resp:
+                data = await read_json(resp)
         except Exception as e:
             logger.error(f"Failed to fetch anomura fuel API: {e}")
             return {}
@@ -123,6 +128,7 @@ async def integrate_doe_fuel_prices(db):
 
             doc = {
                 "name": fuel_name,
+                **name_fields(fuel_name),
                 "category": "fuel",
                 "currentPrice": current_price,
                 "averagePrice": average_price,
@@ -130,6 +136,7 @@ async def integrate_doe_fuel_prices(db):
                 "location": data["region"],
                 "icon": "⛽",
                 "status": status,
+                "statusRank": status_rank(status),
                 "savings": round(average_price - current_price, 2),
                 "trend": trend,
                 "priceRange": {"low": data.get("range_low"), "high": data.get("range_high")},
@@ -152,11 +159,15 @@ async def integrate_doe_fuel_prices(db):
                 {"$set": doc},
                 upsert=True,
             )
+            # Searchable right away, without a full name index refresh
+            name_index.add(doc["name_key"])
             saved_count += 1
             logger.info(f"Saved fuel: {fuel_name} ₱{current_price}/{data['unit']}")
 
         except Exception as e:
             logger.error(f"Error saving fuel price {fuel_name}: {e}")
 
+    if saved_count:
+        await collection_versions.bump(db, "market_items")
     logger.info(f"✅ DOE fuel prices integrated: {saved_count} items")
     return saved_count > 0
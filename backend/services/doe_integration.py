@@ -16,16 +16,28 @@ Pagination:
   The generic `category=Issuances` URL only shows ~2 pages of featured items.
   We detect the max page from the <select> pagination combobox in the HTML
   and iterate through all pages (full mode) or just the first few (daily mode).
+
+Crawling:
+  Listing pages are fetched ahead concurrently under one doe.gov.ph rate
+  limiter (DOE_CRAWL_RATE req/s, DOE_CRAWL_CONCURRENCY pages ahead) and
+  processed in page order. Daily crawls stop at the newest issuance already in
+  `doe_circulars` (its high-water mark); full crawls persist their frontier in
+  `crawl_frontier` and resume from it. Upserts go through BulkWriter.
 """
 
 import aiohttp
 import asyncio
-import json
 import logging
+import os
 import re
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from bs4 import SoupStrainer
+from pymongo import UpdateOne
+
+from services.bulk_writer import BulkWriter
+from services.html_parsing import fragments, html_to_text, parse, script_json, soup
+from services.http_utils import HostRateLimiter, fetch_with_retry, http_clients, read_text
 
 logger = logging.getLogger(__name__)
 
@@ -38,8 +50,18 @@ DOE_CMS_BASE = "https://prod-cms.doe.gov.ph"
 # "Department Circular" because it unlocks the full 137-page pagination.
 DOE_LISTING_SUBCATEGORY = "Department Circular"
 
-# Rate limit: seconds to wait between page fetches
-PAGE_DELAY = 1.5
+# Listings crawled (concurrently). One suffices — see the note above.
+LISTING_SUBCATEGORIES = (DOE_LISTING_SUBCATEGORY,)
+
+# Politeness budget for doe.gov.ph, shared by every concurrent page fetch
+CRAWL_RATE = float(os.environ.get("DOE_CRAWL_RATE", "1.0"))  # requests/sec
+CRAWL_BURST = 2
+# Listing pages fetched ahead of the one being processed (full crawls)
+CRAWL_CONCURRENCY = int(os.environ.get("DOE_CRAWL_CONCURRENCY", "4"))
+
+# Full crawls persist their next page here: {_id: "doe:<subcategory>", next_page, max_page}
+FRONTIER_COLLECTION = "crawl_frontier"
+FRONTIER_SAVE_EVERY = 10
 
 # Default pages to fetch per subcategory in daily/incremental mode
 DEFAULT_MAX_PAGES = 5
@@ -64,56 +86,28 @@ def _extract_nuxt_articles(html: str) -> List[Dict]:
     """
     Extract article data from the __NUXT__ script block in DOE SSR HTML.
 
-    The __NUXT__ block is a JS IIFE, not pure JSON. We extract the articles
-    array by finding it within the script content via regex, then parse the
-    HTML content field with BeautifulSoup for a clean text summary.
+    The __NUXT__ block is a JS IIFE, not pure JSON, but its articles array is
+    JSON: it is sliced out of the script and decoded directly, without
+    parsing the rest of the page.
     """
-    # Find the script containing window.__NUXT__
-    match = re.search(r"window\.__NUXT__\s*=\s*(.+?);\s*</script>", html, re.DOTALL)
-    if not match:
-        logger.debug("Could not find __NUXT__ in DOE HTML")
-        return []
-
-    nuxt_js = match.group(1)
-
-    # Extract the articles array from the JS blob.
-    # Articles are inside "articles":[...] — find this JSON array.
-    articles_match = re.search(
-        r'"articles"\s*:\s*(\[.*?\])\s*,\s*"', nuxt_js, re.DOTALL
-    )
-    if not articles_match:
-        # Fallback: try without trailing comma constraint
-        articles_match = re.search(
-            r'"articles"\s*:\s*(\[.*?\])\s*\}', nuxt_js, re.DOTALL
-        )
-    if not articles_match:
+    articles = script_json(html, "window.__NUXT__", "articles")
+    if not isinstance(articles, list):
         logger.debug("Could not extract articles array from __NUXT__")
         return []
-
-    raw = articles_match.group(1)
-
-    # The JS may use `undefined` or `null` — normalize for JSON parsing
-    raw = raw.replace("undefined", "null")
-
-    try:
-        articles = json.loads(raw)
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse articles JSON: {e}")
-        return []
-
     return articles
 
 
 def _extract_articles_from_html(html: str) -> List[Dict]:
     """
     Fallback: extract articles by parsing the rendered HTML with BeautifulSoup.
-    Used when __NUXT__ extraction fails.
+    Used when __NUXT__ extraction fails. Only <div>s are parsed — the cards
+    live in them, the __NUXT__ script and <head> don't.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    cards = soup(html, only=SoupStrainer("div"))
     articles = []
 
     # Each article card has an h1 with a link (title), a time element, and content
-    for heading in soup.find_all("h1"):
+    for heading in cards.find_all("h1"):
         link_tag = heading.find("a")
         if not link_tag:
             continue
@@ -189,11 +183,10 @@ def _detect_max_page(html: str) -> int:
     The DOE Nuxt.js listing pages have a <select> with <option> elements
     numbered 1..N. Returns the highest option value, or 1 if not found.
     """
-    soup = BeautifulSoup(html, "html.parser")
     # The pagination combobox is a <select> with option values like "1", "2", ...
     # Look for a select that contains numeric options
-    for select in soup.find_all("select"):
-        options = select.find_all("option")
+    for select in fragments(html, "select"):
+        options = soup(select).find_all("option")
         max_val = 0
         for opt in options:
             val = opt.get("value", opt.get_text(strip=True))
@@ -231,8 +224,7 @@ def _clean_html_to_summary(html_content: str, max_len: int = 500) -> str:
     """Strip HTML tags and return a plain-text summary."""
     if not html_content:
         return ""
-    soup = BeautifulSoup(html_content, "html.parser")
-    text = soup.get_text(separator=" ", strip=True)
+    text = html_to_text(html_content)
     if len(text) > max_len:
         text = text[:max_len].rsplit(" ", 1)[0] + "..."
     return text
@@ -262,245 +254,427 @@ def _classify_issuance(title: str) -> str:
     return "Issuance"
 
 
+def _normalize_issuance(article: Dict) -> Dict:
+    """Map a raw DOE article (from __NUXT__ or HTML) to our doe_circulars schema."""
+    title = article.get("title", "")
+    content_html = article.get("content", "")
+    summary = _clean_html_to_summary(content_html)
+    category = _classify_issuance(title)
+
+    # Extract circular/order number from title
+    number_match = re.search(
+        r"(?:No\.?\s*)?([A-Z]{2,}\d{4}-\d{2}-\d+|[A-Z]+\d{4}-\d+-\d+)", title
+    )
+    circular_number = number_match.group(1) if number_match else None
+
+    # Build attachment URLs
+    attachments = []
+    for att in article.get("attachments", []):
+        content_url = att.get("contentUrl", "")
+        if content_url.startswith("/"):
+            content_url = f"{DOE_CMS_BASE}{content_url}"
+        attachments.append(
+            {
+                "title": att.get("title", ""),
+                "url": content_url,
+                "format": att.get("encodingFormat", ""),
+            }
+        )
+
+    # Article URL — strip ?redirect= query params (ugly and long)
+    link = article.get("link", "")
+    link = re.split(r"\?redirect=", link)[0]
+    if link.startswith("/"):
+        link = f"{DOE_BASE}{link}"
+
+    return {
+        "doe_id": article.get("id"),
+        "circular_number": circular_number,
+        "title": title,
+        "category": category,
+        "summary": summary,
+        "date_published": article.get("datePublished"),
+        "url": link,
+        "attachments": attachments,
+    }
+
+
 # ──────────────────────────────────────────────
-# Fetch DOE issuances (with full pagination)
+# Fetch DOE issuances (concurrent pagination)
 # ──────────────────────────────────────────────
 
 
-async def _fetch_doe_page(session: aiohttp.ClientSession, url: str) -> Optional[str]:
-    """Fetch a DOE page and return raw HTML."""
+async def _fetch_doe_page(
+    session: aiohttp.ClientSession,
+    url: str,
+    rate_limiter: Optional[HostRateLimiter] = None,
+) -> Optional[str]:
+    """Fetch a DOE page (with retry) and return raw HTML."""
     try:
-        async with session.get(
-            url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=30)
-        ) as resp:
-            if resp.status != 200:
-                logger.warning(f"DOE page returned HTTP {resp.status}: {url}")
-                return None
-            return await resp.text()
+        resp = await fetch_with_retry(
+            session,
+            url,
+            headers=HEADERS,
+            rate_limiter=rate_limiter,
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+        if resp is None:
+            logger.warning(f"DOE page could not be fetched: {url}")
+            return None
+        async with resp:
+            return await read_text(resp)
     except Exception as e:
         logger.error(f"Failed to fetch DOE page {url}: {e}")
         return None
 
 
-async def _fetch_subcategory(
-    session: aiohttp.ClientSession,
-    subcategory: str,
-    max_pages: int,
-    seen_ids: set,
-) -> List[Dict]:
-    """
-    Paginate through a single DOE subcategory and return all articles found.
-    Respects rate limiting (PAGE_DELAY between requests).
-    Deduplicates against seen_ids (shared across subcategories).
-    """
+def _listing_url(subcategory: str, page_num: int) -> str:
     # URL-encode: spaces -> +
     subcat_param = subcategory.replace(" ", "+")
     base_url = (
         f"{DOE_BASE}/articles/group/laws-and-issuances"
         f"?subcategory={subcat_param}&display_type=Card"
     )
+    return base_url if page_num == 1 else f"{base_url}&page={page_num}"
+
+
+async def _parse_listing_page(html: str, detect_max: bool) -> Tuple[List[Dict], int]:
+    """
+    Articles on a listing page and, if `detect_max`, its page count (else 1).
+
+    The __NUXT__ slice and the pagination <select> are cheap enough to parse
+    inline; the rendered-HTML fallback parses most of the page, so large
+    pages go to the worker pool for it.
+    """
+    max_page = _detect_max_page(html) if detect_max else 1
+    articles = _extract_nuxt_articles(html)
+    if not articles:
+        logger.debug("__NUXT__ extraction failed, falling back to HTML parsing")
+        articles = await parse(_extract_articles_from_html, html)
+    return articles, max_page
+
+
+def _is_newer(article: Dict, high_water: Dict) -> bool:
+    """True if `article` is newer than everything already stored."""
+    aid = article.get("id")
+    if aid and high_water.get("doe_id"):
+        return aid > high_water["doe_id"]
+    published = article.get("datePublished")
+    if published and high_water.get("date_published"):
+        return published > high_water["date_published"]
+    return True
+
 
+# Called after each listing page, in page order: (page_num, max_page, new_articles_on_page)
+PageCallback = Callable[[int, int, List[Dict]], Awaitable[None]]
+
+
+async def _crawl_listing(
+    session: aiohttp.ClientSession,
+    subcategory: str,
+    max_pages: int,
+    seen_ids: set,
+    rate_limiter: HostRateLimiter,
+    start_page: int = 1,
+    high_water: Optional[Dict] = None,
+    on_page: Optional[PageCallback] = None,
+) -> Tuple[List[Dict], bool]:
+    """
+    Paginate through a single DOE subcategory. Returns the articles found and
+    whether the crawl ended normally (False if a page could not be fetched).
+
+    Up to CRAWL_CONCURRENCY pages are fetched ahead concurrently (every
+    request waits on the shared `rate_limiter`) and processed in page order.
+    Deduplicates against seen_ids (shared across subcategories).
+
+    Stops at the last page, at a page that fails or has no articles, at a
+    page of duplicates, or — given a `high_water` mark ({doe_id,
+    date_published} of the newest stored issuance) — after the first page
+    with nothing newer than it. Incremental crawls fetch one page at a time
+    so that early stop costs no extra requests.
+
+    `start_page` resumes a crawl part-way through; `on_page` is awaited after
+    each page with that page's new articles (used for storing/checkpointing).
+    """
     articles: List[Dict] = []
     effective_max = max_pages
-
-    for page_num in range(1, effective_max + 1):
-        page_url = base_url if page_num == 1 else f"{base_url}&page={page_num}"
-        html = await _fetch_doe_page(session, page_url)
-        if not html:
-            logger.warning(
-                f"[{subcategory}] Failed to fetch page {page_num} — stopping"
+    lookahead = 1 if high_water is not None else CRAWL_CONCURRENCY
+    pending: Dict[int, asyncio.Task] = {}
+    scheduled = start_page - 1
+
+    def schedule(upto: int):
+        nonlocal scheduled
+        while scheduled < min(upto, effective_max):
+            scheduled += 1
+            pending[scheduled] = asyncio.ensure_future(
+                _fetch_doe_page(session, _listing_url(subcategory, scheduled), rate_limiter)
             )
-            break
-
-        # On the first page, detect max pages from the pagination combobox
-        if page_num == 1:
-            detected_max = _detect_max_page(html)
-            if detected_max > 1:
-                # Cap at max_pages param (which is already the user's limit)
-                effective_max = min(max_pages, detected_max)
-                logger.info(
-                    f"[{subcategory}] Detected {detected_max} total pages, "
-                    f"will fetch up to {effective_max}"
-                )
 
-        # Try __NUXT__ extraction first (structured data)
-        page_articles = _extract_nuxt_articles(html)
-        if not page_articles:
-            logger.debug(
-                f"[{subcategory}] __NUXT__ extraction failed for page {page_num}, "
-                f"falling back to HTML parsing"
-            )
-            page_articles = _extract_articles_from_html(html)
+    page_num = start_page
+    try:
+        schedule(start_page)
+        while page_num <= effective_max:
+            html = await pending.pop(page_num)
+            if not html:
+                logger.warning(f"[{subcategory}] Failed to fetch page {page_num} — stopping")
+                return articles, False
+
+            # On the first fetched page, detect max pages from the pagination combobox
+            page_articles, detected_max = await _parse_listing_page(html, page_num == start_page)
+            if page_num == start_page:
+                if detected_max > 1:
+                    # Cap at max_pages param (which is already the user's limit)
+                    effective_max = min(max_pages, detected_max)
+                    logger.info(
+                        f"[{subcategory}] Detected {detected_max} total pages, "
+                        f"will fetch up to {effective_max}"
+                    )
+            schedule(page_num + lookahead)
+
+            if not page_articles:
+                logger.info(f"[{subcategory}] No articles found on page {page_num} — stopping")
+                break
+
+            new_articles = []
+            for a in page_articles:
+                aid = a.get("id")
+                title = a.get("title", "")
+                # Deduplicate by id, or by title if no id
+                key = aid if aid else title
+                if key and key not in seen_ids:
+                    new_articles.append(a)
+                    seen_ids.add(key)
+            articles.extend(new_articles)
 
-        if not page_articles:
             logger.info(
-                f"[{subcategory}] No articles found on page {page_num} — stopping"
+                f"[{subcategory}] Page {page_num}/{effective_max}: "
+                f"{len(new_articles)} new articles (subtotal: {len(articles)})"
             )
-            break
-
-        added = 0
-        for a in page_articles:
-            aid = a.get("id")
-            title = a.get("title", "")
-            # Deduplicate by id, or by title if no id
-            key = aid if aid else title
-            if key and key not in seen_ids:
-                articles.append(a)
-                seen_ids.add(key)
-                added += 1
 
-        logger.info(
-            f"[{subcategory}] Page {page_num}/{effective_max}: "
-            f"{added} new articles (subtotal: {len(articles)})"
-        )
+            if on_page is not None:
+                await on_page(page_num, effective_max, new_articles)
+
+            if not new_articles:
+                # All items on this page were duplicates — we've caught up
+                logger.info(f"[{subcategory}] No new articles on page {page_num} — stopping")
+                break
+            # Pinned items can be old, so only a page with nothing new ends the crawl
+            if high_water is not None and not any(_is_newer(a, high_water) for a in new_articles):
+                logger.info(f"[{subcategory}] Reached stored issuances on page {page_num} — stopping")
+                break
+            page_num += 1
+    finally:
+        for task in pending.values():
+            task.cancel()
+
+    return articles, True
+
+
+async def _crawl(
+    full: bool,
+    start_page: int,
+    on_page: Optional[PageCallback],
+    high_water: Optional[Dict],
+) -> Tuple[List[Dict], bool]:
+    """fetch_doe_issuances, also returning whether every listing crawl ended normally."""
+    max_pages = 999 if full else DEFAULT_MAX_PAGES
+    seen_ids: set = set()
+    session = http_clients.session()
+    rate_limiter = HostRateLimiter(rate=CRAWL_RATE, burst=CRAWL_BURST)
+    logger.info(
+        f"Scraping DOE issuances (mode={'full' if full else 'incremental'}, "
+        f"max_pages={'ALL' if full else max_pages})"
+    )
 
-        if added == 0:
-            # All items on this page were duplicates — we've caught up
-            logger.info(
-                f"[{subcategory}] No new articles on page {page_num} — stopping"
+    def page_callback() -> Optional[PageCallback]:
+        if on_page is None:
+            return None
+
+        async def callback(page_num: int, max_page: int, articles: List[Dict]):
+            await on_page(page_num, max_page, [_normalize_issuance(a) for a in articles])
+
+        return callback
+
+    results = await asyncio.gather(
+        *(
+            _crawl_listing(
+                session,
+                subcategory,
+                max_pages,
+                seen_ids,
+                rate_limiter,
+                start_page=start_page,
+                high_water=high_water,
+                on_page=page_callback(),
             )
-            break
+            for subcategory in LISTING_SUBCATEGORIES
+        )
+    )
+    all_articles = [article for listing, _ in results for article in listing]
+    logger.info(f"DOE scrape done — {len(all_articles)} articles fetched")
 
-        # Rate limit between pages (skip delay after last page)
-        if page_num < effective_max:
-            await asyncio.sleep(PAGE_DELAY)
+    # Normalize to our schema
+    issuances = [_normalize_issuance(article) for article in all_articles]
 
-    return articles
+    logger.info(f"Fetched {len(issuances)} DOE issuances total")
+    return issuances, all(completed for _, completed in results)
 
 
-async def fetch_doe_issuances(full: bool = False) -> List[Dict]:
+async def fetch_doe_issuances(
+    full: bool = False,
+    start_page: int = 1,
+    on_page: Optional[PageCallback] = None,
+    high_water: Optional[Dict] = None,
+) -> List[Dict]:
     """
     Fetch DOE issuances with pagination from the Laws and Issuances listing.
 
     All DOE subcategory URLs return the same article listing (the filter is
-    cosmetic in SSR HTML), so we paginate through a single subcategory URL
-    to get all issuance types (DCs, DOs, MCs, AOs, SOs, etc.).
+    cosmetic in SSR HTML), so LISTING_SUBCATEGORIES holds just one listing
+    that covers all issuance types (DCs, DOs, MCs, AOs, SOs, etc.). Listings
+    are crawled concurrently under one doe.gov.ph rate limiter.
 
     Args:
         full: If True, fetch ALL pages (historical backfill — may take several
               minutes and fetch 500+ items).
               If False (default), fetch only the first DEFAULT_MAX_PAGES pages
               (~20 most recent items for daily refresh).
+        start_page: Listing page to start from (resuming a full crawl).
+        on_page: Awaited after each page with that page's *normalized*
+                 issuances: `on_page(page_num, max_page, issuances)`.
+        high_water: Newest stored issuance ({doe_id, date_published}); the
+                    crawl stops once it reaches pages with nothing newer.
 
     Returns:
         List of normalized issuance dicts ready for MongoDB upsert.
     """
-    max_pages = 999 if full else DEFAULT_MAX_PAGES
+    issuances, _ = await _crawl(full, start_page, on_page, high_water)
+    return issuances
 
-    all_articles: List[Dict] = []
-    seen_ids: set = set()
 
-    async with aiohttp.ClientSession() as session:
-        logger.info(
-            f"Scraping DOE issuances (mode={'full' if full else 'incremental'}, "
-            f"max_pages={'ALL' if full else max_pages})"
-        )
-        all_articles = await _fetch_subcategory(
-            session, DOE_LISTING_SUBCATEGORY, max_pages, seen_ids
-        )
-        logger.info(f"DOE scrape done — {len(all_articles)} articles fetched")
+# ──────────────────────────────────────────────
+# MongoDB upsert + crawl state
+# ──────────────────────────────────────────────
 
-    # Normalize to our schema
-    issuances = []
-    for article in all_articles:
-        title = article.get("title", "")
-        content_html = article.get("content", "")
-        summary = _clean_html_to_summary(content_html)
-        category = _classify_issuance(title)
-
-        # Extract circular/order number from title
-        number_match = re.search(
-            r"(?:No\.?\s*)?([A-Z]{2,}\d{4}-\d{2}-\d+|[A-Z]+\d{4}-\d+-\d+)", title
-        )
-        circular_number = number_match.group(1) if number_match else None
 
-        # Build attachment URLs
-        attachments = []
-        for att in article.get("attachments", []):
-            content_url = att.get("contentUrl", "")
-            if content_url.startswith("/"):
-                content_url = f"{DOE_CMS_BASE}{content_url}"
-            attachments.append(
-                {
-                    "title": att.get("title", ""),
-                    "url": content_url,
-                    "format": att.get("encodingFormat", ""),
-                }
-            )
+def _upsert_op(item: Dict, now: datetime) -> UpdateOne:
+    """Upsert for one normalized issuance: by doe_id, falling back to title."""
+    doc = {
+        **item,
+        "scraped_at": now,
+        "data_source": "doe.gov.ph (SSR scrape)",
+    }
+    key = {"doe_id": item["doe_id"]} if item.get("doe_id") else {"title": item["title"]}
+    return UpdateOne(key, {"$set": doc, "$setOnInsert": {"created_at": now}}, upsert=True)
 
-        # Article URL — strip ?redirect= query params (ugly and long)
-        link = article.get("link", "")
-        link = re.split(r"\?redirect=", link)[0]
-        if link.startswith("/"):
-            link = f"{DOE_BASE}{link}"
 
-        issuances.append(
-            {
-                "doe_id": article.get("id"),
-                "circular_number": circular_number,
-                "title": title,
-                "category": category,
-                "summary": summary,
-                "date_published": article.get("datePublished"),
-                "url": link,
-                "attachments": attachments,
-            }
-        )
+async def _high_water(db) -> Optional[Dict]:
+    """{doe_id, date_published} of the newest stored issuance, or None if empty."""
+    by_id = await db.doe_circulars.find_one({}, {"doe_id": 1}, sort=[("doe_id", -1)])
+    by_date = await db.doe_circulars.find_one({}, {"date_published": 1}, sort=[("date_published", -1)])
+    if by_id is None and by_date is None:
+        return None
+    return {
+        "doe_id": (by_id or {}).get("doe_id"),
+        "date_published": (by_date or {}).get("date_published"),
+    }
 
-    logger.info(f"Fetched {len(issuances)} DOE issuances total")
-    return issuances
 
+def _frontier_id(subcategory: str) -> str:
+    return f"doe:{subcategory}"
 
-# ──────────────────────────────────────────────
-# MongoDB upsert
-# ──────────────────────────────────────────────
+
+async def _load_frontier(db) -> int:
+    """Next listing page of an unfinished full crawl (1 if none)."""
+    doc = await db[FRONTIER_COLLECTION].find_one({"_id": _frontier_id(DOE_LISTING_SUBCATEGORY)})
+    return doc["next_page"] if doc else 1
+
+
+async def _save_frontier(db, next_page: int, max_page: int):
+    await db[FRONTIER_COLLECTION].update_one(
+        {"_id": _frontier_id(DOE_LISTING_SUBCATEGORY)},
+        {"$set": {"next_page": next_page, "max_page": max_page, "updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
 
 
-async def run_doe_update(db, full: bool = False) -> dict:
+# Called after each page is stored: (page_num, max_page, issuances_updated_so_far)
+ProgressCallback = Callable[[int, int, int], Awaitable[None]]
+
+
+async def run_doe_update(
+    db,
+    full: bool = False,
+    start_page: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> dict:
     """
     Fetch real DOE issuances and upsert to MongoDB.
 
+    Issuances are upserted in bulk batches as the crawl proceeds. A full
+    crawl saves its frontier (next listing page) in `crawl_frontier` every
+    FRONTIER_SAVE_EVERY pages, after flushing the pages before it, so an
+    interrupted crawl keeps everything stored and resumes where it stopped.
+    An incremental crawl stops at the newest issuance already stored.
+
     Args:
         db: Motor database instance.
         full: If True, do a full historical backfill (all pages).
               If False (default), incremental update (first few pages).
+        start_page: Listing page to start from; by default a full crawl
+                    resumes from its saved frontier.
+        progress: Optional async callback awaited after each stored page.
 
     Returns a result dict with success flag and details.
     """
     try:
-        issuances = await fetch_doe_issuances(full=full)
+        now = datetime.now(timezone.utc)
+        categories = set()
+        if start_page is None:
+            start_page = await _load_frontier(db) if full else 1
+        high_water = None if full else await _high_water(db)
+
+        last_page = {"page": start_page - 1, "max_page": start_page - 1}
+
+        async with BulkWriter(db.doe_circulars) as writer:
+
+            async def store_page(page_num: int, max_page: int, issuances: List[Dict]):
+                for item in issuances:
+                    await writer.add(_upsert_op(item, now))
+                categories.update(i["category"] for i in issuances)
+                last_page.update(page=page_num, max_page=max_page)
+                if full and page_num % FRONTIER_SAVE_EVERY == 0:
+                    # Only pages already written may fall behind the frontier
+                    await writer.flush()
+                    await _save_frontier(db, page_num + 1, max_page)
+                if progress is not None:
+                    await progress(page_num, max_page, writer.ops_queued)
+
+            issuances, completed = await _crawl(full, start_page, store_page, high_water)
+
+        if full:
+            if completed:
+                # The next full crawl starts over from page 1
+                await db[FRONTIER_COLLECTION].delete_one({"_id": _frontier_id(DOE_LISTING_SUBCATEGORY)})
+            elif last_page["page"] >= start_page:
+                await _save_frontier(db, last_page["page"] + 1, last_page["max_page"])
+
         if not issuances:
+            # Nothing newer than what's stored, or a resumed crawl that was already done
+            if high_water is not None or (start_page > 1 and completed):
+                return {
+                    "success": True,
+                    "issuances_updated": 0,
+                    "mode": "full_backfill" if full else "incremental",
+                    "timestamp": now.isoformat(),
+                    "categories": [],
+                }
             return {
                 "success": False,
                 "error": "No issuances fetched from DOE website",
             }
 
-        now = datetime.now(timezone.utc)
-        updated = 0
-
-        for item in issuances:
-            doc = {
-                **item,
-                "scraped_at": now,
-                "data_source": "doe.gov.ph (SSR scrape)",
-            }
-
-            # Upsert by doe_id (unique article identifier)
-            if item.get("doe_id"):
-                await db.doe_circulars.update_one(
-                    {"doe_id": item["doe_id"]},
-                    {"$set": doc, "$setOnInsert": {"created_at": now}},
-                    upsert=True,
-                )
-            else:
-                # Fallback: upsert by title
-                await db.doe_circulars.update_one(
-                    {"title": item["title"]},
-                    {"$set": doc, "$setOnInsert": {"created_at": now}},
-                    upsert=True,
-                )
-            updated += 1
-
+        updated = writer.ops_queued - writer.error_count
         logger.info(
             f"DOE update complete — {updated} issuances upserted at {now.isoformat()}"
         )
@@ -509,7 +683,7 @@ async def run_doe_update(db, full: bool = False) -> dict:
             "issuances_updated": updated,
             "mode": "full_backfill" if full else "incremental",
             "timestamp": now.isoformat(),
-            "categories": list(set(i["category"] for i in issuances)),
+            "categories": list(categories),
         }
 
     except Exception as e:
@@ -13,19 +13,37 @@ CSV columns:
 
 Region codes:  CLUZ = Luzon, CVIS = Visayas, CMIN = Mindanao
 
+Files are streamed through services/iemop_csv.py — parsed chunk by chunk in
+bounded memory. When a db is passed, interval-level prices (mean marginal
+price across resources per region per RTD interval) are upserted to the
+`wesm_prices` collection:
+  {date (YYYY-MM-DD), region, interval, seq, price, min, max, count, last,
+   source, updated_at}   — unique on (date, region, interval)
+
+Days are fetched concurrently over the app-wide pooled session. Each day's region
+stats are cached per day — permanently for past days (their files are final),
+also in the `wesm_daily_stats` collection {_id: date, regions, fetched_at}
+when a db is passed — so any `days=N` window is assembled from the day cache
+and a warm or restarted process downloads only today's file.
+
 Note: NGCP real-time MW data (grid status) is blocked by Cloudflare (403).
       Grid MW values are realistic estimates from NGCP historical data.
       Grid STATUS is derived from actual WESM price levels.
 """
 
 import aiohttp
-import csv
-import io
+import asyncio
 import logging
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+from pymongo import UpdateOne
+
+from services.bulk_writer import BulkWriter
+from services.http_utils import http_clients
+from services.iemop_csv import CHUNK_SIZE, MarketPriceAggregator
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,77 +67,127 @@ class WESMPriceScraper:
         )
     }
 
-    # In-memory cache: key → (data, timestamp)
-    _cache: Dict = {}
+    # Per-day region stats: date (YYYY-MM-DD) → (stats, fetched_at); stats is
+    # {} when no file was published. A past day's file is final, so its stats
+    # are kept for good (and in `wesm_daily_stats` when a db is passed); today's
+    # partial file and missing days are refetched after CACHE_TTL.
+    _days: Dict[str, tuple] = {}
+    # date → running fetch, so concurrent requests share one download
+    _inflight: Dict[str, asyncio.Task] = {}
     CACHE_TTL = 3600  # seconds (1 hour)
 
+    MAX_LOOKBACK = 14  # days searched for `days` days with data
+    FETCH_CONCURRENCY = 4
+    TIMEOUT = aiohttp.ClientTimeout(total=20)
+
     # ------------------------------------------------------------------ #
     #  Internal helpers                                                    #
     # ------------------------------------------------------------------ #
 
-    def _cached(self, key: str) -> Optional[Dict]:
-        entry = self._cache.get(key)
-        if entry and (time.time() - entry[1]) < self.CACHE_TTL:
-            return entry[0]
+    def _cached_day(self, date_str: str, today_str: str) -> Optional[Dict]:
+        """Cached stats for a day ({} = no file), or None if it must be fetched."""
+        entry = self._days.get(date_str)
+        if entry is None:
+            return None
+        stats, fetched_at = entry
+        if stats and date_str < today_str:
+            return stats
+        if time.time() - fetched_at < self.CACHE_TTL:
+            return stats
         return None
 
-    def _store(self, key: str, data: Dict):
-        self._cache[key] = (data, time.time())
-
-    async def _fetch_csv(self, date: datetime) -> Optional[str]:
-        """Download IEMOP MP CSV for the given date. Returns text or None."""
-        date_str = date.strftime("%Y%m%d")
-        url = self.CSV_URL.format(date_str=date_str)
+    async def _load_days(self, db, date_strs: List[str]):
+        """Pull finalized days this process hasn't seen from `wesm_daily_stats`."""
+        wanted = [d for d in date_strs if d not in self._days]
+        if db is None or not wanted:
+            return
         try:
-            timeout = aiohttp.ClientTimeout(total=20)
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self.HEADERS, timeout=timeout) as resp:
-                    if resp.status == 200:
-                        return await resp.text(errors="replace")
-                    logger.debug(f"IEMOP MP {date_str}: HTTP {resp.status}")
+            async for doc in db.wesm_daily_stats.find({"_id": {"$in": wanted}}):
+                self._days[doc["_id"]] = (doc["regions"], time.time())
         except Exception as exc:
-            logger.debug(f"IEMOP MP {date_str}: {exc}")
-        return None
+            logger.warning(f"Could not load cached WESM daily stats: {exc}")
 
-    def _parse_mp_csv(self, content: str) -> Dict[str, Dict]:
+    async def _fetch_day(
+        self, session: aiohttp.ClientSession, date: datetime
+    ) -> Optional[MarketPriceAggregator]:
+        """
+        Stream the IEMOP MP CSV for the given date through the aggregator.
+        Returns the aggregator, or None if the file isn't published.
+        Network errors propagate.
+        """
+        date_str = date.strftime("%Y%m%d")
+        url = self.CSV_URL.format(date_str=date_str)
+        async with session.get(url, headers=self.HEADERS, timeout=self.TIMEOUT) as resp:
+            if resp.status != 200:
+                logger.debug(f"IEMOP MP {date_str}: HTTP {resp.status}")
+                return None
+            agg = MarketPriceAggregator(self.REGION_MAP)
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                agg.feed(chunk)
+            agg.close()
+            return agg
+
+    async def _refresh_day(
+        self, session: aiohttp.ClientSession, db, date: datetime, today_str: str
+    ) -> Optional[Dict]:
         """
-        Parse IEMOP MP CSV.
-        Returns {region_key: {current, average, min, max}} or {}.
+        Fetch one day, cache its stats and persist them. Returns the stats
+        ({} if no file), or None on a network error — not cached, so the day
+        is retried on the next call.
         """
-        prices: Dict[str, List[float]] = {k: [] for k in self.REGION_MAP.values()}
+        date_str = date.strftime("%Y-%m-%d")
         try:
-            reader = csv.DictReader(io.StringIO(content))
-            for row in reader:
-                region_code = (row.get("REGION_NAME") or "").strip()
-                price_raw = (row.get("MARGINAL_PRICE") or "").strip()
-                region_key = self.REGION_MAP.get(region_code)
-                if region_key and price_raw:
-                    try:
-                        prices[region_key].append(float(price_raw))
-                    except ValueError:
-                        pass
+            agg = await self._fetch_day(session, date)
         except Exception as exc:
-            logger.error(f"Error parsing IEMOP MP CSV: {exc}")
-            return {}
-
-        result = {}
-        for key, vals in prices.items():
-            if vals:
-                result[key] = {
-                    "current": vals[-1],
-                    "average": sum(vals) / len(vals),
-                    "min": min(vals),
-                    "max": max(vals),
-                }
-        return result
+            logger.debug(f"IEMOP MP {date_str}: {exc}")
+            return None
+        stats = agg.region_stats() if agg is not None else {}
+        self._days[date_str] = (stats, time.time())
+
+        if stats and db is not None:
+            try:
+                await self._save_intervals(db, date, agg)
+                if date_str < today_str:
+                    await db.wesm_daily_stats.update_one(
+                        {"_id": date_str},
+                        {"$set": {"regions": stats, "fetched_at": datetime.utcnow()}},
+                        upsert=True,
+                    )
+            except Exception as exc:
+                logger.warning(f"Could not save WESM prices for {date_str}: {exc}")
+        return stats
+
+    async def _save_intervals(self, db, date: datetime, agg: MarketPriceAggregator) -> int:
+        """Upsert one day's interval-level prices to `wesm_prices`."""
+        date_str = date.strftime("%Y-%m-%d")
+        now = datetime.utcnow()
+        async with BulkWriter(db.wesm_prices) as writer:
+            for region_key, intervals in agg.interval_prices().items():
+                for row in intervals:
+                    doc = {
+                        "date": date_str,
+                        "region": region_key,
+                        **row,
+                        "source": "IEMOP Real-Time Dispatch",
+                        "updated_at": now,
+                    }
+                    await writer.add(
+                        UpdateOne(
+                            {"date": date_str, "region": region_key, "interval": row["interval"]},
+                            {"$set": doc},
+                            upsert=True,
+                        )
+                    )
+        return writer.ops_queued - writer.error_count
 
     # ------------------------------------------------------------------ #
     #  Public API                                                          #
     # ------------------------------------------------------------------ #
 
-    async def fetch_price_trends(self, days: int = 7) -> Dict:
+    async def fetch_price_trends(self, days: int = 7, db=None) -> Dict:
         """
         Fetch WESM price trends for the last `days` days.
+        With `db`, each fetched day's interval prices are saved to `wesm_prices`.
 
         Returns a dict shaped like the existing price_trends structure:
           {
@@ -130,38 +198,63 @@ class WESMPriceScraper:
 
         Returns {} if IEMOP is unreachable.
         """
-        cache_key = f"price_trends_{days}"
-        cached = self._cached(cache_key)
-        if cached is not None:
-            return cached
-
         # Philippines is UTC+8
         ph_now = datetime.utcnow() + timedelta(hours=8)
+        today_str = ph_now.strftime("%Y-%m-%d")
+        candidates = [ph_now - timedelta(days=i) for i in range(self.MAX_LOOKBACK)]
+        await self._load_days(db, [d.strftime("%Y-%m-%d") for d in candidates])
+
+        semaphore = asyncio.Semaphore(self.FETCH_CONCURRENCY)
+        session = http_clients.session()
+
+        async def fetch(day: datetime):
+            async with semaphore:
+                return await self._refresh_day(session, db, day, today_str)
+
+        async def refresh(day: datetime):
+            date_str = day.strftime("%Y-%m-%d")
+            task = self._inflight.get(date_str)
+            if task is None:
+                task = self._inflight[date_str] = asyncio.ensure_future(fetch(day))
+                task.add_done_callback(lambda _: self._inflight.pop(date_str, None))
+            # Shielded: a caller that is cancelled (e.g. a dropped request)
+            # must not cancel the download other callers are waiting on
+            return await asyncio.shield(task)
+
+        # Newest first: take the first `days` days that have data, fetching
+        # (concurrently) only the ones not cached. Days that turn out to
+        # have no file (or failed to download) are skipped and the window
+        # extends further back.
+        failed = set()
+        while True:
+            picked, to_fetch = [], []
+            for day in candidates:
+                if len(picked) + len(to_fetch) >= days:
+                    break
+                date_str = day.strftime("%Y-%m-%d")
+                if date_str in failed:
+                    continue
+                stats = self._cached_day(date_str, today_str)
+                if stats is None:
+                    to_fetch.append(day)
+                elif stats:
+                    picked.append((day, stats))
+            if not to_fetch:
+                break
+            results = await asyncio.gather(*(refresh(day) for day in to_fetch))
+            failed.update(
+                day.strftime("%Y-%m-%d") for day, stats in zip(to_fetch, results) if stats is None
+            )
 
         region_daily: Dict[str, List[Dict]] = {k: [] for k in self.REGION_MAP.values()}
-        days_checked = 0
-        days_collected = 0
-
-        while days_collected < days and days_checked < 14:
-            target = ph_now - timedelta(days=days_checked)
-            days_checked += 1
-
-            content = await self._fetch_csv(target)
-            if not content:
-                continue
-
-            daily_stats = self._parse_mp_csv(content)
-            if not daily_stats:
-                continue
-
+        for day, daily_stats in picked:
             for region_key, stats in daily_stats.items():
                 region_daily[region_key].append(
                     {
-                        "date": target.strftime("%Y-%m-%d"),
+                        "date": day.strftime("%Y-%m-%d"),
                         "avg": stats["average"],
                     }
                 )
-            days_collected += 1
 
         if not any(region_daily.values()):
             logger.warning("IEMOP: no data collected for any region")
@@ -188,7 +281,6 @@ class WESMPriceScraper:
                 "source": "IEMOP Real-Time Dispatch",
             }
 
-        self._store(cache_key, output)
         return output
 
     async def derive_grid_status(self, price_trends: Optional[Dict] = None) -> Dict:
@@ -0,0 +1,443 @@
+"""
+Long-horizon price forecasts trained on `price_history`.
+
+Forecasts elsewhere only see the 6–7 point `trend` embedded in market_items.
+This module fits per-commodity models on the full daily history (up to a year
+of DA Bantay Presyo observations):
+
+  seasonal_naive   repeats the last trading week (DA publishes weekdays only,
+                   so the season is SEASON business days)
+  exp_smoothing    damped-trend Holt; (alpha, beta, phi) grid-searched on
+                   one-step-ahead SSE, vectorized over the whole grid
+  ridge            scikit-learn Ridge on the last LAGS daily returns,
+                   forecast recursively
+
+Each model is scored with a rolling-origin backtest (BACKTEST_FOLDS origins a
+week apart, BACKTEST_HORIZON days each); `best` is the lowest MAPE.
+
+Fitted state is plain JSON (parameters, smoothing state, the series tail) and
+is cached in the `forecast_models` collection, one document per commodity.
+A cached model is current while price_history's collection version (bumped by
+every write, see services/collection_versions.py) is unchanged; after a bump
+it is re-checked against a fingerprint of the commodity's rows, so backfilled
+older days and corrected prices refit too, while writes to other commodities
+don't. When only new days were appended the fit is incremental: the smoothing
+recursion advances from the cached state with the cached parameters, Ridge
+refits on its trailing window, and the full grid search + backtest only rerun
+every REOPTIMIZE_EVERY new observations (or when MODEL_VERSION or any earlier
+observation changes).
+
+Fitting runs in the shared process pool (services/worker_pool.py) —
+`fit_commodity` is module-level so it pickles — and `Forecaster.train_all`
+spreads every commodity across it.
+
+Env vars:
+  FORECAST_REOPTIMIZE_EVERY — new observations before a full refit (default 20)
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from services import worker_pool
+from services.collection_versions import collection_versions
+from services.name_search import name_filter
+
+logger = logging.getLogger(__name__)
+
+MODEL_VERSION = 1
+MODELS_COLLECTION = "forecast_models"
+
+SEASON = 5  # business days in a trading week
+LAGS = 10
+RIDGE_ALPHA = 1.0
+RIDGE_WINDOW = 250  # most recent lagged rows Ridge trains on
+RIDGE_MIN_ROWS = 20
+MAX_DAILY_RETURN = 0.5  # clamp for recursive Ridge steps
+
+MIN_OBSERVATIONS = 15
+BACKTEST_HORIZON = 10
+BACKTEST_FOLDS = 3
+REOPTIMIZE_EVERY = int(os.environ.get("FORECAST_REOPTIMIZE_EVERY", "20"))
+MAX_HORIZON = 60
+TAIL = max(LAGS + 1, SEASON)
+
+ALPHAS = np.linspace(0.05, 0.95, 19)
+BETAS = np.array([0.01, 0.05, 0.1, 0.2, 0.3])
+PHIS = np.array([0.8, 0.9, 0.98, 1.0])
+
+MODEL_NAMES = ("seasonal_naive", "exp_smoothing", "ridge")
+
+
+# ------------------------------------------------------------------ #
+#  Models (pure, picklable)                                            #
+# ------------------------------------------------------------------ #
+
+def _values_hash(values: np.ndarray) -> str:
+    return hashlib.sha1(np.ascontiguousarray(values, dtype=float).tobytes()).hexdigest()
+
+
+def rows_fingerprint(rows: Sequence[Dict]) -> str:
+    """Hash of a commodity's price_history rows (date-sorted): changes with any added or edited row."""
+    digest = hashlib.sha1()
+    for row in rows:
+        digest.update(f"{row.get('date')}={row.get('price')};".encode())
+    return digest.hexdigest()
+
+
+def prepare_series(dates: Sequence[str], prices: Sequence[float]) -> pd.Series:
+    """Daily observations → business-day series (last value per date, gaps forward-filled)."""
+    series = pd.Series(np.asarray(prices, dtype=float), index=pd.to_datetime(list(dates)))
+    series = series[np.isfinite(series.values) & (series.values > 0)]
+    series = series[~series.index.duplicated(keep="last")].sort_index()
+    if series.empty:
+        return series
+    return series.reindex(pd.bdate_range(series.index[0], series.index[-1])).ffill()
+
+
+def seasonal_naive_forecast(tail: np.ndarray, horizon: int) -> np.ndarray:
+    season = tail[-SEASON:]
+    return np.resize(season, horizon)
+
+
+def _holt_grid(values: np.ndarray):
+    """Damped Holt over every (alpha, beta, phi) at once: (sse, level, trend) arrays."""
+    alpha, beta, phi = (a.ravel() for a in np.meshgrid(ALPHAS, BETAS, PHIS, indexing="ij"))
+    level = np.full(alpha.shape, values[0])
+    trend = np.full(alpha.shape, values[1] - values[0])
+    sse = np.zeros(alpha.shape)
+    for t, y in enumerate(values[1:], start=1):
+        predicted = level + phi * trend
+        if t >= 2:
+            sse += (y - predicted) ** 2
+        new_level = alpha * y + (1 - alpha) * predicted
+        trend = beta * (new_level - level) + (1 - beta) * phi * trend
+        level = new_level
+    return sse, alpha, beta, phi, level, trend
+
+
+def fit_exp_smoothing(values: np.ndarray) -> Dict:
+    sse, alpha, beta, phi, level, trend = _holt_grid(values)
+    best = int(np.argmin(sse))
+    return {
+        "alpha": float(alpha[best]),
+        "beta": float(beta[best]),
+        "phi": float(phi[best]),
+        "level": float(level[best]),
+        "trend": float(trend[best]),
+    }
+
+
+def advance_exp_smoothing(params: Dict, new_values: np.ndarray) -> Dict:
+    """Run the Holt recursion over new observations with the fitted parameters."""
+    alpha, beta, phi = params["alpha"], params["beta"], params["phi"]
+    level, trend = params["level"], params["trend"]
+    for y in new_values:
+        new_level = alpha * y + (1 - alpha) * (level + phi * trend)
+        trend = beta * (new_level - level) + (1 - beta) * phi * trend
+        level = new_level
+    return {**params, "level": float(level), "trend": float(trend)}
+
+
+def exp_smoothing_forecast(params: Dict, horizon: int) -> np.ndarray:
+    damping = np.cumsum(params["phi"] ** np.arange(1, horizon + 1))
+    return params["level"] + damping * params["trend"]
+
+
+def _returns(values: np.ndarray) -> np.ndarray:
+    return np.diff(values) / values[:-1]
+
+
+def fit_ridge(values: np.ndarray) -> Optional[Dict]:
+    """Ridge on LAGS lagged daily returns; None if the history is too short."""
+    from sklearn.linear_model import Ridge
+
+    returns = _returns(values)
+    if len(returns) - LAGS < RIDGE_MIN_ROWS:
+        return None
+    # Row t: returns[t-1], ..., returns[t-LAGS] → returns[t]
+    windows = np.lib.stride_tricks.sliding_window_view(returns[:-1], LAGS)[:, ::-1]
+    targets = returns[LAGS:]
+    model = Ridge(alpha=RIDGE_ALPHA).fit(windows[-RIDGE_WINDOW:], targets[-RIDGE_WINDOW:])
+    return {"coef": model.coef_.tolist(), "intercept": float(model.intercept_)}
+
+
+def ridge_forecast(params: Dict, tail: np.ndarray, horizon: int) -> np.ndarray:
+    coef, intercept = np.asarray(params["coef"]), params["intercept"]
+    lags = list(_returns(tail[-(LAGS + 1):])[::-1])
+    value = tail[-1]
+    out = np.empty(horizon)
+    for h in range(horizon):
+        step = float(np.clip(intercept + coef @ np.asarray(lags[:LAGS]), -MAX_DAILY_RETURN, MAX_DAILY_RETURN))
+        value = value * (1 + step)
+        out[h] = value
+        lags.insert(0, step)
+    return out
+
+
+def _fit_models(values: np.ndarray) -> Dict:
+    return {
+        "seasonal_naive": {},
+        "exp_smoothing": fit_exp_smoothing(values),
+        "ridge": fit_ridge(values),
+    }
+
+
+def _forecast_models(models: Dict, tail: np.ndarray, horizon: int) -> Dict[str, np.ndarray]:
+    forecasts = {"seasonal_naive": seasonal_naive_forecast(tail, horizon)}
+    forecasts["exp_smoothing"] = exp_smoothing_forecast(models["exp_smoothing"], horizon)
+    if models.get("ridge"):
+        forecasts["ridge"] = ridge_forecast(models["ridge"], tail, horizon)
+    return forecasts
+
+
+def backtest(values: np.ndarray) -> Dict[str, Dict]:
+    """Rolling-origin MAE / RMSE / MAPE per model (empty when the history is too short)."""
+    errors: Dict[str, List[np.ndarray]] = {name: [] for name in MODEL_NAMES}
+    actuals: Dict[str, List[np.ndarray]] = {name: [] for name in MODEL_NAMES}
+    for fold in range(BACKTEST_FOLDS):
+        origin = len(values) - BACKTEST_HORIZON - fold * SEASON
+        if origin < MIN_OBSERVATIONS:
+            break
+        train, actual = values[:origin], values[origin:origin + BACKTEST_HORIZON]
+        for name, predicted in _forecast_models(_fit_models(train), train[-TAIL:], len(actual)).items():
+            errors[name].append(predicted - actual)
+            actuals[name].append(actual)
+
+    metrics = {}
+    for name in MODEL_NAMES:
+        if not errors[name]:
+            continue
+        error, actual = np.concatenate(errors[name]), np.concatenate(actuals[name])
+        metrics[name] = {
+            "mae": round(float(np.mean(np.abs(error))), 3),
+            "rmse": round(float(np.sqrt(np.mean(error ** 2))), 3),
+            "mape": round(float(np.mean(np.abs(error) / actual) * 100), 2),
+            "points": int(len(error)),
+        }
+    return metrics
+
+
+def fit_commodity(name: str, dates: Sequence[str], prices: Sequence[float], previous: Optional[Dict] = None) -> Dict:
+    """
+    Fit (or incrementally refit) every model for one commodity.
+
+    Runs in a worker process. `previous` is the cached state from an earlier
+    call; it is advanced incrementally only if every observation it was fitted
+    on is unchanged (same start, same values), i.e. days were only appended.
+    """
+    series = prepare_series(dates, prices)
+    if len(series) < MIN_OBSERVATIONS:
+        return {"name": name, "status": "insufficient_data", "n_obs": int(len(series)), "version": MODEL_VERSION}
+
+    values = series.values
+    first_date = series.index[0].strftime("%Y-%m-%d")
+    last_date = series.index[-1].strftime("%Y-%m-%d")
+
+    incremental = (
+        previous is not None
+        and previous.get("status") == "ok"
+        and previous.get("version") == MODEL_VERSION
+        and previous.get("first_date") == first_date
+        and previous.get("n_obs", 0) <= len(values)
+        and previous.get("values_hash") == _values_hash(values[:previous["n_obs"]])
+        and previous.get("since_reoptimized", 0) + len(values) - previous["n_obs"] < REOPTIMIZE_EVERY
+    )
+    if incremental:
+        new_values = values[previous["n_obs"]:]
+        models = {
+            "seasonal_naive": {},
+            "exp_smoothing": advance_exp_smoothing(previous["models"]["exp_smoothing"], new_values),
+            "ridge": fit_ridge(values),
+        }
+        metrics = previous["backtest"]
+        since_reoptimized = previous.get("since_reoptimized", 0) + len(new_values)
+    else:
+        models = _fit_models(values)
+        metrics = backtest(values)
+        since_reoptimized = 0
+
+    best = min(metrics, key=lambda m: metrics[m]["mape"]) if metrics else "exp_smoothing"
+    return {
+        "name": name,
+        "status": "ok",
+        "version": MODEL_VERSION,
+        "first_date": first_date,
+        "last_date": last_date,
+        "n_obs": int(len(values)),
+        "values_hash": _values_hash(values),
+        "tail": values[-TAIL:].tolist(),
+        "models": models,
+        "backtest": metrics,
+        "backtest_horizon": BACKTEST_HORIZON,
+        "best": best,
+        "since_reoptimized": since_reoptimized,
+        "incremental": incremental,
+        "fitted_at": datetime.utcnow().isoformat(),
+    }
+
+
+def forecast_from_state(state: Dict, horizon: int) -> Dict:
+    """Forecast `horizon` business days past the state's last observation."""
+    tail = np.asarray(state["tail"], dtype=float)
+    dates = pd.bdate_range(pd.Timestamp(state["last_date"]) + pd.offsets.BDay(1), periods=horizon)
+    forecasts = _forecast_models(state["models"], tail, horizon)
+    return {
+        "dates": [d.strftime("%Y-%m-%d") for d in dates],
+        "models": {name: np.round(values, 2).tolist() for name, values in forecasts.items()},
+    }
+
+
+# ------------------------------------------------------------------ #
+#  Service                                                             #
+# ------------------------------------------------------------------ #
+
+class Forecaster:
+    """Per-commodity fitted state, cached in memory and in MODELS_COLLECTION."""
+
+    def __init__(self):
+        self._states: Dict[str, Dict] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.fits = 0
+        self.incremental_fits = 0
+        self.cache_hits = 0
+
+    # ------------------------------------------------------------------ #
+    #  Public API                                                          #
+    # ------------------------------------------------------------------ #
+
+    async def resolve_name(self, db, name: str) -> Optional[str]:
+        """Exact commodity name, else the most recently observed name matching `name`."""
+        if await db.price_history.find_one({"name": name}, {"_id": 1}):
+            return name
+        doc = await db.price_history.find_one(name_filter(name), {"name": 1}, sort=[("date", -1)])
+        return doc["name"] if doc else None
+
+    async def get_state(self, db, name: str) -> Dict:
+        """Fitted state for `name`, refitted first if newer days exist."""
+        state, _ = await self._get_state(db, name)
+        return state
+
+    async def forecast(self, db, name: str, horizon: int) -> Dict:
+        state = await self.get_state(db, name)
+        result = {
+            "name": name,
+            "status": state["status"],
+            "n_obs": state["n_obs"],
+        }
+        if state["status"] != "ok":
+            return result
+        return {
+            **result,
+            "last_date": state["last_date"],
+            "last_price": round(state["tail"][-1], 2),
+            "horizon": horizon,
+            "best": state["best"],
+            **forecast_from_state(state, horizon),
+            "backtest": state["backtest"],
+            "backtest_horizon": state["backtest_horizon"],
+            "fitted_at": state["fitted_at"],
+        }
+
+    async def train_all(self, db, progress: Optional[Callable] = None) -> Dict:
+        """Bring every commodity's model up to date, spread across the process pool."""
+        names = [n for n in await db.price_history.distinct("name") if isinstance(n, str)]
+        stats = {"commodities": len(names), "fitted": 0, "up_to_date": 0, "insufficient_data": 0, "failed": 0}
+        semaphore = asyncio.Semaphore(worker_pool.MAX_WORKERS)
+
+        async def train(name: str):
+            async with semaphore:
+                try:
+                    state, fitted = await self._get_state(db, name)
+                except Exception as e:
+                    logger.error(f"Forecast training failed for {name}: {e}")
+                    stats["failed"] += 1
+                    return
+            if state["status"] != "ok":
+                stats["insufficient_data"] += 1
+            elif fitted:
+                stats["fitted"] += 1
+            else:
+                stats["up_to_date"] += 1
+            if progress is not None:
+                await progress(name, stats)
+
+        await asyncio.gather(*(train(name) for name in names))
+        return stats
+
+    def stats(self) -> Dict:
+        return {
+            "cached_models": len(self._states),
+            "fits": self.fits,
+            "incremental_fits": self.incremental_fits,
+            "cache_hits": self.cache_hits,
+        }
+
+    # ------------------------------------------------------------------ #
+    #  Internal                                                            #
+    # ------------------------------------------------------------------ #
+
+    async def _get_state(self, db, name: str):
+        """(state, fitted) — concurrent callers for one commodity share a single refresh."""
+        future = self._inflight.get(name)
+        if future is None:
+            future = self._inflight[name] = asyncio.ensure_future(self._refresh(db, name))
+            future.add_done_callback(lambda _: self._inflight.pop(name, None))
+        return await asyncio.shield(future)
+
+    async def _refresh(self, db, name: str):
+        state = self._states.get(name)
+        if state is None:
+            state = await db[MODELS_COLLECTION].find_one({"_id": name})
+        current = state is not None and state.get("version") == MODEL_VERSION
+
+        await collection_versions.sync()
+        source_version = collection_versions.snapshot(["price_history"])[0]
+        if current and state.get("source_version") == source_version:
+            return self._hit(name, state)
+
+        rows = await db.price_history.find(
+            {"name": name}, {"_id": 0, "date": 1, "price": 1}
+        ).sort("date", 1).to_list(length=None)
+        if not rows:
+            raise LookupError(f"No price history for {name}")
+        fingerprint = rows_fingerprint(rows)
+        if current and state.get("source_fingerprint") == fingerprint:
+            # price_history changed, but not this commodity's rows
+            state["source_version"] = source_version
+            try:
+                await db[MODELS_COLLECTION].update_one(
+                    {"_id": name}, {"$set": {"source_version": source_version}}
+                )
+            except Exception as e:
+                logger.warning(f"Could not store forecast model for {name}: {e}")
+            return self._hit(name, state)
+
+        state = await worker_pool.run_in_process(
+            fit_commodity, name, [r["date"] for r in rows], [r.get("price") for r in rows], state
+        )
+        self.fits += 1
+        self.incremental_fits += bool(state.get("incremental"))
+
+        state.update({"_id": name, "source_fingerprint": fingerprint, "source_version": source_version})
+        self._states[name] = state
+        try:
+            await db[MODELS_COLLECTION].replace_one({"_id": name}, state, upsert=True)
+        except Exception as e:
+            logger.warning(f"Could not store forecast model for {name}: {e}")
+        return state, True
+
+    def _hit(self, name: str, state: Dict):
+        self.cache_hits += 1
+        self._states[name] = state
+        return state, False
+
+
+# Singleton
+forecaster = Forecaster()
@@ -3,111 +3,180 @@ Historical Price Archive Backfill
 Iterates over a date range, downloads DA Bantay Presyo PDFs, parses prices,
 and upserts snapshots to the `price_history` MongoDB collection.
 
-Each document: {name, date (YYYY-MM-DD), price, category, source, scraped_at}
+Each document: {name, name_key, name_prefixes, date (YYYY-MM-DD), price, category,
+source, scraped_at} — name_key/name_prefixes are the search fields from
+services/name_search.py.
 Unique index: {name, date}
 
 DA PDFs are only published on weekdays — weekends are skipped automatically.
-Rate limiting: 1.5s delay between page fetches to be polite to DA servers.
+
+Days are processed concurrently (bounded by `concurrency`) over the app-wide
+pooled HTTP session. Every request to da.gov.ph — including retries and the
+second URL pattern — draws from a per-host token bucket, so the politeness
+budget holds no matter how many days are in flight. PDF text extraction and
+price parsing run in the shared process pool so they never stall the event loop.
+PDFs and their parsed prices come from the local PDF cache when already seen,
+so re-running an overlapping range costs no downloads or re-parsing.
+
+At the defaults (4 days in flight, 2 req/s) a one-year backfill (~260 weekdays,
+~1.5 requests/day) finishes in roughly 3–4 minutes instead of ~90.
 """
 
 import asyncio
+import inspect
 import logging
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Awaitable, Callable, Collection, Dict, List, Optional, Union
 
+import aiohttp
+from pymongo import UpdateOne
+
+from services.bulk_writer import BulkWriter
+from services.categorizer import backfill_categorizer
 from services.daily_price_parser import daily_parser
+from services.http_utils import HostRateLimiter, http_clients
+from services.name_search import name_fields, name_index
 
 logger = logging.getLogger(__name__)
 
-RATE_LIMIT_SECS = 1.5
-
-CATEGORY_MAP = {
-    ("rice", "bigas", "milled", "glutinous", "basmati", "premium", "jasponica", "japonica"): "rice",
-    ("chicken", "egg", "poultry"): "poultry",
-    ("pork", "beef", "carabao", "meat"): "meat",
-    ("fish", "tilapia", "bangus", "galunggong", "alumahan", "tuna", "mackerel"): "fish",
-    ("lettuce", "cabbage", "tomato", "onion", "potato", "carrot", "broccoli",
-     "pechay", "ampalaya", "eggplant", "squash", "sayote", "chayote", "mustasa", "corn",
-     "kangkong", "sitaw", "mongo"): "vegetables",
-    ("garlic", "ginger", "chili", "pepper"): "spices",
-    ("diesel", "gasoline", "fuel", "lpg", "kerosene"): "fuel",
-}
+# Days downloaded/parsed at the same time
+DEFAULT_CONCURRENCY = 4
 
+# Politeness budget against da.gov.ph: sustained requests/sec and burst size
+REQUESTS_PER_SECOND = 2.0
+REQUEST_BURST = 4
 
-def _categorize(name: str) -> str:
-    n = name.lower()
-    for keywords, cat in CATEGORY_MAP.items():
-        if any(k in n for k in keywords):
-            return cat
-    return "others"
+ProgressCallback = Callable[[Dict, Dict], Union[None, Awaitable[None]]]
 
 
-async def backfill_date_range(db, start_date: datetime, end_date: datetime) -> dict:
-    """
-    Download and store daily price snapshots for every weekday in [start_date, end_date].
-    Returns stats: {days_attempted, days_success, days_failed, records_upserted}
-    """
-    days_attempted = days_success = days_failed = records_upserted = 0
+def _weekdays(start_date: datetime, end_date: datetime) -> List[datetime]:
+    """All weekdays in [start_date, end_date] — DA doesn't publish on weekends."""
+    days = []
     current = start_date
-
     while current <= end_date:
-        # Skip weekends — DA doesn't publish
-        if current.weekday() >= 5:
-            current += timedelta(days=1)
-            continue
-
-        days_attempted += 1
-        date_str = current.strftime("%Y-%m-%d")
-        logger.info(f"Backfilling {date_str}...")
-
-        try:
-            pdf_bytes = await daily_parser.download_pdf(current)
-            if not pdf_bytes:
-                logger.warning(f"No PDF found for {date_str} — skipping")
-                days_failed += 1
-                current += timedelta(days=1)
-                await asyncio.sleep(RATE_LIMIT_SECS)
-                continue
-
-            text = daily_parser.extract_text_from_pdf(pdf_bytes)
-            prices = daily_parser.parse_prices(text)
-
-            if not prices:
-                logger.warning(f"No prices parsed for {date_str}")
-                days_failed += 1
-                current += timedelta(days=1)
-                await asyncio.sleep(RATE_LIMIT_SECS)
-                continue
-
-            for name, price in prices.items():
-                doc = {
-                    "name": name,
-                    "date": date_str,
-                    "price": price,
-                    "category": _categorize(name),
-                    "source": "DA Bantay Presyo",
-                    "scraped_at": datetime.utcnow().isoformat(),
-                }
-                await db.price_history.update_one(
-                    {"name": name, "date": date_str},
-                    {"$set": doc},
-                    upsert=True,
-                )
-                records_upserted += 1
-
-            days_success += 1
-            logger.info(f"✓ {date_str}: {len(prices)} items upserted")
-
-        except Exception as e:
-            logger.error(f"Error backfilling {date_str}: {e}")
-            days_failed += 1
-
+        if current.weekday() < 5:
+            days.append(current)
         current += timedelta(days=1)
-        await asyncio.sleep(RATE_LIMIT_SECS)
+    return days
+
+
+async def _backfill_day(
+    db,
+    session: aiohttp.ClientSession,
+    rate_limiter: HostRateLimiter,
+    day: datetime,
+) -> Dict:
+    """Download, parse and store one day. Returns {date, status, records}."""
+    date_str = day.strftime("%Y-%m-%d")
+    logger.info(f"Backfilling {date_str}...")
+
+    pdf_bytes = await daily_parser.download_pdf(
+        day, session=session, rate_limiter=rate_limiter
+    )
+    if not pdf_bytes:
+        logger.warning(f"No PDF found for {date_str} — skipping")
+        return {"date": date_str, "status": "missing", "records": 0}
+
+    prices = await daily_parser.parse_pdf(pdf_bytes)
+    if not prices:
+        logger.warning(f"No prices parsed for {date_str}")
+        return {"date": date_str, "status": "empty", "records": 0}
+
+    # One unordered bulk_write per day instead of ~200 update_one round trips
+    scraped_at = datetime.utcnow().isoformat()
+    categories = backfill_categorizer.categorize_many(prices)
+    async with BulkWriter(db.price_history) as writer:
+        for (name, price), category in zip(prices.items(), categories):
+            doc = {
+                "name": name,
+                **name_fields(name),
+                "date": date_str,
+                "price": price,
+                "category": category,
+                "source": "DA Bantay Presyo",
+                "scraped_at": scraped_at,
+            }
+            await writer.add(
+                UpdateOne({"name": name, "date": date_str}, {"$set": doc}, upsert=True)
+            )
+
+    records = writer.ops_queued - writer.error_count
+    logger.info(f"✓ {date_str}: {records} items upserted")
+    return {"date": date_str, "status": "success", "records": records}
+
+
+async def backfill_date_range(
+    db,
+    start_date: datetime,
+    end_date: datetime,
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    requests_per_second: float = REQUESTS_PER_SECOND,
+    progress: Optional[ProgressCallback] = None,
+    skip_dates: Collection[str] = (),
+) -> dict:
+    """
+    Download and store daily price snapshots for every weekday in [start_date, end_date].
 
-    return {
-        "days_attempted": days_attempted,
-        "days_success": days_success,
-        "days_failed": days_failed,
-        "records_upserted": records_upserted,
+    Args:
+        concurrency: Max days downloaded/parsed at once.
+        requests_per_second: Sustained request budget against da.gov.ph.
+        progress: Optional callback `(day_result, stats)` invoked as each day
+                  finishes (in completion order, not date order). May be async.
+        skip_dates: YYYY-MM-DD dates already backfilled (e.g. from a resumed
+                    job's checkpoint) — not downloaded again.
+
+    Returns stats: {days_attempted, days_success, days_failed, records_upserted}
+    """
+    skip = set(skip_dates)
+    days = [d for d in _weekdays(start_date, end_date) if d.strftime("%Y-%m-%d") not in skip]
+    stats = {
+        "days_attempted": len(days),
+        "days_success": 0,
+        "days_failed": 0,
+        "records_upserted": 0,
     }
+    if not days:
+        return stats
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    rate_limiter = HostRateLimiter(rate=requests_per_second, burst=REQUEST_BURST)
+
+    session = http_clients.session()
+
+    async def run_day(day: datetime):
+        async with semaphore:
+            try:
+                result = await _backfill_day(db, session, rate_limiter, day)
+            except Exception as e:
+                logger.error(f"Error backfilling {day.strftime('%Y-%m-%d')}: {e}")
+                result = {"date": day.strftime("%Y-%m-%d"), "status": "error", "records": 0}
+
+        if result["status"] == "success":
+            stats["days_success"] += 1
+        else:
+            stats["days_failed"] += 1
+        stats["records_upserted"] += result["records"]
+
+        if progress is not None:
+            outcome = progress(result, dict(stats))
+            if inspect.isawaitable(outcome):
+                await outcome
+
+    tasks = [asyncio.create_task(run_day(day)) for day in days]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # A failing progress callback (or cancellation) stops the whole
+        # backfill — no day keeps downloading after the caller has given up
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    await name_index.refresh(db)
+
+    logger.info(
+        f"Backfill done — {stats['days_success']}/{stats['days_attempted']} days, "
+        f"{stats['records_upserted']} records"
+    )
+    return stats
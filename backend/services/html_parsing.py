@@ -0,0 +1,104 @@
+"""
+Shared HTML parsing, kept off the event loop.
+
+The DOE and market scrapers used to build a full BeautifulSoup tree with the
+pure-Python `html.parser` for every page, inline on the event loop. A DOE
+listing page is mostly the __NUXT__ payload, nav and styles, none of which
+the scrapers read. Parsing here:
+
+  * uses lxml as the tree builder when it is installed (`PARSER`), falling
+    back to html.parser
+  * `soup(html, only=SoupStrainer(...))` builds only the elements the caller
+    reads instead of the whole document, and `fragments()` goes further for
+    small non-nesting elements (a pagination <select>): they are sliced out
+    of the raw text so the rest of the page is never tokenized
+  * `script_json()` reads a JSON value straight out of an inline script by
+    slicing the page and json-decoding from the key — no tree at all
+  * `parse(fn, html, ...)` runs a parser function inline for small documents
+    and in the shared process pool (services/worker_pool.py) for documents
+    of OFFLOAD_BYTES or more
+
+Env vars:
+  HTML_OFFLOAD_BYTES — documents at least this long (in characters) are parsed
+                       in the worker pool (default 65536 — a full parse of a
+                       larger page blocks the loop for well over 10 ms)
+"""
+
+import json
+import logging
+import os
+import re
+from typing import Any, Callable, List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from services.worker_pool import run_in_process
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml  # noqa: F401
+
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+OFFLOAD_BYTES = int(os.environ.get("HTML_OFFLOAD_BYTES", str(64 * 1024)))
+
+_decoder = json.JSONDecoder()
+
+
+def soup(html: str, only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Parse `html` (only the parts matching `only`, if given)."""
+    return BeautifulSoup(html, PARSER, parse_only=only)
+
+
+def html_to_text(html: str) -> str:
+    """Visible text of an HTML fragment, whitespace-joined."""
+    if "<" not in html:
+        return " ".join(html.split())
+    return soup(html).get_text(separator=" ", strip=True)
+
+
+def fragments(html: str, tag: str) -> List[str]:
+    """Raw `<tag ...>...</tag>` substrings of `html`. Only for tags that don't nest."""
+    return re.findall(rf"<{tag}\b.*?</{tag}\s*>", html, re.IGNORECASE | re.DOTALL)
+
+
+def script_json(html: str, marker: str, key: str) -> Any:
+    """
+    The JSON value of the first `"key": ...` inside the inline script that
+    starts at `marker` (e.g. "window.__NUXT__"), or None if absent/unparseable.
+
+    Only the script is searched, and the JSON decoder finds the end of the
+    value itself, so nested arrays and strings containing brackets are safe.
+    """
+    start = html.find(marker)
+    if start < 0:
+        return None
+    end = html.find("</script>", start)
+    script = html[start:end] if end >= 0 else html[start:]
+
+    match = re.search(rf'"{re.escape(key)}"\s*:\s*', script)
+    if not match:
+        return None
+    try:
+        value, _ = _decoder.raw_decode(script, match.end())
+    except json.JSONDecodeError:
+        # The JS may use `undefined` — normalize for JSON parsing
+        try:
+            value, _ = _decoder.raw_decode(script[match.end():].replace("undefined", "null"))
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse {key} JSON from {marker}: {e}")
+            return None
+    return value
+
+
+async def parse(fn: Callable, html: str, *args) -> Any:
+    """
+    `fn(html, *args)` — inline for small documents, in the worker pool for
+    large ones. `fn` must be a module-level (picklable) function.
+    """
+    if len(html) < OFFLOAD_BYTES:
+        return fn(html, *args)
+    return await run_in_process(fn, html, *args)
@@ -1,10 +1,31 @@
 """
 Shared HTTP utilities for the Climate Intel backend.
-Provides retry-with-backoff for aiohttp requests.
+Provides the app-wide pooled client session, retry-with-backoff for aiohttp
+requests, capped response reads and per-host rate limiting.
+
+Every integration gets its session from `http_clients.session()` instead of
+opening its own, so TCP+TLS connections (and DNS lookups) are reused across
+integrations and requests. The session is created lazily on first use and
+closed on app shutdown. It is bound to the event loop it was created on; code
+running under a fresh `asyncio.run()` (scheduler.py, tests) transparently gets
+a new one.
+
+Env vars:
+  HTTP_POOL_LIMIT          — max open connections in total (default 100)
+  HTTP_LIMIT_PER_HOST      — max open connections per host (default 10)
+  HTTP_KEEPALIVE_SECONDS   — idle keep-alive before a connection is closed (default 30)
+  HTTP_DNS_CACHE_SECONDS   — DNS cache TTL (default 300)
+  HTTP_MAX_RESPONSE_BYTES  — cap for bodies read via read_capped (default 50 MB)
+  HTTP_MAX_RETRIES         — attempts per request in fetch_with_retry (default 3)
+  HTTP_BACKOFF_BASE        — exponential backoff base in seconds (default 2)
 """
 import asyncio
+import json
 import logging
-from typing import Optional
+import os
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
 
 import aiohttp
 
@@ -15,46 +36,248 @@ DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
 }
 
+POOL_LIMIT = int(os.environ.get("HTTP_POOL_LIMIT", "100"))
+LIMIT_PER_HOST = int(os.environ.get("HTTP_LIMIT_PER_HOST", "10"))
+KEEPALIVE_SECONDS = float(os.environ.get("HTTP_KEEPALIVE_SECONDS", "30"))
+DNS_CACHE_SECONDS = int(os.environ.get("HTTP_DNS_CACHE_SECONDS", "300"))
+MAX_RESPONSE_BYTES = int(os.environ.get("HTTP_MAX_RESPONSE_BYTES", str(50 * 1024 * 1024)))
+
+# Shared retry policy — fetch_with_retry's defaults
+MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.environ.get("HTTP_BACKOFF_BASE", "2"))
+# Longest Retry-After (seconds) honoured on a 429 before giving up on the URL
+MAX_RETRY_AFTER = 60.0
+
+
+class ResponseTooLarge(Exception):
+    """Raised by read_capped when a body exceeds its size cap."""
+
+
+class HTTPClientManager:
+    """
+    Owns the app-wide aiohttp.ClientSession and its pooled TCPConnector:
+    keep-alive connections, a per-host connection limit and a DNS cache.
+    """
+
+    def __init__(
+        self,
+        limit: int = POOL_LIMIT,
+        limit_per_host: int = LIMIT_PER_HOST,
+        keepalive_timeout: float = KEEPALIVE_SECONDS,
+        dns_cache_ttl: int = DNS_CACHE_SECONDS,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.sessions_created = 0
+
+    def session(self) -> aiohttp.ClientSession:
+        """Return the shared session for the running loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # A session left behind by a finished loop can't be used (or closed) here
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                enable_cleanup_closed=True,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=DEFAULT_TIMEOUT)
+            self._loop = loop
+            self.sessions_created += 1
+        return self._session
+
+    async def close(self):
+        """Close the shared session (call on shutdown / before a loop ends)."""
+        session, self._session, self._loop = self._session, None, None
+        if session is not None and not session.closed:
+            await session.close()
+
+    def stats(self) -> Dict:
+        connector = self._session.connector if self._session is not None else None
+        return {
+            "open": self._session is not None and not self._session.closed,
+            "sessions_created": self.sessions_created,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "keepalive_timeout": self.keepalive_timeout,
+            "dns_cache_ttl": self.dns_cache_ttl,
+            "idle_connections": (
+                sum(len(conns) for conns in connector._conns.values())
+                if connector is not None
+                else 0
+            ),
+        }
+
+
+http_clients = HTTPClientManager()
+
+
+async def read_capped(
+    response: aiohttp.ClientResponse, max_bytes: int = MAX_RESPONSE_BYTES
+) -> bytes:
+    """
+    Read a response body, raising ResponseTooLarge past `max_bytes`.
+    A too-large Content-Length fails before anything is downloaded.
+    """
+    if response.content_length is not None and response.content_length > max_bytes:
+        response.release()
+        raise ResponseTooLarge(
+            f"{response.url}: Content-Length {response.content_length} > {max_bytes}"
+        )
+    chunks, size = [], 0
+    async for chunk in response.content.iter_chunked(64 * 1024):
+        size += len(chunk)
+        if size > max_bytes:
+            response.close()
+            raise ResponseTooLarge(f"{response.url}: body exceeds {max_bytes} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def read_text(
+    response: aiohttp.ClientResponse, max_bytes: int = MAX_RESPONSE_BYTES
+) -> str:
+    """read_capped, decoded with the Content-Type charset (utf-8 if none or unknown)."""
+    data = await read_capped(response, max_bytes)
+    # Not response.get_encoding(): its charset sniffing needs the body aiohttp
+    # itself read, and raises for a body streamed through read_capped
+    encoding = response.charset or "utf-8"
+    try:
+        return data.decode(encoding, errors="replace")
+    except LookupError:
+        return data.decode("utf-8", errors="replace")
+
+
+async def read_json(
+    response: aiohttp.ClientResponse, max_bytes: int = MAX_RESPONSE_BYTES
+) -> Any:
+    """read_capped, parsed as JSON."""
+    return json.loads(await read_capped(response, max_bytes))
+
+
+class TokenBucket:
+    """
+    Async token bucket: refills at `rate` tokens/sec up to `capacity` tokens.
+    `acquire()` waits until a token is available, so callers sharing a bucket
+    never exceed the configured request rate (beyond the initial burst).
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        # The lock serializes waiters so tokens are handed out in FIFO order
+        async with self._get_lock():
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+
+class HostRateLimiter:
+    """One TokenBucket per hostname — a politeness budget for each remote site."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    async def acquire(self, url: str):
+        host = urlparse(url).hostname or ""
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        await bucket.acquire()
+
 
 async def fetch_with_retry(
-    session: aiohttp.ClientSession,
+    session: Optional[aiohttp.ClientSession],
     url: str,
     *,
-    max_retries: int = 3,
-    backoff_base: float = 2.0,
+    max_retries: int = MAX_RETRIES,
+    backoff_base: float = BACKOFF_BASE,
     headers: dict = None,
+    rate_limiter: Optional[HostRateLimiter] = None,
+    method: str = "GET",
+    **request_kwargs,
 ) -> Optional[aiohttp.ClientResponse]:
     """
     Fetch a URL with retry and exponential backoff.
 
-    Returns the aiohttp response on HTTP 200.
+    `session` None means the shared `http_clients` session. Extra keyword
+    arguments (params, json, timeout, ...) are passed to `session.request`.
+
+    Returns the aiohttp response on HTTP 200, or on 304 Not Modified (only
+    sent when the caller passes conditional headers — see services/pdf_cache).
     Returns None on:
       - HTTP 404 (immediately, no retry — resource doesn't exist)
       - All retries exhausted (5xx, timeouts, connection errors)
 
     Retries on:
       - HTTP 5xx server errors
+      - HTTP 429, after the server's Retry-After (if at most MAX_RETRY_AFTER)
       - aiohttp.ClientError (connection reset, DNS failure, etc.)
       - asyncio.TimeoutError
+
+    If `rate_limiter` is given, every attempt (including retries) waits for a
+    token from the target host's bucket first.
     """
     merged_headers = {**DEFAULT_HEADERS, **(headers or {})}
+    if session is None:
+        session = http_clients.session()
 
     for attempt in range(max_retries):
         try:
-            response = await session.get(url, headers=merged_headers)
+            if rate_limiter is not None:
+                await rate_limiter.acquire(url)
+            response = await session.request(
+                method, url, headers=merged_headers, **request_kwargs
+            )
 
-            if response.status == 200:
+            if response.status in (200, 304):
                 return response
 
             if response.status == 404:
                 # Resource doesn't exist — no point retrying
                 logger.info(f"404 Not Found: {url}")
+                response.release()
                 return None
 
+            if response.status == 429:
+                retry_after = _retry_after(response)
+                response.release()
+                if retry_after is None or retry_after > MAX_RETRY_AFTER:
+                    logger.warning(f"HTTP 429 (Retry-After {retry_after}): {url}")
+                    return None
+                logger.info(f"HTTP 429 — retrying in {retry_after:.0f}s: {url}")
+                await asyncio.sleep(retry_after)
+                continue
+
             if response.status >= 500:
                 logger.warning(
                     f"HTTP {response.status} on attempt {attempt + 1}/{max_retries}: {url}"
                 )
+                response.release()
                 if attempt < max_retries - 1:
                     wait = backoff_base ** attempt
                     logger.info(f"Retrying in {wait:.0f}s...")
@@ -63,6 +286,7 @@ async def fetch_with_retry(
 
             # Other 4xx — don't retry
             logger.info(f"HTTP {response.status}: {url}")
+            response.release()
             return None
 
         except (aiohttp.ClientError, asyncio.TimeoutError) as e:
@@ -76,3 +300,12 @@ async def fetch_with_retry(
 
     logger.warning(f"All {max_retries} attempts failed: {url}")
     return None
+
+
+def _retry_after(response: aiohttp.ClientResponse) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds form only)."""
+    value = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
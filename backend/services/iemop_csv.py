@@ -0,0 +1,208 @@
+"""
+Streaming parser for IEMOP market price (MP_YYYYMMDD.csv) files.
+
+A full day's file holds one row per resource per 5-minute RTD interval — tens
+of MB of text. Instead of buffering the whole body and walking it with
+csv.DictReader, MarketPriceAggregator is fed the response body chunk by chunk:
+complete lines are collected into batches of ~BATCH_BYTES and each batch is
+parsed by pandas' C reader (only TIME_INTERVAL, REGION_NAME and
+MARGINAL_PRICE), then folded into running per-(region, interval) totals.
+Memory stays bounded by the batch size plus one small record per interval,
+however large the file.
+
+Results:
+  region_stats()     {region: {current, average, min, max}} — same as the old
+                     whole-file parser (current = the region's last row)
+  interval_prices()  {region: [{interval, seq, price, min, max, count, last}]}
+                     — price is the mean marginal price across resources,
+                     in file order (seq)
+
+Usage:
+    agg = MarketPriceAggregator(REGION_MAP)
+    async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+        agg.feed(chunk)
+    agg.close()
+"""
+
+import codecs
+import csv
+import io
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+BATCH_BYTES = 1024 * 1024
+
+INTERVAL_COL = "TIME_INTERVAL"
+REGION_COL = "REGION_NAME"
+PRICE_COL = "MARGINAL_PRICE"
+
+
+class MarketPriceAggregator:
+    """Incremental per-region / per-interval statistics over an MP CSV stream."""
+
+    def __init__(self, region_map: Dict[str, str], batch_bytes: int = BATCH_BYTES):
+        self.region_map = region_map
+        self.batch_bytes = batch_bytes
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._header: Optional[List[str]] = None
+        self._partial = ""
+        self._chunks: List[str] = []
+        self._buffered = 0
+
+        # (region, interval) → [seq, sum, count, min, max, last]; dict order = file order
+        self._intervals: Dict[tuple, list] = {}
+        self._last: Dict[str, float] = {}
+
+        self.rows = 0
+        self.bytes = 0
+
+    # ------------------------------------------------------------------ #
+    #  Public API                                                          #
+    # ------------------------------------------------------------------ #
+
+    def feed(self, data: bytes):
+        self.bytes += len(data)
+        text = self._partial + self._decoder.decode(data)
+        cut = text.rfind("\n") + 1
+        self._partial = text[cut:]
+        if cut:
+            self._add_text(text[:cut])
+
+    def close(self):
+        """Flush the final (possibly unterminated) line and any buffered batch."""
+        tail = self._partial + self._decoder.decode(b"", final=True)
+        self._partial = ""
+        if tail.strip():
+            self._add_text(tail + "\n")
+        self._flush()
+
+    def region_stats(self) -> Dict[str, Dict]:
+        totals: Dict[str, list] = {}
+        for (region, _), (_, total, count, low, high, _) in self._intervals.items():
+            acc = totals.get(region)
+            if acc is None:
+                totals[region] = [total, count, low, high]
+            else:
+                acc[0] += total
+                acc[1] += count
+                acc[2] = min(acc[2], low)
+                acc[3] = max(acc[3], high)
+        return {
+            region: {
+                "current": self._last[region],
+                "average": total / count,
+                "min": low,
+                "max": high,
+            }
+            for region, (total, count, low, high) in totals.items()
+        }
+
+    def interval_prices(self) -> Dict[str, List[Dict]]:
+        out: Dict[str, List[Dict]] = {}
+        for (region, interval), (seq, total, count, low, high, last) in self._intervals.items():
+            out.setdefault(region, []).append(
+                {
+                    "interval": interval,
+                    "seq": seq,
+                    "price": total / count,
+                    "min": low,
+                    "max": high,
+                    "count": count,
+                    "last": last,
+                }
+            )
+        return out
+
+    # ------------------------------------------------------------------ #
+    #  Internal                                                            #
+    # ------------------------------------------------------------------ #
+
+    def _add_text(self, text: str):
+        """Buffer complete lines; parse once a batch's worth has accumulated."""
+        if self._header is None:
+            text = text.lstrip("\r\n")
+            if not text:
+                return
+            first, _, text = text.partition("\n")
+            self._header = [h.strip().lstrip("\ufeff") for h in next(csv.reader([first]))]
+        self._chunks.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.batch_bytes:
+            self._flush()
+
+    def _flush(self):
+        if not self._chunks or self._header is None:
+            return
+        text = "".join(self._chunks)
+        self._chunks, self._buffered = [], 0
+
+        columns = (INTERVAL_COL, REGION_COL, PRICE_COL)
+        if not all(c in self._header for c in columns):
+            logger.error(f"IEMOP MP CSV is missing one of {columns}: header={self._header}")
+            return
+
+        try:
+            df = pd.read_csv(
+                io.StringIO(text),
+                header=None,
+                names=self._header,
+                usecols=list(columns),
+                # Few distinct regions/intervals: categoricals are parsed once per value
+                dtype={INTERVAL_COL: "category", REGION_COL: "category"},
+                keep_default_na=False,
+                na_values={PRICE_COL: [""]},
+                skip_blank_lines=True,
+                on_bad_lines="skip",
+                engine="c",
+            )
+        except Exception as exc:
+            logger.error(f"Error parsing IEMOP MP CSV batch: {exc}")
+            return
+
+        # Work on category codes: strip/map each distinct value once, not every row.
+        # Code -1 (missing value) indexes the trailing "" entry.
+        region_col, interval_col = df[REGION_COL].cat, df[INTERVAL_COL].cat
+        region_names = [self.region_map.get(str(c).strip(), "") for c in region_col.categories] + [""]
+        interval_names = [str(v).strip() for v in interval_col.categories] + [""]
+        region_codes = region_col.codes.to_numpy()
+        interval_codes = interval_col.codes.to_numpy()
+
+        prices = df[PRICE_COL]
+        if prices.dtype != np.float64:
+            # Non-numeric values in this batch — fall back to per-value coercion
+            prices = pd.to_numeric(prices.astype(str).str.strip(), errors="coerce")
+        prices = prices.to_numpy(dtype=np.float64)
+
+        known = np.array([name != "" for name in region_names])
+        keep = known[region_codes] & np.isfinite(prices)
+        if not keep.any():
+            return
+        region_codes, interval_codes, prices = region_codes[keep], interval_codes[keep], prices[keep]
+        self.rows += len(prices)
+
+        # One integer key per (region, interval) pair
+        key = region_codes.astype(np.int64) * len(interval_names) + interval_codes
+        stats = pd.Series(prices).groupby(key, sort=False).agg(["sum", "count", "min", "max", "last"])
+        intervals = self._intervals
+        for k, total, count, low, high, last in stats.itertuples(name=None):
+            pair = (region_names[k // len(interval_names)], interval_names[k % len(interval_names)])
+            acc = intervals.get(pair)
+            if acc is None:
+                intervals[pair] = [len(intervals), float(total), int(count), float(low), float(high), float(last)]
+            else:
+                acc[1] += float(total)
+                acc[2] += int(count)
+                acc[3] = min(acc[3], float(low))
+                acc[4] = max(acc[4], float(high))
+                acc[5] = float(last)
+
+        # Last row of each region in this batch
+        last_rows = pd.Series(np.arange(len(prices))).groupby(region_codes).last()
+        for code, row in last_rows.items():
+            self._last[region_names[code]] = float(prices[row])
@@ -0,0 +1,128 @@
+"""
+Job handlers for long-running integrations (see services/job_runner.py).
+
+  historical_backfill      params {start_date, end_date, concurrency}
+                           checkpoint {last_completed_date, completed_dates, stats}
+  comprehensive_real_data  params {days} — idempotent upserts, re-run on resume
+  doe_full_update          checkpoint {issuances_updated} — the crawl resumes from the
+                           frontier run_doe_update keeps in `crawl_frontier`
+  forecast_training        no params — refits forecast models with new price_history days
+  telegram_broadcast       params {message} — the job id doubles as the broadcast id,
+                           so a resumed job skips chats it already reached
+
+Importing this module registers the handlers on the `job_runner` singleton.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict
+
+from services.comprehensive_real_data import integrate_comprehensive_real_data
+from services.doe_integration import run_doe_update
+from services.forecasting import forecaster
+from services.historical_backfill import DEFAULT_CONCURRENCY, backfill_date_range
+from services.job_runner import JobContext, job_runner
+from services.telegram_broadcast import broadcast_dispatcher
+
+logger = logging.getLogger(__name__)
+
+
+@job_runner.handler("historical_backfill")
+async def historical_backfill_job(ctx: JobContext) -> Dict:
+    start = datetime.strptime(ctx.params["start_date"], "%Y-%m-%d")
+    end = datetime.strptime(ctx.params["end_date"], "%Y-%m-%d")
+    concurrency = ctx.params.get("concurrency", DEFAULT_CONCURRENCY)
+
+    completed = set(ctx.checkpoint.get("completed_dates", []))
+    totals = dict(
+        ctx.checkpoint.get("stats")
+        or {"days_attempted": 0, "days_success": 0, "days_failed": 0, "records_upserted": 0}
+    )
+    base = dict(totals)
+
+    async def on_day(day_result: Dict, stats: Dict):
+        # Days finish out of order; only missing/successful days count as done —
+        # errored days (network failures) are retried when the job resumes.
+        if day_result["status"] != "error":
+            completed.add(day_result["date"])
+        for key in totals:
+            totals[key] = base[key] + stats[key]
+        done = sorted(completed)
+        await ctx.report(
+            {"last_date": day_result["date"], **totals},
+            checkpoint={
+                "last_completed_date": done[-1] if done else None,
+                "completed_dates": done,
+                "stats": totals,
+            },
+        )
+
+    await backfill_date_range(
+        ctx.db,
+        start,
+        end,
+        concurrency=concurrency,
+        progress=on_day,
+        skip_dates=completed,
+    )
+    return totals
+
+
+@job_runner.handler("comprehensive_real_data")
+async def comprehensive_real_data_job(ctx: JobContext) -> Dict:
+    days = ctx.params.get("days", 7)
+    await ctx.report({"stage": "integrating", "days": days})
+
+    if not await integrate_comprehensive_real_data(ctx.db, days):
+        raise RuntimeError("Integration failed - check logs for details")
+
+    count = await ctx.db.market_items.count_documents({})
+    sample = await ctx.db.market_items.find_one({}, {"metadata": 1, "name": 1, "trend": 1})
+    return {
+        "message": "Real historical data integrated successfully",
+        "total_items": count,
+        "data_source": "DA Bantay Presyo Daily Price Index",
+        "days_analyzed": days,
+        "sample": {
+            "item": sample.get("name") if sample else None,
+            "trend_points": len(sample.get("trend", [])) if sample else 0,
+            "date_range": sample.get("metadata", {}).get("date_range") if sample else None,
+        },
+    }
+
+
+@job_runner.handler("doe_full_update")
+async def doe_full_update_job(ctx: JobContext) -> Dict:
+    # run_doe_update resumes from the crawl frontier it persists itself
+    already = ctx.checkpoint.get("issuances_updated", 0)
+
+    async def on_page(page_num: int, max_page: int, updated: int):
+        await ctx.report(
+            {"page": page_num, "max_page": max_page, "issuances_updated": already + updated},
+            checkpoint={"issuances_updated": already + updated},
+        )
+
+    result = await run_doe_update(ctx.db, full=True, progress=on_page)
+    if not result.get("success"):
+        raise RuntimeError(result.get("error", "DOE update failed"))
+    result["issuances_updated"] += already
+    return result
+
+
+@job_runner.handler("forecast_training")
+async def forecast_training_job(ctx: JobContext) -> Dict:
+    # Already-current models are cache hits, so a resumed job just skips them
+    async def on_commodity(name: str, stats: Dict):
+        await ctx.report({"last_commodity": name, **stats})
+
+    return await forecaster.train_all(ctx.db, progress=on_commodity)
+
+
+@job_runner.handler("telegram_broadcast")
+async def telegram_broadcast_job(ctx: JobContext) -> Dict:
+    async def on_progress(stats: Dict):
+        await ctx.report(stats)
+
+    return await broadcast_dispatcher.broadcast(
+        ctx.db, ctx.params["message"], broadcast_id=ctx.job_id, progress=on_progress
+    )
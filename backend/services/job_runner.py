@@ -0,0 +1,304 @@
+"""
+Background job runner for long integrations.
+
+Long-running work (historical backfill, comprehensive DA integration, full DOE
+crawl) used to run inside the request handler, so a Render proxy timeout killed
+it with no way to resume. Instead, endpoints submit a job and return its id
+immediately; the work runs in a background task queue.
+
+Jobs are persisted in the `jobs` collection:
+  {_id (job id), kind, params, status, progress, checkpoint, result, error,
+   attempts, worker_id, created_at, started_at, heartbeat_at, finished_at}
+
+Status flow: queued → running → succeeded | failed
+
+Handlers save a `checkpoint` as they go (e.g. last completed date/page). When a
+worker restarts, jobs left queued — or running with a stale heartbeat — are
+re-queued and the handler resumes from its stored checkpoint.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+# Parallel jobs per process — integrations are network/DB bound but share
+# politeness budgets with the request path, so keep this small.
+WORKER_CONCURRENCY = 1
+
+# A running job whose heartbeat is older than this is considered orphaned
+HEARTBEAT_INTERVAL = 30  # seconds
+STALE_AFTER = timedelta(minutes=3)
+
+# Give up on a job after this many (re)starts — e.g. it keeps crashing the worker
+MAX_ATTEMPTS = 3
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+JobHandler = Callable[["JobContext"], Awaitable[Dict]]
+
+
+class JobContext:
+    """Passed to handlers: job params, resume checkpoint and a progress reporter."""
+
+    def __init__(self, runner: "JobRunner", job: Dict):
+        self.runner = runner
+        self.db = runner.db
+        self.job_id = job["_id"]
+        self.params: Dict = job.get("params") or {}
+        self.checkpoint: Dict = job.get("checkpoint") or {}
+        # Handlers report from concurrent tasks; writes go out one at a time,
+        # in call order, so an older checkpoint never lands after a newer one
+        self._report_lock = asyncio.Lock()
+
+    async def report(self, progress: Dict, checkpoint: Optional[Dict] = None):
+        """Persist progress (and optionally a new checkpoint) for this job."""
+        async with self._report_lock:
+            update = {"progress": progress, "heartbeat_at": datetime.utcnow()}
+            if checkpoint is not None:
+                self.checkpoint = checkpoint
+                update["checkpoint"] = checkpoint
+            await self.db.jobs.update_one({"_id": self.job_id}, {"$set": update})
+
+
+class JobRunner:
+    """In-process task queue backed by the `jobs` collection."""
+
+    def __init__(self, concurrency: int = WORKER_CONCURRENCY):
+        self.concurrency = concurrency
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.db = None
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._running: Dict[str, asyncio.Task] = {}
+
+    # ------------------------------------------------------------------ #
+    #  Public API                                                          #
+    # ------------------------------------------------------------------ #
+
+    def handler(self, kind: str):
+        """Decorator registering an async handler `fn(ctx) -> result dict`."""
+
+        def register(fn: JobHandler) -> JobHandler:
+            self._handlers[kind] = fn
+            return fn
+
+        return register
+
+    async def start(self, db):
+        """Start worker tasks and re-queue unfinished jobs (call on app startup)."""
+        self.db = db
+        self._queue = asyncio.Queue()
+        for _ in range(self.concurrency):
+            self._tasks.append(asyncio.create_task(self._worker()))
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+        await self._requeue_unfinished()
+        logger.info(f"Job runner started (worker {self.worker_id})")
+
+    async def stop(self):
+        """Stop workers. Interrupted jobs go back to `queued` and resume on restart."""
+        # Snapshot first — cancelled handlers drop themselves from _running
+        interrupted = list(self._running)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if interrupted:
+            await self.db.jobs.update_many(
+                {"_id": {"$in": interrupted}, "status": "running"},
+                {"$set": {"status": "queued", "worker_id": None}},
+            )
+
+    async def submit(self, kind: str, params: Optional[Dict] = None) -> str:
+        """Persist a new job and enqueue it. Returns the job id."""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        now = datetime.utcnow()
+        await self.db.jobs.insert_one(
+            {
+                "_id": job_id,
+                "kind": kind,
+                "params": params or {},
+                "status": "queued",
+                "progress": {},
+                "checkpoint": {},
+                "result": None,
+                "error": None,
+                "attempts": 0,
+                "worker_id": None,
+                "created_at": now,
+                "started_at": None,
+                "heartbeat_at": None,
+                "finished_at": None,
+            }
+        )
+        await self._queue.put(job_id)
+        logger.info(f"Job {job_id} ({kind}) queued")
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        return await self.db.jobs.find_one({"_id": job_id})
+
+    async def watch(self, job_id: str, poll_interval: float = 1.0) -> AsyncIterator[Dict]:
+        """
+        Yield the job document each time its status/progress changes, until it
+        reaches a terminal status. Polls MongoDB so it works across processes.
+        """
+        last = None
+        while True:
+            job = await self.get(job_id)
+            if job is None:
+                return
+            snapshot = (job.get("status"), job.get("progress"), job.get("error"))
+            if snapshot != last:
+                last = snapshot
+                yield job
+            if job.get("status") in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(poll_interval)
+
+    # ------------------------------------------------------------------ #
+    #  Internal                                                            #
+    # ------------------------------------------------------------------ #
+
+    async def _requeue_unfinished(self):
+        """Queue jobs left `queued`, or `running` with a stale heartbeat."""
+        stale_before = datetime.utcnow() - STALE_AFTER
+        await self.db.jobs.update_many(
+            {
+                "status": "running",
+                "$or": [
+                    {"heartbeat_at": {"$lt": stale_before}},
+                    {"heartbeat_at": None},
+                ],
+            },
+            {"$set": {"status": "queued", "worker_id": None}},
+        )
+        resumed = 0
+        async for job in self.db.jobs.find({"status": "queued"}, {"_id": 1}).sort("created_at", 1):
+            await self._queue.put(job["_id"])
+            resumed += 1
+        if resumed:
+            logger.info(f"Re-queued {resumed} unfinished job(s)")
+
+    async def _claim(self, job_id: str) -> Optional[Dict]:
+        now = datetime.utcnow()
+        return await self.db.jobs.find_one_and_update(
+            {"_id": job_id, "status": "queued"},
+            {
+                "$set": {
+                    "status": "running",
+                    "worker_id": self.worker_id,
+                    "started_at": now,
+                    "heartbeat_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _finish(self, job_id: str, status: str, result=None, error=None):
+        await self.db.jobs.update_one(
+            {"_id": job_id},
+            {
+                "$set": {
+                    "status": status,
+                    "result": result,
+                    "error": error,
+                    "finished_at": datetime.utcnow(),
+                }
+            },
+        )
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = await self._claim(job_id)
+                if job is None:
+                    continue  # claimed elsewhere or already finished
+                if job["attempts"] > MAX_ATTEMPTS:
+                    await self._finish(job_id, "failed", error="Exceeded max attempts")
+                    continue
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job runner error for {job_id}: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Dict):
+        job_id, kind = job["_id"], job["kind"]
+        handler = self._handlers.get(kind)
+        if handler is None:
+            await self._finish(job_id, "failed", error=f"No handler for job kind '{kind}'")
+            return
+
+        ctx = JobContext(self, job)
+        if ctx.checkpoint:
+            logger.info(f"Job {job_id} ({kind}) resuming from checkpoint {ctx.checkpoint}")
+        else:
+            logger.info(f"Job {job_id} ({kind}) started")
+
+        self._running[job_id] = asyncio.current_task()
+        try:
+            result = await handler(ctx)
+            await self._finish(job_id, "succeeded", result=result)
+            logger.info(f"Job {job_id} ({kind}) succeeded")
+        except asyncio.CancelledError:
+            raise  # shutdown — stop() puts the job back in the queue
+        except Exception as e:
+            logger.error(f"Job {job_id} ({kind}) failed: {e}", exc_info=True)
+            await self._finish(job_id, "failed", error=str(e))
+        finally:
+            self._running.pop(job_id, None)
+
+    async def _heartbeat(self):
+        """Keep running jobs fresh and pick up jobs orphaned by dead workers."""
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            try:
+                if self._running:
+                    await self.db.jobs.update_many(
+                        {"_id": {"$in": list(self._running)}},
+                        {"$set": {"heartbeat_at": datetime.utcnow()}},
+                    )
+                await self._requeue_orphans()
+            except Exception as e:
+                logger.warning(f"Job heartbeat failed: {e}")
+
+    async def _requeue_orphans(self):
+        stale_before = datetime.utcnow() - STALE_AFTER
+        async for job in self.db.jobs.find(
+            {"status": "running", "heartbeat_at": {"$lt": stale_before}}, {"_id": 1}
+        ):
+            result = await self.db.jobs.update_one(
+                {"_id": job["_id"], "status": "running", "heartbeat_at": {"$lt": stale_before}},
+                {"$set": {"status": "queued", "worker_id": None}},
+            )
+            if result.modified_count:
+                logger.info(f"Job {job['_id']} orphaned — re-queued")
+                await self._queue.put(job["_id"])
+
+
+def serialize_job(job: Dict) -> Dict:
+    """JSON-safe view of a job document for API responses."""
+    out = {"id": job["_id"]}
+    for key, val in job.items():
+        if key in ("_id", "worker_id"):
+            continue
+        out[key] = val.isoformat() if isinstance(val, datetime) else val
+    return out
+
+
+# Singleton
+job_runner = JobRunner()
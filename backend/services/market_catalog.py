@@ -0,0 +1,180 @@
+"""
+Market items catalog: server-side filtering, sorting and keyset pagination.
+
+Every sort mode of GET /api/market-items runs in MongoDB against a compound
+index, so `sort=price-low&limit=20` returns the 20 cheapest items (not the 20
+most recently updated, re-ordered) and the cost stays flat as the catalog grows.
+
+"best" orders by status (MURA, then STABLE, then MAHAL/other) — MongoDB can't
+index a CASE expression, so writers store the rank alongside the status:
+
+    doc["statusRank"] = status_rank(doc["status"])
+
+Pagination is keyset-based: each page returns an opaque `next` token holding
+the sort-key values of its last item (plus `_id` as tie-break); pass it back as
+`after=` for the next page. Unlike skip/offset this never rescans earlier pages.
+"""
+
+import base64
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from bson import json_util
+
+from services.collection_versions import collection_versions
+from services.name_search import name_filter
+
+logger = logging.getLogger(__name__)
+
+STATUS_RANKS = {"MURA": 0, "STABLE": 1}
+OTHER_STATUS_RANK = 2
+
+# Sort mode → MongoDB sort spec. Every spec ends in _id so keys are unique.
+SORTS: Dict[str, List[Tuple[str, int]]] = {
+    "best": [("statusRank", 1), ("savings", -1), ("_id", 1)],
+    "price-low": [("currentPrice", 1), ("_id", 1)],
+    "price-high": [("currentPrice", -1), ("_id", -1)],
+    "name": [("name", 1), ("_id", 1)],
+    "recent": [("lastUpdated", -1), ("_id", -1)],
+}
+DEFAULT_SORT = "recent"  # unknown sort values keep the old lastUpdated order
+
+# Heavy fields the list views don't need — dropped with view=summary
+SUMMARY_EXCLUDE = {"trend": 0, "climateImpact": 0, "metadata": 0}
+
+# Each sort is served with and without an equality prefix on category.
+# price-high walks the price-low index backwards. Created by services/db_migrations.py.
+INDEXES = [
+    [("statusRank", 1), ("savings", -1), ("_id", 1)],
+    [("category", 1), ("statusRank", 1), ("savings", -1), ("_id", 1)],
+    [("currentPrice", 1), ("_id", 1)],
+    [("category", 1), ("currentPrice", 1), ("_id", 1)],
+    [("name", 1), ("_id", 1)],
+    [("category", 1), ("name", 1), ("_id", 1)],
+    [("lastUpdated", -1), ("_id", -1)],
+]
+
+DATETIME_FIELDS = ("lastUpdated", "createdAt", "updatedAt")
+
+
+class InvalidCursor(ValueError):
+    """The `after` token is malformed or was issued for a different sort."""
+
+
+def status_rank(status: Optional[str]) -> int:
+    return STATUS_RANKS.get(status, OTHER_STATUS_RANK)
+
+
+async def backfill_status_rank(db) -> int:
+    """Set statusRank on items written before the field existed."""
+    result = await db.market_items.update_many(
+        {"statusRank": {"$exists": False}},
+        [
+            {
+                "$set": {
+                    "statusRank": {
+                        "$switch": {
+                            "branches": [
+                                {"case": {"$eq": ["$status", status]}, "then": rank}
+                                for status, rank in STATUS_RANKS.items()
+                            ],
+                            "default": OTHER_STATUS_RANK,
+                        }
+                    }
+                }
+            }
+        ],
+    )
+    if result.modified_count:
+        await collection_versions.bump(db, "market_items")
+        logger.info(f"Backfilled statusRank on {result.modified_count} market items")
+    return result.modified_count
+
+
+def serialize_item(item: Dict) -> Dict:
+    """ObjectId/datetimes → strings for JSON responses (mutates and returns item)."""
+    item["id"] = str(item.pop("_id"))
+    for field in DATETIME_FIELDS:
+        if field in item:
+            item[field] = item[field].isoformat()
+    return item
+
+
+def encode_cursor(sort: str, item: Dict) -> str:
+    values = [item.get(field) for field, _ in SORTS[sort]]
+    raw = json_util.dumps({"s": sort, "v": values}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(sort: str, token: str) -> List:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json_util.loads(raw)
+        values = payload["v"]
+    except Exception:
+        raise InvalidCursor("Malformed 'after' cursor")
+    if payload.get("s") != sort or len(values) != len(SORTS[sort]):
+        raise InvalidCursor("'after' cursor was issued for a different sort")
+    return values
+
+
+def _after_filter(spec: List[Tuple[str, int]], values: List) -> Dict:
+    """
+    Documents strictly after `values` in `spec` order (lexicographic keyset).
+
+    MongoDB sorts null/missing before every other value, and $gt/$lt never
+    match null, so null keys get explicit branches: after a null comes any
+    non-null value (ascending) or nothing (descending); a descending walk
+    past a non-null value still has the nulls ahead of it.
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(spec):
+        clause = {f: values[j] for j, (f, _) in enumerate(spec[:i])}
+        value = values[i]
+        if direction == 1:
+            clause[field] = {"$ne": None} if value is None else {"$gt": value}
+        elif value is None:
+            continue
+        else:
+            clause["$or"] = [{field: {"$lt": value}}, {field: None}]
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+async def list_items(
+    db,
+    *,
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    sort: str = "best",
+    limit: int = 100,
+    after: Optional[str] = None,
+    view: str = "full",
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    One page of market items. Returns (serialized items, next-page token or None).
+    Raises InvalidCursor for a bad `after` token.
+    """
+    if sort not in SORTS:
+        sort = DEFAULT_SORT
+    spec = SORTS[sort]
+
+    query: Dict = {}
+    if category and category != "all":
+        query["category"] = category
+    if search:
+        query.update(name_filter(search))
+    if after:
+        query = {"$and": [query, _after_filter(spec, decode_cursor(sort, after))]}
+
+    projection = SUMMARY_EXCLUDE if view == "summary" else None
+    # One extra document tells us whether another page exists
+    cursor = db.market_items.find(query, projection).sort(spec).limit(limit + 1)
+    items = await cursor.to_list(length=limit + 1)
+
+    next_token = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_token = encode_cursor(sort, items[-1])
+
+    return [serialize_item(item) for item in items], next_token
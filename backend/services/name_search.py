@@ -0,0 +1,148 @@
+"""
+Commodity name search.
+
+Name filters used to be unanchored case-insensitive `$regex` queries, which
+can't use an index and scan the whole collection on every call. Instead:
+
+  * Writers store a normalized `name_key` (lowercase, single-spaced) and
+    `name_prefixes` (every prefix of every word, up to PREFIX_MAX chars) next
+    to the name — use `name_fields(name)` (`item_name_*` on crowd reports).
+  * An in-memory trigram index over all distinct name keys resolves a search
+    term to the exact set of keys containing it as a substring; the query then
+    becomes an indexed `{"name_key": {"$in": keys}}`.
+  * If the in-memory index isn't loaded (e.g. MongoDB was down at startup),
+    queries fall back to word-prefix matching on the indexed `name_prefixes`.
+
+The index is loaded at startup and refreshed after each integration run.
+MongoDB indexes on these fields are declared in services/db_migrations.py.
+Search terms are literal text, not regular expressions.
+"""
+
+import logging
+import re
+from typing import Dict, Iterable, List, Set
+
+from pymongo import UpdateMany
+
+from services.bulk_writer import BulkWriter
+
+logger = logging.getLogger(__name__)
+
+PREFIX_MAX = 12
+GRAM = 3
+
+_WORD = re.compile(r"[^\W_]+")
+
+# (collection, name field, key field, prefixes field)
+NAMED_COLLECTIONS = [
+    ("market_items", "name", "name_key", "name_prefixes"),
+    ("price_history", "name", "name_key", "name_prefixes"),
+    ("crowd_price_reports", "item_name", "item_name_key", "item_name_prefixes"),
+]
+
+
+def normalize(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def prefix_tokens(name_key: str) -> List[str]:
+    tokens = set()
+    for word in _WORD.findall(name_key):
+        for n in range(1, min(len(word), PREFIX_MAX) + 1):
+            tokens.add(word[:n])
+    return sorted(tokens)
+
+
+def name_fields(name: str, prefix: str = "name") -> Dict:
+    """Search fields to store alongside a name: {<prefix>_key, <prefix>_prefixes}."""
+    key = normalize(name)
+    return {f"{prefix}_key": key, f"{prefix}_prefixes": prefix_tokens(key)}
+
+
+class NameIndex:
+    """In-memory trigram index over distinct normalized names."""
+
+    def __init__(self):
+        self.loaded = False
+        self._keys: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._grams: Dict[str, Set[int]] = {}
+
+    def rebuild(self, keys: Iterable[str]):
+        self._keys, self._ids, self._grams = [], {}, {}
+        for key in keys:
+            self.add(key)
+        self.loaded = True
+
+    def add(self, key: str):
+        if not key or key in self._ids:
+            return
+        key_id = len(self._keys)
+        self._keys.append(key)
+        self._ids[key] = key_id
+        for i in range(len(key) - GRAM + 1):
+            self._grams.setdefault(key[i:i + GRAM], set()).add(key_id)
+
+    def search(self, term: str) -> List[str]:
+        """All indexed keys containing `term` (normalized) as a substring."""
+        term = normalize(term)
+        if len(term) < GRAM:
+            return [k for k in self._keys if term in k]
+
+        postings = []
+        for i in range(len(term) - GRAM + 1):
+            ids = self._grams.get(term[i:i + GRAM])
+            if not ids:
+                return []
+            postings.append(ids)
+        postings.sort(key=len)
+        candidates = set.intersection(*postings)
+        return [self._keys[i] for i in candidates if term in self._keys[i]]
+
+    async def refresh(self, db):
+        """Reload all name keys from MongoDB (call after integrations write).
+        On failure the previous index stays in place."""
+        keys: Set[str] = set()
+        try:
+            for collection, _, key_field, _ in NAMED_COLLECTIONS:
+                keys.update(k for k in await db[collection].distinct(key_field) if isinstance(k, str))
+        except Exception as e:
+            logger.warning(f"Name index refresh failed: {e}")
+            return
+        self.rebuild(keys)
+        logger.info(f"Name index refreshed: {len(keys)} distinct names")
+
+    def __len__(self):
+        return len(self._keys)
+
+
+name_index = NameIndex()
+
+
+def name_filter(search: str, prefix: str = "name") -> Dict:
+    """MongoDB filter for documents whose <prefix> contains `search`."""
+    if name_index.loaded:
+        return {f"{prefix}_key": {"$in": name_index.search(search)}}
+    words = [w[:PREFIX_MAX] for w in _WORD.findall(normalize(search))]
+    if not words:
+        return {f"{prefix}_key": {"$in": []}}
+    return {f"{prefix}_prefixes": {"$all": words}}
+
+
+async def backfill_name_fields(db):
+    """Add search fields to documents written before they existed."""
+    for collection, name_field, key_field, _ in NAMED_COLLECTIONS:
+        missing = await db[collection].distinct(name_field, {key_field: {"$exists": False}})
+        if not missing:
+            continue
+        prefix = key_field[: -len("_key")]
+        async with BulkWriter(db[collection]) as writer:
+            for name in missing:
+                if isinstance(name, str):
+                    await writer.add(
+                        UpdateMany(
+                            {name_field: name, key_field: {"$exists": False}},
+                            {"$set": name_fields(name, prefix)},
+                        )
+                    )
+        logger.info(f"Backfilled search fields for {len(missing)} names in {collection}")
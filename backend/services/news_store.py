@@ -0,0 +1,227 @@
+"""
+Stored NewsData.io articles, refreshed within a daily API-credit budget.
+
+/api/energy/news and /api/energy/news/multiple used to call NewsData.io on every
+request — under frontend polling that burns the free tier's 200 credits/day in
+minutes. Both endpoints now read from the `news_articles` collection:
+
+    {_id: url, title, description, content, source, url, published,
+     category, keywords, queries: [normalized query, ...], fetched_at}
+
+  * A query is re-fetched from the API only when its last fetch (in
+    `news_queries`: {_id: normalized query, fetched_at, articles}) is older
+    than NEWS_REFRESH_SECONDS. Refreshes are single-flight per query and run
+    concurrently under a semaphore.
+  * Articles are deduplicated by URL; an article returned by several queries
+    is stored once and tagged with each of them.
+  * A TTL index on `fetched_at` (db_migrations.py) drops articles no query
+    has returned for TTL_DAYS.
+  * Every API call takes one credit from the day's budget in `api_usage`
+    ({_id: "newsdata:YYYY-MM-DD", used}, UTC days). Once NEWSDATA_DAILY_CREDITS
+    are used, stored articles keep being served until the next day.
+
+Env vars:
+  NEWS_REFRESH_SECONDS    — minimum age before a query is re-fetched (default 3600)
+  NEWSDATA_DAILY_CREDITS  — API calls allowed per UTC day (default 180 of the
+                            free tier's 200, leaving room for manual checks)
+  NEWSDATA_CONCURRENCY    — queries fetched at once (default 3)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List
+
+from pymongo import DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from services.bulk_writer import BulkWriter
+from services.newsdata_integration import MAX_CONCURRENT_QUERIES, QUERIES, news_integration
+
+logger = logging.getLogger(__name__)
+
+ARTICLES_COLLECTION = "news_articles"
+QUERIES_COLLECTION = "news_queries"
+USAGE_COLLECTION = "api_usage"
+
+REFRESH_SECONDS = float(os.environ.get("NEWS_REFRESH_SECONDS", "3600"))
+DAILY_CREDITS = int(os.environ.get("NEWSDATA_DAILY_CREDITS", "180"))
+TTL_DAYS = 7
+
+ARTICLE_FIELDS = ("title", "description", "content", "source", "url", "published", "category", "keywords")
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class DailyQuota:
+    """Per-UTC-day call budget, counted atomically in `api_usage`."""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+
+    def _key(self) -> str:
+        return f"{self.name}:{datetime.utcnow().strftime('%Y-%m-%d')}"
+
+    async def take(self, db) -> bool:
+        """Use one credit. False (and nothing used) if today's budget is spent."""
+        try:
+            await db[USAGE_COLLECTION].find_one_and_update(
+                {"_id": self._key(), "used": {"$lt": self.limit}},
+                {"$inc": {"used": 1}, "$set": {"limit": self.limit}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            return True
+        except DuplicateKeyError:
+            # The day's document exists but didn't match: used >= limit
+            return False
+
+    async def usage(self, db) -> Dict:
+        doc = await db[USAGE_COLLECTION].find_one({"_id": self._key()}) or {}
+        used = doc.get("used", 0)
+        return {"used": used, "limit": self.limit, "remaining": max(0, self.limit - used)}
+
+
+class NewsStore:
+    """Serves NewsData articles from MongoDB, refreshing stale queries within quota."""
+
+    def __init__(
+        self,
+        integration=news_integration,
+        refresh_seconds: float = REFRESH_SECONDS,
+        daily_credits: int = DAILY_CREDITS,
+        concurrency: int = MAX_CONCURRENT_QUERIES,
+    ):
+        self.integration = integration
+        self.refresh_seconds = refresh_seconds
+        self.concurrency = max(1, concurrency)
+        self.quota = DailyQuota("newsdata", daily_credits)
+        # normalized query -> epoch of its last fetch (mirrors news_queries)
+        self._fetched_at: Dict[str, float] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        self.api_calls = 0
+        self.quota_denied = 0
+
+    # ------------------------------------------------------------------ #
+    #  Public API                                                          #
+    # ------------------------------------------------------------------ #
+
+    async def articles(self, db, query: str, limit: int = 10) -> List[Dict]:
+        """Articles for one query, newest first."""
+        key = normalize_query(query)
+        await self.refresh(db, [key])
+        return await self._read(db, key, limit)
+
+    async def multiple(self, db, limit: int = 10) -> Dict[str, List[Dict]]:
+        """Articles for every configured query (QUERIES), keyed like QUERIES."""
+        keys = {name: normalize_query(q) for name, q in QUERIES.items()}
+        await self.refresh(db, keys.values())
+        results = await asyncio.gather(*(self._read(db, key, limit) for key in keys.values()))
+        return dict(zip(keys, results))
+
+    async def refresh(self, db, queries: Iterable[str], force: bool = False) -> Dict:
+        """Fetch the given (normalized) queries that are stale, concurrently."""
+        queries = list(dict.fromkeys(queries))
+        if not force:
+            await self._load_fetch_times(db, queries)
+            now = time.time()
+            queries = [
+                q for q in queries if now - self._fetched_at.get(q, 0) >= self.refresh_seconds
+            ]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(query: str) -> int:
+            async with semaphore:
+                return await self._refresh_query(db, query)
+
+        async def shared(query: str) -> int:
+            task = self._inflight.get(query)
+            if task is None:
+                task = self._inflight[query] = asyncio.ensure_future(fetch(query))
+                task.add_done_callback(lambda _: self._inflight.pop(query, None))
+            return await task
+
+        counts = await asyncio.gather(*(shared(q) for q in queries))
+        return {"queries_refreshed": len(queries), "articles": sum(counts)}
+
+    async def refresh_all(self, db, force: bool = False) -> Dict:
+        """Refresh every configured query (ingestion entry point)."""
+        stats = await self.refresh(db, (normalize_query(q) for q in QUERIES.values()), force=force)
+        return {**stats, "quota": await self.quota.usage(db)}
+
+    def stats(self) -> Dict:
+        return {
+            "api_calls": self.api_calls,
+            "quota_denied": self.quota_denied,
+            "queries_tracked": len(self._fetched_at),
+        }
+
+    # ------------------------------------------------------------------ #
+    #  Internal                                                            #
+    # ------------------------------------------------------------------ #
+
+    async def _load_fetch_times(self, db, queries: List[str]):
+        unknown = [q for q in queries if q not in self._fetched_at]
+        if not unknown:
+            return
+        try:
+            async for doc in db[QUERIES_COLLECTION].find({"_id": {"$in": unknown}}):
+                fetched_at = doc["fetched_at"].replace(tzinfo=timezone.utc)
+                self._fetched_at[doc["_id"]] = fetched_at.timestamp()
+        except Exception as e:
+            logger.warning(f"Could not load news query fetch times: {e}")
+
+    async def _refresh_query(self, db, query: str) -> int:
+        """Fetch one query from the API and store its articles. Returns the count."""
+        if not self.integration.api_key:
+            return 0
+        if not await self.quota.take(db):
+            self.quota_denied += 1
+            logger.warning(f"NewsData daily credit budget spent — serving stored '{query}'")
+            return 0
+        self.api_calls += 1
+        articles = await self.integration.fetch_energy_news(query=query)
+
+        now = datetime.utcnow()
+        async with BulkWriter(db[ARTICLES_COLLECTION]) as writer:
+            for article in articles:
+                if not article.get("url"):
+                    continue
+                await writer.add(
+                    UpdateOne(
+                        {"_id": article["url"]},
+                        {
+                            "$set": {**{f: article.get(f) for f in ARTICLE_FIELDS}, "fetched_at": now},
+                            "$addToSet": {"queries": query},
+                        },
+                        upsert=True,
+                    )
+                )
+        # Empty results count as a fetch too — a failing query must not retry every request
+        await db[QUERIES_COLLECTION].update_one(
+            {"_id": query},
+            {"$set": {"fetched_at": now, "articles": len(articles)}},
+            upsert=True,
+        )
+        self._fetched_at[query] = time.time()
+        logger.info(f"Stored {len(articles)} NewsData articles for '{query}'")
+        return len(articles)
+
+    async def _read(self, db, query: str, limit: int) -> List[Dict]:
+        cursor = (
+            db[ARTICLES_COLLECTION]
+            .find({"queries": query}, {"_id": 0, **{f: 1 for f in ARTICLE_FIELDS}})
+            .sort("published", DESCENDING)
+            .limit(limit)
+        )
+        return [doc async for doc in cursor]
+
+
+# Singleton
+news_store = NewsStore()
@@ -3,19 +3,28 @@ NewsData.io API Integration for Energy and Commodity News (Philippines)
 Fetches real-time articles from NewsData.io.
 
 Free tier: 200 calls/day. Each fetch_multiple_queries call makes ~7 API calls.
-API key env var: NEWSDATA_API_KEY
+The API endpoints serve stored articles via services/news_store.py, which
+refreshes them within a daily credit budget.
+
+Env vars:
+  NEWSDATA_API_KEY      — API key
+  NEWSDATA_CONCURRENCY  — queries fetched at once (default 3)
 """
 import aiohttp
 import asyncio
 import os
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 import logging
 
+from services.http_utils import fetch_with_retry, read_json
+
 logger = logging.getLogger(__name__)
 
 NEWSDATA_URL = "https://newsdata.io/api/1/news"
 
+MAX_CONCURRENT_QUERIES = int(os.environ.get("NEWSDATA_CONCURRENCY", "3"))
+
 # Queries covering energy AND key commodity prices (rice, pork, fish, onion prices PH)
 QUERIES = {
     "renewable_energy":   "renewable energy Philippines",
@@ -44,6 +53,7 @@ class NewsDataIntegration:
         countries: List[str] = ["ph"],
         categories: List[str] = ["business", "environment"],
         language: str = "en",
+        session: Optional[aiohttp.ClientSession] = None,
     ) -> List[Dict]:
         """Fetch news from NewsData.io. Returns empty list if API key missing or call fails."""
         api_key = self.api_key
@@ -60,18 +70,20 @@ class NewsDataIntegration:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    self.base_url, params=params, timeout=aiohttp.ClientTimeout(total=15)
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        articles = data.get("results", [])
-                        logger.info(f"NewsData query '{query}': {len(articles)} articles")
-                        return self._process_articles(articles)
-                    body = await response.text()
-                    logger.error(f"NewsData API {response.status}: {body[:200]}")
-                    return []
+            response = await fetch_with_retry(
+                session,
+                self.base_url,
+                params=params,
+                timeout=aiohttp.ClientTimeout(total=15),
+            )
+            if response is None:
+                logger.error(f"NewsData query '{query}' failed")
+                return []
+            async with response:
+                data = await read_json(response)
+            articles = data.get("results", [])
+            logger.info(f"NewsData query '{query}': {len(articles)} articles")
+            return self._process_articles(articles)
         except Exception as e:
             logger.error(f"NewsData fetch error (query='{query}'): {e}")
             return []
@@ -92,14 +104,18 @@ class NewsDataIntegration:
             })
         return processed
 
-    async def fetch_multiple_queries(self) -> Dict[str, List[Dict]]:
-        """Fetch news for all configured queries concurrently."""
-        tasks = {key: self.fetch_energy_news(query=q) for key, q in QUERIES.items()}
-        results = {}
-        for key, coro in tasks.items():
-            results[key] = await coro
-            await asyncio.sleep(0.1)  # Avoid rate-limit bursts
-        return results
+    async def fetch_multiple_queries(
+        self, concurrency: int = MAX_CONCURRENT_QUERIES
+    ) -> Dict[str, List[Dict]]:
+        """Fetch news for all configured queries concurrently (at most `concurrency` at once)."""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch(query: str) -> List[Dict]:
+            async with semaphore:
+                return await self.fetch_energy_news(query=query)
+
+        results = await asyncio.gather(*(fetch(q) for q in QUERIES.values()))
+        return dict(zip(QUERIES, results))
 
 
 # Singleton instance
@@ -11,80 +11,46 @@ The table sits in the homepage right sidebar and shows:
   | Operating Margin             |  2,472 |   287 |   560 |
 
 ngcp.ph blocks plain HTTP (Cloudflare 403); Playwright + stealth bypasses it.
-Results are cached for 30 minutes to avoid launching Chromium on every request.
+Pages come from the shared warm browser in services.browser_pool; caching
+(stale-while-revalidate, services.swr_cache) is done by the caller.
 """
 
-import asyncio
 import logging
-import time
 from typing import Dict, List, Optional
 
-from playwright.async_api import async_playwright
 from playwright_stealth import stealth_async
 
+from services.browser_pool import browser_pool
+
 logger = logging.getLogger(__name__)
 
 NGCP_URL = "https://ngcp.ph"
 
-# Chromium flags for low-memory environments (Render free tier ~512 MB)
-_CHROMIUM_ARGS = [
-    "--no-sandbox",
-    "--disable-setuid-sandbox",
-    "--disable-dev-shm-usage",
-    "--disable-gpu",
-    "--single-process",
-    "--disable-extensions",
-    "--disable-background-networking",
-    "--disable-sync",
-    "--mute-audio",
-    "--no-first-run",
-]
-
 
 class NGCPScraper:
-    CACHE_TTL = 1800  # 30 minutes
-
-    def __init__(self):
-        self._cache: Optional[Dict] = None
-        self._cache_ts: float = 0
-        self._lock: Optional[asyncio.Lock] = None
-
-    def _get_lock(self) -> asyncio.Lock:
-        if self._lock is None:
-            self._lock = asyncio.Lock()
-        return self._lock
-
     # ------------------------------------------------------------------ #
     #  Public API                                                          #
     # ------------------------------------------------------------------ #
 
     async def scrape(self) -> Optional[Dict]:
         """
-        Return Power Situation Outlook data from ngcp.ph.
+        Scrape Power Situation Outlook data from ngcp.ph.
+
+        Uncached — server.py serves this through a stale-while-revalidate cache.
 
         Returns:
             dict with {total_supply, total_demand, reserves, grids[], data_as_of, source}
             on success, or None on failure.
         """
-        if self._cache and (time.time() - self._cache_ts) < self.CACHE_TTL:
-            return self._cache
-
-        async with self._get_lock():
-            # Double-check after acquiring lock
-            if self._cache and (time.time() - self._cache_ts) < self.CACHE_TTL:
-                return self._cache
-
-            result = await self._do_scrape()
-            if result is not None:
-                self._cache = result
-                self._cache_ts = time.time()
-                logger.info(
-                    f"NGCP: scraped OK — demand={result.get('total_demand')} MW "
-                    f"supply={result.get('total_supply')} MW"
-                )
-            else:
-                logger.warning("NGCP: scrape returned no data")
-            return result
+        result = await self._do_scrape()
+        if result is not None:
+            logger.info(
+                f"NGCP: scraped OK — demand={result.get('total_demand')} MW "
+                f"supply={result.get('total_supply')} MW"
+            )
+        else:
+            logger.warning("NGCP: scrape returned no data")
+        return result
 
     # ------------------------------------------------------------------ #
     #  Internal                                                            #
@@ -92,20 +58,7 @@ class NGCPScraper:
 
     async def _do_scrape(self) -> Optional[Dict]:
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=_CHROMIUM_ARGS,
-                )
-                context = await browser.new_context(
-                    user_agent=(
-                        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/121.0.0.0 Safari/537.36"
-                    ),
-                    viewport={"width": 1280, "height": 900},
-                )
-                page = await context.new_page()
+            async with browser_pool.page() as page:
                 await stealth_async(page)
 
                 await page.goto(
@@ -156,13 +109,11 @@ class NGCPScraper:
                     return null;
                 }""")
 
-                await browser.close()
-
-                if not raw or not raw.get("rows"):
-                    logger.warning("NGCP: could not locate Power Situation Outlook table")
-                    return None
+            if not raw or not raw.get("rows"):
+                logger.warning("NGCP: could not locate Power Situation Outlook table")
+                return None
 
-                return self._parse_table(raw["rows"])
+            return self._parse_table(raw["rows"])
 
         except Exception as exc:
             logger.error(f"NGCP scraper error: {exc}")
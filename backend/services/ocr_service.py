@@ -3,9 +3,10 @@ from PIL import Image
 import io
 import logging
 from typing import Optional, Dict
-import PyPDF2
 import aiofiles
 
+from services.pdf_extraction import extract_text
+
 logger = logging.getLogger(__name__)
 
 class OCRService:
@@ -29,15 +30,10 @@ class OCRService:
     async def extract_text_from_pdf(self, pdf_path: str) -> Optional[str]:
         """Extract text from PDF document"""
         try:
-            text_content = []
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text = page.extract_text()
-                    if text:
-                        text_content.append(text)
-            
-            return '\n'.join(text_content)
+            async with aiofiles.open(pdf_path, 'rb') as file:
+                pdf_bytes = await file.read()
+            # User uploads are one-offs — don't memoize them in the PDF cache
+            return await extract_text(pdf_bytes, memoize=False)
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {str(e)}")
             return None
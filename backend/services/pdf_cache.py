@@ -0,0 +1,341 @@
+"""
+Content-addressed on-disk cache for downloaded government PDFs.
+
+DA Daily Price Index and DOE contract PDFs are effectively immutable once
+published, but every integration run used to download and re-parse all of
+them. With the cache, a daily 7-day refresh downloads only the new day's PDF
+and parses only that one.
+
+Layout under PDF_CACHE_DIR:
+  index.json                   url → {sha256, size, etag, last_modified,
+                                      fetched_at, accessed_at}
+  blobs/<ab>/<sha256>.pdf      PDF bytes, stored once per distinct content
+  parsed/<kind>/<sha256>-<version>.json
+                               memoized parse results (text, prices, ...)
+
+Entries are fresh for `max_age` seconds (None = immutable, never revalidated);
+after that a conditional GET (If-None-Match / If-Modified-Since) revalidates
+them, so an unchanged file costs a 304 instead of a full download. Blobs are
+evicted least-recently-used once the total exceeds PDF_CACHE_MAX_MB. Cache
+hits only touch accessed_at in memory; the index is written on put, eviction
+and revalidation, and at most every INDEX_SAVE_INTERVAL seconds for hits.
+
+Env vars:
+  PDF_CACHE_DIR    — cache root (default /tmp/climate-intel/pdf-cache; Render's
+                     disk is ephemeral, so the cache lives as long as the instance)
+  PDF_CACHE_MAX_MB — size cap for PDF blobs (default 200)
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+import aiohttp
+
+from services.http_utils import (
+    HostRateLimiter,
+    ResponseTooLarge,
+    fetch_with_retry,
+    read_capped,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "/tmp/climate-intel/pdf-cache"
+DEFAULT_MAX_MB = 200
+
+# Hits persist their accessed_at (LRU order) at most this often
+INDEX_SAVE_INTERVAL = 60  # seconds
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class PDFCache:
+    """URL-keyed, SHA-256 content-addressed PDF store with LRU eviction."""
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.root = Path(root or os.environ.get("PDF_CACHE_DIR", DEFAULT_CACHE_DIR))
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("PDF_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self._index: Optional[Dict[str, Dict]] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._dirty = False  # accessed_at changed since the last index write
+        self._saved_at = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    # ------------------------------------------------------------------ #
+    #  Public API                                                          #
+    # ------------------------------------------------------------------ #
+
+    async def get(self, url: str) -> Optional[bytes]:
+        """Cached bytes for `url`, or None. Never touches the network."""
+        entry = self._load_index().get(url)
+        if entry is None:
+            return None
+        sha = entry["sha256"]
+        data = await asyncio.to_thread(self._read_blob, sha)
+        if data is None:
+            # Blob evicted or corrupted underneath the index
+            async with self._get_lock():
+                if self._index.get(url, {}).get("sha256") == sha:
+                    del self._index[url]
+                    await self._save_index()
+            return None
+        entry["accessed_at"] = time.time()
+        self._dirty = True
+        self.hits += 1
+        if entry["accessed_at"] - self._saved_at >= INDEX_SAVE_INTERVAL:
+            await self.flush()
+        return data
+
+    async def flush(self):
+        """Write access times recorded by hits since the last index write."""
+        async with self._get_lock():
+            if self._dirty:
+                await self._save_index()
+
+    async def fetch(
+        self,
+        session: Optional[aiohttp.ClientSession],
+        url: str,
+        *,
+        max_age: Optional[float] = None,
+        headers: Optional[dict] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        max_retries: int = 3,
+        **request_kwargs,
+    ) -> Optional[bytes]:
+        """
+        Return the PDF at `url`, from cache when possible.
+
+        Args:
+            max_age: Seconds a cached copy is served without revalidation.
+                     None means the URL is immutable (e.g. dated DA PDFs).
+            session, headers, rate_limiter, max_retries and any other
+                     keyword arguments (e.g. timeout) are passed to
+                     fetch_with_retry; session None means the shared pool.
+
+        If revalidation fails (network error, 404), the stale copy is returned.
+        """
+        async with self._get_lock():
+            entry = self._load_index().get(url)
+            entry = dict(entry) if entry else None
+
+        if entry is not None:
+            fresh = max_age is None or time.time() - entry["fetched_at"] < max_age
+            if fresh:
+                cached = await self.get(url)
+                if cached is not None:
+                    return cached
+                entry = None  # blob gone — fall through to a full download
+
+        conditional = dict(headers or {})
+        if entry is not None:
+            if entry.get("etag"):
+                conditional["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                conditional["If-Modified-Since"] = entry["last_modified"]
+
+        response = await fetch_with_retry(
+            session,
+            url,
+            max_retries=max_retries,
+            headers=conditional,
+            rate_limiter=rate_limiter,
+            **request_kwargs,
+        )
+
+        if response is None:
+            if entry is not None:
+                logger.warning(f"Revalidation failed for {url} — serving cached copy")
+                return await self.get(url)
+            return None
+
+        if response.status == 304 and entry is not None:
+            response.release()
+            self.revalidated += 1
+            async with self._get_lock():
+                current = self._load_index().get(url)
+                if current is not None:
+                    current["fetched_at"] = time.time()
+                    await self._save_index()
+            return await self.get(url)
+
+        try:
+            async with response:
+                data = await read_capped(response)
+        except ResponseTooLarge as e:
+            logger.warning(f"Refusing oversized PDF: {e}")
+            return None
+        self.misses += 1
+        await self.put(
+            url,
+            data,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return data
+
+    async def put(
+        self,
+        url: str,
+        data: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> str:
+        """Store `data` as the content of `url`. Returns its SHA-256."""
+        sha = content_hash(data)
+        path = self._blob_path(sha)
+        if not path.exists():
+            await asyncio.to_thread(_write_atomic, path, data)
+
+        now = time.time()
+        async with self._get_lock():
+            self._load_index()[url] = {
+                "sha256": sha,
+                "size": len(data),
+                "etag": etag,
+                "last_modified": last_modified,
+                "fetched_at": now,
+                "accessed_at": now,
+            }
+            await self._evict()
+            await self._save_index()
+        return sha
+
+    async def memoize(
+        self,
+        kind: str,
+        version: str,
+        pdf_bytes: bytes,
+        compute: Callable[[], Union[Any, Awaitable[Any]]],
+    ) -> Any:
+        """
+        Return the parse result of `kind` for these PDF bytes, computing it
+        with `compute()` (sync or async) only on a miss. Results are keyed by
+        content hash + `version`, so bump the version when a parser changes.
+        Values must be JSON-serializable.
+        """
+        path = self.root / "parsed" / kind / f"{content_hash(pdf_bytes)}-{version}.json"
+        cached = await asyncio.to_thread(self._read_json, path)
+        if cached is not None:
+            return cached["value"]
+
+        value = compute()
+        if inspect.isawaitable(value):
+            value = await value
+        if value:  # don't pin empty results from a failed extraction
+            payload = json.dumps({"value": value}).encode()
+            await asyncio.to_thread(_write_atomic, path, payload)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        index = self._load_index()
+        blobs = {e["sha256"]: e["size"] for e in index.values()}
+        return {
+            "urls": len(index),
+            "blobs": len(blobs),
+            "bytes": sum(blobs.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+        }
+
+    # ------------------------------------------------------------------ #
+    #  Internal                                                            #
+    # ------------------------------------------------------------------ #
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _blob_path(self, sha: str) -> Path:
+        return self.root / "blobs" / sha[:2] / f"{sha}.pdf"
+
+    def _read_blob(self, sha: str) -> Optional[bytes]:
+        try:
+            data = self._blob_path(sha).read_bytes()
+        except OSError:
+            return None
+        return data if content_hash(data) == sha else None
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[Dict]:
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _load_index(self) -> Dict[str, Dict]:
+        if self._index is None:
+            self._index = self._read_json(self.root / "index.json") or {}
+            self._saved_at = time.time()
+        return self._index
+
+    async def _save_index(self):
+        """Write the index; callers hold the lock."""
+        payload = json.dumps(self._index).encode()
+        self._dirty, self._saved_at = False, time.time()
+        try:
+            await asyncio.to_thread(_write_atomic, self.root / "index.json", payload)
+        except OSError as e:
+            logger.warning(f"Could not write PDF cache index: {e}")
+
+    async def _evict(self):
+        """Drop least-recently-used blobs until the cache is under max_bytes."""
+        index = self._index
+        last_access: Dict[str, float] = {}
+        sizes: Dict[str, int] = {}
+        for entry in index.values():
+            sha = entry["sha256"]
+            sizes[sha] = entry["size"]
+            last_access[sha] = max(last_access.get(sha, 0), entry["accessed_at"])
+
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        evicted = []
+        for sha in sorted(last_access, key=last_access.get):
+            if total <= self.max_bytes:
+                break
+            total -= sizes[sha]
+            evicted.append(sha)
+
+        gone = set(evicted)
+        for url in [u for u, e in index.items() if e["sha256"] in gone]:
+            del index[url]
+        await asyncio.to_thread(self._delete_blobs, evicted)
+        logger.info(f"PDF cache: evicted {len(evicted)} blob(s), {total} bytes remain")
+
+    def _delete_blobs(self, shas):
+        parsed = self.root / "parsed"
+        for sha in shas:
+            self._blob_path(sha).unlink(missing_ok=True)
+            if parsed.exists():
+                for path in parsed.glob(f"*/{sha}-*.json"):
+                    path.unlink(missing_ok=True)
+
+
+# Singleton
+pdf_cache = PDFCache()
@@ -0,0 +1,97 @@
+"""
+Shared PDF text extraction.
+
+PyPDF2 is pure Python: extracting a multi-page PDF on the event loop stalls
+every API request for the duration. All PDF text extraction goes through
+`extract_text()`, which runs PyPDF2 in the shared process pool
+(services/worker_pool.py). Large documents are split into page ranges that are
+extracted in parallel on separate workers.
+
+Output is identical to the old inline extractors: the non-empty page texts
+joined with newlines.
+
+Usage:
+    text = await extract_text(pdf_bytes)                  # memoized by content hash
+    text = await extract_text(upload_bytes, memoize=False)  # one-off uploads
+"""
+
+import asyncio
+import io
+import logging
+from typing import List, Optional, Tuple
+
+import PyPDF2
+
+from services.pdf_cache import pdf_cache
+from services.worker_pool import MAX_WORKERS, run_in_process
+
+logger = logging.getLogger(__name__)
+
+# Memo version for extracted text — changes with the PyPDF2 release
+TEXT_VERSION = f"pypdf2-{PyPDF2.__version__}"
+
+# Documents with more pages than this are split across workers
+PARALLEL_MIN_PAGES = 12
+# Smallest page range handed to one worker (each worker re-reads the xref table)
+MIN_PAGES_PER_TASK = 4
+
+
+def extract_text_sync(pdf_bytes: bytes) -> str:
+    """Extract all text in the current process. For code already in a worker."""
+    reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    return _join(_extract_range(reader, 0, len(reader.pages)))
+
+
+def _join(texts: List[str]) -> str:
+    return "\n".join(t for t in texts if t)
+
+
+def _extract_range(reader: PyPDF2.PdfReader, start: int, stop: int) -> List[str]:
+    return [reader.pages[i].extract_text() for i in range(start, stop)]
+
+
+def _extract_small(pdf_bytes: bytes, max_pages: int) -> Tuple[Optional[str], int]:
+    """
+    Worker: extract the whole document if it has at most `max_pages` pages.
+    Otherwise return (None, page_count) so the caller can fan out.
+    """
+    reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    n_pages = len(reader.pages)
+    if n_pages > max_pages:
+        return None, n_pages
+    return _join(_extract_range(reader, 0, n_pages)), n_pages
+
+
+def _extract_pages(pdf_bytes: bytes, start: int, stop: int) -> List[str]:
+    """Worker: raw text of pages [start, stop)."""
+    reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    return _extract_range(reader, start, stop)
+
+
+async def _extract(pdf_bytes: bytes) -> str:
+    text, n_pages = await run_in_process(_extract_small, pdf_bytes, PARALLEL_MIN_PAGES)
+    if text is not None:
+        return text
+
+    # One range per worker, but never slivers of a page or two
+    per_task = max(MIN_PAGES_PER_TASK, -(-n_pages // MAX_WORKERS))
+    ranges = [(i, min(i + per_task, n_pages)) for i in range(0, n_pages, per_task)]
+    logger.info(f"Extracting {n_pages}-page PDF in {len(ranges)} parallel ranges")
+    chunks = await asyncio.gather(
+        *(run_in_process(_extract_pages, pdf_bytes, start, stop) for start, stop in ranges)
+    )
+    return _join([t for chunk in chunks for t in chunk])
+
+
+async def extract_text(pdf_bytes: bytes, memoize: bool = True) -> str:
+    """
+    Extract all text from a PDF without blocking the event loop.
+
+    With `memoize` (the default) the result is cached by content hash in the
+    PDF cache, so a PDF seen before is never parsed again.
+
+    Raises PyPDF2 errors for unreadable documents — callers decide the fallback.
+    """
+    if not memoize:
+        return await _extract(pdf_bytes)
+    return await pdf_cache.memoize("text", TEXT_VERSION, pdf_bytes, lambda: _extract(pdf_bytes))
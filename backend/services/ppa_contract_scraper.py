@@ -4,13 +4,18 @@ Downloads and parses DOE legacy site PDFs of awarded RE projects.
 Source: legacy.doe.gov.ph/renewable-energy/awarded{type}
 """
 import aiohttp
-import asyncio
-import io
 import re
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from pymongo import UpdateOne
+
+from services.bulk_writer import BulkWriter
+from services.http_utils import HostRateLimiter
+from services.pdf_cache import pdf_cache
+from services.pdf_extraction import extract_text
+
 logger = logging.getLogger(__name__)
 
 # Latest PDFs (as of April 2025) for each RE technology
@@ -38,38 +43,44 @@ PDF_SOURCES = {
     },
 }
 
+# Contract lists are re-published under new names, but revalidate daily in case
+# a file is replaced in place (a 304 costs almost nothing)
+CACHE_MAX_AGE = 24 * 3600
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 }
 
 
-async def download_pdf(url: str) -> Optional[bytes]:
-    """Download a PDF from URL, return bytes or None on failure."""
+async def download_pdf(
+    url: str,
+    session: Optional[aiohttp.ClientSession] = None,
+    rate_limiter: Optional[HostRateLimiter] = None,
+) -> Optional[bytes]:
+    """Download a PDF from URL (via the local PDF cache), return bytes or None on failure.
+
+    Goes over the app-wide pooled session unless a `session` is passed.
+    """
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=60)) as resp:
-                if resp.status == 200:
-                    data = await resp.read()
-                    logger.info(f"Downloaded {len(data)} bytes from {url.split('/')[-1]}")
-                    return data
-                else:
-                    logger.warning(f"HTTP {resp.status} for {url}")
-                    return None
+        data = await pdf_cache.fetch(
+            session,
+            url,
+            max_age=CACHE_MAX_AGE,
+            headers=HEADERS,
+            rate_limiter=rate_limiter,
+            timeout=aiohttp.ClientTimeout(total=60),
+        )
+        if data:
+            logger.info(f"Got {len(data)} bytes for {url.split('/')[-1]}")
+        return data
     except Exception as e:
         logger.error(f"Download error for {url}: {e}")
         return None
 
 
-def parse_pdf_text(pdf_bytes: bytes) -> str:
-    """Extract all text from PDF bytes using PyPDF2."""
-    import PyPDF2
-    reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
-    pages_text = []
-    for page in reader.pages:
-        text = page.extract_text()
-        if text:
-            pages_text.append(text)
-    return "\n".join(pages_text)
+async def parse_pdf_text(pdf_bytes: bytes) -> str:
+    """Extract all text from PDF bytes (PyPDF2, in the worker pool)."""
+    return await extract_text(pdf_bytes)
 
 
 def parse_re_contracts(text: str, technology: str, contract_type: str = "commercial") -> List[Dict]:
@@ -201,16 +212,19 @@ async def scrape_all_contracts(db=None) -> Dict:
     all_entries = []
     errors = []
 
+    # 1 req/s against the DOE legacy site; cache hits don't count
+    rate_limiter = HostRateLimiter(rate=1.0, burst=1)
+
     for tech, urls in PDF_SOURCES.items():
         for ctype, url in urls.items():
             logger.info(f"Processing {tech} ({ctype})...")
-            pdf_bytes = await download_pdf(url)
+            pdf_bytes = await download_pdf(url, rate_limiter=rate_limiter)
             if not pdf_bytes:
                 errors.append(f"Failed to download {tech} ({ctype})")
                 continue
 
             try:
-                text = parse_pdf_text(pdf_bytes)
+                text = await parse_pdf_text(pdf_bytes)
                 entries = parse_re_contracts(text, tech, ctype)
                 logger.info(f"  Parsed {len(entries)} {tech} ({ctype}) entries")
                 all_entries.extend(entries)
@@ -218,33 +232,21 @@ async def scrape_all_contracts(db=None) -> Dict:
                 logger.error(f"Parse error for {tech} ({ctype}): {e}")
                 errors.append(f"Parse error for {tech} ({ctype}): {str(e)}")
 
-            # Rate limit between downloads
-            await asyncio.sleep(1.0)
-
     # Upsert to MongoDB if db is provided
     upserted = 0
     if db is not None:
         collection = db.ppa_contracts
-        for entry in all_entries:
-            # Create a unique key from project name + developer + technology
-            doc_id = f"{entry['project_name']}|{entry['developer']}|{entry['technology']}"
-            entry["doc_id"] = doc_id
-            entry["scraped_at"] = datetime.utcnow()
-            entry["source"] = "DOE Legacy Site"
-            entry["data_as_of"] = "April 2025"
-
-            result = await collection.update_one(
-                {"doc_id": doc_id},
-                {"$set": entry},
-                upsert=True,
-            )
-            if result.upserted_id or result.modified_count:
-                upserted += 1
-
-        # Create index on doc_id
-        await collection.create_index("doc_id", unique=True)
-        await collection.create_index("technology")
-        await collection.create_index("stage")
+        async with BulkWriter(collection) as writer:
+            for entry in all_entries:
+                # Create a unique key from project name + developer + technology
+                doc_id = f"{entry['project_name']}|{entry['developer']}|{entry['technology']}"
+                entry["doc_id"] = doc_id
+                entry["scraped_at"] = datetime.utcnow()
+                entry["source"] = "DOE Legacy Site"
+                entry["data_as_of"] = "April 2025"
+
+                await writer.add(UpdateOne({"doc_id": doc_id}, {"$set": entry}, upsert=True))
+        upserted = writer.upserted_count + writer.modified_count
 
         logger.info(f"Upserted {upserted} contracts to MongoDB")
 
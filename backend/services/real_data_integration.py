@@ -2,18 +2,22 @@
 Real Data Integration Service for DA Bantay Presyo
 Downloads and processes PDF price reports from DA website
 """
-import aiohttp
 import asyncio
 from datetime import datetime, timedelta
-import PyPDF2
-import io
 import re
 import logging
 from typing import List, Dict, Optional
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
 import os
 
-from services.http_utils import fetch_with_retry, DEFAULT_TIMEOUT
+from services.bulk_writer import BulkWriter
+from services.categorizer import weekly_categorizer
+from services.http_utils import http_clients
+from services.market_catalog import status_rank
+from services.name_search import name_fields, name_index
+from services.pdf_cache import pdf_cache
+from services.pdf_extraction import extract_text
 
 logger = logging.getLogger(__name__)
 
@@ -30,30 +34,38 @@ class DABantayPresyoIntegration:
     async def download_latest_pdf(self) -> Optional[bytes]:
         """Download the most recent daily price PDF (skips weekends).
 
-        Uses fetch_with_retry for each URL candidate — retries on 5xx/timeout.
-        Shared session across all attempts.
+        Uses the local PDF cache + fetch_with_retry for each URL candidate —
+        retries on 5xx/timeout. Shared session across all attempts.
         """
         today = datetime.now()
 
-        async with aiohttp.ClientSession(timeout=DEFAULT_TIMEOUT) as session:
-            for days_ago in range(7):
-                check_date = today - timedelta(days=days_ago)
-                if check_date.weekday() >= 5:
-                    continue
+        session = http_clients.session()
+        for days_ago in range(7):
+            check_date = today - timedelta(days=days_ago)
+            if check_date.weekday() >= 5:
+                continue
+
+            urls = self._construct_daily_urls(check_date)
+            for url in urls:
+                data = await pdf_cache.get(url)
+                if data is not None:
+                    logger.info(
+                        f"Daily PDF for {check_date.strftime('%Y-%m-%d')} served from cache"
+                    )
+                    return data
 
-                for url in self._construct_daily_urls(check_date):
-                    logger.info(f"Trying: {url}")
-                    response = await fetch_with_retry(
-                        session, url, max_retries=3, headers=self.headers
+            for url in urls:
+                logger.info(f"Trying: {url}")
+                data = await pdf_cache.fetch(
+                    session, url, max_retries=3, headers=self.headers
+                )
+                if data:
+                    logger.info(
+                        f"Downloaded daily PDF for {check_date.strftime('%Y-%m-%d')} ({len(data)} bytes)"
                     )
-                    if response is not None and response.status == 200:
-                        data = await response.read()
-                        logger.info(
-                            f"Downloaded daily PDF for {check_date.strftime('%Y-%m-%d')} ({len(data)} bytes)"
-                        )
-                        return data
+                    return data
 
-                await asyncio.sleep(1.0)
+            await asyncio.sleep(1.0)
 
         logger.error("Could not find any recent daily price PDF")
         return None
@@ -67,18 +79,9 @@ class DABantayPresyoIntegration:
         ]
     
     async def extract_text_from_pdf(self, pdf_bytes: bytes) -> str:
-        """Extract text from PDF"""
+        """Extract text from PDF (in the worker pool, memoized by content hash)"""
         try:
-            pdf_file = io.BytesIO(pdf_bytes)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            text_content = []
-            for page in pdf_reader.pages:
-                text = page.extract_text()
-                if text:
-                    text_content.append(text)
-            
-            return '\n'.join(text_content)
+            return await extract_text(pdf_bytes)
         except Exception as e:
             logger.error(f"Error extracting PDF text: {str(e)}")
             return ""
@@ -151,24 +154,7 @@ class DABantayPresyoIntegration:
     
     def categorize_item(self, name: str) -> str:
         """Categorize item based on name"""
-        name_lower = name.lower()
-        
-        if any(word in name_lower for word in ['lettuce', 'cabbage', 'tomato', 'onion', 'potato', 'carrot', 'broccoli', 'pechay', 'ampalaya', 'eggplant', 'squash', 'celery']):
-            return 'vegetables'
-        elif any(word in name_lower for word in ['chicken', 'egg']):
-            return 'poultry'
-        elif any(word in name_lower for word in ['pork', 'beef', 'carabao']):
-            return 'meat'
-        elif any(word in name_lower for word in ['fish', 'tilapia', 'bangus', 'galunggong', 'alumahan']):
-            return 'fish'
-        elif any(word in name_lower for word in ['rice', 'bigas']):
-            return 'rice'
-        elif any(word in name_lower for word in ['garlic', 'ginger', 'chili', 'pepper', 'salt']):
-            return 'spices'
-        elif any(word in name_lower for word in ['diesel', 'gasoline', 'fuel', 'lpg', 'kerosene']):
-            return 'fuel'
-        else:
-            return 'others'
+        return weekly_categorizer.categorize(name)
     
     def determine_status(self, current_price: float, average_price: float) -> str:
         """Determine price status"""
@@ -183,60 +169,77 @@ class DABantayPresyoIntegration:
     
     async def process_and_save_data(self, items: List[Dict]):
         """Process parsed items and save to database"""
-        saved_count = 0
-        
+        # Load existing trend/average for every item in one query
+        names = [item['name'] for item in items]
+        existing_by_name = {}
+        async for doc in self.db.market_items.find(
+            {'name': {'$in': names}}, {'name': 1, 'averagePrice': 1, 'trend': 1}
+        ):
+            existing_by_name[doc['name']] = doc
+
+        docs_by_name = {}
         for item in items:
             try:
-                # Get existing item to maintain trend history
-                existing = await self.db.market_items.find_one({"name": item['name']})
-                
+                # Existing item maintains trend history
+                existing = existing_by_name.get(item['name'])
+
                 current_price = item.get('price', 0)
-                
+
                 # Calculate average from existing data or use current as baseline
                 if existing and 'averagePrice' in existing:
                     average_price = existing['averagePrice']
                 else:
                     average_price = current_price * 1.1  # Assume 10% higher average for new items
-                
+
                 # Update trend
                 trend = existing['trend'][-5:] if existing and 'trend' in existing else []
                 trend.append(current_price)
                 if len(trend) > 6:
                     trend = trend[-6:]
-                
+
+                now = datetime.utcnow()
+                status = self.determine_status(current_price, average_price)
+
                 # Prepare document
                 doc = {
                     'name': item['name'],
+                    **name_fields(item['name']),
                     'category': self.categorize_item(item['name']),
                     'currentPrice': current_price,
                     'averagePrice': average_price,
                     'unit': item.get('unit', 'kg'),
                     'location': 'NCR',
                     'icon': self._get_icon(self.categorize_item(item['name'])),
-                    'status': self.determine_status(current_price, average_price),
+                    'status': status,
+                    'statusRank': status_rank(status),
                     'savings': round(average_price - current_price, 2),
                     'trend': trend,
-                    'lastUpdated': datetime.utcnow(),
+                    'lastUpdated': now,
                     'climateImpact': self._generate_climate_impact(item['name']),
-                    'updatedAt': datetime.utcnow()
+                    'updatedAt': now
                 }
-                
-                if not existing:
-                    doc['createdAt'] = datetime.utcnow()
-                
-                # Upsert
-                await self.db.market_items.update_one(
-                    {'name': item['name']},
-                    {'$set': doc},
-                    upsert=True
-                )
-                saved_count += 1
-                
+
+                # A name repeated in the batch extends the trend of its earlier
+                # occurrence, and only the last version of it is written
+                existing_by_name[item['name']] = doc
+                docs_by_name[item['name']] = doc
+
             except Exception as e:
                 logger.error(f"Error saving item {item.get('name')}: {str(e)}")
                 continue
-        
+
+        async with BulkWriter(self.db.market_items) as writer:
+            for name, doc in docs_by_name.items():
+                # Upsert — createdAt only set when the item is new
+                await writer.add(UpdateOne(
+                    {'name': name},
+                    {'$set': doc, '$setOnInsert': {'createdAt': doc['updatedAt']}},
+                    upsert=True
+                ))
+
+        saved_count = len(docs_by_name) - writer.error_count
         logger.info(f"Saved {saved_count} items to database")
+        await name_index.refresh(self.db)
         return saved_count
     
     def _get_icon(self, category: str) -> str:
@@ -0,0 +1,203 @@
+"""
+Response cache for read endpoints whose data only changes when an integration
+writes to MongoDB.
+
+ResponseCacheMiddleware (plain ASGI) stores the serialized body of successful
+GET responses for the configured path prefixes, keyed by path + normalized
+query string. Each entry remembers the version of the collections the route
+reads (services/collection_versions.py); once any of them is bumped the entry
+is stale and the next request recomputes it.
+
+Every cached route response carries a strong ETag (SHA-256 of the body) and
+`Cache-Control: public, max-age=<max_age>, must-revalidate`; a matching
+`If-None-Match` gets a bodyless 304. Between integrations a polling dashboard
+therefore costs one dict lookup per request (plus a version sync every few
+seconds) instead of a MongoDB query and a JSON re-serialization.
+
+Entries also expire after `ttl` seconds as a safety net for writes that bypass
+the version counters (manual edits in Atlas, live-scrape fallbacks). The cache
+is an LRU bounded to `max_entries` responses.
+
+Env vars:
+  RESPONSE_CACHE_ENABLED   — "0" disables caching (ETags are still sent)
+  RESPONSE_CACHE_TTL       — max entry age in seconds (default 3600)
+  RESPONSE_CACHE_MAX_AGE   — Cache-Control max-age in seconds (default 0)
+"""
+
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from services.collection_versions import collection_versions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 512
+
+# Headers recomputed for every response (or meaningless on a replay)
+_DROP_HEADERS = {b"content-length", b"etag", b"cache-control", b"date", b"server"}
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/"x" matches "x"; * matches anything."""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.replace("W/", "", 1) == etag:
+            return True
+    return False
+
+
+class _Entry:
+    __slots__ = ("version", "stored_at", "status", "headers", "body", "etag")
+
+    def __init__(self, version, status, headers, body):
+        self.version = version
+        self.stored_at = time.monotonic()
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = make_etag(body)
+
+
+class ResponseCacheMiddleware:
+    """
+    Args:
+        app: the wrapped ASGI app.
+        routes: (path prefix, collections the route reads) pairs. The first
+            matching prefix wins; routes reading nothing from MongoDB (static
+            lists) use an empty tuple and expire by `ttl` only.
+    """
+
+    def __init__(
+        self,
+        app,
+        routes: Sequence[Tuple[str, Sequence[str]]],
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: Optional[float] = None,
+        max_age: Optional[int] = None,
+    ):
+        self.app = app
+        self.routes = [(prefix, tuple(collections)) for prefix, collections in routes]
+        self.max_entries = max_entries
+        self.ttl = ttl if ttl is not None else float(os.environ.get("RESPONSE_CACHE_TTL", 3600))
+        max_age = max_age if max_age is not None else int(os.environ.get("RESPONSE_CACHE_MAX_AGE", 0))
+        self.cache_control = f"public, max-age={max_age}, must-revalidate".encode()
+        self.enabled = os.environ.get("RESPONSE_CACHE_ENABLED", "1") != "0"
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        _instances.append(self)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+        collections = self._match(scope["path"])
+        if collections is None:
+            return await self.app(scope, receive, send)
+
+        if_none_match = None
+        for name, value in scope.get("headers", []):
+            if name == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+                break
+
+        await collection_versions.sync()
+        key = self._key(scope)
+        version = collection_versions.snapshot(collections)
+
+        entry = self._entries.get(key) if self.enabled else None
+        if entry is not None and entry.version == version and time.monotonic() - entry.stored_at < self.ttl:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return await self._send(send, entry, if_none_match, b"HIT")
+
+        self.misses += 1
+        status, headers, body = await self._capture(scope, receive)
+        entry = _Entry(version, status, headers, body)
+        if status == 200 and self.enabled:
+            self._store(key, entry)
+        await self._send(send, entry, if_none_match, b"MISS")
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+    def clear(self):
+        self._entries.clear()
+
+    # ------------------------------------------------------------------ #
+    #  Internal                                                            #
+    # ------------------------------------------------------------------ #
+
+    def _match(self, path: str) -> Optional[Tuple[str, ...]]:
+        for prefix, collections in self.routes:
+            if path.startswith(prefix):
+                return collections
+        return None
+
+    @staticmethod
+    def _key(scope) -> str:
+        query = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+        return scope["path"] + "?" + urlencode(sorted(query))
+
+    async def _capture(self, scope, receive) -> Tuple[int, List, bytes]:
+        start = {}
+        chunks = []
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture_send)
+        headers = [(k, v) for k, v in start.get("headers", []) if k.lower() not in _DROP_HEADERS]
+        return start.get("status", 500), headers, b"".join(chunks)
+
+    def _store(self, key: str, entry: _Entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _send(self, send, entry: _Entry, if_none_match: Optional[str], cache_status: bytes):
+        cacheable = entry.status == 200
+        headers = list(entry.headers)
+        if cacheable:
+            headers += [(b"etag", entry.etag.encode()), (b"cache-control", self.cache_control)]
+            headers.append((b"x-cache", cache_status))
+
+        if cacheable and if_none_match and etag_matches(if_none_match, entry.etag):
+            self.not_modified += 1
+            headers = [(k, v) for k, v in headers if k.lower() not in (b"content-type",)]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        headers.append((b"content-length", str(len(entry.body)).encode()))
+        await send({"type": "http.response.start", "status": entry.status, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
+
+
+_instances: List[ResponseCacheMiddleware] = []
+
+
+def cache_stats() -> Optional[Dict]:
+    """Stats of the installed middleware (None before the app is built)."""
+    return _instances[-1].stats() if _instances else None
@@ -0,0 +1,192 @@
+"""
+Stale-while-revalidate cache for slow upstream calls (NGCP scrape, IEMOP trends,
+energy analytics).
+
+Each cached key has a soft and a hard TTL:
+
+  age < soft_ttl          fresh — returned as is
+  soft_ttl <= age < hard  stale — returned immediately, and a single background
+                          refresh is started (callers never wait for Chromium
+                          or IEMOP once a value exists)
+  age >= hard_ttl / none  miss — the caller awaits the refresh
+
+Refreshes are single-flight per key: concurrent misses and stale hits share
+one loader call. A loader result that fails `cacheable` (None or empty by
+default — the scrapers' "no data" values) is not stored, so a failed refresh
+keeps serving the last good value until it passes the hard TTL.
+
+Values are kept in memory (L1) and, when a collection is given, in MongoDB
+(L2, default `grid_status_cache`, one document per `<name>:<key>`), so a
+restarted instance serves the last good value instead of a cold miss.
+
+TTLs can be overridden per cache with SWR_<NAME>_SOFT_TTL / SWR_<NAME>_HARD_TTL
+(seconds). `cache_stats()` returns hit/miss counters for every cache.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COLLECTION = "grid_status_cache"
+
+_registry: List["SWRCache"] = []
+
+
+def cache_stats() -> Dict[str, Dict]:
+    return {cache.name: cache.stats() for cache in _registry}
+
+
+class SWRCache:
+    """Two-level stale-while-revalidate cache with single-flight refreshes."""
+
+    def __init__(
+        self,
+        name: str,
+        soft_ttl: float,
+        hard_ttl: float,
+        collection: Optional[str] = DEFAULT_COLLECTION,
+        cacheable: Callable[[Any], bool] = bool,
+    ):
+        env = f"SWR_{name.upper()}"
+        self.name = name
+        self.soft_ttl = float(os.environ.get(f"{env}_SOFT_TTL", soft_ttl))
+        self.hard_ttl = max(self.soft_ttl, float(os.environ.get(f"{env}_HARD_TTL", hard_ttl)))
+        self.collection = collection
+        self.cacheable = cacheable
+
+        self._entries: Dict[str, Tuple[Any, float]] = {}  # key -> (value, stored_at epoch)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+        _registry.append(self)
+
+    # ------------------------------------------------------------------ #
+    #  Public API                                                          #
+    # ------------------------------------------------------------------ #
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]], db=None) -> Any:
+        """
+        Return the cached value for `key`, refreshing it with `loader()` as needed.
+
+        On a miss (no value younger than the hard TTL) the caller gets the
+        loader's result, or its exception. Stale hits never raise; failed
+        background refreshes are only logged.
+        """
+        entry = self._entries.get(key)
+        if entry is None and db is not None and self.collection:
+            entry = await self._load(db, key)
+            if entry is not None:
+                self.l2_hits += 1
+
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age < self.soft_ttl:
+                self.hits += 1
+                return value
+            if age < self.hard_ttl:
+                self.stale_hits += 1
+                task = self._refresh(key, loader, db)
+                if task not in self._background:
+                    self._background.add(task)
+                    task.add_done_callback(self._background_done)
+                return value
+
+        self.misses += 1
+        return await asyncio.shield(self._refresh(key, loader, db))
+
+    async def peek(self, key: str, db=None) -> Optional[Tuple[Any, float]]:
+        """Last good (value, stored_at) for `key`, ignoring TTLs — for "as of" fallbacks."""
+        entry = self._entries.get(key)
+        if entry is None and db is not None and self.collection:
+            entry = await self._load(db, key)
+        return entry
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drop one key (or everything) from memory; L2 copies age out by TTL."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "soft_ttl": self.soft_ttl,
+            "hard_ttl": self.hard_ttl,
+            "keys": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 3) if lookups else None,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "refreshing": sorted(self._inflight),
+        }
+
+    # ------------------------------------------------------------------ #
+    #  Internal                                                            #
+    # ------------------------------------------------------------------ #
+
+    def _background_done(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled():
+            task.exception()  # already logged; retrieve so asyncio doesn't warn
+
+    def _refresh(self, key: str, loader: Callable[[], Awaitable[Any]], db) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_refresh(key, loader, db))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _run_refresh(self, key: str, loader: Callable[[], Awaitable[Any]], db) -> Any:
+        self.refreshes += 1
+        try:
+            value = await loader()
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.warning(f"SWR cache {self.name}:{key}: refresh failed: {e}")
+            raise
+
+        if not self.cacheable(value):
+            self.refresh_errors += 1
+            return value
+
+        stored_at = time.time()
+        self._entries[key] = (value, stored_at)
+        if db is not None and self.collection:
+            try:
+                await db[self.collection].replace_one(
+                    {"_id": f"{self.name}:{key}"},
+                    {"value": value, "stored_at": stored_at},
+                    upsert=True,
+                )
+            except Exception as e:
+                logger.debug(f"SWR cache {self.name}:{key}: L2 write failed: {e}")
+        return value
+
+    async def _load(self, db, key: str) -> Optional[Tuple[Any, float]]:
+        try:
+            doc = await db[self.collection].find_one({"_id": f"{self.name}:{key}"})
+        except Exception as e:
+            logger.debug(f"SWR cache {self.name}:{key}: L2 read failed: {e}")
+            return None
+        if not doc or "stored_at" not in doc:
+            return None
+        entry = (doc["value"], doc["stored_at"])
+        self._entries[key] = entry
+        return entry
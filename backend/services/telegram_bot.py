@@ -6,7 +6,8 @@ Uses Telegram Bot API directly via aiohttp (no additional dependencies).
 Setup:
 1. Create a bot via @BotFather → get TELEGRAM_BOT_TOKEN
 2. Users start the bot and are subscribed via POST /api/telegram/subscribe
-3. GitHub Actions calls POST /api/telegram/send-daily-alert each morning
+3. GitHub Actions calls POST /api/telegram/send-daily-alert each morning, which
+   queues a broadcast job (services/telegram_broadcast.py)
 
 Env vars:
   TELEGRAM_BOT_TOKEN — from BotFather
@@ -18,6 +19,8 @@ import aiohttp
 from datetime import datetime
 from typing import Optional
 
+from services.http_utils import http_clients
+
 logger = logging.getLogger(__name__)
 
 TELEGRAM_API = "https://api.telegram.org/bot{token}/{method}"
@@ -27,7 +30,9 @@ def _token() -> Optional[str]:
     return os.environ.get("TELEGRAM_BOT_TOKEN")
 
 
-async def send_message(chat_id: str, text: str) -> bool:
+async def send_message(
+    chat_id: str, text: str, session: Optional[aiohttp.ClientSession] = None
+) -> bool:
     """Send a message to a single chat_id. Returns True on success."""
     token = _token()
     if not token:
@@ -35,14 +40,14 @@ async def send_message(chat_id: str, text: str) -> bool:
         return False
     url = TELEGRAM_API.format(token=token, method="sendMessage")
     payload = {"chat_id": chat_id, "text": text, "parse_mode": "HTML"}
+    session = session or http_clients.session()
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                if resp.status == 200:
-                    return True
-                body = await resp.text()
-                logger.error(f"Telegram API error {resp.status}: {body}")
-                return False
+        async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+            if resp.status == 200:
+                return True
+            body = await resp.text()
+            logger.error(f"Telegram API error {resp.status}: {body}")
+            return False
     except Exception as e:
         logger.error(f"Telegram send failed for chat_id={chat_id}: {e}")
         return False
@@ -79,20 +84,3 @@ def build_daily_alert(top_items: list, climate_metrics: list, grid_status: dict)
     lines.append("\n<i>View full data: https://frontend-qxb1lmjh3-martin-banarias-projects.vercel.app</i>")
     return "\n".join(lines)
 
-
-async def broadcast(db, message: str) -> dict:
-    """Send message to all active subscribers. Returns send stats."""
-    subscribers = []
-    async for doc in db.telegram_subscribers.find({"active": True}, {"chat_id": 1}):
-        subscribers.append(doc["chat_id"])
-
-    sent, failed = 0, 0
-    for chat_id in subscribers:
-        ok = await send_message(chat_id, message)
-        if ok:
-            sent += 1
-        else:
-            failed += 1
-
-    logger.info(f"Telegram broadcast: {sent} sent, {failed} failed out of {len(subscribers)}")
-    return {"total": len(subscribers), "sent": sent, "failed": failed}
@@ -6,13 +6,21 @@ Commercial use permitted on WeatherAPI free tier (1M calls/month).
 Fetches current conditions for Manila (NCR) and updates 8 climate metric documents:
   Temperature, Rainfall, Air Quality Index, Humidity, UV Index,
   Soil Moisture (derived), Drought Index (derived), Wind Speed
+
+Every reading is also folded into `climate_history`, one document per metric
+per Philippine calendar day: {name, date (YYYY-MM-DD), value (latest), sum,
+count} — the daily mean is sum / count. services/climate_correlation.py aligns
+it with price_history.
 """
 
 import aiohttp
 import asyncio
 import logging
 import os
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+
+from services.collection_versions import collection_versions
+from services.http_utils import http_clients, read_json
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +30,9 @@ WEATHERAPI_BASE = "https://api.weatherapi.com/v1"
 # Philippine location used for all climate metrics
 PH_LOCATION = "Manila,Philippines"
 
+# Calendar days in climate_history are Philippine dates, like DA price dates
+PH_TZ = timezone(timedelta(hours=8))
+
 # Maps WeatherAPI EPA AQI category (1-6) → estimated AQI value
 EPA_TO_AQI = {1: 25, 2: 75, 3: 125, 4: 175, 5: 250, 6: 350}
 
@@ -289,7 +300,7 @@ def _update_trend(existing_trend: list, new_value: float, max_len: int = 7) -> l
 # ──────────────────────────────────────────────
 
 
-async def fetch_weather_data() -> dict:
+async def fetch_weather_data(session: aiohttp.ClientSession = None) -> dict:
     """Fetch current weather + AQI from WeatherAPI.com.
     Returns the JSON data on success, or a dict with 'error' key on failure."""
     if not WEATHERAPI_KEY:
@@ -298,17 +309,17 @@ async def fetch_weather_data() -> dict:
         return {"error": msg}
 
     url = f"{WEATHERAPI_BASE}/current.json?key={WEATHERAPI_KEY}&q={PH_LOCATION}&aqi=yes"
+    session = session or http_clients.session()
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                url, timeout=aiohttp.ClientTimeout(total=15)
-            ) as resp:
-                if resp.status != 200:
-                    body = await resp.text()
-                    msg = f"WeatherAPI returned HTTP {resp.status}: {body[:200]}"
-                    logger.error(msg)
-                    return {"error": msg}
-                return await resp.json()
+        async with session.get(
+            url, timeout=aiohttp.ClientTimeout(total=15)
+        ) as resp:
+            if resp.status != 200:
+                body = await resp.text()
+                msg = f"WeatherAPI returned HTTP {resp.status}: {body[:200]}"
+                logger.error(msg)
+                return {"error": msg}
+            return await read_json(resp)
     except asyncio.TimeoutError:
         msg = "WeatherAPI request timed out after 15s"
         logger.error(msg)
@@ -436,6 +447,7 @@ async def run_weather_update(db) -> dict:
         ]
 
         updated = 0
+        today = now.astimezone(PH_TZ).strftime("%Y-%m-%d")
         for m in metrics:
             # Fetch existing doc to preserve/extend its trend
             existing = await db.climate_metrics.find_one({"name": m["name"]})
@@ -468,8 +480,18 @@ async def run_weather_update(db) -> dict:
                 {"$set": doc, "$setOnInsert": {"createdAt": now}},
                 upsert=True,
             )
+            await db.climate_history.update_one(
+                {"name": m["name"], "date": today},
+                {
+                    "$set": {"value": m["currentValue"], "updatedAt": now},
+                    "$inc": {"sum": m["currentValue"], "count": 1},
+                },
+                upsert=True,
+            )
             updated += 1
 
+        if updated:
+            await collection_versions.bump(db, "climate_metrics", "climate_history")
         logger.info(
             f"Weather update complete — {updated} metrics updated at {now.isoformat()}"
         )
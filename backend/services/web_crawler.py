@@ -1,12 +1,42 @@
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from typing import Optional, Dict, List
 import logging
 from datetime import datetime
 
+from services.html_parsing import parse, soup
+from services.http_utils import http_clients, read_text
+
 logger = logging.getLogger(__name__)
 
+
+def _extract_market_items(html: str, source_type: str) -> List[Dict]:
+    """Parse market items out of a page (module-level so large pages can go to the worker pool)."""
+    market_data = []
+
+    # Different parsing logic based on source
+    if source_type == "da_bantay_presyo":
+        # Parse DA Bantay Presyo format
+        # This would need to be customized based on actual website structure
+        items = soup(html, only=SoupStrainer('div', class_='market-item')).find_all('div', class_='market-item')  # Example selector
+        for item in items:
+            try:
+                data = {
+                    'name': item.find('h3').text.strip() if item.find('h3') else None,
+                    'price': float(item.find('span', class_='price').text.strip()) if item.find('span', class_='price') else None,
+                    'unit': item.find('span', class_='unit').text.strip() if item.find('span', class_='unit') else 'kg',
+                    'scraped_at': datetime.utcnow().isoformat()
+                }
+                if data['name'] and data['price']:
+                    market_data.append(data)
+            except Exception as e:
+                logger.error(f"Error parsing item: {str(e)}")
+                continue
+
+    return market_data
+
+
 class WebCrawler:
     """Web crawler for scraping market price data from various sources"""
     
@@ -15,46 +45,26 @@ class WebCrawler:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
     
-    async def scrape_url(self, url: str) -> Optional[str]:
-        """Scrape content from a given URL"""
+    async def scrape_url(self, url: str, session: Optional[aiohttp.ClientSession] = None) -> Optional[str]:
+        """Scrape content from a given URL (over the shared pooled session by default)"""
+        session = session or http_clients.session()
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self.headers, timeout=10) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        return html
-                    else:
-                        logger.error(f"Failed to scrape {url}: Status {response.status}")
-                        return None
+            async with session.get(
+                url, headers=self.headers, timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status == 200:
+                    html = await read_text(response)
+                    return html
+                else:
+                    logger.error(f"Failed to scrape {url}: Status {response.status}")
+                    return None
         except Exception as e:
             logger.error(f"Error scraping {url}: {str(e)}")
             return None
     
     async def extract_market_data(self, html: str, source_type: str = "da_bantay_presyo") -> List[Dict]:
-        """Extract market data from HTML content"""
-        soup = BeautifulSoup(html, 'html.parser')
-        market_data = []
-        
-        # Different parsing logic based on source
-        if source_type == "da_bantay_presyo":
-            # Parse DA Bantay Presyo format
-            # This would need to be customized based on actual website structure
-            items = soup.find_all('div', class_='market-item')  # Example selector
-            for item in items:
-                try:
-                    data = {
-                        'name': item.find('h3').text.strip() if item.find('h3') else None,
-                        'price': float(item.find('span', class_='price').text.strip()) if item.find('span', class_='price') else None,
-                        'unit': item.find('span', class_='unit').text.strip() if item.find('span', class_='unit') else 'kg',
-                        'scraped_at': datetime.utcnow().isoformat()
-                    }
-                    if data['name'] and data['price']:
-                        market_data.append(data)
-                except Exception as e:
-                    logger.error(f"Error parsing item: {str(e)}")
-                    continue
-        
-        return market_data
+        """Extract market data from HTML content (off the event loop for large pages)"""
+        return await parse(_extract_market_items, html, source_type)
     
     async def scrape_pagasa_climate_data(self, url: str = "https://www.pagasa.dost.gov.ph/") -> Dict:
         """Scrape climate data from PAGASA website"""
@@ -62,7 +72,7 @@ class WebCrawler:
         if not html:
             return {}
         
-        soup = BeautifulSoup(html, 'html.parser')
+        page = soup(html, only=SoupStrainer(id='temperature'))
         climate_data = {
             'temperature': None,
             'rainfall': None,
@@ -73,7 +83,7 @@ class WebCrawler:
         # Parse PAGASA data - customize based on actual structure
         try:
             # Example parsing logic
-            temp_element = soup.find('div', {'id': 'temperature'})
+            temp_element = page.find('div', {'id': 'temperature'})
             if temp_element:
                 climate_data['temperature'] = float(temp_element.text.strip())
         except Exception as e:
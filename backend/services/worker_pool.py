@@ -0,0 +1,65 @@
+"""
+Shared process pool for CPU-bound work (PDF text extraction, price parsing).
+
+PyPDF2 and the regex parsers are pure Python and hold the GIL, so running them
+inline blocks the event loop for every API request. Work submitted here runs in
+a small, lazily-created ProcessPoolExecutor instead.
+
+Workers use the "spawn" start method: the server process has Motor/driver
+threads running, and forking a threaded process is unsafe.
+
+Env vars:
+  WORKER_POOL_SIZE — max worker processes (default 2; Render free tier is 512 MB)
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = int(os.environ.get("WORKER_POOL_SIZE", "2"))
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return the shared executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info(f"Started worker pool ({MAX_WORKERS} processes)")
+    return _executor
+
+
+async def run_in_process(fn: Callable, *args) -> Any:
+    """
+    Run `fn(*args)` in the worker pool and await the result.
+    `fn` must be a module-level (picklable) function.
+
+    If a worker died (OOM-killed, segfault in a C extension), the pool is
+    rebuilt once and the call retried.
+    """
+    global _executor
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_executor(), fn, *args)
+    except BrokenProcessPool:
+        logger.warning("Worker pool broken — restarting it and retrying once")
+        _executor = None
+        return await loop.run_in_executor(get_executor(), fn, *args)
+
+
+def shutdown():
+    """Stop the worker processes (called on app shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
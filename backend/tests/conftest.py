@@ -3,11 +3,25 @@ Shared pytest fixtures for Climate Intel backend tests.
 Usage: REACT_APP_BACKEND_URL=http://localhost:8000 pytest tests/ -v
 """
 import os
+import sys
+from pathlib import Path
+
 import pytest
 import requests
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
 
+# Unit tests import backend modules directly (e.g. `from services.x import y`)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# ...and shared test helpers (e.g. `from mock_mongo import mock_db`, tests/mock_mongo.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "production: smoke test against a running backend (REACT_APP_BACKEND_URL)"
+    )
+
 
 @pytest.fixture(scope="session")
 def base_url():
@@ -0,0 +1,41 @@
+"""
+In-memory Motor databases for unit tests: mongomock behind mongomock-motor's
+async wrappers, so services run their real queries and updates with MongoDB
+semantics and no server.
+
+    db = mock_db({"telegram_subscribers": [{"chat_id": "1", "active": True}]})
+    stored(db.telegram_subscribers, "chat_id")["1"]  # -> the stored document
+"""
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Union
+
+from mongomock_motor import AsyncMongoMockClient, AsyncMongoMockCollection
+
+
+def mock_db(collections: Optional[Dict[str, Iterable[Dict]]] = None):
+    """A fresh, empty database, seeded with `{collection: [documents]}`."""
+    db = AsyncMongoMockClient()["test"]
+    for name, docs in (collections or {}).items():
+        docs = [dict(doc) for doc in docs]
+        if docs:
+            db.delegate[name].insert_many(docs)
+    return db
+
+
+def stored(collection, key: Optional[str] = None) -> Union[List[Dict], Dict]:
+    """Documents in `collection`, read synchronously — as a list, or keyed by `key`."""
+    docs = list(collection.database.delegate[collection.name].find())
+    return docs if key is None else {doc.get(key): doc for doc in docs}
+
+
+def count_bulk_writes(monkeypatch) -> Counter:
+    """bulk_write calls per collection name, for the rest of the test."""
+    calls: Counter = Counter()
+    bulk_write = AsyncMongoMockCollection.bulk_write
+
+    async def counted(self, *args, **kwargs):
+        calls[self.name] += 1
+        return await bulk_write(self, *args, **kwargs)
+
+    monkeypatch.setattr(AsyncMongoMockCollection, "bulk_write", counted)
+    return calls
@@ -0,0 +1,108 @@
+"""
+Tests for the columnar AnalyticsEngine (no server needed).
+
+tests/fixtures/analytics/golden.json holds 400 synthetic items (see
+benchmarks/bench_analytics_engine.make_items: missing/empty/one-point trends,
+zero and negative trend starts, int and float prices, duplicated trends that
+tie in the top-N lists) plus the reports the pre-vectorization engine produced
+for them. Output must match that JSON exactly.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from services.analytics_engine import AnalyticsEngine, ItemFrame
+
+GOLDEN = json.loads((Path(__file__).parent / "fixtures" / "analytics" / "golden.json").read_text())
+ITEMS, METRICS = GOLDEN["items"], GOLDEN["metrics"]
+
+
+def reports(items):
+    engine = AnalyticsEngine()
+    with np.errstate(all="ignore"):
+        return {
+            "market_analytics": engine.generate_market_analytics(items),
+            "price_trends": engine.calculate_price_trends(items),
+            "climate_correlations": engine.correlate_climate_to_prices(items, METRICS),
+            "buying_opportunities": engine.identify_best_buying_opportunities(items),
+            "weekly_report": {**engine.generate_weekly_report(items, METRICS), "generated_at": None},
+        }
+
+
+def plain(value):
+    """Serialize like the endpoints do (numpy scalars become their str/JSON form)."""
+    return json.loads(json.dumps(value, default=str))
+
+
+class TestGoldenReports:
+    @pytest.mark.parametrize("report", sorted(GOLDEN["expected"]))
+    def test_matches_previous_engine(self, report):
+        assert json.dumps(plain(reports(ITEMS)[report])) == json.dumps(GOLDEN["expected"][report])
+
+    def test_shared_frame_matches_item_list(self):
+        assert plain(reports(ItemFrame(ITEMS))) == plain(reports(ITEMS))
+
+
+class TestEdgeCases:
+    def test_empty_items(self):
+        engine = AnalyticsEngine()
+        analytics = engine.generate_market_analytics([])
+        assert analytics["price_summary"]["total_items"] == 0
+        assert analytics["price_summary"]["price_stability_index"] == 0
+        assert analytics["supply_demand"] == [] and analytics["category_insights"] == []
+        assert analytics["top_movers"] == {"top_gainers": [], "top_losers": []}
+        assert engine.calculate_price_trends([]) == {}
+
+    def test_ties_keep_item_order(self):
+        items = [
+            {"name": f"Item {i}", "category": "fish", "status": "MURA", "savings": 2.0,
+             "currentPrice": 100.0, "trend": [100.0, 120.0] if i % 2 else [100.0, 80.0]}
+            for i in range(30)
+        ]
+        alerts = AnalyticsEngine()._generate_price_alerts(ItemFrame(items))
+        assert [a["item"] for a in alerts] == [f"Item {i}" for i in range(10)]
+        movers = AnalyticsEngine()._get_top_movers(ItemFrame(items))
+        assert [m["name"] for m in movers["top_losers"]] == ["Item 0", "Item 2", "Item 4", "Item 6", "Item 8"]
+        assert [m["name"] for m in movers["top_gainers"]] == ["Item 29", "Item 27", "Item 25", "Item 23", "Item 21"]
+
+
+class TestBatchPredictions:
+    def test_matches_per_item_polyfit(self):
+        engine = AnalyticsEngine()
+        items = ITEMS + [
+            {"name": "No trend", "currentPrice": 10.0},
+            {"name": "Null trend", "currentPrice": 10.0, "trend": None},
+            {"name": "Long", "currentPrice": 12.0, "trend": [float(p) for p in range(40, 10, -1)]},
+        ]
+        batch = engine.predict_price_movements_batch(items)
+        assert len(batch) == len(items)
+        for item, got in zip(items, batch):
+            expected = engine.predict_price_movements(item) if item.get("trend") is not None else got
+            assert expected.keys() == got.keys()
+            if "prediction" in expected:
+                assert got == expected
+                continue
+            assert got["direction"] == expected["direction"]
+            assert got["current_price"] == expected["current_price"]
+            assert got["confidence"] == pytest.approx(expected["confidence"])
+            # The fits differ in the last bits; an exact .xx5 may round either way
+            assert got["predicted_next"] == pytest.approx(expected["predicted_next"], abs=0.0100001)
+            assert got["trend_slope"] == pytest.approx(expected["trend_slope"], abs=0.0100001)
+
+    def test_variable_length_trends(self):
+        batch = AnalyticsEngine().predict_price_movements_batch([
+            {"currentPrice": 4.0, "trend": [1.0, 2.0, 3.0, 4.0]},
+            {"currentPrice": 9.0, "trend": [10.0, 9.5, 9.0]},
+            {"currentPrice": 1.0, "trend": [1.0, 1.0]},
+            {"currentPrice": 1.0, "trend": [1.0, None, 2.0]},
+        ])
+        assert batch[0]["predicted_next"] == 5.0 and batch[0]["trend_slope"] == 1.0
+        assert batch[1]["predicted_next"] == 8.5 and batch[1]["direction"] == "decreasing"
+        assert batch[2] == batch[3] == {"prediction": "insufficient_data"}
+        assert AnalyticsEngine().predict_price_movements_batch([]) == []
+
+    def test_accepts_item_frame(self):
+        engine = AnalyticsEngine()
+        assert engine.predict_price_movements_batch(ItemFrame(ITEMS)) == engine.predict_price_movements_batch(ITEMS)
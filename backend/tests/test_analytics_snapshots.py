@@ -0,0 +1,135 @@
+"""
+Tests for materialized analytics snapshots against a scratch database.
+
+The database tests require MONGO_URL; skipped otherwise.
+"""
+import asyncio
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+from bson import ObjectId
+
+from services import analytics_snapshots as snapshots_module
+from services.analytics_engine import analytics_engine
+from services.analytics_snapshots import AnalyticsSnapshots, _plain
+from services.collection_versions import CollectionVersions
+
+MONGO_URL = os.environ.get("MONGO_URL")
+SCRATCH_DB = "climate_intel_analytics_snapshots_test"
+
+requires_mongo = pytest.mark.skipif(not MONGO_URL, reason="MONGO_URL not set")
+
+ITEMS = [
+    {"name": "Rice", "category": "rice", "status": "MURA", "savings": 4.0, "currentPrice": 48.0,
+     "trend": [54.0, 52.0, 50.0, 48.0], "climateImpact": {"level": "low"}},
+    {"name": "Tomato", "category": "vegetables", "status": "MAHAL", "savings": -10.0, "currentPrice": 120.0,
+     "trend": [80.0, 95.0, 110.0, 120.0], "climateImpact": {"level": "high"}},
+    {"name": "Cabbage", "category": "vegetables", "status": "STABLE", "savings": 1.0, "currentPrice": 60.0,
+     "trend": [60.0, 61.0, 60.0], "climateImpact": {"level": "low"}},
+]
+METRICS = [
+    {"name": "Temperature", "currentValue": 27.0, "averageValue": 29.0, "status": "NORMAL"},
+    {"name": "UV Index", "currentValue": 11.0, "averageValue": 8.0, "status": "WARNING"},
+]
+
+
+def run(coro_fn):
+    """Run `coro_fn(db)` against a freshly seeded scratch database."""
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    async def main():
+        client = AsyncIOMotorClient(MONGO_URL)
+        await client.drop_database(SCRATCH_DB)
+        db = client[SCRATCH_DB]
+        await db.market_items.insert_many([dict(i) for i in ITEMS])
+        await db.climate_metrics.insert_many([dict(m) for m in METRICS])
+        try:
+            return await coro_fn(db)
+        finally:
+            await client.drop_database(SCRATCH_DB)
+            client.close()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def versions(monkeypatch):
+    versions = CollectionVersions()
+    monkeypatch.setattr(snapshots_module, "collection_versions", versions)
+    return versions
+
+
+class TestPlain:
+    def test_numpy_values_become_python_and_bson_types_are_kept(self):
+        item_id, seen = ObjectId(), datetime(2026, 10, 16, 8, 30)
+        report = {
+            "count": np.int64(3),
+            "share": np.float64(0.5),
+            "rising": np.bool_(True),
+            "range": (np.float64(48.0), 120.0),
+            "series": np.array([1, 2]),
+            "by_size": {5: "small"},
+            "item": {"_id": item_id, "lastUpdated": seen, "name": "Rice", "price": None},
+        }
+
+        plain = _plain(report)
+
+        assert plain == {
+            "count": 3,
+            "share": 0.5,
+            "rising": True,
+            "range": [48.0, 120.0],
+            "series": [1, 2],
+            "by_size": {"5": "small"},
+            "item": {"_id": item_id, "lastUpdated": seen, "name": "Rice", "price": None},
+        }
+        assert type(plain["count"]) is int and type(plain["rising"]) is bool
+        assert type(plain["share"]) is float
+
+
+@requires_mongo
+class TestAnalyticsSnapshots:
+    def test_reports_match_engine_and_are_computed_once(self, versions):
+        snapshots = AnalyticsSnapshots()
+
+        async def scenario(db):
+            trends = await snapshots.get(db, "price_trends")
+            await snapshots.get(db, "market_analytics")
+            await snapshots.get(db, "climate_correlations")
+            stored = await db.analytics_snapshots.count_documents({})
+            return trends, stored
+
+        trends, stored = run(scenario)
+        assert trends["data"] == _plain(analytics_engine.calculate_price_trends(ITEMS))
+        assert stored == len(snapshots_module.REPORTS)
+        assert snapshots.materializations == 1
+
+    def test_source_version_change_triggers_recompute(self, versions):
+        snapshots = AnalyticsSnapshots()
+
+        async def scenario(db):
+            before = await snapshots.get(db, "buying_opportunities")
+            await db.market_items.update_one({"name": "Tomato"}, {"$set": {
+                "status": "MURA", "savings": 30.0, "trend": [150.0, 140.0, 120.0],
+                "climateImpact": {"level": "low"},
+            }})
+            await versions.bump(db, "market_items")
+            after = await snapshots.get(db, "buying_opportunities")
+            return before, after
+
+        before, after = run(scenario)
+        assert [o["item"] for o in before["data"]] == ["Rice"]
+        assert {o["item"] for o in after["data"]} == {"Rice", "Tomato"}
+        assert after["version"] != before["version"]
+        assert snapshots.materializations == 2
+
+    def test_snapshots_survive_restart(self, versions):
+        async def scenario(db):
+            await AnalyticsSnapshots().get(db, "weekly_report")
+            restarted = AnalyticsSnapshots()
+            await restarted.get(db, "weekly_report")
+            return restarted
+
+        assert run(scenario).materializations == 0
@@ -0,0 +1,203 @@
+"""
+Tests for the pooled-context lifecycle in services/browser_pool.py — reuse,
+recycling, relaunch and memory-triggered restarts — against a fake Playwright
+browser, so no Chromium is launched.
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from services import browser_pool as browser_pool_module  # noqa: E402
+from services.browser_pool import BrowserPool  # noqa: E402
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+        self.fail_new_page = False
+        self.open_pages = 0
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def new_page(self):
+        if self.fail_new_page:
+            raise RuntimeError("Target page, context or browser has been closed")
+        self.open_pages += 1
+        self.browser.in_use = sum(c.open_pages for c in self.browser.contexts)
+        self.browser.max_in_use = max(self.browser.max_in_use, self.browser.in_use)
+        return FakePage(self)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+        self.in_use = self.max_in_use = 0
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeChromium:
+    def __init__(self):
+        self.browsers = []
+
+    async def launch(self, headless=True, args=()):
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+
+    async def stop(self):
+        pass
+
+
+@pytest.fixture
+def rss(monkeypatch):
+    """Settable process-tree RSS (MB) seen by the pool."""
+    value = {"mb": 100.0}
+    monkeypatch.setattr(browser_pool_module, "process_tree_rss_mb", lambda: value["mb"])
+    return value
+
+
+def make_pool(**kw):
+    pool = BrowserPool(**{"size": 1, "max_context_uses": 20, "memory_limit_mb": 400, **kw})
+    pool._playwright = FakePlaywright()
+    return pool
+
+
+async def use(pool, fail=False):
+    async with pool.page() as page:
+        page.context.open_pages -= 1  # released once the body finishes
+        if fail:
+            raise ValueError("scrape failed")
+        return page
+
+
+class TestBrowserPool:
+    def test_context_is_reused_then_recycled_after_max_uses(self, rss):
+        pool = make_pool(max_context_uses=2)
+
+        async def run():
+            return [await use(pool) for _ in range(3)]
+
+        pages = asyncio.run(run())
+
+        assert all(p.closed for p in pages)
+        assert pages[0].context is pages[1].context
+        assert pages[2].context is not pages[0].context
+        assert pages[0].context.closed
+        assert (pool.launches, pool.contexts_created, pool.contexts_recycled) == (1, 2, 1)
+        assert pool.stats()["idle_contexts"] == 1
+
+    def test_failed_use_recycles_the_context(self, rss):
+        pool = make_pool()
+
+        async def run():
+            with pytest.raises(ValueError):
+                await use(pool, fail=True)
+            return await use(pool)
+
+        page = asyncio.run(run())
+
+        browser = pool._playwright.chromium.browsers[0]
+        assert browser.contexts[0].closed
+        assert page.context is browser.contexts[1]
+        assert (pool.failures, pool.contexts_recycled, pool.pages) == (1, 1, 2)
+
+    def test_new_page_failure_still_releases_the_context(self, rss):
+        pool = make_pool()
+
+        async def run():
+            await use(pool)
+            pool._idle[0].context.fail_new_page = True
+            with pytest.raises(RuntimeError):
+                await use(pool)
+            # The slot was released: with size=1 this would hang otherwise
+            return await asyncio.wait_for(use(pool), timeout=1)
+
+        page = asyncio.run(run())
+
+        broken = pool._playwright.chromium.browsers[0].contexts[0]
+        assert broken.closed
+        assert page.context is not broken
+        assert (pool.failures, pool.contexts_recycled) == (1, 1)
+
+    def test_disconnected_browser_is_relaunched(self, rss):
+        pool = make_pool()
+
+        async def run():
+            first = await use(pool)
+            first.context.browser.connected = False
+            return first, await use(pool)
+
+        first, second = asyncio.run(run())
+
+        assert pool.launches == 2
+        assert second.context.browser is not first.context.browser
+        # The idle context from the dead browser is dropped, not reused
+        assert first.context.closed
+
+    def test_memory_over_limit_recycles_and_restarts(self, rss):
+        pool = make_pool(memory_limit_mb=400)
+
+        async def run():
+            rss["mb"] = 450.0
+            first = await use(pool)
+            rss["mb"] = 150.0
+            return first, await use(pool)
+
+        first, second = asyncio.run(run())
+
+        assert first.context.closed
+        # Still over the limit once the context was gone, so Chromium was restarted
+        assert not first.context.browser.connected
+        assert pool.launches == 2
+        assert second.context.browser is not first.context.browser
+        assert pool.stats()["peak_rss_mb"] == 450.0
+
+    def test_concurrent_pages_are_bounded_by_pool_size(self, rss):
+        pool = make_pool(size=2)
+
+        async def one():
+            async with pool.page() as page:
+                await asyncio.sleep(0.01)
+                page.context.open_pages -= 1
+
+        async def run():
+            await asyncio.gather(*(one() for _ in range(6)))
+
+        asyncio.run(run())
+
+        browser = pool._playwright.chromium.browsers[0]
+        assert browser.max_in_use == 2
+        assert pool.contexts_created == 2
+        assert pool.pages == 6
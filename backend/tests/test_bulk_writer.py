@@ -0,0 +1,182 @@
+"""
+Tests for the batched MongoDB writer (services/bulk_writer.py) and the
+market_items batch upsert built on it, against a mongomock database
+(tests/mock_mongo.py).
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from services import bulk_writer as bulk_writer_module
+from services import real_data_integration
+from services.bulk_writer import BulkWriter
+from services.collection_versions import VERSIONS_COLLECTION, CollectionVersions
+from services.name_search import NameIndex
+from services.real_data_integration import DABantayPresyoIntegration
+from mock_mongo import mock_db, stored
+
+
+@pytest.fixture
+def versions(monkeypatch):
+    versions = CollectionVersions()
+    monkeypatch.setattr(bulk_writer_module, "collection_versions", versions)
+    return versions
+
+
+def upserts(n):
+    return [UpdateOne({"name": f"item-{i}"}, {"$set": {"price": i}}, upsert=True) for i in range(n)]
+
+
+class SlowCollection:
+    """Wraps a collection, making bulk_write slow and tracking overlap."""
+
+    def __init__(self, collection, delay=0.01):
+        self.inner, self.delay = collection, delay
+        self.name, self.database = collection.name, collection.database
+        self.in_flight = self.max_in_flight = 0
+        self.chunks = []
+
+    async def bulk_write(self, ops, ordered=True):
+        assert ordered is False
+        self.chunks.append(len(ops))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return await self.inner.bulk_write(ops, ordered=ordered)
+        finally:
+            self.in_flight -= 1
+
+
+class FailingCollection:
+    """bulk_write fails with `error`; a BulkWriteError carries `details`."""
+
+    def __init__(self, db, error):
+        self.name, self.database = "market_items", db
+        self.error = error
+
+    async def bulk_write(self, ops, ordered=True):
+        raise self.error
+
+
+class TestBulkWriter:
+    def test_ops_are_flushed_in_chunks(self, versions):
+        db = mock_db()
+        slow = SlowCollection(db.price_history)
+
+        async def run():
+            async with BulkWriter(slow, chunk_size=3, max_inflight=2) as writer:
+                for op in upserts(10):
+                    await writer.add(op)
+            return writer
+
+        writer = asyncio.run(run())
+
+        assert slow.chunks == [3, 3, 3, 1]
+        assert 1 < slow.max_in_flight <= 2
+        assert writer.stats() == {"ops": 10, "upserted": 10, "modified": 0, "matched": 0, "errors": 0}
+        assert len(stored(db.price_history)) == 10
+
+    def test_flush_waits_for_in_flight_chunks(self, versions):
+        db = mock_db()
+        slow = SlowCollection(db.price_history, delay=0.02)
+
+        async def run():
+            writer = BulkWriter(slow, chunk_size=2)
+            for op in upserts(4):
+                await writer.add(op)
+            before = len(stored(db.price_history))
+            await writer.flush()
+            return before, len(stored(db.price_history))
+
+        before, after = asyncio.run(run())
+
+        assert before < 4
+        assert after == 4
+
+    def test_version_is_bumped_once_per_flush_that_changed_documents(self, versions):
+        db = mock_db({"price_history": [{"name": "item-0", "price": 0}]})
+
+        async def run():
+            async with BulkWriter(db.price_history, chunk_size=2) as writer:
+                for op in upserts(5):
+                    await writer.add(op)
+            first = versions.snapshot(["price_history"])
+
+            # Matched but unchanged documents don't invalidate anything
+            async def noop_bulk_write(ops, ordered=True):
+                return SimpleNamespace(bulk_api_result={"nMatched": 1, "nModified": 0})
+
+            unchanged = SimpleNamespace(name="price_history", database=db, bulk_write=noop_bulk_write)
+            async with BulkWriter(unchanged) as writer:
+                await writer.add(upserts(1)[0])
+            return first, versions.snapshot(["price_history"])
+
+        first, second = asyncio.run(run())
+
+        assert first == (1,)
+        assert second == first
+        assert stored(db[VERSIONS_COLLECTION], "_id")["price_history"]["version"] == 1
+
+    def test_partial_bulk_write_error_counts_only_failed_ops(self, versions):
+        db = mock_db()
+        error = BulkWriteError(
+            {
+                "nUpserted": 2,
+                "nModified": 1,
+                "nMatched": 1,
+                "writeErrors": [{"index": 3, "code": 11000, "errmsg": "E11000 duplicate key"}],
+            }
+        )
+
+        async def run():
+            async with BulkWriter(FailingCollection(db, error)) as writer:
+                for op in upserts(4):
+                    await writer.add(op)
+            return writer
+
+        writer = asyncio.run(run())
+
+        assert writer.stats() == {"ops": 4, "upserted": 2, "modified": 1, "matched": 1, "errors": 1}
+        # The ops that were applied still invalidate cached reads
+        assert versions.snapshot(["market_items"]) == (1,)
+
+    def test_failed_bulk_write_counts_every_op(self, versions):
+        db = mock_db()
+
+        async def run():
+            async with BulkWriter(FailingCollection(db, ConnectionError("reset")), chunk_size=3) as writer:
+                for op in upserts(5):
+                    await writer.add(op)
+            return writer
+
+        writer = asyncio.run(run())
+
+        assert writer.error_count == 5
+        assert versions.snapshot(["market_items"]) == (0,)
+
+
+class TestMarketItemsBatch:
+    def test_repeated_name_extends_the_earlier_trend(self, versions, monkeypatch):
+        monkeypatch.setattr(real_data_integration, "name_index", NameIndex())
+        db = mock_db({"market_items": [{"name": "Rice", "averagePrice": 50.0, "trend": [48.0, 49.0]}]})
+        integration = DABantayPresyoIntegration(db)
+        items = [
+            {"name": "Rice", "price": 51.0},
+            {"name": "Tomato", "price": 80.0},
+            {"name": "Rice", "price": 52.0},
+        ]
+
+        saved = asyncio.run(integration.process_and_save_data(items))
+
+        by_name = stored(db.market_items, "name")
+        assert saved == 2
+        assert len(by_name) == 2
+        assert by_name["Rice"]["trend"] == [48.0, 49.0, 51.0, 52.0]
+        assert by_name["Rice"]["currentPrice"] == 52.0
+        assert by_name["Rice"]["averagePrice"] == 50.0
+        assert by_name["Tomato"]["trend"] == [80.0]
+        assert "createdAt" in by_name["Tomato"] and "createdAt" not in by_name["Rice"]
@@ -0,0 +1,64 @@
+"""
+Tests for the shared keyword categorizer (no server needed).
+
+tests/fixtures/categorizer/recorded_corpus.json holds commodity names with the
+categories/units produced by the original per-integration `any(k in name ...)`
+implementations; the Aho–Corasick rule sets must reproduce them exactly.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from services.categorizer import (
+    Categorizer,
+    backfill_categorizer,
+    commodity_categorizer,
+    unit_classifier,
+    weekly_categorizer,
+)
+
+CORPUS = json.loads(
+    (Path(__file__).parent / "fixtures" / "categorizer" / "recorded_corpus.json").read_text(encoding="utf-8")
+)
+
+RULE_SETS = {
+    "backfill": backfill_categorizer,
+    "commodity": commodity_categorizer,
+    "weekly": weekly_categorizer,
+    "unit": unit_classifier,
+}
+
+
+class TestRecordedCorpus:
+    @pytest.mark.parametrize("rule_set", sorted(RULE_SETS))
+    def test_matches_recorded_output(self, rule_set):
+        categorizer = RULE_SETS[rule_set]
+        mismatches = [
+            (row["name"], row[rule_set], categorizer.categorize(row["name"]))
+            for row in CORPUS
+            if categorizer.categorize(row["name"]) != row[rule_set]
+        ]
+        assert mismatches == []
+
+    @pytest.mark.parametrize("rule_set", sorted(RULE_SETS))
+    def test_categorize_many_matches_single(self, rule_set):
+        categorizer = RULE_SETS[rule_set]
+        names = [row["name"] for row in CORPUS]
+        assert categorizer.categorize_many(names) == [row[rule_set] for row in CORPUS]
+
+
+class TestCategorizer:
+    def test_first_rule_wins_regardless_of_position(self):
+        # "pork" appears first in the name, but the rice rule is listed first
+        assert commodity_categorizer.categorize("Pork Fried Rice") == "rice"
+
+    def test_overlapping_keywords(self):
+        categorizer = Categorizer([("a", ["shell"]), ("b", ["he"]), ("c", ["she"])], default="none")
+        assert categorizer.categorize("ushers") == "b"
+        assert categorizer.categorize("SHELLFISH") == "a"
+        assert categorizer.categorize("hx") == "none"
+
+    def test_default(self):
+        assert backfill_categorizer.categorize("Sugar Refined") == "others"
+        assert unit_classifier.categorize("Sugar Refined") == "kg"
@@ -0,0 +1,118 @@
+"""
+Tests for the climate–price correlation engine (pure functions; no database).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.climate_correlation import (
+    MIN_PAIRS,
+    compute_report,
+    correlate,
+    fisher_interval,
+    rolling_correlate,
+)
+
+
+def series_rows(days=240, lag=14, seed=1):
+    """Vegetable prices driven by rainfall `lag` days earlier; meat prices are noise."""
+    rng = np.random.default_rng(seed)
+    calendar = pd.date_range("2025-10-01", periods=days, freq="D")
+    rain = np.clip(20 + 15 * np.sin(np.arange(days) / 20) + rng.normal(0, 5, days), 0, None)
+    temp = 30 + rng.normal(0, 1, days)
+
+    climate = {"name": [], "date": [], "value": []}
+    prices = {"name": [], "category": [], "date": [], "price": []}
+    for i, day in enumerate(calendar):
+        date = day.strftime("%Y-%m-%d")
+        for name, value in (("Rainfall", rain[i]), ("Temperature", temp[i])):
+            climate["name"].append(name)
+            climate["date"].append(date)
+            climate["value"].append(float(value))
+        if day.weekday() >= 5:
+            continue  # DA publishes weekdays only
+        for j in range(3):
+            base = 50.0 * (j + 1)
+            driver = rain[i - lag] if i >= lag else 20.0
+            for name, category, price in (
+                (f"Veg {j}", "vegetables", base * (1 + 0.004 * driver + rng.normal(0, 0.01))),
+                (f"Meat {j}", "meat", base * (1 + rng.normal(0, 0.02))),
+            ):
+                prices["name"].append(name)
+                prices["category"].append(category)
+                prices["date"].append(date)
+                prices["price"].append(float(price))
+    return prices, climate
+
+
+class TestCorrelate:
+    def test_matches_pandas_pairwise(self):
+        rng = np.random.default_rng(0)
+        prices = rng.normal(size=(60, 2))
+        climate = rng.normal(size=(60, 3))
+        prices[[3, 10, 11], 0] = np.nan
+        climate[[5, 40], 2] = np.nan
+        climate[:, 1] = np.round(climate[:, 1])  # ties for Spearman
+
+        pearson, spearman, n = correlate(prices, climate, lags=(0, 2))
+        for li, lag in enumerate((0, 2)):
+            shifted = pd.DataFrame(climate).shift(lag)
+            for c in range(2):
+                for k in range(3):
+                    x, y = pd.Series(prices[:, c]), shifted[k]
+                    assert pearson[li, c, k] == pytest.approx(x.corr(y))
+                    assert spearman[li, c, k] == pytest.approx(x.corr(y, method="spearman"))
+                    assert n[li, c, k] == (x.notna() & y.notna()).sum()
+
+    def test_rolling_windows_end_at_last_day(self):
+        rng = np.random.default_rng(0)
+        prices, climate = rng.normal(size=(100, 1)), rng.normal(size=(100, 1))
+        r, n = rolling_correlate(prices, climate, lags=(0,), window=40, step=30)
+        assert r.shape == (3, 1, 1, 1)
+        last = pd.Series(prices[-40:, 0]).corr(pd.Series(climate[-40:, 0]))
+        assert r[-1, 0, 0, 0] == pytest.approx(last)
+        assert (n == 40).all()
+
+    def test_fisher_interval_brackets_r(self):
+        low, high = fisher_interval(np.array([0.5, -0.2]), np.array([50, 200]))
+        assert (low < [0.5, -0.2]).all() and (high > [0.5, -0.2]).all()
+        wide_low, wide_high = fisher_interval(np.array(0.5), np.array(50), variance=1.06)
+        assert wide_high - wide_low > high[0] - low[0]
+
+
+class TestComputeReport:
+    def test_recovers_lagged_driver(self):
+        prices, climate = series_rows(lag=14)
+        report = compute_report(prices, climate, "2026-06-01")
+        top = report["correlations"][0]
+        assert (top["category"], top["metric"], top["lag_days"]) == ("vegetables", "Rainfall", 14)
+        assert top["significant"] and top["direction"] == "positive"
+        assert top["pearson"]["ci_low"] <= top["pearson"]["r"] <= top["pearson"]["ci_high"]
+        assert top["spearman"]["ci_low"] > 0
+        assert top["affected_items"] == 3
+        assert top["rolling"]["windows"] > 0 and top["rolling"]["sign_agreement"] == 1.0
+
+        noise = [c for c in report["correlations"] if c["category"] == "meat"]
+        assert noise and not any(c["significant"] for c in noise)
+
+    def test_short_climate_history_reports_nothing(self):
+        prices, climate = series_rows()
+        keep = MIN_PAIRS - 5
+        short = {key: values[-2 * keep:] for key, values in climate.items()}
+        report = compute_report(prices, short, "2026-06-01")
+        assert report["correlations"] == []
+        assert report["climate_days"] == keep
+
+    def test_grid_shorter_than_longest_lag(self):
+        # A new deployment: only 20 days of prices and climate, LAGS go to 30
+        prices, climate = series_rows(days=20)
+        report = compute_report(prices, climate, "2026-06-01")
+        assert report["correlations"] == []
+
+    def test_no_data(self):
+        empty = compute_report(
+            {"name": [], "category": [], "date": [], "price": []},
+            {"name": [], "date": [], "value": []},
+            "2026-06-01",
+        )
+        assert empty["correlations"] == [] and empty["pairs_tested"] == 0
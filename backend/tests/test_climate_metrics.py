@@ -9,6 +9,9 @@ import os
 
 BASE_URL = os.environ.get("REACT_APP_BACKEND_URL", "").rstrip("/")
 
+# Smoke tests against a deployed backend; the unit job deselects them
+pytestmark = pytest.mark.production
+
 
 class TestClimateMetrics:
     """Climate Metrics API tests — GET /api/climate-metrics"""
@@ -0,0 +1,205 @@
+"""
+Tests for the concurrent DOE issuance crawl (services/doe_integration.py) and
+its resumable job (services/integration_jobs.py), against a local stub of the
+doe.gov.ph listing and a mongomock database (tests/mock_mongo.py).
+"""
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from services import doe_integration
+from services.doe_integration import FRONTIER_COLLECTION, fetch_doe_issuances, run_doe_update
+from services.http_utils import http_clients
+from services.integration_jobs import doe_full_update_job
+from services.job_runner import JobRunner
+from mock_mongo import count_bulk_writes, mock_db, stored
+
+PER_PAGE = 4
+
+
+class StubDOE:
+    """
+    A `pages`-page Laws and Issuances listing, newest first: page 1 holds the
+    highest article ids. Pages in `missing` answer 404; pages from `hold_from`
+    on are not answered until `released` is set.
+    """
+
+    def __init__(self, pages, missing=(), delay=0.02, hold_from=None):
+        self.pages, self.missing, self.delay = pages, set(missing), delay
+        self.hold_from = hold_from
+        self.released = asyncio.Event()
+        self.requested = []
+        self.in_flight = self.max_in_flight = 0
+
+    def article_id(self, page, i):
+        return 1000 - (page - 1) * PER_PAGE - i
+
+    def render(self, page):
+        articles = [
+            {
+                "id": self.article_id(page, i),
+                "title": f"Department Circular No. DC2026-{page:02d}-{i:04d}",
+                "link": f"/articles/{self.article_id(page, i)}--dc",
+                "content": "<p>Guidelines.</p>",
+                "datePublished": f"2026-{12 - page % 12:02d}-01T00:00:00+08:00",
+                "attachments": [],
+            }
+            for i in range(PER_PAGE)
+        ]
+        options = "".join(f'<option value="{n}">{n}</option>' for n in range(1, self.pages + 1))
+        nuxt = json.dumps({"data": [{"articles": articles, "total": self.pages * PER_PAGE}]})
+        return (
+            f"<html><body><select>{options}</select>"
+            f"<script>window.__NUXT__={nuxt};</script></body></html>"
+        )
+
+    async def handle(self, request):
+        page = int(request.query.get("page", 1))
+        self.requested.append(page)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.hold_from is not None and page >= self.hold_from:
+                await self.released.wait()
+            if page in self.missing or page > self.pages:
+                return web.Response(status=404)
+            return web.Response(text=self.render(page), content_type="text/html")
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture(autouse=True)
+def fast_crawl(monkeypatch):
+    monkeypatch.setattr(doe_integration, "CRAWL_RATE", 1000.0)
+    monkeypatch.setattr(doe_integration, "CRAWL_CONCURRENCY", 4)
+
+
+def run_against(stub, monkeypatch, coro_fn):
+    async def run():
+        app = web.Application()
+        app.router.add_get("/articles/group/laws-and-issuances", stub.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        monkeypatch.setattr(doe_integration, "DOE_BASE", f"http://127.0.0.1:{port}")
+        try:
+            return await coro_fn()
+        finally:
+            await http_clients.close()
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+class TestDOECrawl:
+    def test_full_crawl_fetches_pages_concurrently(self, monkeypatch):
+        stub, db = StubDOE(pages=12), mock_db()
+        bulk_writes = count_bulk_writes(monkeypatch)
+
+        result = run_against(stub, monkeypatch, lambda: run_doe_update(db, full=True))
+
+        assert result["success"]
+        assert result["issuances_updated"] == 12 * PER_PAGE
+        assert sorted(stub.requested) == list(range(1, 13))
+        assert stub.max_in_flight > 1
+        assert len(stored(db.doe_circulars)) == 12 * PER_PAGE
+        # Upserts are batched, and a finished crawl leaves no frontier behind
+        assert 0 < bulk_writes["doe_circulars"] <= 2
+        assert stored(db[FRONTIER_COLLECTION]) == []
+
+    def test_incremental_crawl_stops_at_stored_issuances(self, monkeypatch):
+        stub = StubDOE(pages=10)
+        # Everything from page 2 on is already stored
+        db = mock_db(
+            {"doe_circulars": [{"doe_id": stub.article_id(page, i)} for page in range(2, 11) for i in range(PER_PAGE)]}
+        )
+
+        result = run_against(stub, monkeypatch, lambda: run_doe_update(db))
+
+        assert result["success"]
+        # Page 1 is all new, page 2 is all stored — nothing past it is fetched
+        assert stub.requested == [1, 2]
+        assert result["issuances_updated"] == 2 * PER_PAGE
+
+    def test_interrupted_full_crawl_resumes_from_frontier(self, monkeypatch):
+        db = mock_db()
+        broken = StubDOE(pages=15, missing={13})
+
+        first = run_against(broken, monkeypatch, lambda: run_doe_update(db, full=True))
+
+        assert first["success"]
+        assert len(stored(db.doe_circulars)) == 12 * PER_PAGE
+        frontier = stored(db[FRONTIER_COLLECTION], "_id")["doe:Department Circular"]
+        assert (frontier["next_page"], frontier["max_page"]) == (13, 15)
+
+        fixed = StubDOE(pages=15)
+        second = run_against(fixed, monkeypatch, lambda: run_doe_update(db, full=True))
+
+        assert second["success"]
+        assert sorted(fixed.requested) == [13, 14, 15]
+        assert len(stored(db.doe_circulars)) == 15 * PER_PAGE
+        assert stored(db[FRONTIER_COLLECTION]) == []
+
+    def test_interrupted_full_update_job_resumes_from_frontier(self, monkeypatch):
+        monkeypatch.setattr(doe_integration, "FRONTIER_SAVE_EVERY", 4)
+        db, stub = mock_db(), StubDOE(pages=15, hold_from=13)
+
+        def runner():
+            jobs = JobRunner()
+            jobs.handler("doe_full_update")(doe_full_update_job)
+            return jobs
+
+        async def page_reported(job_id, page):
+            while ((await db.jobs.find_one({"_id": job_id})) or {}).get("progress", {}).get("page") != page:
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            first = runner()
+            await first.start(db)
+            job_id = await first.submit("doe_full_update")
+            await asyncio.wait_for(page_reported(job_id, 12), timeout=5)
+            await first.stop()  # the worker restarts while page 13 is in flight
+            interrupted = await db.jobs.find_one({"_id": job_id})
+            frontier = await db[FRONTIER_COLLECTION].find_one({})
+
+            stub.released.set()
+            stub.requested.clear()
+            second = runner()
+            await second.start(db)
+            try:
+
+                async def done():
+                    async for job in second.watch(job_id, poll_interval=0.01):
+                        pass
+                    return job
+
+                return interrupted, frontier, await asyncio.wait_for(done(), timeout=5)
+            finally:
+                await second.stop()
+
+        interrupted, frontier, job = run_against(stub, monkeypatch, scenario)
+
+        assert interrupted["status"] == "queued"
+        assert interrupted["checkpoint"] == {"issuances_updated": 12 * PER_PAGE}
+        assert frontier["next_page"] == 13
+        assert job["status"] == "succeeded"
+        assert job["attempts"] == 2
+        # Only the pages past the frontier were fetched again
+        assert sorted(stub.requested) == [13, 14, 15]
+        assert job["result"]["issuances_updated"] == 15 * PER_PAGE
+        assert len(stored(db.doe_circulars)) == 15 * PER_PAGE
+        assert stored(db[FRONTIER_COLLECTION]) == []
+
+    def test_fetch_without_db_returns_normalized_issuances(self, monkeypatch):
+        stub = StubDOE(pages=3)
+
+        issuances = run_against(stub, monkeypatch, lambda: fetch_doe_issuances())
+
+        assert len(issuances) == 3 * PER_PAGE
+        assert issuances[0]["doe_id"] == 1000
+        assert issuances[0]["category"] == "Department Circular"
@@ -0,0 +1,73 @@
+"""
+Tests for the DOE fuel price integration (services/doe_fuel_integration.py)
+against a local stub of the anomura fuel API and a mongomock database
+(tests/mock_mongo.py).
+"""
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from services import doe_fuel_integration
+from services.collection_versions import CollectionVersions
+from services.doe_fuel_integration import integrate_doe_fuel_prices
+from services.http_utils import http_clients
+from services.name_search import NameIndex
+from mock_mongo import mock_db, stored
+
+LATEST = {
+    "week_start": "2026-10-13",
+    "ncr_summary": [
+        {"product": "RON 95", "common_price": 62.5, "range_low": 60.1, "range_high": 65.0},
+        {"product": "DIESEL", "common_price": None, "range_low": 55.0, "range_high": 58.0},
+        {"product": "AUTO LPG", "common_price": 40.0},
+    ],
+}
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = NameIndex()
+    index.rebuild(["rice", "tomato"])
+    monkeypatch.setattr(doe_fuel_integration, "name_index", index)
+    monkeypatch.setattr(doe_fuel_integration, "collection_versions", CollectionVersions())
+    return index
+
+
+def integrate(db, monkeypatch):
+    async def latest(request):
+        return web.json_response(LATEST)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/api/fuel/latest", latest)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        monkeypatch.setattr(doe_fuel_integration, "ANOMURA_FUEL_API", f"http://127.0.0.1:{port}/api/fuel/latest")
+        try:
+            return await integrate_doe_fuel_prices(db)
+        finally:
+            await http_clients.close()
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+class TestFuelIntegration:
+    def test_fuel_items_are_upserted_and_searchable(self, monkeypatch, index):
+        db = mock_db({"market_items": [{"name": "Diesel", "averagePrice": 50.0, "trend": [50.0]}]})
+
+        assert integrate(db, monkeypatch)
+
+        items = stored(db.market_items, "name")
+        assert set(items) == {"Gasoline 95", "Diesel"}
+        assert items["Gasoline 95"]["currentPrice"] == 62.5
+        assert items["Diesel"]["currentPrice"] == 56.5  # midpoint of the range
+        assert items["Diesel"]["trend"] == [50.0, 56.5]
+        assert items["Diesel"]["status"] == "MAHAL"
+        # New names are in the in-memory name index without a full refresh
+        assert index.search("gasoline") == ["gasoline 95"]
+        assert index.search("diesel") == ["diesel"]
@@ -0,0 +1,232 @@
+"""
+Tests for the price_history forecasting models (pure functions) and the
+Forecaster service (mongomock database, fits run inline).
+"""
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import forecasting
+from services.collection_versions import collection_versions
+from services.forecasting import (
+    MIN_OBSERVATIONS,
+    SEASON,
+    Forecaster,
+    fit_commodity,
+    forecast_from_state,
+    prepare_series,
+)
+from services.name_search import name_fields
+from mock_mongo import mock_db, stored
+
+
+def history(n, start="2025-10-01", seed=0, weekly=(0.0, 1.0, 2.0, 1.0, -1.0), drift=0.05, noise=0.3):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=n)
+    prices = 100 + drift * np.arange(n) + np.resize(np.asarray(weekly), n) + rng.normal(0, noise, n)
+    return [d.strftime("%Y-%m-%d") for d in dates], prices.tolist()
+
+
+class TestPrepareSeries:
+    def test_business_day_alignment(self):
+        series = prepare_series(
+            ["2026-03-02", "2026-03-04", "2026-03-04", "2026-03-07", "2026-03-09", "2026-03-10"],
+            [10.0, 11.0, 12.0, 99.0, 0.0, 13.0],
+        )
+        # Saturday and non-positive prices dropped, duplicate date keeps the last, gaps forward-filled
+        assert series.index.strftime("%Y-%m-%d").tolist() == [
+            "2026-03-02", "2026-03-03", "2026-03-04", "2026-03-05", "2026-03-06", "2026-03-09", "2026-03-10",
+        ]
+        assert series.tolist() == [10.0, 10.0, 12.0, 12.0, 12.0, 12.0, 13.0]
+
+
+class TestFitCommodity:
+    def test_insufficient_history(self):
+        dates, prices = history(MIN_OBSERVATIONS - 1)
+        assert fit_commodity("Rice", dates, prices)["status"] == "insufficient_data"
+
+    def test_fits_all_models_with_backtest(self):
+        dates, prices = history(200)
+        state = fit_commodity("Rice", dates, prices)
+        assert state["status"] == "ok" and not state["incremental"]
+        assert set(state["backtest"]) == {"seasonal_naive", "exp_smoothing", "ridge"}
+        for metrics in state["backtest"].values():
+            assert metrics["mae"] >= 0 and metrics["rmse"] >= metrics["mae"] and metrics["points"] == 30
+        assert state["best"] == min(state["backtest"], key=lambda m: state["backtest"][m]["mape"])
+
+    def test_short_history_skips_ridge(self):
+        dates, prices = history(MIN_OBSERVATIONS + 5)
+        state = fit_commodity("Rice", dates, prices)
+        assert state["models"]["ridge"] is None
+        assert "ridge" not in forecast_from_state(state, 3)["models"]
+
+    def test_seasonal_pattern_is_learned(self):
+        dates, prices = history(200, drift=0.0, noise=0.0, weekly=(10.0, 20.0, 30.0, 20.0, 0.0))
+        state = fit_commodity("Rice", dates, prices)
+        forecast = forecast_from_state(state, 2 * SEASON)
+        assert forecast["models"]["seasonal_naive"] == prices[-SEASON:] * 2
+        assert state["backtest"]["seasonal_naive"]["mae"] == 0
+        assert state["best"] == "seasonal_naive"
+
+    def test_incremental_refit_advances_cached_state(self):
+        dates, prices = history(200)
+        previous = fit_commodity("Rice", dates[:-3], prices[:-3])
+        state = fit_commodity("Rice", dates, prices, previous)
+        assert state["incremental"] and state["since_reoptimized"] == 3
+        assert state["backtest"] == previous["backtest"]
+        for key in ("alpha", "beta", "phi"):
+            assert state["models"]["exp_smoothing"][key] == previous["models"]["exp_smoothing"][key]
+
+        # Same recursion as a full pass with the cached parameters
+        params = {**previous["models"]["exp_smoothing"]}
+        expected = forecasting.advance_exp_smoothing(params, np.asarray(prices[-3:]))
+        assert state["models"]["exp_smoothing"]["level"] == pytest.approx(expected["level"])
+
+    def test_reoptimizes_after_enough_new_days(self, monkeypatch):
+        monkeypatch.setattr(forecasting, "REOPTIMIZE_EVERY", 5)
+        dates, prices = history(200)
+        previous = fit_commodity("Rice", dates[:-6], prices[:-6])
+        assert not fit_commodity("Rice", dates, prices, previous)["incremental"]
+
+    def test_backfilled_day_refits_fully(self):
+        dates, prices = history(200)
+        # A missing mid-history day later backfilled: the cached prefix no longer matches
+        previous = fit_commodity("Rice", dates[:100] + dates[101:-2], prices[:100] + prices[101:-2])
+        assert not fit_commodity("Rice", dates, prices, previous)["incremental"]
+
+    def test_changed_history_start_refits(self):
+        dates, prices = history(200)
+        previous = fit_commodity("Rice", dates[5:-1], prices[5:-1])
+        assert not fit_commodity("Rice", dates, prices, previous)["incremental"]
+
+
+class TestForecastFromState:
+    def test_dates_skip_weekends(self):
+        dates, prices = history(100, start="2026-01-05")
+        state = fit_commodity("Rice", dates, prices)
+        forecast = forecast_from_state(state, 6)
+        assert pd.Timestamp(state["last_date"]).weekday() < 5
+        assert len(forecast["dates"]) == 6
+        assert all(pd.Timestamp(d).weekday() < 5 for d in forecast["dates"])
+        assert forecast["dates"][0] > state["last_date"]
+        for values in forecast["models"].values():
+            assert len(values) == 6 and all(np.isfinite(values))
+
+
+def price_rows(name, n, **kwargs):
+    dates, prices = history(n, **kwargs)
+    return [{"name": name, "date": d, "price": p, **name_fields(name)} for d, p in zip(dates, prices)]
+
+
+async def inline(fn, *args):
+    return fn(*args)
+
+
+@pytest.fixture
+def forecaster(monkeypatch):
+    monkeypatch.setattr(forecasting.worker_pool, "run_in_process", inline)
+    # Each mock_db counts versions from scratch; so must the process-wide counters
+    monkeypatch.setattr(collection_versions, "_versions", {})
+    return Forecaster()
+
+
+def write(db, coro):
+    """Apply a price_history write and bump its version, like BulkWriter does."""
+
+    async def run():
+        await coro
+        await collection_versions.bump(db, "price_history")
+
+    asyncio.run(run())
+
+
+class TestForecasterRefresh:
+    def test_unchanged_history_is_a_cache_hit(self, forecaster):
+        db = mock_db({"price_history": price_rows("Rice", 120)})
+        asyncio.run(forecaster.get_state(db, "Rice"))
+        asyncio.run(forecaster.get_state(db, "Rice"))
+        assert (forecaster.fits, forecaster.cache_hits) == (1, 1)
+
+    def test_cached_model_survives_a_restart(self, forecaster):
+        db = mock_db({"price_history": price_rows("Rice", 120)})
+        asyncio.run(forecaster.get_state(db, "Rice"))
+
+        restarted = Forecaster()
+        asyncio.run(restarted.get_state(db, "Rice"))
+        assert (restarted.fits, restarted.cache_hits) == (0, 1)
+
+    def test_backfilled_older_day_refits(self, forecaster):
+        rows = price_rows("Rice", 120)
+        missing = rows.pop(50)
+        db = mock_db({"price_history": rows})
+        before = asyncio.run(forecaster.get_state(db, "Rice"))
+
+        write(db, db.price_history.insert_one(missing))
+        after = asyncio.run(forecaster.get_state(db, "Rice"))
+
+        assert forecaster.fits == 2
+        assert after["last_date"] == before["last_date"]
+        assert not after["incremental"]
+
+    def test_corrected_price_refits(self, forecaster):
+        rows = price_rows("Rice", 120)
+        db = mock_db({"price_history": rows})
+        asyncio.run(forecaster.get_state(db, "Rice"))
+
+        write(db, db.price_history.update_one({"name": "Rice", "date": rows[-1]["date"]}, {"$set": {"price": 150.0}}))
+        state = asyncio.run(forecaster.get_state(db, "Rice"))
+
+        assert forecaster.fits == 2
+        assert state["tail"][-1] == 150.0
+
+    def test_new_day_refits_incrementally(self, forecaster):
+        rows = price_rows("Rice", 121)
+        db = mock_db({"price_history": rows[:-1]})
+        asyncio.run(forecaster.get_state(db, "Rice"))
+
+        write(db, db.price_history.insert_one(rows[-1]))
+        state = asyncio.run(forecaster.get_state(db, "Rice"))
+
+        assert forecaster.fits == 2 and forecaster.incremental_fits == 1
+        assert state["last_date"] == rows[-1]["date"]
+
+    def test_write_to_another_commodity_keeps_the_model(self, forecaster):
+        db = mock_db({"price_history": price_rows("Rice", 120)})
+        asyncio.run(forecaster.get_state(db, "Rice"))
+
+        write(db, db.price_history.insert_many(price_rows("Egg", 30)))
+        asyncio.run(forecaster.get_state(db, "Rice"))
+
+        assert (forecaster.fits, forecaster.cache_hits) == (1, 1)
+
+    def test_unknown_commodity_raises(self, forecaster):
+        with pytest.raises(LookupError):
+            asyncio.run(forecaster.get_state(mock_db(), "Unobtainium"))
+
+
+class TestForecasterService:
+    def test_resolve_name(self, forecaster):
+        rows = price_rows("Rice Regular Milled", 20) + price_rows("Rice Well Milled", 25, start="2025-10-08")
+        db = mock_db({"price_history": rows})
+
+        assert asyncio.run(forecaster.resolve_name(db, "Rice Regular Milled")) == "Rice Regular Milled"
+        # Partial match: the most recently observed matching commodity
+        assert asyncio.run(forecaster.resolve_name(db, "rice milled")) == "Rice Well Milled"
+        assert asyncio.run(forecaster.resolve_name(db, "durian")) is None
+
+    def test_train_all(self, forecaster):
+        db = mock_db({"price_history": price_rows("Rice", 120) + price_rows("Egg", 90) + price_rows("Durian", 5)})
+        seen = []
+
+        async def progress(name, stats):
+            seen.append(name)
+
+        first = asyncio.run(forecaster.train_all(db, progress=progress))
+        second = asyncio.run(forecaster.train_all(db))
+
+        assert first == {"commodities": 3, "fitted": 2, "up_to_date": 0, "insufficient_data": 1, "failed": 0}
+        assert second == {"commodities": 3, "fitted": 0, "up_to_date": 2, "insufficient_data": 1, "failed": 0}
+        assert sorted(seen) == ["Durian", "Egg", "Rice"]
+        assert len(stored(db.forecast_models)) == 3
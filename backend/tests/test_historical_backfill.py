@@ -0,0 +1,143 @@
+"""
+Tests for the concurrent historical backfill (services/historical_backfill.py)
+against a local stub of the da.gov.ph PDF archive and a mongomock database
+(tests/mock_mongo.py). PDF parsing is replaced by a lookup of the stub's bytes.
+"""
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+from aiohttp import web
+
+from services import daily_price_parser, historical_backfill
+from services.daily_price_parser import daily_parser
+from services.http_utils import http_clients
+from services.name_search import NameIndex
+from services.pdf_cache import PDFCache
+from mock_mongo import mock_db, stored
+
+# Mon 2026-10-05 .. Fri 2026-10-16: 10 weekdays
+START, END = datetime(2026, 10, 5), datetime(2026, 10, 16)
+
+
+class StubDA:
+    """Serves a "PDF" per day under the first DA URL pattern; `missing` days 404."""
+
+    def __init__(self, missing=(), delay=0.03):
+        self.missing, self.delay = set(missing), delay
+        self.requested = []
+        self.in_flight = self.max_in_flight = 0
+        self.started = []
+
+    async def handle(self, request):
+        name = request.match_info["name"]
+        self.requested.append(name)
+        self.started.append(time.monotonic())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            day = name.removeprefix("Daily-Price-Index-").removesuffix(".pdf")
+            if not name.startswith("Daily-Price-Index-") or day in self.missing:
+                return web.Response(status=404)
+            return web.Response(body=f"%PDF {day}".encode(), content_type="application/pdf")
+        finally:
+            self.in_flight -= 1
+
+
+async def fake_parse_pdf(pdf_bytes):
+    day = pdf_bytes.decode().split(" ", 1)[1]
+    return {"Rice": 50.0 + int(day.split("-")[1]), "Tomato": 80.0}
+
+
+@pytest.fixture
+def backfill_env(monkeypatch, tmp_path):
+    monkeypatch.setattr(daily_price_parser, "pdf_cache", PDFCache(root=str(tmp_path)))
+    monkeypatch.setattr(daily_parser, "parse_pdf", fake_parse_pdf)
+    index = NameIndex()
+    monkeypatch.setattr(historical_backfill, "name_index", index)
+    return index
+
+
+def run_backfill(stub, monkeypatch, settle=0, **kwargs):
+    """Run a backfill against `stub`; the stub stays up `settle` seconds after it ends."""
+    db = mock_db()
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/{year}/{month}/{name}", stub.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        monkeypatch.setattr(daily_parser, "base_url", f"http://127.0.0.1:{port}")
+        try:
+            return await historical_backfill.backfill_date_range(db, START, END, **kwargs)
+        finally:
+            await asyncio.sleep(settle)
+            await http_clients.close()
+            await runner.cleanup()
+
+    return asyncio.run(run()), db
+
+
+class TestBackfillDateRange:
+    def test_days_are_fetched_concurrently_within_the_bound(self, monkeypatch, backfill_env):
+        stub = StubDA()
+
+        stats, db = run_backfill(stub, monkeypatch, concurrency=3, requests_per_second=1000)
+
+        assert stats == {"days_attempted": 10, "days_success": 10, "days_failed": 0, "records_upserted": 20}
+        assert stub.max_in_flight == 3
+        prices = stored(db.price_history)
+        assert len(prices) == 20
+        rice = next(d for d in prices if d["name"] == "Rice" and d["date"] == "2026-10-07")
+        assert (rice["price"], rice["category"], rice["name_key"]) == (57.0, "rice", "rice")
+        assert backfill_env.search("tomato") == ["tomato"]
+
+    def test_request_rate_is_bounded_across_days(self, monkeypatch, backfill_env):
+        stub = StubDA(delay=0)
+        start = time.monotonic()
+
+        run_backfill(stub, monkeypatch, concurrency=10, requests_per_second=40)
+
+        # REQUEST_BURST requests go out at once, the rest at 40/s; a request
+        # can only arrive after its token was granted
+        extra = len(stub.started) - historical_backfill.REQUEST_BURST
+        assert max(stub.started) - start >= extra / 40
+
+    def test_missing_and_skipped_days(self, monkeypatch, backfill_env):
+        stub = StubDA(missing={"October-8-2026"})
+        results = []
+
+        stats, db = run_backfill(
+            stub,
+            monkeypatch,
+            requests_per_second=1000,
+            skip_dates={"2026-10-05", "2026-10-06"},
+            progress=lambda result, _: results.append(result),
+        )
+
+        assert stats["days_attempted"] == 8
+        assert (stats["days_success"], stats["days_failed"]) == (7, 1)
+        # Both URL patterns were tried for the missing day; skipped days weren't fetched
+        assert stub.requested.count("Daily-Price-Index-October-8-2026.pdf") == 1
+        assert stub.requested.count("October-8-2026-DPI-AFC.pdf") == 1
+        assert not any("October-5-" in name or "October-6-" in name for name in stub.requested)
+        assert {"date": "2026-10-08", "status": "missing", "records": 0} in results
+        assert len(results) == 8
+
+    def test_failing_progress_callback_stops_the_backfill(self, monkeypatch, backfill_env):
+        stub = StubDA(delay=0.05)
+
+        async def progress(result, stats):
+            raise RuntimeError("checkpoint write failed")
+
+        with pytest.raises(RuntimeError, match="checkpoint write failed"):
+            run_backfill(stub, monkeypatch, settle=0.5, concurrency=2, requests_per_second=1000, progress=progress)
+
+        # The first finished day fails the run; the remaining days are
+        # cancelled rather than left downloading after the error
+        assert len(stub.requested) <= 4
@@ -0,0 +1,86 @@
+"""
+Tests for the shared HTML parsing helpers and the DOE listing parsers built on
+them, using saved DOE listing pages (tests/fixtures/doe/).
+"""
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from services import html_parsing, worker_pool
+from services.doe_integration import (
+    _detect_max_page,
+    _extract_articles_from_html,
+    _extract_nuxt_articles,
+    _parse_listing_page,
+)
+from services.html_parsing import fragments, html_to_text, script_json
+
+FIXTURES = Path(__file__).parent / "fixtures" / "doe"
+
+
+@pytest.fixture(scope="module")
+def listing_page():
+    return (FIXTURES / "listing_page_1.html").read_text(encoding="utf-8")
+
+
+class TestScriptJson:
+    def test_value_is_decoded_up_to_its_own_end(self):
+        html = (
+            '<script>window.__NUXT__={"data":[{"articles":[{"id":1,"tags":["a]","b"],'
+            '"attachments":[]}],"total":1}]};</script><script>{"articles":[2]}</script>'
+        )
+        assert script_json(html, "window.__NUXT__", "articles") == [
+            {"id": 1, "tags": ["a]", "b"], "attachments": []}
+        ]
+
+    def test_undefined_is_read_as_null(self):
+        html = '<script>window.__NUXT__={"articles":[{"id":1,"summary":undefined}],"x":1};</script>'
+        assert script_json(html, "window.__NUXT__", "articles") == [{"id": 1, "summary": None}]
+
+    def test_missing_marker_or_key(self):
+        assert script_json("<p>no scripts</p>", "window.__NUXT__", "articles") is None
+        assert script_json("<script>window.__NUXT__={};</script>", "window.__NUXT__", "articles") is None
+
+
+class TestHelpers:
+    def test_fragments_slice_only_the_tag(self):
+        html = "<div><SELECT id=a><option>1</option></SELECT><p>x</p><select></select></div>"
+        assert fragments(html, "select") == ["<SELECT id=a><option>1</option></SELECT>", "<select></select>"]
+
+    def test_html_to_text(self):
+        assert html_to_text("<p>Guidelines</p><p>for <b>net</b> metering</p>") == "Guidelines for net metering"
+        assert html_to_text("  plain\n text ") == "plain text"
+
+    def test_large_documents_are_parsed_in_the_worker_pool(self, monkeypatch, listing_page):
+        monkeypatch.setattr(html_parsing, "OFFLOAD_BYTES", 1024)
+        try:
+            articles = asyncio.run(html_parsing.parse(_extract_articles_from_html, listing_page))
+        finally:
+            worker_pool.shutdown()
+        assert len(articles) == 4
+
+
+class TestDOEListingParsers:
+    def test_nuxt_and_html_paths_agree(self, listing_page):
+        from_nuxt = _extract_nuxt_articles(listing_page)
+        from_html = _extract_articles_from_html(listing_page)
+
+        assert [a["id"] for a in from_nuxt] == [2934000, 2933999, 2933998, 2933997]
+        assert [a["id"] for a in from_html] == [a["id"] for a in from_nuxt]
+        assert [a["title"] for a in from_html] == [a["title"] for a in from_nuxt]
+        assert from_nuxt[0]["attachments"][0]["encodingFormat"] == "application/pdf"
+
+    def test_max_page_is_detected(self, listing_page):
+        assert _detect_max_page(listing_page) == 137
+        assert _detect_max_page("<html><body><p>one page</p></body></html>") == 1
+
+    def test_listing_without_nuxt_falls_back_to_cards(self, listing_page):
+        html = listing_page.replace("window.__NUXT__", "window.__SAVED__")
+        try:
+            articles, max_page = asyncio.run(_parse_listing_page(html, True))
+        finally:
+            worker_pool.shutdown()
+
+        assert len(articles) == 4
+        assert max_page == 137
@@ -0,0 +1,258 @@
+"""
+Tests for the pooled HTTP client, capped reads, rate limiting and retry
+policy, against a local aiohttp server (no network needed).
+"""
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from services.http_utils import (
+    HostRateLimiter,
+    HTTPClientManager,
+    ResponseTooLarge,
+    TokenBucket,
+    fetch_with_retry,
+    read_capped,
+    read_text,
+)
+
+
+async def serve(routes):
+    """Start a local server for `routes` ({path: handler}); returns (runner, base_url)."""
+    app = web.Application()
+    for path, handler in routes.items():
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+class TestHTTPClientManager:
+    def test_session_is_shared_within_a_loop(self):
+        clients = HTTPClientManager(limit_per_host=2)
+
+        async def run():
+            first, second = clients.session(), clients.session()
+            limit_per_host = first.connector.limit_per_host
+            await clients.close()
+            return first, second, limit_per_host
+
+        first, second, limit_per_host = asyncio.run(run())
+        assert first is second
+        assert first.closed
+        assert limit_per_host == 2
+
+    def test_new_loop_gets_a_new_session(self):
+        clients = HTTPClientManager()
+
+        async def grab():
+            return clients.session()
+
+        first = asyncio.run(grab())
+        second = asyncio.run(grab())
+        assert first is not second
+        assert clients.sessions_created == 2
+
+    def test_connections_are_reused(self):
+        clients = HTTPClientManager()
+
+        async def ok(request):
+            return web.Response(text=str(request.transport.get_extra_info("peername")[1]))
+
+        async def run():
+            runner, base = await serve({"/": ok})
+            try:
+                ports = []
+                for _ in range(3):
+                    async with clients.session().get(f"{base}/") as resp:
+                        ports.append(await resp.text())
+                return ports
+            finally:
+                await clients.close()
+                await runner.cleanup()
+
+        # Same client port every time = one kept-alive connection
+        assert len(set(asyncio.run(run()))) == 1
+
+
+class TestReadCapped:
+    def test_body_over_cap_is_refused(self):
+        async def big(request):
+            response = web.StreamResponse()
+            await response.prepare(request)
+            for _ in range(4):
+                await response.write(b"x" * 1024)
+            return response
+
+        async def run():
+            runner, base = await serve({"/big": big})
+            clients = HTTPClientManager()
+            try:
+                async with clients.session().get(f"{base}/big") as resp:
+                    return await read_capped(resp, max_bytes=2048)
+            finally:
+                await clients.close()
+                await runner.cleanup()
+
+        with pytest.raises(ResponseTooLarge):
+            asyncio.run(run())
+
+    def test_body_under_cap_is_returned(self):
+        async def small(request):
+            return web.Response(body=b"hello")
+
+        async def run():
+            runner, base = await serve({"/small": small})
+            clients = HTTPClientManager()
+            try:
+                async with clients.session().get(f"{base}/small") as resp:
+                    return await read_capped(resp, max_bytes=2048)
+            finally:
+                await clients.close()
+                await runner.cleanup()
+
+        assert asyncio.run(run()) == b"hello"
+
+
+class TestReadText:
+    def read(self, handler):
+        async def run():
+            runner, base = await serve({"/": handler})
+            clients = HTTPClientManager()
+            try:
+                async with clients.session().get(f"{base}/") as resp:
+                    return await read_text(resp)
+            finally:
+                await clients.close()
+                await runner.cleanup()
+
+        return asyncio.run(run())
+
+    def test_html_without_charset_is_read_as_utf8(self):
+        async def page(request):
+            return web.Response(
+                body="<p>Presyo ng bigas — ₱45</p>".encode(), headers={"Content-Type": "text/html"}
+            )
+
+        assert self.read(page) == "<p>Presyo ng bigas — ₱45</p>"
+
+    def test_declared_charset_is_used(self):
+        async def page(request):
+            return web.Response(
+                body="café".encode("latin-1"), headers={"Content-Type": "text/html; charset=iso-8859-1"}
+            )
+
+        assert self.read(page) == "café"
+
+
+async def grant_times(acquire, n):
+    """Seconds after start at which each of `n` concurrent acquire() calls returned."""
+    start = time.monotonic()
+    times = []
+
+    async def one():
+        await acquire()
+        times.append(time.monotonic() - start)
+
+    await asyncio.gather(*(one() for _ in range(n)))
+    return sorted(times)
+
+
+class TestTokenBucket:
+    def test_burst_is_immediate_then_rate_limited(self):
+        bucket = TokenBucket(rate=50, capacity=5)
+
+        times = asyncio.run(grant_times(bucket.acquire, 15))
+
+        assert times[4] < 0.02  # the first `capacity` tokens don't wait
+        assert times[5] >= 1 / 50 - 0.005
+        # 10 tokens beyond the burst at 50/s
+        assert 0.2 - 0.01 <= times[-1] < 0.2 + 0.15
+
+    def test_sustained_rate_is_not_exceeded(self):
+        bucket = TokenBucket(rate=100, capacity=1)
+
+        times = asyncio.run(grant_times(bucket.acquire, 21))
+
+        # Any window after the first token holds at most rate * window (+1) grants
+        for i in range(1, len(times)):
+            assert times[i] - times[0] >= (i - 1) / 100
+
+    def test_default_capacity_is_one_second_of_rate(self):
+        assert TokenBucket(rate=4).capacity == 4
+        assert TokenBucket(rate=0.5).capacity == 1
+
+
+class TestHostRateLimiter:
+    def test_hosts_have_separate_budgets(self):
+        limiter = HostRateLimiter(rate=10, burst=3)
+
+        async def run():
+            hosts = ["https://www.da.gov.ph/a.pdf", "https://doe.gov.ph/page", "https://iemop.ph/x"]
+            start = time.monotonic()
+            for url in hosts * 3:
+                await limiter.acquire(url)
+            return time.monotonic() - start
+
+        # Three requests per host fit each host's burst
+        assert asyncio.run(run()) < 0.05
+
+    def test_same_host_shares_one_budget(self):
+        limiter = HostRateLimiter(rate=40, burst=2)
+
+        urls = iter(["https://www.da.gov.ph/a.pdf", "http://www.da.gov.ph/b.pdf"] * 3)
+
+        async def acquire():
+            # Different paths and schemes, one hostname
+            await limiter.acquire(next(urls))
+
+        times = asyncio.run(grant_times(acquire, 6))
+
+        assert times[1] < 0.02
+        assert times[-1] >= 4 / 40 - 0.01
+
+
+class TestFetchWithRetry:
+    def run_flaky(self, statuses, headers=None):
+        """Serve `statuses` in order, then 200; return (final status or None, hits)."""
+        hits = []
+
+        async def flaky(request):
+            status = statuses[len(hits)] if len(hits) < len(statuses) else 200
+            hits.append(status)
+            return web.Response(status=status, text="ok", headers=headers or {})
+
+        async def run():
+            runner, base = await serve({"/": flaky})
+            clients = HTTPClientManager()
+            try:
+                resp = await fetch_with_retry(clients.session(), f"{base}/", backoff_base=0.01)
+                if resp is None:
+                    return None
+                resp.release()
+                return resp.status
+            finally:
+                await clients.close()
+                await runner.cleanup()
+
+        return asyncio.run(run()), hits
+
+    def test_server_errors_are_retried(self):
+        status, hits = self.run_flaky([503, 502])
+        assert status == 200
+        assert hits == [503, 502, 200]
+
+    def test_429_waits_for_retry_after(self):
+        status, hits = self.run_flaky([429], headers={"Retry-After": "0"})
+        assert status == 200
+        assert hits == [429, 200]
+
+    def test_404_is_not_retried(self):
+        status, hits = self.run_flaky([404])
+        assert status is None
+        assert hits == [404]
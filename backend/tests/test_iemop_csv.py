@@ -0,0 +1,86 @@
+"""
+Tests for the streaming IEMOP MP CSV aggregator (no server needed).
+
+tests/fixtures/iemop/mp_sample.csv is a two-hour MP file with CRLF endings, a
+quoted resource name containing a comma, padded fields, blank and
+non-numeric prices, an unknown region and a blank line. Region statistics must
+match the original whole-file csv.DictReader parser, however the body is
+chunked.
+"""
+import csv
+import io
+from pathlib import Path
+
+import pytest
+
+from services.energy_grid_scraper import WESMPriceScraper
+from services.iemop_csv import MarketPriceAggregator
+
+FIXTURE = (Path(__file__).parent / "fixtures" / "iemop" / "mp_sample.csv").read_bytes()
+REGION_MAP = WESMPriceScraper.REGION_MAP
+
+
+def reference_stats(content: str):
+    """The parser this replaced: buffer everything, DictReader, float lists."""
+    prices = {k: [] for k in REGION_MAP.values()}
+    for row in csv.DictReader(io.StringIO(content)):
+        region_key = REGION_MAP.get((row.get("REGION_NAME") or "").strip())
+        price_raw = (row.get("MARGINAL_PRICE") or "").strip()
+        if region_key and price_raw:
+            try:
+                prices[region_key].append(float(price_raw))
+            except ValueError:
+                pass
+    return {
+        key: {"current": vals[-1], "average": sum(vals) / len(vals), "min": min(vals), "max": max(vals)}
+        for key, vals in prices.items()
+        if vals
+    }
+
+
+def aggregate(data: bytes, chunk_size: int, batch_bytes: int = 1024) -> MarketPriceAggregator:
+    agg = MarketPriceAggregator(REGION_MAP, batch_bytes=batch_bytes)
+    for i in range(0, len(data), chunk_size):
+        agg.feed(data[i:i + chunk_size])
+    agg.close()
+    return agg
+
+
+class TestMarketPriceAggregator:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 1000, len(FIXTURE)])
+    def test_region_stats_match_reference(self, chunk_size):
+        expected = reference_stats(FIXTURE.decode())
+        stats = aggregate(FIXTURE, chunk_size).region_stats()
+        assert set(stats) == set(expected) == {"luzon", "visayas", "mindanao"}
+        for region, values in expected.items():
+            assert stats[region] == pytest.approx(values)
+
+    def test_interval_prices(self):
+        intervals = aggregate(FIXTURE, 4096).interval_prices()
+        luzon = intervals["luzon"]
+        assert len(luzon) == 24
+        assert [row["seq"] for row in luzon] == sorted(row["seq"] for row in luzon)
+
+        first = luzon[0]
+        assert first["interval"] == "01/06/2025 00:00:00"
+        assert first["count"] == 4  # three resources plus the padded, quoted row
+        assert first["min"] <= first["price"] <= first["max"]
+
+        last = luzon[-1]
+        assert last["last"] == -150.25
+        assert last["min"] == -150.25
+
+    def test_totals_are_consistent(self):
+        agg = aggregate(FIXTURE, 333)
+        per_interval = sum(row["count"] for rows in agg.interval_prices().values() for row in rows)
+        assert agg.rows == per_interval == 3 * 24 * 3 + 2
+        assert agg.bytes == len(FIXTURE)
+
+    def test_unterminated_last_line(self):
+        body = b"TIME_INTERVAL,REGION_NAME,MARGINAL_PRICE\n00:05,CLUZ,100\n00:05,CLUZ,300"
+        assert aggregate(body, 5).region_stats() == {
+            "luzon": {"current": 300.0, "average": 200.0, "min": 100.0, "max": 300.0}
+        }
+
+    def test_missing_columns(self):
+        assert aggregate(b"FOO,BAR\n1,2\n", 64).region_stats() == {}
@@ -2,7 +2,9 @@
 Tests for Integration trigger endpoints and status.
 POST /api/integration/run-weather-update
 POST /api/integration/run-doe-update
+POST /api/integration/run-historical-backfill
 GET  /api/integration/status
+GET  /api/jobs/{job_id}
 GET  /api/health
 """
 import pytest
@@ -11,6 +13,9 @@ import os
 
 BASE_URL = os.environ.get("REACT_APP_BACKEND_URL", "").rstrip("/")
 
+# Smoke tests against a deployed backend; the unit job deselects them
+pytestmark = pytest.mark.production
+
 
 class TestHealthEndpoint:
     """GET /api/health — server health + MongoDB diagnostics"""
@@ -81,3 +86,36 @@ class TestDOEUpdate:
         )
         data = response.json()
         assert "success" in data
+
+
+class TestHistoricalBackfill:
+    """POST /api/integration/run-historical-backfill — validation happens before queueing"""
+
+    def test_backfill_rejects_bad_dates(self):
+        response = requests.post(
+            f"{BASE_URL}/api/integration/run-historical-backfill",
+            params={"start_date": "2024-13-01", "end_date": "2024-12-31"},
+        )
+        assert response.status_code == 400
+
+    def test_backfill_rejects_reversed_range(self):
+        response = requests.post(
+            f"{BASE_URL}/api/integration/run-historical-backfill",
+            params={"start_date": "2024-02-01", "end_date": "2024-01-01"},
+        )
+        assert response.status_code == 400
+
+
+class TestJobs:
+    """GET /api/jobs, GET /api/jobs/{job_id}"""
+
+    def test_unknown_job_returns_404(self):
+        response = requests.get(f"{BASE_URL}/api/jobs/does-not-exist")
+        assert response.status_code == 404
+
+    def test_list_jobs(self):
+        response = requests.get(f"{BASE_URL}/api/jobs")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert isinstance(data["data"], list)
@@ -0,0 +1,209 @@
+"""
+Tests for the background job runner (services/job_runner.py): running,
+failing, and resuming interrupted jobs from their checkpoint, against a
+mongomock database (tests/mock_mongo.py).
+"""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from services.job_runner import MAX_ATTEMPTS, STALE_AFTER, JobContext, JobRunner
+from mock_mongo import mock_db, stored
+
+
+def counting_runner(processed, hold_at=None, gate=None):
+    """A runner whose "count" job processes items 0..n-1, checkpointing after each."""
+    runner = JobRunner()
+
+    @runner.handler("count")
+    async def count(ctx):
+        start = ctx.checkpoint.get("next", 0)
+        for i in range(start, ctx.params["n"]):
+            if i == hold_at:
+                await gate.wait()
+            processed.append(i)
+            await ctx.report({"done": i + 1}, checkpoint={"next": i + 1})
+        return {"processed": ctx.params["n"] - start}
+
+    @runner.handler("broken")
+    async def broken(ctx):
+        raise RuntimeError("source returned garbage")
+
+    return runner
+
+
+async def finished(runner, job_id):
+    async def last():
+        async for job in runner.watch(job_id, poll_interval=0.01):
+            pass
+        return job
+
+    return await asyncio.wait_for(last(), timeout=2)
+
+
+async def progressed_to(db, job_id, done):
+    async def poll():
+        while ((await db.jobs.find_one({"_id": job_id})) or {}).get("progress", {}).get("done") != done:
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout=2)
+
+
+def stored_job(**fields):
+    return {
+        "_id": "job-1",
+        "kind": "count",
+        "params": {"n": 10},
+        "status": "queued",
+        "progress": {},
+        "checkpoint": {},
+        "result": None,
+        "error": None,
+        "attempts": 0,
+        "worker_id": None,
+        "created_at": datetime.utcnow(),
+        "started_at": None,
+        "heartbeat_at": None,
+        "finished_at": None,
+        **fields,
+    }
+
+
+class TestJobRunner:
+    def test_submitted_job_runs_to_success(self):
+        db, processed = mock_db(), []
+        runner = counting_runner(processed)
+
+        async def run():
+            await runner.start(db)
+            try:
+                return await finished(runner, await runner.submit("count", {"n": 3}))
+            finally:
+                await runner.stop()
+
+        job = asyncio.run(run())
+
+        assert job["status"] == "succeeded"
+        assert job["result"] == {"processed": 3}
+        assert job["checkpoint"] == {"next": 3}
+        assert job["attempts"] == 1
+        assert processed == [0, 1, 2]
+
+    def test_failing_handler_marks_the_job_failed(self):
+        db = mock_db()
+        runner = counting_runner([])
+
+        async def run():
+            await runner.start(db)
+            try:
+                return await finished(runner, await runner.submit("broken"))
+            finally:
+                await runner.stop()
+
+        job = asyncio.run(run())
+
+        assert job["status"] == "failed"
+        assert job["error"] == "source returned garbage"
+        assert job["finished_at"] is not None
+
+    def test_unknown_kind_is_rejected(self):
+        with pytest.raises(ValueError):
+            asyncio.run(counting_runner([]).submit("nope"))
+
+    def test_stopped_job_resumes_from_its_checkpoint(self):
+        db, processed = mock_db(), []
+
+        async def run():
+            gate = asyncio.Event()
+            first = counting_runner(processed, hold_at=6, gate=gate)
+            await first.start(db)
+            job_id = await first.submit("count", {"n": 10})
+            await progressed_to(db, job_id, 6)
+            await first.stop()  # e.g. a deploy restarts the worker mid-job
+            interrupted = await db.jobs.find_one({"_id": job_id})
+
+            second = counting_runner(processed)
+            await second.start(db)
+            try:
+                return interrupted, await finished(second, job_id)
+            finally:
+                await second.stop()
+
+        interrupted, job = asyncio.run(run())
+
+        assert interrupted["status"] == "queued"
+        assert interrupted["checkpoint"] == {"next": 6}
+        assert job["status"] == "succeeded"
+        assert job["result"] == {"processed": 4}
+        assert job["attempts"] == 2
+        # Items before the checkpoint were not redone
+        assert processed == list(range(10))
+
+    def test_orphaned_running_job_is_resumed_on_start(self):
+        # A worker died mid-job: still "running", heartbeat long gone
+        stale = datetime.utcnow() - STALE_AFTER - timedelta(minutes=1)
+        db = mock_db({"jobs": [stored_job(status="running", attempts=1, heartbeat_at=stale,
+                                         checkpoint={"next": 7})]})
+        processed = []
+        runner = counting_runner(processed)
+
+        async def run():
+            await runner.start(db)
+            try:
+                return await finished(runner, "job-1")
+            finally:
+                await runner.stop()
+
+        job = asyncio.run(run())
+
+        assert job["status"] == "succeeded"
+        assert processed == [7, 8, 9]
+        assert job["attempts"] == 2
+
+    def test_job_over_max_attempts_is_failed(self):
+        db = mock_db({"jobs": [stored_job(attempts=MAX_ATTEMPTS)]})
+        processed = []
+        runner = counting_runner(processed)
+
+        async def run():
+            await runner.start(db)
+            try:
+                return await finished(runner, "job-1")
+            finally:
+                await runner.stop()
+
+        job = asyncio.run(run())
+
+        assert job["status"] == "failed"
+        assert job["error"] == "Exceeded max attempts"
+        assert processed == []
+
+
+class SlowJobs:
+    """Wraps the jobs collection; the n-th update_one takes delays[n] seconds."""
+
+    def __init__(self, collection, delays):
+        self.inner, self.delays = collection, list(delays)
+
+    async def update_one(self, *args, **kwargs):
+        await asyncio.sleep(self.delays.pop(0))
+        return await self.inner.update_one(*args, **kwargs)
+
+
+class TestJobContext:
+    def test_concurrent_reports_keep_the_latest_checkpoint(self):
+        db = mock_db({"jobs": [stored_job(status="running")]})
+        jobs = SlowJobs(db.jobs, delays=[0.05, 0.02, 0])
+        ctx = JobContext(SimpleNamespace(db=SimpleNamespace(jobs=jobs)), stored_job())
+
+        async def run():
+            # e.g. backfill days finishing together; the first write is the slowest
+            await asyncio.gather(*(ctx.report({"done": n}, checkpoint={"next": n}) for n in (1, 2, 3)))
+
+        asyncio.run(run())
+
+        job = stored(db.jobs)[0]
+        assert (job["progress"], job["checkpoint"]) == ({"done": 3}, {"next": 3})
+        assert ctx.checkpoint == {"next": 3}
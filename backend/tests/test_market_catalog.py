@@ -0,0 +1,59 @@
+"""
+Tests for market items keyset pagination (services/market_catalog.py) against
+a mongomock database (tests/mock_mongo.py).
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from services.market_catalog import list_items
+from mock_mongo import mock_db
+
+
+def catalog():
+    """Ten items; three have no price (null or missing) and two no lastUpdated."""
+    items = []
+    for n in range(10):
+        item = {"_id": ObjectId(), "name": f"Item {n}", "category": "rice", "statusRank": n % 3, "savings": n}
+        if n not in (2, 5):
+            item["lastUpdated"] = datetime(2026, 10, 1) + timedelta(days=n % 4)
+        if n in (3, 6):
+            item["currentPrice"] = None
+        elif n != 8:
+            item["currentPrice"] = 50.0 + n % 4
+        items.append(item)
+    return items
+
+
+def walk(db, sort, limit):
+    """Every page of `sort`, following the `next` tokens; returns item names in order."""
+
+    async def run():
+        names, after = [], None
+        while True:
+            page, after = await list_items(db, sort=sort, limit=limit, after=after)
+            names += [item["name"] for item in page]
+            if after is None:
+                return names
+
+    return asyncio.run(run())
+
+
+class TestKeysetPagination:
+    @pytest.mark.parametrize("sort", ["price-low", "price-high", "recent", "best", "name"])
+    @pytest.mark.parametrize("limit", [1, 2, 3, 4])
+    def test_pages_cover_every_item_once_in_sort_order(self, sort, limit):
+        db = mock_db({"market_items": catalog()})
+
+        # Null and missing sort keys straddle the page boundaries at these limits
+        assert walk(db, sort, limit) == walk(db, sort, limit=100)
+        assert len(walk(db, sort, limit=100)) == 10
+
+    def test_null_prices_sort_before_ascending_and_after_descending(self):
+        db = mock_db({"market_items": catalog()})
+        unpriced = {"Item 3", "Item 6", "Item 8"}
+
+        assert set(walk(db, "price-low", 2)[:3]) == unpriced
+        assert set(walk(db, "price-high", 2)[-3:]) == unpriced
@@ -1,6 +1,6 @@
 """
 Tests for Market Items API endpoints.
-GET /api/market-items
+GET /api/market-items (sort, after=, view=)
 GET /api/market-items/{item_id}
 GET /api/best-deals
 GET /api/categories
@@ -15,6 +15,9 @@ import os
 
 BASE_URL = os.environ.get("REACT_APP_BACKEND_URL", "").rstrip("/")
 
+# Smoke tests against a deployed backend; the unit job deselects them
+pytestmark = pytest.mark.production
+
 
 class TestMarketItemsExtended:
     """Extended market items tests beyond test_energy_analytics.py"""
@@ -61,6 +64,46 @@ class TestMarketItemsExtended:
                 assert response2.status_code == 200
 
 
+class TestMarketItemsSortingAndPaging:
+    """Server-side sorting, keyset pagination (after=) and view=summary"""
+
+    def test_price_low_returns_cheapest(self):
+        """sort=price-low&limit=N must be the N cheapest items, not N recent ones re-sorted."""
+        all_items = requests.get(
+            f"{BASE_URL}/api/market-items", params={"sort": "price-low", "limit": 1000}
+        ).json()["data"]
+        page = requests.get(
+            f"{BASE_URL}/api/market-items", params={"sort": "price-low", "limit": 5}
+        ).json()["data"]
+        assert [i["id"] for i in page] == [i["id"] for i in all_items[:5]]
+        prices = [i["currentPrice"] for i in all_items]
+        assert prices == sorted(prices)
+
+    def test_keyset_pages_do_not_overlap(self):
+        seen = []
+        params = {"sort": "best", "limit": 50}
+        for _ in range(10):
+            data = requests.get(f"{BASE_URL}/api/market-items", params=params).json()
+            seen.extend(i["id"] for i in data["data"])
+            if not data["next"]:
+                break
+            params["after"] = data["next"]
+        assert len(seen) == len(set(seen))
+
+    def test_invalid_cursor_returns_400(self):
+        response = requests.get(f"{BASE_URL}/api/market-items", params={"after": "not-a-cursor"})
+        assert response.status_code == 400
+
+    def test_summary_view_omits_heavy_fields(self):
+        data = requests.get(
+            f"{BASE_URL}/api/market-items", params={"view": "summary", "limit": 5}
+        ).json()
+        for item in data["data"]:
+            assert "trend" not in item
+            assert "climateImpact" not in item
+            assert "currentPrice" in item
+
+
 class TestAnalyticsEndpoints:
     """Analytics endpoints beyond what test_energy_analytics.py covers."""
 
@@ -0,0 +1,71 @@
+"""
+Tests for commodity name search (no server needed).
+
+The trigram index must return exactly the names a case-insensitive substring
+match would — the behaviour the old `$regex` filters had for plain text.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from services import name_search
+from services.name_search import NameIndex, name_fields, name_filter, normalize, prefix_tokens
+
+NAMES = sorted({
+    row["name"]
+    for row in json.loads(
+        (Path(__file__).parent / "fixtures" / "categorizer" / "recorded_corpus.json").read_text(encoding="utf-8")
+    )
+})
+
+
+@pytest.fixture
+def index():
+    idx = NameIndex()
+    idx.rebuild(normalize(name) for name in NAMES)
+    return idx
+
+
+class TestNameFields:
+    def test_normalize(self):
+        assert normalize("  Red  Onion\tLocal ") == "red onion local"
+
+    def test_prefix_tokens(self):
+        assert prefix_tokens("egg (white)") == ["e", "eg", "egg", "w", "wh", "whi", "whit", "white"]
+
+    def test_prefix_tokens_capped(self):
+        tokens = prefix_tokens("x" * 30)
+        assert max(map(len, tokens)) == name_search.PREFIX_MAX
+
+    def test_name_fields_prefix(self):
+        fields = name_fields("Tilapia", "item_name")
+        assert fields["item_name_key"] == "tilapia"
+        assert "tila" in fields["item_name_prefixes"]
+
+
+class TestNameIndex:
+    @pytest.mark.parametrize("term", ["rice", "RICE", "red onion", "ka", "e", "galunggong", "xyz", "  Pork  "])
+    def test_matches_substring_search(self, index, term):
+        expected = {normalize(n) for n in NAMES if normalize(term) in normalize(n)}
+        assert set(index.search(term)) == expected
+
+    def test_regex_metacharacters_are_literal(self, index):
+        assert index.search("rice.*") == []
+
+    def test_add_is_searchable(self, index):
+        index.add("ube halaya")
+        assert index.search("halaya") == ["ube halaya"]
+
+
+class TestNameFilter:
+    def test_uses_index_when_loaded(self, monkeypatch, index):
+        monkeypatch.setattr(name_search, "name_index", index)
+        query = name_filter("galunggong")
+        assert set(query) == {"name_key"}
+        assert query["name_key"]["$in"] and all("galunggong" in k for k in query["name_key"]["$in"])
+
+    def test_falls_back_to_prefixes(self, monkeypatch):
+        monkeypatch.setattr(name_search, "name_index", NameIndex())
+        assert name_filter("Red Onion", "item_name") == {"item_name_prefixes": {"$all": ["red", "onion"]}}
+        assert name_filter("  ") == {"name_key": {"$in": []}}
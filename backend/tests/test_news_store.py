@@ -0,0 +1,111 @@
+"""
+Tests for the stored NewsData articles and the daily credit budget (fake API
+client and a mongomock database from tests/mock_mongo.py; no server needed).
+"""
+import asyncio
+import time
+
+from services.news_store import NewsStore, normalize_query
+from services.newsdata_integration import QUERIES
+from mock_mongo import mock_db, stored
+
+
+class FakeNewsData:
+    """Returns two articles per query, one of them shared by every query."""
+
+    api_key = "test-key"
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = []
+        self.in_flight = self.max_in_flight = 0
+
+    async def fetch_energy_news(self, query):
+        self.calls.append(query)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return [
+            {"title": f"About {query}", "url": f"https://news.example/{query}", "published": "2026-10-15 08:00:00"},
+            {"title": "Shared", "url": "https://news.example/shared", "published": "2026-10-16 08:00:00"},
+        ]
+
+
+class TestNewsStore:
+    def test_repeated_requests_are_served_from_the_store(self):
+        api, db = FakeNewsData(), mock_db()
+        store = NewsStore(integration=api, refresh_seconds=3600)
+
+        async def run():
+            first = await store.articles(db, "Solar Power Philippines")
+            second = await store.articles(db, "solar power  philippines")
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert api.calls == ["solar power philippines"]
+        assert first == second
+        assert [a["title"] for a in first] == ["Shared", "About solar power philippines"]
+
+    def test_concurrent_requests_share_one_fetch(self):
+        api, db = FakeNewsData(), mock_db()
+        store = NewsStore(integration=api)
+
+        async def run():
+            await asyncio.gather(*(store.articles(db, "rice prices") for _ in range(5)))
+
+        asyncio.run(run())
+        assert len(api.calls) == 1
+
+    def test_multiple_fetches_queries_concurrently_and_dedupes(self):
+        api, db = FakeNewsData(delay=0.1), mock_db()
+        store = NewsStore(integration=api, concurrency=3)
+
+        start = time.monotonic()
+        results = asyncio.run(store.multiple(db))
+
+        assert set(results) == set(QUERIES)
+        assert len(api.calls) == len(QUERIES)
+        assert api.max_in_flight == 3
+        # 7 queries, 3 at a time: 3 rounds, not 7
+        assert time.monotonic() - start < 0.1 * len(QUERIES)
+        # One document per URL; the shared article is tagged with every query
+        articles = stored(db["news_articles"], "_id")
+        assert len(articles) == len(QUERIES) + 1
+        assert len(articles["https://news.example/shared"]["queries"]) == len(QUERIES)
+
+    def test_stale_queries_are_refetched(self):
+        api, db = FakeNewsData(delay=0), mock_db()
+        store = NewsStore(integration=api, refresh_seconds=3600)
+
+        async def run():
+            await store.articles(db, "fuel prices")
+            store._fetched_at[normalize_query("fuel prices")] -= 3601
+            await store.articles(db, "fuel prices")
+
+        asyncio.run(run())
+        assert len(api.calls) == 2
+
+    def test_fetch_times_survive_a_restart(self):
+        api, db = FakeNewsData(delay=0), mock_db()
+        asyncio.run(NewsStore(integration=api).articles(db, "grid updates"))
+
+        restarted = NewsStore(integration=api)
+        articles = asyncio.run(restarted.articles(db, "grid updates"))
+
+        assert len(api.calls) == 1
+        assert len(articles) == 2
+
+    def test_daily_credit_budget_is_enforced(self):
+        api, db = FakeNewsData(delay=0), mock_db()
+        store = NewsStore(integration=api, daily_credits=2)
+
+        async def run():
+            for query in ("a", "b", "c", "d"):
+                await store.articles(db, query)
+            return await store.quota.usage(db)
+
+        usage = asyncio.run(run())
+        assert api.calls == ["a", "b"]
+        assert store.quota_denied == 2
+        assert usage == {"used": 2, "limit": 2, "remaining": 0}
@@ -0,0 +1,181 @@
+"""
+Tests for the content-addressed PDF cache (services/pdf_cache.py): hits,
+conditional revalidation, changed content and LRU eviction, against a local
+aiohttp server standing in for the DA/DOE PDF hosts.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+
+from services import pdf_cache as pdf_cache_module
+from services.http_utils import http_clients
+from services.pdf_cache import PDFCache, content_hash
+
+
+class StubPDFHost:
+    """Serves `content` at /doc.pdf with an ETag, honouring If-None-Match."""
+
+    def __init__(self, content=b"%PDF-1.4 price index v1"):
+        self.content = content
+        self.down = False
+        self.requests = []
+
+    @property
+    def etag(self):
+        return f'"{content_hash(self.content)[:16]}"'
+
+    async def handle(self, request):
+        self.requests.append(dict(request.headers))
+        if self.down:
+            return web.Response(status=503)
+        if request.headers.get("If-None-Match") == self.etag:
+            return web.Response(status=304, headers={"ETag": self.etag})
+        return web.Response(
+            body=self.content,
+            content_type="application/pdf",
+            headers={"ETag": self.etag, "Last-Modified": "Mon, 05 Oct 2026 00:00:00 GMT"},
+        )
+
+
+def run_against(host, coro_fn):
+    async def run():
+        app = web.Application()
+        app.router.add_get("/doc.pdf", host.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            return await coro_fn(f"http://127.0.0.1:{port}/doc.pdf")
+        finally:
+            await http_clients.close()
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable clock for fetched_at/accessed_at."""
+    now = {"t": 1_000_000.0}
+    monkeypatch.setattr(pdf_cache_module, "time", SimpleNamespace(time=lambda: now["t"]))
+    return now
+
+
+class TestPDFCache:
+    def test_immutable_url_is_downloaded_once(self, tmp_path):
+        host, cache = StubPDFHost(), PDFCache(root=str(tmp_path))
+
+        async def run(url):
+            return url, await cache.fetch(None, url), await cache.fetch(None, url)
+
+        url, first, second = run_against(host, run)
+
+        assert first == second == host.content
+        assert len(host.requests) == 1
+        assert (cache.misses, cache.hits) == (1, 1)
+
+        # The index is on disk: a new instance (a restart) still hits
+        restarted = PDFCache(root=str(tmp_path))
+        assert asyncio.run(restarted.get(url)) == host.content
+        assert len(host.requests) == 1
+
+    def test_stale_entry_is_revalidated_with_a_conditional_get(self, tmp_path, clock):
+        host, cache = StubPDFHost(), PDFCache(root=str(tmp_path))
+
+        async def run(url):
+            first = await cache.fetch(None, url, max_age=60)
+            clock["t"] += 120
+            return first, await cache.fetch(None, url, max_age=60)
+
+        first, second = run_against(host, run)
+
+        assert first == second == host.content
+        assert len(host.requests) == 2
+        assert host.requests[1]["If-None-Match"] == host.etag
+        assert host.requests[1]["If-Modified-Since"] == "Mon, 05 Oct 2026 00:00:00 GMT"
+        assert (cache.misses, cache.revalidated) == (1, 1)
+        # A 304 restarts the freshness window
+        assert cache.stats()["urls"] == 1
+        assert cache._index[next(iter(cache._index))]["fetched_at"] == clock["t"]
+
+    def test_changed_content_replaces_the_entry(self, tmp_path, clock):
+        host, cache = StubPDFHost(), PDFCache(root=str(tmp_path))
+
+        async def run(url):
+            old = await cache.fetch(None, url, max_age=60)
+            host.content = b"%PDF-1.4 price index v2 (corrected)"
+            clock["t"] += 120
+            return url, old, await cache.fetch(None, url, max_age=60)
+
+        url, old, new = run_against(host, run)
+
+        assert old != new == host.content
+        assert cache.misses == 2 and cache.revalidated == 0
+        assert cache._index[url]["sha256"] == content_hash(new)
+        assert asyncio.run(cache.get(url)) == new
+
+    def test_failed_revalidation_serves_the_stale_copy(self, tmp_path, clock):
+        host, cache = StubPDFHost(), PDFCache(root=str(tmp_path))
+
+        async def run(url):
+            first = await cache.fetch(None, url, max_age=60)
+            host.down = True
+            clock["t"] += 120
+            return first, await cache.fetch(None, url, max_age=60, max_retries=1)
+
+        first, stale = run_against(host, run)
+
+        assert stale == first == host.content
+        assert len(host.requests) == 2
+
+    def test_least_recently_used_blobs_are_evicted(self, tmp_path, clock):
+        cache = PDFCache(root=str(tmp_path), max_bytes=250)
+        blobs = {f"https://da.gov.ph/{n}.pdf": bytes([n]) * 100 for n in range(3)}
+        urls = list(blobs)
+
+        async def run():
+            for url in urls[:2]:
+                await cache.put(url, blobs[url])
+                clock["t"] += 1
+            await cache.get(urls[0])  # 0 is now more recent than 1
+            clock["t"] += 1
+            await cache.put(urls[2], blobs[urls[2]])
+            return [await cache.get(url) for url in urls]
+
+        cached = asyncio.run(run())
+
+        assert cached == [blobs[urls[0]], None, blobs[urls[2]]]
+        assert not cache._blob_path(content_hash(blobs[urls[1]])).exists()
+        assert cache.stats()["bytes"] == 200
+
+    def test_hits_persist_access_times_without_a_write_per_lookup(self, tmp_path, clock):
+        cache = PDFCache(root=str(tmp_path))
+        url, index_file = "https://da.gov.ph/0.pdf", tmp_path / "index.json"
+
+        async def run():
+            await cache.put(url, b"%PDF-1.4 daily prices")
+            written = index_file.stat().st_ino  # each write replaces the file
+            clock["t"] += 1
+            for _ in range(20):
+                assert await cache.get(url) is not None
+            assert index_file.stat().st_ino == written
+            assert cache._index[url]["accessed_at"] == clock["t"]
+
+            # The next hit after INDEX_SAVE_INTERVAL writes the batch of access times...
+            clock["t"] += pdf_cache_module.INDEX_SAVE_INTERVAL
+            await cache.get(url)
+            persisted = PDFCache(root=str(tmp_path))._load_index()[url]["accessed_at"]
+            # ...and flush() (on shutdown) writes whatever is left
+            clock["t"] += 1
+            await cache.get(url)
+            await cache.flush()
+            return persisted, PDFCache(root=str(tmp_path))._load_index()[url]["accessed_at"]
+
+        persisted, flushed = asyncio.run(run())
+
+        assert persisted == clock["t"] - 1
+        assert flushed == clock["t"]
@@ -0,0 +1,46 @@
+"""
+Golden-file tests for DailyPriceIndexParser.parse_prices (no server needed).
+
+Each tests/fixtures/price_parser/<name>.txt is parser input; <name>.expected.json
+is the output recorded from the original three-regex parser, including its
+quirks (e.g. "Price 60000.00" falls back to the trailing "00" and is dropped).
+If a parser change is intentional, re-record the JSON and bump PARSER_VERSION.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from services.daily_price_parser import daily_parser
+
+FIXTURES = Path(__file__).parent / "fixtures" / "price_parser"
+CASES = sorted(p.stem for p in FIXTURES.glob("*.txt"))
+
+
+class TestParsePricesGolden:
+    @pytest.mark.parametrize("case", CASES)
+    def test_matches_golden_output(self, case):
+        text = (FIXTURES / f"{case}.txt").read_text(encoding="utf-8")
+        expected = json.loads((FIXTURES / f"{case}.expected.json").read_text(encoding="utf-8"))
+        result = daily_parser.parse_prices(text)
+        assert result == expected
+        # Later duplicates overwrite earlier ones in place — order is part of the output
+        assert list(result) == list(expected)
+
+
+class TestParsePrices:
+    def test_two_decimal_price(self):
+        assert daily_parser.parse_prices("Bangus Large 220.00") == {"Bangus Large": 220.0}
+
+    def test_out_of_range_falls_back_to_trailing_digits(self):
+        assert daily_parser.parse_prices("Price 99999.75") == {"Price 99999": 75.0}
+
+    def test_skips_headers_and_na(self):
+        text = "DAILY PRICE INDEX 2025\nPage 1 of 3 45.00\nCauliflower n/a\nRice N/A 45.00"
+        assert daily_parser.parse_prices(text) == {}
+
+    def test_non_ascii_digits(self):
+        assert daily_parser.parse_prices("Bangus ١٢٣.٤٥") == {"Bangus": 123.45}
+
+    def test_empty_text(self):
+        assert daily_parser.parse_prices("") == {}
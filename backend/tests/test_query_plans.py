@@ -0,0 +1,157 @@
+"""
+Query plan tests: no endpoint or integration query may run as a COLLSCAN.
+
+Builds a scratch database with the registered indexes (services/db_migrations.py)
+and explains every filtered or sorted query shape used in server.py and the
+services. Deliberate full scans (analytics over all items, unfiltered counts)
+are not listed.
+
+Requires MONGO_URL; skipped otherwise.
+"""
+import asyncio
+import os
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from services import market_catalog
+from services.db_migrations import INDEXES, ensure_indexes
+
+MONGO_URL = os.environ.get("MONGO_URL")
+SCRATCH_DB = "climate_intel_query_plans_test"
+
+pytestmark = pytest.mark.skipif(not MONGO_URL, reason="MONGO_URL not set")
+
+NOW = datetime.utcnow()
+
+# (collection, filter, sort, limit) — mirrors the queries in server.py and services
+FIND_SHAPES = [
+    # market_items
+    *(("market_items", {}, spec, 100) for spec in market_catalog.SORTS.values()),
+    *(("market_items", {"category": "rice"}, spec, 100) for spec in market_catalog.SORTS.values()),
+    ("market_items", {"$and": [{}, market_catalog._after_filter(market_catalog.SORTS["best"], [0, 5.0, ObjectId()])]},
+     market_catalog.SORTS["best"], 100),
+    ("market_items", {"_id": ObjectId()}, None, 1),
+    ("market_items", {"name": "Rice"}, None, 1),
+    ("market_items", {"name": {"$in": ["Rice", "Egg"]}}, None, 0),
+    ("market_items", {"name_key": {"$in": ["rice"]}}, [("currentPrice", 1)], 1),
+    ("market_items", {"name_prefixes": {"$all": ["ric"]}}, None, 1),
+    ("market_items", {"savings": {"$gt": 0}}, None, 200),
+    ("market_items", {"category": "fuel"}, None, 0),
+    ("market_items", {}, [("lastUpdated", -1)], 1),
+    # price_history
+    ("price_history", {"name": "Rice", "date": "2025-01-06"}, None, 1),
+    ("price_history", {"name_key": {"$in": ["rice"]}, "date": {"$gte": "2025-01-01"}}, [("date", 1)], 500),
+    ("price_history", {"name_prefixes": {"$all": ["ric"]}}, [("date", 1)], 500),
+    # crowd_price_reports
+    ("crowd_price_reports", {"status": "pending"}, [("reported_at", -1)], 50),
+    ("crowd_price_reports", {"item_name_key": {"$in": ["rice"]}, "status": "pending"}, [("reported_at", -1)], 50),
+    ("crowd_price_reports", {"item_name_prefixes": {"$all": ["ric"]}}, [("reported_at", -1)], 50),
+    # climate_metrics
+    ("climate_metrics", {"name": "Temperature"}, None, 1),
+    ("climate_metrics", {"_id": ObjectId()}, None, 1),
+    # climate_history
+    ("climate_history", {"name": "Temperature", "date": "2026-06-01"}, None, 1),
+    ("climate_history", {"date": {"$gte": "2025-06-01"}}, None, 0),
+    # doe_circulars
+    ("doe_circulars", {}, [("date_published", -1)], 20),
+    ("doe_circulars", {"doe_id": "123"}, None, 1),
+    ("doe_circulars", {"title": "Department Circular"}, None, 1),
+    ("doe_circulars", {}, [("doe_id", -1)], 1),
+    # ppa_contracts
+    ("ppa_contracts", {"doc_id": "a|b|solar"}, None, 1),
+    ("ppa_contracts", {}, [("potential_capacity_mw", -1)], 50),
+    ("ppa_contracts", {"technology": {"$regex": "solar", "$options": "i"}}, [("potential_capacity_mw", -1)], 50),
+    ("ppa_contracts", {"stage": {"$regex": "development", "$options": "i"}}, None, 0),
+    # telegram_subscribers
+    ("telegram_subscribers", {"chat_id": "42"}, None, 1),
+    ("telegram_subscribers", {"active": True}, None, 0),
+    ("telegram_subscribers", {"active": True, "last_broadcast_id": {"$ne": "abc"}}, None, 0),
+    # news_articles / news_queries
+    ("news_articles", {"queries": "solar power philippines"}, [("published", -1)], 10),
+    ("news_queries", {"_id": {"$in": ["solar power philippines"]}}, None, 0),
+    # telegram_broadcasts
+    ("telegram_broadcasts", {}, [("started_at", -1)], 10),
+    # wesm_prices
+    ("wesm_prices", {"date": "2025-01-06", "region": "luzon", "interval": "00:05"}, None, 1),
+    ("wesm_prices", {"date": {"$gte": "2025-01-01"}, "region": "luzon"}, [("date", 1)], 0),
+    # jobs
+    ("jobs", {"_id": "abc"}, None, 1),
+    ("jobs", {"status": "queued"}, [("created_at", 1)], 0),
+    ("jobs", {"status": "running", "heartbeat_at": {"$lt": NOW}}, None, 0),
+    ("jobs", {}, [("created_at", -1)], 20),
+    ("jobs", {"status": "failed"}, [("created_at", -1)], 20),
+]
+
+AGGREGATE_SHAPES = [
+    ("crowd_price_reports", [
+        {"$match": {"item_name_key": {"$in": ["rice"]}, "status": "approved", "reported_at": {"$gte": "2025-01-01"}}},
+        {"$group": {"_id": "$item_name", "avg": {"$avg": "$price"}}},
+    ]),
+]
+
+
+def _collscans(plan) -> int:
+    if isinstance(plan, dict):
+        return (plan.get("stage") == "COLLSCAN") + sum(_collscans(v) for v in plan.values())
+    if isinstance(plan, list):
+        return sum(_collscans(v) for v in plan)
+    return 0
+
+
+def _winning_plans(explain) -> list:
+    """All winningPlan sections of an explain document (find or aggregate)."""
+    if isinstance(explain, dict):
+        found = [explain["winningPlan"]] if "winningPlan" in explain else []
+        return found + [p for k, v in explain.items() if k != "winningPlan" for p in _winning_plans(v)]
+    if isinstance(explain, list):
+        return [p for v in explain for p in _winning_plans(v)]
+    return []
+
+
+@pytest.fixture(scope="module")
+def db():
+    from pymongo import MongoClient
+
+    client = MongoClient(MONGO_URL)
+    database = client[SCRATCH_DB]
+    client.drop_database(SCRATCH_DB)
+
+    async def create_indexes():
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        motor_client = AsyncIOMotorClient(MONGO_URL)
+        try:
+            assert await ensure_indexes(motor_client[SCRATCH_DB]) == []
+        finally:
+            motor_client.close()
+
+    asyncio.run(create_indexes())
+    yield database
+    client.drop_database(SCRATCH_DB)
+    client.close()
+
+
+class TestQueryPlans:
+    def test_every_registered_collection_is_covered(self):
+        covered = {shape[0] for shape in FIND_SHAPES + AGGREGATE_SHAPES}
+        assert set(INDEXES) <= covered
+
+    @pytest.mark.parametrize("collection,query,sort,limit", FIND_SHAPES)
+    def test_find_uses_index(self, db, collection, query, sort, limit):
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        plans = _winning_plans(cursor.explain())
+        assert plans, "explain() returned no winning plan"
+        assert sum(_collscans(p) for p in plans) == 0, f"COLLSCAN for {collection} {query} sort={sort}"
+
+    @pytest.mark.parametrize("collection,pipeline", AGGREGATE_SHAPES)
+    def test_aggregate_uses_index(self, db, collection, pipeline):
+        explain = db.command("aggregate", collection, pipeline=pipeline, explain=True)
+        plans = _winning_plans(explain)
+        assert plans, "explain() returned no winning plan"
+        assert sum(_collscans(p) for p in plans) == 0, f"COLLSCAN for {collection} {pipeline}"
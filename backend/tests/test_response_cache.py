@@ -0,0 +1,127 @@
+"""
+Tests for the ETag response cache middleware (plain ASGI; no server needed).
+"""
+import asyncio
+import json
+
+from services.collection_versions import CollectionVersions
+from services import response_cache
+from services.response_cache import ResponseCacheMiddleware, etag_matches
+
+
+class CountingApp:
+    """ASGI app returning a JSON body built from a call counter."""
+
+    def __init__(self, status=200):
+        self.calls = 0
+        self.status = status
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        body = json.dumps({"path": scope["path"], "calls": self.calls}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": self.status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def request(app, path, query=b"", headers=(), method="GET"):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start, body = sent[0], b"".join(m.get("body", b"") for m in sent[1:])
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, body
+
+
+def make(monkeypatch, status=200, **kwargs):
+    versions = CollectionVersions()
+    monkeypatch.setattr(response_cache, "collection_versions", versions)
+    inner = CountingApp(status)
+    routes = [("/api/market-items", ["market_items"]), ("/api/categories", [])]
+    return ResponseCacheMiddleware(inner, routes, **kwargs), inner, versions
+
+
+class TestResponseCache:
+    def test_repeat_requests_are_served_from_cache(self, monkeypatch):
+        app, inner, _ = make(monkeypatch)
+        first = request(app, "/api/market-items", b"limit=5&sort=best")
+        second = request(app, "/api/market-items", b"sort=best&limit=5")  # same query, reordered
+        assert inner.calls == 1
+        assert first[2] == second[2]
+        assert first[1]["x-cache"] == "MISS" and second[1]["x-cache"] == "HIT"
+        assert first[1]["etag"] == second[1]["etag"]
+        assert second[1]["content-length"] == str(len(second[2]))
+        assert "must-revalidate" in second[1]["cache-control"]
+
+    def test_distinct_queries_are_distinct_entries(self, monkeypatch):
+        app, inner, _ = make(monkeypatch)
+        request(app, "/api/market-items", b"limit=5")
+        request(app, "/api/market-items", b"limit=6")
+        assert inner.calls == 2
+
+    def test_if_none_match_gets_304(self, monkeypatch):
+        app, inner, _ = make(monkeypatch)
+        _, headers, _ = request(app, "/api/market-items")
+        status, headers_304, body = request(app, "/api/market-items", headers=[("If-None-Match", headers["etag"])])
+        assert (status, body) == (304, b"")
+        assert headers_304["etag"] == headers["etag"]
+        status, _, body = request(app, "/api/market-items", headers=[("If-None-Match", '"other"')])
+        assert status == 200 and body
+        assert inner.calls == 1
+
+    def test_version_bump_invalidates(self, monkeypatch):
+        app, inner, versions = make(monkeypatch)
+        _, before, _ = request(app, "/api/market-items")
+        request(app, "/api/categories")
+        versions._versions["market_items"] = 1
+        _, after, _ = request(app, "/api/market-items")
+        request(app, "/api/categories")
+        assert inner.calls == 3  # categories reads no collection — still cached
+        assert after["etag"] != before["etag"]
+
+    def test_ttl_expiry(self, monkeypatch):
+        app, inner, _ = make(monkeypatch, ttl=0)
+        request(app, "/api/market-items")
+        request(app, "/api/market-items")
+        assert inner.calls == 2
+
+    def test_lru_bound(self, monkeypatch):
+        app, inner, _ = make(monkeypatch, max_entries=2)
+        for query in (b"a=1", b"a=2", b"a=3", b"a=1"):
+            request(app, "/api/market-items", query)
+        assert inner.calls == 4
+        assert len(app._entries) == 2
+
+    def test_errors_and_other_routes_pass_through(self, monkeypatch):
+        app, inner, _ = make(monkeypatch, status=500)
+        status, headers, _ = request(app, "/api/market-items")
+        request(app, "/api/market-items")
+        assert status == 500 and "etag" not in headers
+        request(app, "/api/jobs")
+        request(app, "/api/market-items", method="POST")
+        assert inner.calls == 4
+        assert app._entries == {}
+
+
+class TestEtagMatching:
+    def test_weak_and_list_forms(self):
+        assert etag_matches('"abc"', '"abc"')
+        assert etag_matches('W/"abc"', '"abc"')
+        assert etag_matches('"x", "abc"', '"abc"')
+        assert etag_matches("*", '"abc"')
+        assert not etag_matches('"abcd"', '"abc"')
@@ -0,0 +1,117 @@
+"""
+Tests for the stale-while-revalidate cache (in-memory; no server needed).
+"""
+import asyncio
+import time
+
+import pytest
+
+from services.swr_cache import SWRCache
+
+
+class Loader:
+    """Counts calls; returns `value` (or raises `error`) after a short delay."""
+
+    def __init__(self, value="v1"):
+        self.value = value
+        self.error = None
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.error:
+            raise self.error
+        return self.value
+
+
+def age(cache: SWRCache, key: str, seconds: float):
+    value, stored_at = cache._entries[key]
+    cache._entries[key] = (value, stored_at - seconds)
+
+
+class TestSWRCache:
+    def test_fresh_values_are_served_from_memory(self):
+        cache, loader = SWRCache("t_fresh", soft_ttl=60, hard_ttl=600), Loader()
+
+        async def run():
+            assert await cache.get("k", loader) == "v1"
+            assert await cache.get("k", loader) == "v1"
+
+        asyncio.run(run())
+        assert loader.calls == 1
+        assert (cache.misses, cache.hits) == (1, 1)
+
+    def test_concurrent_misses_share_one_load(self):
+        cache, loader = SWRCache("t_flight", soft_ttl=60, hard_ttl=600), Loader()
+
+        async def run():
+            return await asyncio.gather(*(cache.get("k", loader) for _ in range(5)))
+
+        assert asyncio.run(run()) == ["v1"] * 5
+        assert loader.calls == 1
+
+    def test_stale_value_served_while_refreshing(self):
+        cache, loader = SWRCache("t_stale", soft_ttl=60, hard_ttl=600), Loader()
+
+        async def run():
+            await cache.get("k", loader)
+            age(cache, "k", 120)
+            loader.value = "v2"
+            stale = await asyncio.gather(*(cache.get("k", loader) for _ in range(3)))
+            assert stale == ["v1"] * 3
+            await asyncio.sleep(0.05)
+            return await cache.get("k", loader)
+
+        assert asyncio.run(run()) == "v2"
+        assert loader.calls == 2
+        assert cache.stale_hits == 3
+
+    def test_failed_refresh_keeps_last_good_value(self):
+        cache, loader = SWRCache("t_keep", soft_ttl=60, hard_ttl=600), Loader()
+
+        async def run():
+            await cache.get("k", loader)
+            age(cache, "k", 120)
+            loader.error = RuntimeError("upstream down")
+            assert await cache.get("k", loader) == "v1"
+            await asyncio.sleep(0.05)
+            loader.error, loader.value = None, None  # "no data" is not cached either
+            assert await cache.get("k", loader) == "v1"
+            await asyncio.sleep(0.05)
+            return await cache.get("k", loader)
+
+        assert asyncio.run(run()) == "v1"
+        assert cache.refresh_errors == 2
+
+    def test_hard_expired_values_are_reloaded_inline(self):
+        cache, loader = SWRCache("t_hard", soft_ttl=60, hard_ttl=600), Loader()
+
+        async def run():
+            await cache.get("k", loader)
+            age(cache, "k", 601)
+            loader.value = "v2"
+            return await cache.get("k", loader)
+
+        assert asyncio.run(run()) == "v2"
+        assert cache.misses == 2
+
+    def test_miss_propagates_loader_errors(self):
+        cache, loader = SWRCache("t_error", soft_ttl=60, hard_ttl=600), Loader()
+        loader.error = RuntimeError("upstream down")
+        with pytest.raises(RuntimeError):
+            asyncio.run(cache.get("k", loader))
+        assert cache._entries == {}
+
+    def test_peek_ignores_ttls(self):
+        cache, loader = SWRCache("t_peek", soft_ttl=60, hard_ttl=600), Loader()
+        asyncio.run(cache.get("k", loader))
+        age(cache, "k", 10_000)
+        value, stored_at = asyncio.run(cache.peek("k"))
+        assert value == "v1" and stored_at < time.time() - 9_000
+
+    def test_ttls_from_environment(self, monkeypatch):
+        monkeypatch.setenv("SWR_T_ENV_SOFT_TTL", "5")
+        monkeypatch.setenv("SWR_T_ENV_HARD_TTL", "1")
+        cache = SWRCache("t_env", soft_ttl=60, hard_ttl=600)
+        assert (cache.soft_ttl, cache.hard_ttl) == (5, 5)
@@ -0,0 +1,159 @@
+"""
+Tests for the Telegram broadcast dispatcher, against a local stub of the
+Telegram Bot API and a mongomock database (tests/mock_mongo.py).
+"""
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from services.http_utils import http_clients
+from services.telegram_broadcast import BroadcastDispatcher, ChatRateLimiter
+from mock_mongo import count_bulk_writes, mock_db, stored
+
+
+def subscribers_db(chats):
+    return mock_db({"telegram_subscribers": [{"chat_id": c, "active": True} for c in chats]})
+
+
+class StubTelegram:
+    """
+    sendMessage stub: chats in `blocked` get 403; the first `flood` requests
+    get 429 with retry_after; `failing` chats get 400 every time.
+    """
+
+    def __init__(self, blocked=(), flood=0, retry_after=1, failing=(), delay=0.0):
+        self.blocked, self.failing = set(blocked), set(failing)
+        self.flood, self.retry_after, self.delay = flood, retry_after, delay
+        self.delivered = []
+        self.requests = 0
+        self.in_flight = self.max_in_flight = 0
+        self.flood_ended_at = None
+
+    async def handle(self, request):
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            payload = await request.json()
+            await asyncio.sleep(self.delay)
+            chat_id = payload["chat_id"]
+            if self.flood:
+                self.flood -= 1
+                if not self.flood:
+                    self.flood_ended_at = time.monotonic()
+                return web.json_response(
+                    {"ok": False, "error_code": 429, "parameters": {"retry_after": self.retry_after}},
+                    status=429,
+                )
+            if chat_id in self.blocked:
+                return web.json_response({"ok": False, "description": "Forbidden"}, status=403)
+            if chat_id in self.failing:
+                return web.json_response({"ok": False, "description": "Bad Request"}, status=400)
+            self.delivered.append(chat_id)
+            return web.json_response({"ok": True})
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture(autouse=True)
+def bot_token(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test-token")
+
+
+def run_broadcast(stub, db, broadcast_id=None, **dispatcher_kwargs):
+    async def run():
+        app = web.Application()
+        app.router.add_post("/bottest-token/sendMessage", stub.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        dispatcher = BroadcastDispatcher(
+            api_url=f"http://127.0.0.1:{port}/bot{{token}}/{{method}}", **dispatcher_kwargs
+        )
+        try:
+            return await dispatcher.broadcast(db, "hello", broadcast_id=broadcast_id)
+        finally:
+            await http_clients.close()
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+class TestBroadcastDispatcher:
+    def test_delivers_to_every_subscriber_concurrently(self, monkeypatch):
+        chats = [str(i) for i in range(2000)]
+        db, stub = subscribers_db(chats), StubTelegram(delay=0.005)
+        bulk_writes = count_bulk_writes(monkeypatch)
+
+        stats = run_broadcast(stub, db, global_rate=10_000, concurrency=20)
+
+        assert sorted(stub.delivered) == sorted(chats)
+        assert stats["sent"] == stats["total"] == 2000
+        assert stub.max_in_flight > 1
+        record = stored(db.telegram_broadcasts, "_id")[stats["broadcast_id"]]
+        assert record["status"] == "finished"
+        assert record["sent"] == 2000
+        # Delivery marks go out in bulk, not one write per chat
+        assert 0 < bulk_writes["telegram_subscribers"] < 20
+
+    def test_global_rate_is_respected(self):
+        db, stub = subscribers_db([str(i) for i in range(30)]), StubTelegram()
+
+        start = time.monotonic()
+        run_broadcast(stub, db, global_rate=100, concurrency=10)
+
+        # 30 messages at 100 msg/s (burst 1) cannot finish in under ~0.29s
+        assert time.monotonic() - start >= 0.28
+
+    def test_blocked_chats_are_deactivated(self):
+        db, stub = subscribers_db(["1", "2", "3", "4"]), StubTelegram(blocked={"2", "4"})
+
+        stats = run_broadcast(stub, db, global_rate=1000)
+
+        assert (stats["sent"], stats["deactivated"]) == (2, 2)
+        subscribers = stored(db.telegram_subscribers, "chat_id")
+        assert [c for c, doc in subscribers.items() if not doc["active"]] == ["2", "4"]
+
+    def test_429_pauses_for_retry_after(self):
+        db, stub = subscribers_db(["1", "2", "3"]), StubTelegram(flood=1, retry_after=1)
+
+        stats = run_broadcast(stub, db, global_rate=1000, concurrency=1)
+
+        assert stats["sent"] == 3
+        assert stats["rate_limited"] == 1
+        assert stub.requests == 4
+
+    def test_resume_skips_delivered_chats(self):
+        db = subscribers_db(["1", "2", "3"])
+        first = run_broadcast(StubTelegram(failing={"3"}), db, global_rate=1000)
+        assert (first["sent"], first["failed"]) == (2, 1)
+
+        retry = StubTelegram()
+        second = run_broadcast(retry, db, broadcast_id=first["broadcast_id"], global_rate=1000)
+
+        assert retry.delivered == ["3"]
+        assert second["sent"] == 3
+
+    def test_missing_token_raises(self, monkeypatch):
+        monkeypatch.delenv("TELEGRAM_BOT_TOKEN")
+        with pytest.raises(RuntimeError):
+            asyncio.run(BroadcastDispatcher().broadcast(subscribers_db([]), "hello"))
+
+
+class TestChatRateLimiter:
+    def test_messages_to_one_chat_are_spaced(self):
+        limiter = ChatRateLimiter(rate=20)
+
+        async def run():
+            start = time.monotonic()
+            for _ in range(3):
+                await limiter.acquire("42")
+            await limiter.acquire("other")
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(run())
+        assert 0.09 <= elapsed < 0.5
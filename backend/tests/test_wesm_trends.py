@@ -0,0 +1,127 @@
+"""
+Tests for WESMPriceScraper's per-day cache and trend window (no network).
+
+IEMOP downloads are replaced by the MP fixture; the scraper's fetch/cache
+logic runs unchanged.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import aiohttp
+import pytest
+
+from services.energy_grid_scraper import WESMPriceScraper
+from services.iemop_csv import MarketPriceAggregator
+
+FIXTURE = (Path(__file__).parent / "fixtures" / "iemop" / "mp_sample.csv").read_bytes()
+
+
+class FakeIEMOP(WESMPriceScraper):
+    """Serves the fixture for every day except `missing`; `broken` days raise."""
+
+    def __init__(self, missing=(), broken=()):
+        self._days = {}
+        self._inflight = {}
+        self.missing = set(missing)
+        self.broken = set(broken)
+        self.fetched = []
+        self.in_flight = self.max_in_flight = 0
+
+    async def _fetch_day(self, session, date):
+        date_str = date.strftime("%Y-%m-%d")
+        self.fetched.append(date_str)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if date_str in self.broken:
+                raise aiohttp.ClientError("connection reset")
+            if date_str in self.missing:
+                return None
+            agg = MarketPriceAggregator(self.REGION_MAP)
+            agg.feed(FIXTURE)
+            agg.close()
+            return agg
+        finally:
+            self.in_flight -= 1
+
+
+def ph_day(offset: int) -> str:
+    return (datetime.utcnow() + timedelta(hours=8) - timedelta(days=offset)).strftime("%Y-%m-%d")
+
+
+class TestPriceTrends:
+    def test_days_fetched_concurrently(self):
+        scraper = FakeIEMOP()
+        trends = asyncio.run(scraper.fetch_price_trends(days=7))
+        assert sorted(scraper.fetched) == sorted(ph_day(i) for i in range(7))
+        assert scraper.max_in_flight == WESMPriceScraper.FETCH_CONCURRENCY
+        assert set(trends) == {"wesm_luzon", "wesm_visayas", "wesm_mindanao"}
+        assert len(trends["wesm_luzon"]["trend"]) == 7
+        assert trends["wesm_luzon"]["data_date"] == ph_day(0)
+
+    def test_windows_share_the_day_cache(self):
+        scraper = FakeIEMOP()
+        asyncio.run(scraper.fetch_price_trends(days=7))
+        scraper.fetched.clear()
+        asyncio.run(scraper.fetch_price_trends(days=1))
+        asyncio.run(scraper.fetch_price_trends(days=7))
+        assert scraper.fetched == []
+
+    def test_past_days_never_refetched(self):
+        scraper = FakeIEMOP()
+        asyncio.run(scraper.fetch_price_trends(days=7))
+        # Expire everything: only today's (partial) file is fetched again
+        scraper._days = {d: (stats, 0) for d, (stats, _) in scraper._days.items()}
+        scraper.fetched.clear()
+        asyncio.run(scraper.fetch_price_trends(days=7))
+        assert scraper.fetched == [ph_day(0)]
+
+    def test_missing_days_extend_the_window(self):
+        scraper = FakeIEMOP(missing={ph_day(0), ph_day(3)})
+        trends = asyncio.run(scraper.fetch_price_trends(days=7))
+        assert len(trends["wesm_luzon"]["trend"]) == 7
+        assert trends["wesm_luzon"]["data_date"] == ph_day(1)
+        assert ph_day(8) in scraper.fetched and ph_day(9) not in scraper.fetched
+
+    def test_network_errors_are_not_cached(self):
+        scraper = FakeIEMOP(broken={ph_day(0)})
+        trends = asyncio.run(scraper.fetch_price_trends(days=1))
+        assert trends["wesm_luzon"]["data_date"] == ph_day(1)
+        scraper.broken.clear()
+        trends = asyncio.run(scraper.fetch_price_trends(days=1))
+        assert trends["wesm_luzon"]["data_date"] == ph_day(0)
+
+    def test_nothing_published(self):
+        scraper = FakeIEMOP(missing={ph_day(i) for i in range(WESMPriceScraper.MAX_LOOKBACK)})
+        assert asyncio.run(scraper.fetch_price_trends(days=7)) == {}
+        assert len(scraper.fetched) == WESMPriceScraper.MAX_LOOKBACK
+
+    @pytest.mark.parametrize("days", [1, 7])
+    def test_concurrent_callers_share_downloads(self, days):
+        scraper = FakeIEMOP()
+
+        async def both():
+            return await asyncio.gather(
+                scraper.fetch_price_trends(days=days), scraper.fetch_price_trends(days=days)
+            )
+
+        first, second = asyncio.run(both())
+        assert first == second
+        assert len(scraper.fetched) == days
+
+    def test_cancelled_caller_does_not_cancel_shared_downloads(self):
+        scraper = FakeIEMOP()
+
+        async def run():
+            first = asyncio.create_task(scraper.fetch_price_trends(days=7))
+            await asyncio.sleep(0)  # first caller starts the downloads
+            second = asyncio.create_task(scraper.fetch_price_trends(days=7))
+            await asyncio.sleep(0.001)
+            first.cancel()
+            return await second
+
+        trends = asyncio.run(run())
+        assert len(trends["wesm_luzon"]["trend"]) == 7
+        assert len(scraper.fetched) == 7